@@ -4,13 +4,45 @@
 " Architecture: This file contains UI/buffer operations only.
 " All logic (parsing, CLI execution) is in Python (pythonx/vim4rabbit/).
 
+" Initialize Python module on first use (not at Vim startup)
+" Add pythonx directory to Python path and import vim4rabbit
+let s:plugin_root = expand('<sfile>:p:h:h')
+python3 << EOF
+import sys
+import vim
+
+# Add plugin's pythonx directory to Python path
+plugin_root = vim.eval('s:plugin_root')
+pythonx_path = plugin_root + '/pythonx'
+if pythonx_path not in sys.path:
+    sys.path.insert(0, pythonx_path)
+
+# Import vim4rabbit module
+import vim4rabbit
+EOF
+
 " Store buffer numbers for reference
 let s:help_bufnr = -1
 let s:review_bufnr = -1
 
-" Store the running job for cancellation
-let s:review_job = v:null
-let s:review_output = []
+" Id of the running review job (owned by Python, see jobs.py)
+let s:review_job_id = 0
+let s:review_poll_timer = v:null
+let s:review_issues_ready = 0
+
+" Id of the task building the finished review's result (see tasks.py)
+let s:review_task_id = 0
+
+" Review id of the review on display; Python keeps its issues, rendered
+" lines and selections (see sessions.py)
+let s:review_id = 0
+
+" Review cache key computed when the current review started
+let s:review_cache_key = ''
+
+" Speculative review timers (g:vim4rabbit_speculative)
+let s:speculative_debounce_timer = v:null
+let s:speculative_poll_timer = v:null
 
 " Animation state
 let s:spinner_timer = v:null
@@ -34,8 +66,16 @@ let s:game_bufnr = -1
 let s:matrix_match_ids = []
 
 " Main Rabbit command dispatcher
-function! vim4rabbit#Rabbit(subcmd)
+" Optional argument: bang (1 to bypass the review cache)
+function! vim4rabbit#Rabbit(subcmd, ...)
     let l:cmd = a:subcmd
+    let l:bang = a:0 > 0 ? a:1 : 0
+
+    " Accept a trailing bang on the subcommand too (:Rabbit review!)
+    if l:cmd =~# '!$'
+        let l:cmd = substitute(l:cmd, '\s*!$', '', '')
+        let l:bang = 1
+    endif
 
     " Default to 'help' if no subcommand provided
     if l:cmd ==# ''
@@ -45,22 +85,26 @@ function! vim4rabbit#Rabbit(subcmd)
     if l:cmd ==# 'help'
         call vim4rabbit#Help()
     elseif l:cmd ==# 'review'
-        call vim4rabbit#Review('uncommitted')
+        call vim4rabbit#Review('uncommitted', l:bang)
     elseif l:cmd ==# 'review uncommitted'
-        call vim4rabbit#Review('uncommitted')
+        call vim4rabbit#Review('uncommitted', l:bang)
     elseif l:cmd ==# 'review committed'
-        call vim4rabbit#Review('committed')
+        call vim4rabbit#Review('committed', l:bang)
     elseif l:cmd ==# 'review all'
-        call vim4rabbit#Review('all')
+        call vim4rabbit#Review('all', l:bang)
+    elseif l:cmd ==# 'speculative'
+        echo py3eval('vim4rabbit.vim_speculative_stats()')
+    elseif l:cmd ==# 'stats'
+        echo join(py3eval('vim4rabbit.vim_get_review_stats()'), "\n")
     else
         echo "Unknown rabbit command: " . l:cmd
-        echo "Available commands: help, review, review uncommitted, review committed, review all"
+        echo "Available commands: help, review, review uncommitted, review committed, review all, speculative, stats"
     endif
 endfunction
 
 " Command completion for :Rabbit
 function! vim4rabbit#CompleteRabbit(ArgLead, CmdLine, CursorPos)
-    let l:commands = ['help', 'review', 'review uncommitted', 'review committed', 'review all']
+    let l:commands = ['help', 'review', 'review uncommitted', 'review committed', 'review all', 'speculative', 'stats']
     return filter(l:commands, 'v:val =~ "^" . a:ArgLead')
 endfunction
 
@@ -177,10 +221,12 @@ function! vim4rabbit#CleanupHelp()
 endfunction
 
 " Open the review buffer on the right side of the screen
-" Optional argument: review_type ('uncommitted' or 'committed', default 'uncommitted')
+" Optional arguments: review_type ('uncommitted' or 'committed', default 'uncommitted'),
+"                     bypass_cache (1 to ignore cached results, default 0)
 function! vim4rabbit#Review(...)
     " Get review type from argument, default to 'uncommitted'
     let l:review_type = a:0 > 0 ? a:1 : 'uncommitted'
+    let l:bypass_cache = a:0 > 1 ? a:2 : 0
 
     " If review buffer already exists, just focus it
     if s:review_bufnr != -1 && bufexists(s:review_bufnr)
@@ -237,6 +283,9 @@ function! vim4rabbit#Review(...)
     nnoremap <buffer> <silent> <leader>a :call vim4rabbit#SelectAllIssues()<CR>
     nnoremap <buffer> <silent> <leader>n :call vim4rabbit#DeselectAllIssues()<CR>
 
+    " Apply proposed fixes locally
+    nnoremap <buffer> <silent> a :call vim4rabbit#ApplySelectedFixes()<CR>
+
     " Claude integration
     nnoremap <buffer> <silent> @ :call vim4rabbit#LaunchClaude()<CR>
 
@@ -244,14 +293,42 @@ function! vim4rabbit#Review(...)
     autocmd BufWipeout <buffer> call vim4rabbit#CleanupReview()
 
     " Run the review asynchronously
-    call vim4rabbit#RunReviewAsync(l:review_type)
+    call vim4rabbit#RunReviewAsync(l:review_type, l:bypass_cache)
+endfunction
+
+" Pass g:vim4rabbit_line_rules to the line classifier
+function! s:ApplyLineRules()
+    if !exists('g:vim4rabbit_line_rules')
+        return
+    endif
+    let l:error = py3eval('vim4rabbit.vim_set_line_rules(' .
+        \ json_encode(g:vim4rabbit_line_rules) . ')')
+    if !empty(l:error)
+        echohl ErrorMsg
+        echom 'vim4rabbit: g:vim4rabbit_line_rules: ' . l:error
+        echohl None
+    endif
 endfunction
 
 " Run CodeRabbit CLI asynchronously
 " Argument: review_type ('uncommitted' or 'committed')
-function! vim4rabbit#RunReviewAsync(review_type)
-    " Reset output collector
-    let s:review_output = []
+" Optional argument: bypass_cache (1 to ignore cached results, default 0)
+function! vim4rabbit#RunReviewAsync(review_type, ...)
+    let l:bypass_cache = a:0 > 0 ? a:1 : 0
+    call s:ApplyLineRules()
+
+    " Serve an unchanged tree straight from the review cache
+    let s:review_cache_key = ''
+    if get(g:, 'vim4rabbit_review_cache', 1)
+        let l:cached = py3eval('vim4rabbit.vim_review_cache_lookup(' .
+            \ string(a:review_type) . ', ' . (l:bypass_cache ? 'True' : 'False') . ', ' .
+            \ 'False, ' . s:DirectBufnr(s:review_bufnr) . ')')
+        let s:review_cache_key = l:cached.key
+        if l:cached.hit
+            call s:ShowReviewResult(l:cached.result, l:cached.elapsed_secs, 1)
+            return
+        endif
+    endif
 
     " Record start time for elapsed timer
     let s:review_start_time = reltime()
@@ -262,20 +339,245 @@ function! vim4rabbit#RunReviewAsync(review_type)
     call s:UpdateSpinner(0)
     let s:spinner_timer = timer_start(750, function('s:UpdateSpinner'), {'repeat': -1})
 
-    " Build the command based on review type
-    let l:cmd = ['coderabbit', 'review', '--type', a:review_type, '--plain']
+    " Adopt a speculative review already running for this tree
+    let s:review_issues_ready = 0
+    let s:review_job_id = 0
+    if get(g:, 'vim4rabbit_speculative', 0) && a:review_type ==# 'uncommitted' && !l:bypass_cache
+        let s:review_job_id = py3eval('vim4rabbit.vim_speculative_claim(' .
+            \ string(s:review_cache_key) . ')')
+    endif
+
+    " Python runs coderabbit (one process per shard when
+    " g:vim4rabbit_review_shards > 1); we only poll its status
+    if !s:review_job_id
+        " A bang forces a full review even in delta mode
+        let l:delta = get(g:, 'vim4rabbit_review_delta', 0) && !l:bypass_cache
+        let s:review_job_id = py3eval('vim4rabbit.vim_start_review(' .
+            \ string(a:review_type) . ', ' .
+            \ get(g:, 'vim4rabbit_review_timeout', 0) . ', ' .
+            \ get(g:, 'vim4rabbit_review_shards', 1) . ', ' .
+            \ get(g:, 'vim4rabbit_review_max_jobs', 0) . ', ' .
+            \ (l:delta ? 'True' : 'False') . ', ' .
+            \ string(get(g:, 'vim4rabbit_output_format', 'text')) . ')')
+    endif
+    let s:review_poll_timer = timer_start(get(g:, 'vim4rabbit_poll_interval', 100),
+        \ function('s:PollReview'), {'repeat': -1})
+endfunction
+
+" Poll the review job; redraw when new issues are ready, finish on exit
+function! s:PollReview(timer)
+    let l:status = py3eval('vim4rabbit.vim_poll_review(' . s:review_job_id . ')')
+    if l:status.state ==# 'running'
+        if l:status.issues_ready > s:review_issues_ready
+            let s:review_issues_ready = l:status.issues_ready
+            call s:UpdateSpinner(0)
+        endif
+        return
+    endif
 
-    let s:review_job = job_start(l:cmd, {
-        \ 'out_cb': function('s:OnReviewOutput'),
-        \ 'err_cb': function('s:OnReviewOutput'),
-        \ 'exit_cb': function('s:OnReviewExit'),
-        \ 'mode': 'raw',
-        \ })
+    call s:StopPolling()
+    call s:OnReviewDone()
+endfunction
 
-    if job_status(s:review_job) ==# 'fail'
-        call s:StopSpinner()
-        call s:DisplayReviewError('Failed to start coderabbit')
+" Stop the poll timer
+function! s:StopPolling()
+    if s:review_poll_timer != v:null
+        call timer_stop(s:review_poll_timer)
+        let s:review_poll_timer = v:null
+    endif
+endfunction
+
+" Called once the review job has finished: Python builds, tracks and
+" formats the result on a worker thread while the spinner keeps running
+function! s:OnReviewDone()
+    " Capture elapsed time before the result is built
+    let s:review_elapsed_secs = float2nr(reltimefloat(reltime(s:review_start_time)))
+
+    let s:review_task_id = py3eval('vim4rabbit.vim_start_review_result(' .
+        \ s:review_job_id . ', ' .
+        \ (get(g:, 'vim4rabbit_issue_tracking', 1) ? 'True' : 'False') . ', ' .
+        \ (get(g:, 'vim4rabbit_new_issues_only', 0) ? 'True' : 'False') . ', ' .
+        \ s:review_elapsed_secs . ')')
+    let s:review_job_id = 0
+    let s:review_poll_timer = timer_start(get(g:, 'vim4rabbit_poll_interval', 100),
+        \ function('s:PollReviewResult'), {'repeat': -1})
+endfunction
+
+" Poll the result task; show the review once it is ready
+function! s:PollReviewResult(timer)
+    let l:status = py3eval('vim4rabbit.vim_poll_task(' . s:review_task_id . ')')
+    if l:status.state ==# 'running'
+        return
     endif
+
+    call s:StopPolling()
+    let l:result = py3eval('vim4rabbit.vim_take_review_result(' .
+        \ s:review_task_id . ', ' . s:DirectBufnr(s:review_bufnr) . ')')
+    let s:review_task_id = 0
+
+    " Stop the spinner (game keeps running if active)
+    call s:StopSpinner()
+    call s:OnReviewResult(l:result)
+endfunction
+
+" Display the result of a finished review
+function! s:OnReviewResult(result)
+    let l:result = a:result
+
+    " Check if buffer still exists
+    if s:review_bufnr == -1 || !bufexists(s:review_bufnr)
+        return
+    endif
+
+    if !empty(l:result.shard_summary)
+        echom 'vim4rabbit: ' . l:result.shard_summary
+    endif
+    if !empty(l:result.delta_summary)
+        echom 'vim4rabbit: ' . l:result.delta_summary
+    endif
+    if !empty(l:result.issue_summary)
+        echom 'vim4rabbit: ' . l:result.issue_summary
+    endif
+
+    if !l:result.success
+        call s:SetReviewId(0)
+        " Check if this is a "no files" error - show jumping rabbit animation
+        if py3eval('vim4rabbit.vim_is_no_files_error(' . json_encode(l:result.error_message) . ')')
+            call s:StartNoWorkAnimation()
+            return
+        endif
+        let l:review = py3eval('vim4rabbit.vim_format_review(False, [], ' .
+            \ json_encode(l:result.error_message) . ', ' . s:review_elapsed_secs . ')')
+        call s:UpdateReviewBuffer(l:review.lines, l:review.issue_count)
+        return
+    endif
+
+    if !empty(s:review_cache_key)
+        call py3eval('vim4rabbit.vim_review_cache_store(' .
+            \ string(s:review_cache_key) . ', ' . s:review_elapsed_secs . ')')
+    endif
+    call s:ShowReviewResult(l:result, s:review_elapsed_secs, 0)
+endfunction
+
+" Stop the running review job and remove any shard worktrees
+function! s:StopReviewJobs()
+    call s:StopPolling()
+    if s:review_job_id
+        call py3eval('vim4rabbit.vim_cancel_review(' . s:review_job_id . ')')
+        let s:review_job_id = 0
+    endif
+    if s:review_task_id
+        call py3eval('vim4rabbit.vim_cancel_task(' . s:review_task_id . ')')
+        let s:review_task_id = 0
+    endif
+endfunction
+
+" Schedule a speculative review after a write (g:vim4rabbit_speculative)
+" Writes in quick succession restart the debounce timer
+function! vim4rabbit#OnBufWritePost()
+    if s:speculative_debounce_timer != v:null
+        call timer_stop(s:speculative_debounce_timer)
+    endif
+    let s:speculative_debounce_timer = timer_start(
+        \ get(g:, 'vim4rabbit_speculative_delay', 2000),
+        \ function('s:StartSpeculativeReview'))
+endfunction
+
+" Start a speculative review unless a review is already running; a start
+" too soon after the previous one is deferred and made by the poll timer
+function! s:StartSpeculativeReview(timer)
+    let s:speculative_debounce_timer = v:null
+    if s:review_job_id
+        return
+    endif
+    call s:ApplyLineRules()
+    let l:pending = py3eval('vim4rabbit.vim_speculative_start(' .
+        \ get(g:, 'vim4rabbit_speculative_interval', 60) . ', ' .
+        \ get(g:, 'vim4rabbit_review_timeout', 0) . ', ' .
+        \ get(g:, 'vim4rabbit_review_shards', 1) . ', ' .
+        \ get(g:, 'vim4rabbit_review_max_jobs', 0) . ', ' .
+        \ (get(g:, 'vim4rabbit_review_delta', 0) ? 'True' : 'False') . ', ' .
+        \ string(get(g:, 'vim4rabbit_output_format', 'text')) . ')')
+    if l:pending && s:speculative_poll_timer == v:null
+        let s:speculative_poll_timer = timer_start(1000,
+            \ function('s:PollSpeculativeReview'), {'repeat': -1})
+    endif
+endfunction
+
+" Poll the speculative review until it finishes (or is claimed) and no
+" deferred start is left
+function! s:PollSpeculativeReview(timer)
+    if !py3eval('vim4rabbit.vim_speculative_poll()')
+        call timer_stop(s:speculative_poll_timer)
+        let s:speculative_poll_timer = v:null
+    endif
+endfunction
+
+" Stop speculative review timers and kill any running speculative review
+function! vim4rabbit#StopSpeculativeReview()
+    if s:speculative_debounce_timer != v:null
+        call timer_stop(s:speculative_debounce_timer)
+        let s:speculative_debounce_timer = v:null
+    endif
+    if s:speculative_poll_timer != v:null
+        call timer_stop(s:speculative_poll_timer)
+        let s:speculative_poll_timer = v:null
+    endif
+    call py3eval('vim4rabbit.vim_speculative_cancel()')
+endfunction
+
+" Buffer number for vim_* functions that write review lines into a buffer
+" directly, or 0 to get the lines back (g:vim4rabbit_direct_writes = 0)
+function! s:DirectBufnr(bufnr)
+    return get(g:, 'vim4rabbit_direct_writes', 1) ? a:bufnr : 0
+endfunction
+
+" Arguments for vim_* functions that send a frame to buffer bufnr: Python
+" writes the changed lines itself unless direct writes are off
+function! s:FrameArgs(bufnr)
+    return a:bufnr . ', ' . (get(g:, 'vim4rabbit_direct_writes', 1) ? 'True' : 'False')
+endfunction
+
+" Apply a frame update (changed line ranges against the previous frame,
+" from Python) to buffer bufnr; nothing is left to do if Python wrote it
+function! s:ApplyFrame(bufnr, update)
+    if empty(a:update.changes) && !a:update.delete_from
+        return
+    endif
+    if !exists('*deletebufline')
+        call s:ApplyFrameInWindow(a:bufnr, a:update)
+        return
+    endif
+    call setbufvar(a:bufnr, '&modifiable', 1)
+    for [l:lnum, l:lines] in a:update.changes
+        call setbufline(a:bufnr, l:lnum, l:lines)
+    endfor
+    if a:update.delete_from
+        silent! call deletebufline(a:bufnr, a:update.delete_from, '$')
+    endif
+    call setbufvar(a:bufnr, '&modifiable', 0)
+endfunction
+
+" Vim before 8.1.0039 has no deletebufline() (nor setbufline() before
+" 8.0.1039): apply the frame update in the buffer's window instead
+function! s:ApplyFrameInWindow(bufnr, update)
+    let l:winnr = bufwinnr(a:bufnr)
+    if l:winnr == -1
+        " Not applied: the next frame has to rewrite every line
+        call py3eval('vim4rabbit.vim_forget_frames(' . a:bufnr . ')')
+        return
+    endif
+    let l:cur_winnr = winnr()
+    execute l:winnr . 'wincmd w'
+    setlocal modifiable
+    for [l:lnum, l:lines] in a:update.changes
+        call setline(l:lnum, l:lines)
+    endfor
+    if a:update.delete_from
+        silent! execute a:update.delete_from . ',$delete _'
+    endif
+    setlocal nomodifiable
+    execute l:cur_winnr . 'wincmd w'
 endfunction
 
 " Update the animation in the review buffer
@@ -293,18 +595,14 @@ function! s:UpdateSpinner(timer)
     " Calculate elapsed seconds
     let l:elapsed_secs = float2nr(reltimefloat(reltime(s:review_start_time)))
 
-    " Get current animation frame from Python with elapsed time
-    let l:content = py3eval('vim4rabbit.vim_get_animation_frame(' . s:spinner_frame . ', ' . l:elapsed_secs . ')')
+    " Get current animation frame from Python with elapsed time (Python
+    " writes it into the buffer unless direct writes are off)
+    let l:update = py3eval('vim4rabbit.vim_get_animation_frame(' . s:spinner_frame . ', ' .
+        \ l:elapsed_secs . ', ' . s:FrameArgs(s:review_bufnr) . ')')
     let s:spinner_frame = (s:spinner_frame + 1) % s:animation_frame_count
 
     " Update buffer
-    let l:cur_winnr = winnr()
-    execute l:winnr . 'wincmd w'
-    setlocal modifiable
-    silent! %delete _
-    call setline(1, l:content)
-    setlocal nomodifiable
-    execute l:cur_winnr . 'wincmd w'
+    call s:ApplyFrame(s:review_bufnr, l:update)
     redraw
 endfunction
 
@@ -344,83 +642,46 @@ function! s:UpdateNoWorkAnimation(timer)
     endif
 
     " Get current animation frame from Python
-    let l:content = py3eval('vim4rabbit.vim_get_no_work_animation_frame(' . s:no_work_frame . ')')
+    let l:update = py3eval('vim4rabbit.vim_get_no_work_animation_frame(' .
+        \ s:no_work_frame . ', ' . s:FrameArgs(s:review_bufnr) . ')')
     let s:no_work_frame = (s:no_work_frame + 1) % s:no_work_frame_count
 
     " Update buffer
-    let l:cur_winnr = winnr()
-    execute l:winnr . 'wincmd w'
-    setlocal modifiable
-    silent! %delete _
-    call setline(1, l:content)
-    setlocal nomodifiable
-    execute l:cur_winnr . 'wincmd w'
+    call s:ApplyFrame(s:review_bufnr, l:update)
     redraw
 endfunction
 
-" Callback for job output (stdout and stderr)
-function! s:OnReviewOutput(channel, msg)
-    call add(s:review_output, a:msg)
-endfunction
-
-" Callback when job exits
-function! s:OnReviewExit(job, exit_status)
-    " Capture elapsed time before stopping spinner
-    let s:review_elapsed_secs = float2nr(reltimefloat(reltime(s:review_start_time)))
-
-    " Stop the spinner (game keeps running if active)
-    call s:StopSpinner()
-
-    " Clear the job reference
-    let s:review_job = v:null
-
-    " Check if buffer still exists
-    if s:review_bufnr == -1 || !bufexists(s:review_bufnr)
-        return
-    endif
-
-    " Combine output
-    let l:output = join(s:review_output, '')
-
-    " Check if this is a "no files" error - show jumping rabbit animation
-    if a:exit_status != 0 && py3eval('vim4rabbit.vim_is_no_files_error(' . json_encode(l:output) . ')')
-        call s:StartNoWorkAnimation()
-        return
-    endif
-
-    " Format output via Python (pass elapsed time for display)
-    if a:exit_status != 0
-        let l:review = py3eval("vim4rabbit.vim_format_review(False, [], " . json_encode(l:output) . ", " . s:review_elapsed_secs . ")")
+" Format a parsed review result and display it in the review buffer
+" Arguments: result dict (from vim_get_review_result or the cache), elapsed
+" seconds, and whether the result came from the review cache
+function! s:ShowReviewResult(result, elapsed_secs, cached)
+    " Results of vim_start_review_result() arrive formatted
+    if has_key(a:result, 'review')
+        let l:review = a:result.review
     else
-        let l:result = py3eval("vim4rabbit.vim_parse_review_output(" . json_encode(l:output) . ")")
         let l:review = py3eval('vim4rabbit.vim_format_review(' .
-            \ l:result.success . ', ' .
-            \ json_encode(l:result.issues_data) . ', ' .
-            \ json_encode(l:result.error_message) . ', ' .
-            \ s:review_elapsed_secs . ')')
-        " Store issues data for Claude integration
-        call s:StoreIssuesData(l:result.issues_data)
-    endif
-
-    " Update buffer content (unpack dict from Python)
-    call s:UpdateReviewBuffer(l:review.lines, l:review.issue_count)
+            \ (a:result.success ? 'True' : 'False') . ', ' .
+            \ json_encode(a:result.issues_data) . ', ' .
+            \ json_encode(a:result.error_message) . ', ' .
+            \ a:elapsed_secs . ', ' .
+            \ (a:cached ? 'True' : 'False') . ', ' .
+            \ get(a:result, 'hidden_issues', 0) . ', ' .
+            \ get(a:result, 'review_id', 0) . ')')
+    endif
+    " Python keeps the issues for Claude integration; remember their review
+    call s:SetReviewId(get(a:result, 'review_id', 0))
+    let l:render_start = reltime()
+    call s:UpdateReviewBuffer(l:review.lines, l:review.issue_count, l:review.highlights)
+    call py3eval('vim4rabbit.vim_record_render(' .
+        \ string(reltimefloat(reltime(l:render_start))) . ')')
 endfunction
 
-" Store issues data in buffer-local variable for Claude integration
-function! s:StoreIssuesData(issues_data)
-    if s:review_bufnr == -1 || !bufexists(s:review_bufnr)
-        return
-    endif
-
-    let l:winnr = bufwinnr(s:review_bufnr)
-    if l:winnr == -1
-        return
+" Switch to the review on display, forgetting the previous one in Python
+function! s:SetReviewId(review_id)
+    if s:review_id && s:review_id != a:review_id
+        call py3eval('vim4rabbit.vim_close_review_session(' . s:review_id . ')')
     endif
-
-    let l:cur_winnr = winnr()
-    execute l:winnr . 'wincmd w'
-    let b:vim4rabbit_issues = a:issues_data
-    execute l:cur_winnr . 'wincmd w'
+    let s:review_id = a:review_id
 endfunction
 
 " Cancel the running review and close buffer
@@ -434,10 +695,7 @@ function! vim4rabbit#CancelReview()
         execute 'bwipeout ' . s:game_bufnr
     endif
 
-    if s:review_job != v:null && job_status(s:review_job) ==# 'run'
-        call job_stop(s:review_job, 'kill')
-        let s:review_job = v:null
-    endif
+    call s:StopReviewJobs()
 
     " Close the buffer
     if s:review_bufnr != -1 && bufexists(s:review_bufnr)
@@ -446,7 +704,7 @@ function! vim4rabbit#CancelReview()
 endfunction
 
 " Update the review buffer with content
-function! s:UpdateReviewBuffer(content, issue_count)
+function! s:UpdateReviewBuffer(content, issue_count, ...)
     if s:review_bufnr == -1 || !bufexists(s:review_bufnr)
         return
     endif
@@ -458,14 +716,19 @@ function! s:UpdateReviewBuffer(content, issue_count)
 
     let l:cur_winnr = winnr()
     execute l:winnr . 'wincmd w'
-    setlocal modifiable
-    " Clear buffer and add new content
-    silent! %delete _
-    call setline(1, a:content)
-    setlocal nomodifiable
+    " Clear buffer and add new content, unless Python wrote it already
+    if !empty(a:content)
+        setlocal modifiable
+        silent! %delete _
+        call setline(1, a:content)
+        setlocal nomodifiable
+        call py3eval('vim4rabbit.vim_forget_frames(' . s:review_bufnr . ')')
+    endif
     " Move cursor to top
     normal! gg
 
+    call s:HighlightReview(a:0 > 0 ? a:1 : {})
+
     " Set up folding for review results
     setlocal foldmethod=marker
     setlocal foldmarker={{{,}}}
@@ -475,7 +738,7 @@ function! s:UpdateReviewBuffer(content, issue_count)
     setlocal wrap
 
     " Initialize selection tracking in Python
-    call py3eval('vim4rabbit.vim_init_selections(' . a:issue_count . ')')
+    call py3eval('vim4rabbit.vim_init_selections(' . a:issue_count . ', ' . s:review_id . ')')
 
     " Remap 'c' from cancel to close-with-confirmation now that job is done
     nnoremap <buffer> <silent> c :call vim4rabbit#ConfirmCloseReview()<CR>
@@ -484,10 +747,27 @@ function! s:UpdateReviewBuffer(content, issue_count)
     redraw
 endfunction
 
-" Display an error in the review buffer
-function! s:DisplayReviewError(message)
-    let l:review = py3eval('vim4rabbit.vim_format_review(False, [], ' . string(a:message) . ')')
-    call s:UpdateReviewBuffer(l:review.lines, l:review.issue_count)
+" Highlight classified issue lines in the current (review) window
+" Argument: dict of highlight group to line numbers (from vim_format_review)
+function! s:HighlightReview(highlights)
+    for l:id in get(w:, 'vim4rabbit_highlight_ids', [])
+        silent! call matchdelete(l:id)
+    endfor
+    let w:vim4rabbit_highlight_ids = []
+    if !get(g:, 'vim4rabbit_highlight', 1)
+        return
+    endif
+    highlight default link vim4rabbitField Identifier
+    highlight default link vim4rabbitFence Comment
+    highlight default link vim4rabbitDiffAdd DiffAdd
+    highlight default link vim4rabbitDiffDelete DiffDelete
+    highlight default link vim4rabbitDiffHunk PreProc
+    for [l:group, l:lnums] in items(a:highlights)
+        " matchaddpos() takes at most 8 positions per call before Vim 9.0.0620
+        for l:i in range(0, len(l:lnums) - 1, 8)
+            call add(w:vim4rabbit_highlight_ids, matchaddpos(l:group, l:lnums[l:i : l:i + 7]))
+        endfor
+    endfor
 endfunction
 
 " Close the review buffer
@@ -506,11 +786,8 @@ function! vim4rabbit#CloseReview()
     " Stop the no-work animation
     call s:StopNoWorkAnimation()
 
-    " Cancel any running job first
-    if s:review_job != v:null && job_status(s:review_job) ==# 'run'
-        call job_stop(s:review_job, 'kill')
-        let s:review_job = v:null
-    endif
+    " Cancel any running job(s) first
+    call s:StopReviewJobs()
 
     if s:review_bufnr != -1 && bufexists(s:review_bufnr)
         execute 'bwipeout ' . s:review_bufnr
@@ -548,15 +825,14 @@ function! vim4rabbit#CleanupReview()
     " Stop the no-work animation
     call s:StopNoWorkAnimation()
 
-    " Cancel any running job
-    if s:review_job != v:null && job_status(s:review_job) ==# 'run'
-        call job_stop(s:review_job, 'kill')
-    endif
-    let s:review_job = v:null
+    " Cancel any running job(s)
+    call s:StopReviewJobs()
+    call py3eval('vim4rabbit.vim_forget_frames(' . s:review_bufnr . ')')
     let s:review_bufnr = -1
 
-    " Clear selection state in Python
-    call py3eval('vim4rabbit.vim_reset_selections()')
+    " Forget the review session and clear selection state in Python
+    call py3eval('vim4rabbit.vim_close_review_session(' . s:review_id . ')')
+    let s:review_id = 0
 endfunction
 
 " Custom fold text for review issues - shows type and summary
@@ -569,10 +845,11 @@ endfunction
 
 " Get the issue number at the current cursor position
 function! vim4rabbit#GetIssueAtCursor()
-    " Pass buffer lines and 0-based cursor index to Python
-    let l:lines = getline(1, '$')
+    " Pass the review id (Python knows where each issue is) or the buffer
+    " lines, and the 0-based cursor index to Python
+    let l:lines = s:review_id ? s:review_id : string(getline(1, '$'))
     let l:cursor_idx = line('.') - 1
-    return py3eval('vim4rabbit.vim_find_issue_at_line(' . string(l:lines) . ', ' . l:cursor_idx . ')')
+    return py3eval('vim4rabbit.vim_find_issue_at_line(' . l:lines . ', ' . l:cursor_idx . ')')
 endfunction
 
 " Find the line number of a specific issue's checkbox
@@ -588,8 +865,27 @@ function! s:FindIssueLine(issue_num)
     return 0
 endfunction
 
+" Set header lines of the review buffer, from [lnum, line] pairs
+function! s:SetCheckboxLines(checkboxes)
+    if empty(a:checkboxes)
+        return
+    endif
+    setlocal modifiable
+    for [l:lnum, l:line] in a:checkboxes
+        call setline(l:lnum, l:line)
+    endfor
+    setlocal nomodifiable
+endfunction
+
 " Update the checkbox display for an issue
 function! vim4rabbit#UpdateCheckbox(issue_num, selected)
+    " Python knows where the issues of the review on display are
+    if s:review_id
+        call s:SetCheckboxLines(py3eval('vim4rabbit.vim_checkbox_lines([' . a:issue_num . '], ' .
+            \ (a:selected ? 'True' : 'False') . ', ' . s:review_id . ')'))
+        return
+    endif
+
     let l:lnum = s:FindIssueLine(a:issue_num)
     if l:lnum == 0
         return
@@ -619,16 +915,21 @@ endfunction
 
 " Select all issues
 function! vim4rabbit#SelectAllIssues()
-    let l:count = py3eval('vim4rabbit.vim_select_all()')
-    if l:count == 0
+    " One call selects them and returns every header line to update
+    let l:result = py3eval('vim4rabbit.vim_set_all_selected(True, ' . s:review_id . ')')
+    if l:result.count == 0
         return
     endif
 
-    for l:i in range(1, l:count)
-        call vim4rabbit#UpdateCheckbox(l:i, 1)
-    endfor
+    if s:review_id
+        call s:SetCheckboxLines(l:result.checkboxes)
+    else
+        for l:i in range(1, l:result.count)
+            call vim4rabbit#UpdateCheckbox(l:i, 1)
+        endfor
+    endif
 
-    echo "Selected all " . l:count . " issue(s)"
+    echo "Selected all " . l:result.count . " issue(s)"
 endfunction
 
 " Deselect all issues
@@ -638,11 +939,15 @@ function! vim4rabbit#DeselectAllIssues()
         return
     endif
 
-    call py3eval('vim4rabbit.vim_deselect_all()')
+    let l:result = py3eval('vim4rabbit.vim_set_all_selected(False, ' . s:review_id . ')')
 
-    for l:i in range(1, l:count)
-        call vim4rabbit#UpdateCheckbox(l:i, 0)
-    endfor
+    if s:review_id
+        call s:SetCheckboxLines(l:result.checkboxes)
+    else
+        for l:i in range(1, l:count)
+            call vim4rabbit#UpdateCheckbox(l:i, 0)
+        endfor
+    endif
 
     echo "Deselected all issues"
 endfunction
@@ -652,15 +957,47 @@ function! vim4rabbit#GetSelectedIssues()
     return py3eval('vim4rabbit.vim_get_selected()')
 endfunction
 
-" Placeholder for future AI-powered fix application
+" Apply CodeRabbit's proposed diffs of the selected issues (or of the issue
+" at the cursor) to the working tree, without launching Claude
 function! vim4rabbit#ApplySelectedFixes()
     let l:selected = vim4rabbit#GetSelectedIssues()
     if empty(l:selected)
-        echo "No issues selected"
+        let l:issue_num = vim4rabbit#GetIssueAtCursor()
+        if l:issue_num == 0
+            echo "No issues selected. Use Space to select issues."
+            return
+        endif
+        let l:selected = [l:issue_num]
+    endif
+
+    if !s:review_id
+        echo "No issue data available. Please run a review first."
         return
     endif
 
-    echo "Selected issues: " . join(l:selected, ', ') . " (AI fix not yet implemented)"
+    " Files with unsaved changes in Vim are left alone
+    let l:modified = map(filter(getbufinfo({'bufmodified': 1}), '!empty(v:val.name)'),
+        \ 'fnamemodify(v:val.name, ":p")')
+    let l:result = py3eval('vim4rabbit.vim_apply_proposed_fixes(' .
+        \ string(l:selected) . ', ' .
+        \ s:review_id . ', ' .
+        \ json_encode(l:modified) . ')')
+
+    " Reload the buffers of patched files
+    for l:file in l:result.files
+        let l:nr = bufnr(l:file)
+        if l:nr != -1 && bufloaded(l:nr)
+            let l:autoread = getbufvar(l:nr, '&autoread')
+            call setbufvar(l:nr, '&autoread', 1)
+            execute 'checktime' l:nr
+            call setbufvar(l:nr, '&autoread', l:autoread)
+        endif
+    endfor
+
+    for l:message in l:result.messages[1:]
+        echom 'vim4rabbit: ' . l:message
+    endfor
+    echom 'vim4rabbit: ' . l:result.messages[0]
 endfunction
 
 " Launch Claude Code CLI with selected issues
@@ -672,15 +1009,14 @@ function! vim4rabbit#LaunchClaude()
     endif
 
     " Check if issues data is available
-    if !exists('b:vim4rabbit_issues') || empty(b:vim4rabbit_issues)
+    if !s:review_id
         echo "No issue data available. Please run a review first."
         return
     endif
 
-    " Build the prompt via Python
+    " Build the prompt via Python from the review's session
     let l:prompt = py3eval('vim4rabbit.vim_build_claude_prompt(' .
-        \ string(l:selected) . ', ' .
-        \ json_encode(b:vim4rabbit_issues) . ')')
+        \ string(l:selected) . ', ' . s:review_id . ')')
 
     if empty(l:prompt)
         echo "Could not build prompt for selected issues."
@@ -767,6 +1103,7 @@ endfunction
 
 " Clean up when game buffer is closed
 function! vim4rabbit#CleanupGameBuffer()
+    call py3eval('vim4rabbit.vim_forget_frames(' . s:game_bufnr . ')')
     let s:game_bufnr = -1
     call s:StopGame()
 
@@ -914,12 +1251,10 @@ function! vim4rabbit#StartGame(key)
         nnoremap <buffer> <silent> r :call vim4rabbit#GameInput('r')<CR>
     endif
 
-    " Render first frame
-    let l:content = py3eval('vim4rabbit.vim_tick_game()')
-    setlocal modifiable
-    silent! %delete _
-    call setline(1, l:content)
-    setlocal nomodifiable
+    " Render first frame over whatever the buffer showed before
+    call py3eval('vim4rabbit.vim_forget_frames(' . s:game_bufnr . ')')
+    let l:update = py3eval('vim4rabbit.vim_tick_game(' . s:FrameArgs(s:game_bufnr) . ')')
+    call s:ApplyFrame(s:game_bufnr, l:update)
 
     execute l:cur_winnr . 'wincmd w'
 
@@ -956,15 +1291,8 @@ function! s:UpdateGame(timer)
         return
     endif
 
-    let l:content = py3eval('vim4rabbit.vim_tick_game()')
-
-    let l:cur_winnr = winnr()
-    execute l:winnr . 'wincmd w'
-    setlocal modifiable
-    silent! %delete _
-    call setline(1, l:content)
-    setlocal nomodifiable
-    execute l:cur_winnr . 'wincmd w'
+    let l:update = py3eval('vim4rabbit.vim_tick_game(' . s:FrameArgs(s:game_bufnr) . ')')
+    call s:ApplyFrame(s:game_bufnr, l:update)
     redraw
 endfunction
 
@@ -979,21 +1307,18 @@ function! vim4rabbit#GameInput(key)
         return
     endif
 
-    let l:content = py3eval('vim4rabbit.vim_input_game("' . a:key . '")')
-
-    let l:cur_winnr = winnr()
-    execute l:winnr . 'wincmd w'
-    setlocal modifiable
-    silent! %delete _
-    call setline(1, l:content)
-    setlocal nomodifiable
+    let l:update = py3eval('vim4rabbit.vim_input_game("' . a:key . '", ' .
+        \ s:FrameArgs(s:game_bufnr) . ')')
+    call s:ApplyFrame(s:game_bufnr, l:update)
 
     " Re-apply matrix match patterns after char set change
     if s:game_mode ==# 'm' && (a:key ==# 'n' || a:key ==# 's' || a:key ==# 'r')
+        let l:cur_winnr = winnr()
+        execute l:winnr . 'wincmd w'
         call s:ApplyMatrixPatterns()
+        execute l:cur_winnr . 'wincmd w'
     endif
 
-    execute l:cur_winnr . 'wincmd w'
     redraw
 endfunction
 
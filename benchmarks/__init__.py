@@ -0,0 +1,7 @@
+"""
+Benchmarks for vim4rabbit.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser
+"""
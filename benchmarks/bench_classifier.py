@@ -0,0 +1,135 @@
+"""
+Line classifier benchmark.
+
+Compares the line classifier (vim4rabbit.classifier) under its built-in
+rules with the per-line approach it replaced: a chain of startswith()
+tests per kind and a preamble check that lowercases the line and scans a
+list of patterns.
+Both run on the same synthetic CodeRabbit output, interleaved so machine
+noise hits them alike; the fastest of `repeat` runs is kept.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_classifier
+    python -m benchmarks.bench_classifier --issues 1000 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+from vim4rabbit.classifier import (  # noqa: E402
+    BLANK,
+    BODY,
+    DIFF,
+    FENCE,
+    FIELD,
+    PREAMBLE_PATTERNS,
+    SEPARATOR,
+    get_classifier,
+)
+
+from .corpus import generate  # noqa: E402
+
+_LEGACY_FIELD_PREFIXES = ("File:", "Line:", "Type:", "Comment:", "Prompt:")
+
+
+def legacy_classify(line: str) -> str:
+    """Kind of a line with the startswith() chain of the old parser."""
+    if line.startswith("=====") and not line.rstrip().strip("="):
+        return SEPARATOR
+    stripped = line.strip()
+    if not stripped:
+        return BLANK
+    if stripped.startswith(_LEGACY_FIELD_PREFIXES):
+        return FIELD
+    if stripped.startswith(("```", "~~~")):
+        return FENCE
+    if line.startswith(("@@", "+", "-")):
+        return DIFF
+    return BODY
+
+
+def legacy_is_preamble(line: str) -> bool:
+    """The old is_preamble_line(): rebuilds the list, lowercases, scans."""
+    preamble_patterns = list(PREAMBLE_PATTERNS)
+    line_lower = line.lower().strip()
+    return any(pattern in line_lower for pattern in preamble_patterns)
+
+
+def measure(issue_count: int = 10000, repeat: int = 5, seed: int = 0) -> Dict[str, dict]:
+    """
+    Benchmark both approaches on one generated output.
+
+    Args:
+        issue_count: Number of issues in the output
+        repeat: Runs per measurement (the fastest is kept)
+        seed: Corpus seed
+
+    Returns:
+        Dict of benchmark name to {legacy_secs, compiled_secs, speedup,
+        lines_per_sec}
+    """
+    lines = generate(issue_count, seed=seed).split("\n")
+    classifier = get_classifier()
+    assert [legacy_classify(line) for line in lines] == [
+        classifier.classify(line) for line in lines
+    ], "legacy and compiled classification disagree"
+
+    benchmarks: Dict[str, List[Callable[[], object]]] = {
+        "classify": [
+            lambda: [legacy_classify(line) for line in lines],
+            lambda: [classifier.classify(line) for line in lines],
+        ],
+        "preamble": [
+            lambda: [legacy_is_preamble(line) for line in lines],
+            lambda: [classifier.is_preamble(line) for line in lines],
+        ],
+    }
+    results = {}
+    for name, (legacy, compiled) in benchmarks.items():
+        best = [float("inf"), float("inf")]
+        for _ in range(repeat):
+            for i, func in enumerate((legacy, compiled)):
+                started = time.perf_counter()
+                func()
+                best[i] = min(best[i], time.perf_counter() - started)
+        results[name] = {
+            "legacy_secs": round(best[0], 6),
+            "compiled_secs": round(best[1], 6),
+            "speedup": round(best[0] / best[1], 2),
+            "lines_per_sec": round(len(lines) / best[1]),
+        }
+    return results
+
+
+def format_table(results: Dict[str, dict]) -> List[str]:
+    """Results as aligned text rows."""
+    rows = [f"{'benchmark':<12}{'legacy s':>11}{'compiled s':>12}{'speedup':>9}{'lines/s':>12}"]
+    for name, numbers in results.items():
+        rows.append(
+            f"{name:<12}{numbers['legacy_secs']:>11.4f}{numbers['compiled_secs']:>12.4f}"
+            f"{numbers['speedup']:>8.2f}x{numbers['lines_per_sec']:>12}"
+        )
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("\n".join(format_table(measure(args.issues, args.repeat, args.seed))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Review issue memory benchmark.
+
+Measures the memory each issue of a large review keeps alive, with
+tracemalloc, for three representations built from the same synthetic
+CodeRabbit output:
+
+    dataclass  a plain @dataclass with a per-instance __dict__, lists of
+               lines and a string of its own for every field (the
+               representation ReviewIssue replaced)
+    values     ReviewIssue built from values, the way cached reviews are
+               loaded: slots, lines in a tuple, interned file paths and
+               issue types
+    offsets    ReviewIssue built by the parser: slots and offsets into the
+               shared output (the output itself is not counted)
+
+The value representations are built from the review's JSON, as in the
+review cache, and only what outlives the decoded JSON is counted.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --issues 1000
+
+Exits with status 1 if value issues do not use less memory than the
+dataclass ones.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+from vim4rabbit.parser import parse_review_issues  # noqa: E402
+from vim4rabbit.types import ReviewIssue  # noqa: E402
+
+from .corpus import generate  # noqa: E402
+
+
+@dataclass
+class LegacyIssue:
+    """The plain dataclass issue ReviewIssue replaced."""
+    lines: List[str] = field(default_factory=list)
+    file_path: str = ""
+    line_range: str = ""
+    issue_type: str = ""
+    summary: str = ""
+    prompt: str = ""
+
+
+def legacy_from_dict(data: dict) -> LegacyIssue:
+    """Build a LegacyIssue the way ReviewIssue.from_dict() builds an issue."""
+    return LegacyIssue(
+        lines=list(data.get("lines", [])),
+        file_path=data.get("file_path", ""),
+        line_range=data.get("line_range", ""),
+        issue_type=data.get("issue_type", ""),
+        summary=data.get("summary", ""),
+        prompt=data.get("prompt", ""),
+    )
+
+
+def retained_bytes(build: Callable[[], list]) -> int:
+    """Bytes still allocated by build() once its temporaries are freed."""
+    # Build once beforehand and keep it: one-time allocations (the interned
+    # string table growing or being rebuilt) are not what an issue keeps alive
+    warm = build()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept, warm
+    return size
+
+
+def measure(issue_count: int = 10000, seed: int = 0) -> Dict[str, dict]:
+    """
+    Measure each representation on one generated output.
+
+    Args:
+        issue_count: Number of issues in the output
+        seed: Corpus seed
+
+    Returns:
+        Dict of representation name to {bytes_per_issue}
+    """
+    output = generate(issue_count, seed=seed)
+    issues = parse_review_issues(output)
+    encoded = json.dumps([issue.to_dict() for issue in issues])
+    del issues
+
+    def from_json(build: Callable[[dict], object]) -> Callable[[], list]:
+        return lambda: [build(data) for data in json.loads(encoded)]
+
+    builds = {
+        "dataclass": from_json(legacy_from_dict),
+        "values": from_json(ReviewIssue.from_dict),
+        "offsets": lambda: parse_review_issues(output),
+    }
+    results = {}
+    for name, build in builds.items():
+        results[name] = {"bytes_per_issue": round(retained_bytes(build) / issue_count)}
+    return results
+
+
+def format_table(results: Dict[str, dict]) -> List[str]:
+    """Results as aligned text rows."""
+    rows = [f"{'representation':<16}{'bytes/issue':>12}"]
+    for name, numbers in results.items():
+        rows.append(f"{name:<16}{numbers['bytes_per_issue']:>12}")
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = measure(args.issues, args.seed)
+    print(f"{args.issues} issues")
+    print("\n".join(format_table(results)))
+    if results["values"]["bytes_per_issue"] >= results["dataclass"]["bytes_per_issue"]:
+        print("FAIL value issues use no less memory than the dataclass")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Parser throughput benchmark.
+
+Measures parse_review_issues() and parse_issue_metadata() on synthetic
+CodeRabbit output at several issue counts, reports MB/s and issues/s,
+checks that parse time grows near-linearly with the issue count, and
+compares throughput against benchmarks/baseline.json.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_parser                    # run and check
+    python -m benchmarks.bench_parser --update-baseline  # record a new baseline
+    python -m benchmarks.bench_parser --sizes 10 1000    # quicker run
+
+Exits with status 1 if scaling is not near-linear or throughput regressed.
+Baseline numbers are machine dependent: record them on the machine that
+runs the comparison.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+from vim4rabbit.parser import parse_issue_metadata, parse_review_issues  # noqa: E402
+
+from .corpus import generate  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Issue counts measured by default
+SIZES = [10, 1000, 10000, 100000]
+
+# Smallest issue count included in the scaling check (timer noise dominates
+# below it)
+SCALING_MIN_ISSUES = 1000
+
+# Allowed growth of the per-issue time from the smallest to the largest
+# size in the scaling check
+SCALING_LIMIT = 2.0
+
+# Allowed throughput drop relative to the baseline
+REGRESSION_TOLERANCE = 0.35
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Fastest of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(issue_count: int, repeat: int = 3, seed: int = 0) -> Dict[str, dict]:
+    """
+    Benchmark both parser entry points on one generated output.
+
+    Args:
+        issue_count: Number of issues in the output
+        repeat: Runs per measurement (the fastest is kept)
+        seed: Corpus seed
+
+    Returns:
+        Dict of benchmark name to {secs, mb_per_sec, issues_per_sec}
+    """
+    output = generate(issue_count, seed=seed)
+    issues = parse_review_issues(output)
+    assert len(issues) == issue_count, "corpus and parser disagree"
+    issue_lines = [issue.lines for issue in issues]
+    mb = len(output.encode("utf-8")) / 1e6
+
+    def metadata() -> None:
+        for lines in issue_lines:
+            parse_issue_metadata(lines)
+
+    results = {}
+    for name, func in (
+        ("parse_review_issues", lambda: parse_review_issues(output)),
+        ("parse_issue_metadata", metadata),
+    ):
+        secs = best_time(func, repeat)
+        results[name] = {
+            "secs": round(secs, 6),
+            "mb_per_sec": round(mb / secs, 2),
+            "issues_per_sec": round(issue_count / secs),
+        }
+    return results
+
+
+def check_scaling(results: Dict[int, Dict[str, dict]], limit: float = SCALING_LIMIT) -> List[str]:
+    """
+    Check that time per issue stays near-constant as the size grows.
+
+    Args:
+        results: Size to measure() results
+        limit: Allowed ratio of the largest to the smallest per-issue time
+
+    Returns:
+        List of failure messages (empty if scaling is near-linear)
+    """
+    sizes = sorted(size for size in results if size >= SCALING_MIN_ISSUES)
+    failures = []
+    if len(sizes) < 2:
+        return failures
+    for name in results[sizes[0]]:
+        per_issue = [results[size][name]["secs"] / size for size in sizes]
+        ratio = per_issue[-1] / per_issue[0]
+        if ratio > limit:
+            failures.append(
+                f"{name}: time per issue grew {ratio:.2f}x from "
+                f"{sizes[0]} to {sizes[-1]} issues (limit {limit}x)"
+            )
+    return failures
+
+
+def compare_to_baseline(
+    results: Dict[int, Dict[str, dict]],
+    baseline: Dict[str, Dict[str, dict]],
+    tolerance: float = REGRESSION_TOLERANCE,
+) -> List[str]:
+    """
+    Compare throughput with a recorded baseline.
+
+    Args:
+        results: Size to measure() results
+        baseline: "results" of baseline.json (sizes as strings)
+        tolerance: Allowed fractional drop in MB/s
+
+    Returns:
+        List of failure messages (empty if nothing regressed)
+    """
+    failures = []
+    for size, benchmarks in sorted(results.items()):
+        for name, numbers in benchmarks.items():
+            expected = baseline.get(str(size), {}).get(name)
+            if not expected:
+                continue
+            floor = expected["mb_per_sec"] * (1 - tolerance)
+            if numbers["mb_per_sec"] < floor:
+                failures.append(
+                    f"{name} @ {size} issues: {numbers['mb_per_sec']} MB/s, "
+                    f"baseline {expected['mb_per_sec']} MB/s"
+                )
+    return failures
+
+
+def format_table(results: Dict[int, Dict[str, dict]]) -> List[str]:
+    """Results as aligned text rows."""
+    rows = [f"{'benchmark':<22}{'issues':>8}{'secs':>11}{'MB/s':>9}{'issues/s':>11}"]
+    for size, benchmarks in sorted(results.items()):
+        for name, numbers in benchmarks.items():
+            rows.append(
+                f"{name:<22}{size:>8}{numbers['secs']:>11.4f}"
+                f"{numbers['mb_per_sec']:>9.2f}{numbers['issues_per_sec']:>11}"
+            )
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = {size: measure(size, args.repeat, args.seed) for size in args.sizes}
+    print("\n".join(format_table(results)))
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": {str(size): numbers for size, numbers in results.items()},
+        }, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE.relative_to(ROOT)}")
+
+    failures = check_scaling(results)
+    if not args.update_baseline and BASELINE.exists():
+        baseline = json.loads(BASELINE.read_text())["results"]
+        failures += compare_to_baseline(results, baseline, args.tolerance)
+    for failure in failures:
+        print("FAIL " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
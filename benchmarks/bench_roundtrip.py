@@ -0,0 +1,391 @@
+"""
+py3eval() round-trip benchmark.
+
+Times the vim_* calls the autoload script makes, split the way a call
+through py3eval() is:
+
+    encode  building the expression: arguments json_encode()d or string()ed
+            into the call, as the autoload script does
+    eval    evaluating the expression (py3eval() parses and runs it)
+    decode  converting the returned value into Vim values (a JSON round trip
+            stands in for it)
+
+with the bytes of the expression and of the returned value, for reviews of
+10 to 10k issues and for game and spinner frames at typical window sizes.
+Calls that pass a review id are compared with the forms that send buffer
+lines or issue data.
+
+With --vim, the expressions are also run through py3eval() in a headless
+Vim with +python3 ("vim ms": Vim parsing the expression, the call and the
+real conversion of the result).
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_roundtrip
+    python -m benchmarks.bench_roundtrip --sizes 10 1000 --vim
+
+Exits with status 1 if a call meant to be constant-size (CONSTANT_SIZE)
+sends or returns more than CONSTANT_SLACK bytes more for the largest review
+than for the smallest.
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+import vim4rabbit  # noqa: E402
+from vim4rabbit import sessions, tasks  # noqa: E402
+from vim4rabbit.parser import parse_review_issues  # noqa: E402
+from vim4rabbit.types import ReviewResult  # noqa: E402
+
+from .bench_startup import vim_with_python3  # noqa: E402
+from .corpus import generate  # noqa: E402
+
+# Issue counts measured by default
+SIZES = [10, 100, 1000, 10000]
+
+# Window sizes (columns, lines) of game and spinner frames
+FRAME_SIZES = [(80, 24), (160, 48), (240, 67)]
+
+# Games measured: Pong changes a few cells a tick, the Matrix most of them
+GAME_KEYS = ["p", "m"]
+
+# Buffer number frames are diffed against (no buffer exists outside Vim,
+# so the changes are returned as they are with direct writes off)
+FRAME_BUFNR = 7
+
+# Calls whose payload must not grow with the review
+CONSTANT_SIZE = ["find_issue_at_line(review_id)", "checkbox_lines(review_id)"]
+
+# Bytes a constant-size call may grow by (line and issue numbers get longer)
+CONSTANT_SLACK = 8
+
+
+@dataclass
+class Call:
+    """A vim_* call as the autoload script makes it."""
+    label: str
+    expression: Callable[[], str]  # builds the py3eval() argument (timed as encode)
+    before: Optional[Callable[[], None]] = None  # untimed, before each run
+
+
+def json_encode(value: object) -> str:
+    """Vim's json_encode() of a value (UTF-8, no spaces)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def vim_string(value: object) -> str:
+    """Vim's string() of a string or a list of strings."""
+    if isinstance(value, list):
+        return "[" + ", ".join(vim_string(item) for item in value) + "]"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def payload_bytes(value: object) -> int:
+    """Size of a value as compact JSON, in UTF-8 bytes."""
+    return len(json_encode(value).encode("utf-8"))
+
+
+def review_calls(issue_count: int, seed: int = 0) -> List[Call]:
+    """
+    The review calls, against a shown review of issue_count issues.
+
+    Args:
+        issue_count: Number of issues in the review
+        seed: Corpus seed
+
+    Returns:
+        Calls in the order a review is used
+    """
+    issues = parse_review_issues(generate(issue_count, seed=seed))
+    issues_data = [issue.to_dict() for issue in issues]
+    review_id = sessions.create(list(issues)).review_id
+    review = vim4rabbit.vim_format_review(True, issues_data, "", review_id=review_id)
+    lines = list(review["lines"])
+    result = ReviewResult(success=True, issues=issues).to_dict(bodies=False)
+    result.update({"review": review, "review_id": review_id})
+    vim4rabbit.vim_init_selections(issue_count, review_id)
+    # Cursor on the last issue's header: the worst case of scanning upward
+    cursor = max(i for i, line in enumerate(lines) if line.startswith(f"  [ ] {issue_count}."))
+    everything = list(range(1, issue_count + 1))
+    task = {}
+
+    def start_task() -> None:
+        task["id"] = tasks.start(lambda _: dict(result, review=dict(review, lines=list(lines))))
+        tasks.get(task["id"]).result()
+
+    return [
+        Call(
+            "take_review_result",
+            lambda: f"vim4rabbit.vim_take_review_result({task['id']}, 0)",
+            start_task,
+        ),
+        Call(
+            "format_review(issues_data)",
+            lambda: (
+                "vim4rabbit.vim_format_review(True, " + json_encode(issues_data)
+                + ", '', 0, False, 0)"
+            ),
+        ),
+        Call(
+            "find_issue_at_line(lines)",
+            lambda: f"vim4rabbit.vim_find_issue_at_line({vim_string(lines)}, {cursor})",
+        ),
+        Call(
+            "find_issue_at_line(review_id)",
+            lambda: f"vim4rabbit.vim_find_issue_at_line({review_id}, {cursor})",
+        ),
+        Call(
+            "checkbox_lines(review_id)",
+            lambda: f"vim4rabbit.vim_checkbox_lines([1], True, {review_id})",
+            lambda: vim4rabbit.vim_checkbox_lines([1], False, review_id),
+        ),
+        Call(
+            "set_all_selected(review_id)",
+            lambda: f"vim4rabbit.vim_set_all_selected(True, {review_id})",
+            lambda: vim4rabbit.vim_set_all_selected(False, review_id),
+        ),
+        Call(
+            "build_claude_prompt(issues_data)",
+            lambda: f"vim4rabbit.vim_build_claude_prompt({everything}, {json_encode(issues_data)})",
+        ),
+        Call(
+            "build_claude_prompt(review_id)",
+            lambda: f"vim4rabbit.vim_build_claude_prompt({everything}, {review_id})",
+        ),
+    ]
+
+
+def frame_calls(width: int, height: int) -> List[Call]:
+    """
+    The spinner and game frame calls, for a window of the given size.
+
+    Each is measured returning whole frames (no buffer number) and returning
+    the changes against the previous frame (direct writes off).
+    """
+    calls = []
+    for key in GAME_KEYS:
+        def start(key: str = key) -> None:
+            random.seed(0)
+            vim4rabbit.vim_start_game(key, width, height)
+            vim4rabbit.vim_forget_frames(FRAME_BUFNR)
+            vim4rabbit.vim_tick_game(FRAME_BUFNR, False)
+
+        calls.append(Call(f"tick_game({key}, lines)", lambda: "vim4rabbit.vim_tick_game()", start))
+        calls.append(Call(
+            f"tick_game({key}, changes)",
+            lambda: f"vim4rabbit.vim_tick_game({FRAME_BUFNR}, False)",
+            start,
+        ))
+    spinner = {"frame": 0}
+
+    def next_frame() -> None:
+        spinner["frame"] = (spinner["frame"] + 1) % 24
+
+    calls.append(Call(
+        "animation_frame(lines)",
+        lambda: f"vim4rabbit.vim_get_animation_frame({spinner['frame']}, 12)",
+        next_frame,
+    ))
+    calls.append(Call(
+        "animation_frame(changes)",
+        lambda: f"vim4rabbit.vim_get_animation_frame({spinner['frame']}, 12, {FRAME_BUFNR}, False)",
+        next_frame,
+    ))
+    return calls
+
+
+def roundtrip(call: Call, repeat: int) -> dict:
+    """
+    Time one call, best of `repeat` runs of each phase.
+
+    Returns:
+        Dict with keys encode_ms, eval_ms, decode_ms, total_ms, arg_bytes
+        and result_bytes
+    """
+    namespace = {"vim4rabbit": vim4rabbit}
+    best = {"encode": float("inf"), "eval": float("inf"), "decode": float("inf")}
+    for _ in range(repeat):
+        if call.before is not None:
+            call.before()
+        started = time.perf_counter()
+        expression = call.expression()
+        encoded = time.perf_counter()
+        value = eval(expression, namespace)
+        evaluated = time.perf_counter()
+        json.loads(json_encode(value))
+        decoded = time.perf_counter()
+        best["encode"] = min(best["encode"], encoded - started)
+        best["eval"] = min(best["eval"], evaluated - encoded)
+        best["decode"] = min(best["decode"], decoded - evaluated)
+    numbers = {f"{phase}_ms": round(secs * 1000, 3) for phase, secs in best.items()}
+    numbers["total_ms"] = round(sum(best.values()) * 1000, 3)
+    numbers["arg_bytes"] = len(expression.encode("utf-8"))
+    numbers["result_bytes"] = payload_bytes(value)
+    return numbers
+
+
+def measure(
+    sizes: List[int] = SIZES,
+    frame_sizes: List[Tuple[int, int]] = FRAME_SIZES,
+    repeat: int = 3,
+    seed: int = 0,
+    evaluate: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Measure every call at every size.
+
+    Args:
+        sizes: Issue counts of the reviews
+        frame_sizes: (columns, lines) of the frames
+        repeat: Runs per call
+        seed: Corpus seed
+        evaluate: Runs an expression through py3eval() (inside Vim); adds
+                  vim_ms to each call
+
+    Returns:
+        Dict of size label ('1000 issues', '80x24') to call label to the
+        roundtrip() numbers
+    """
+    batches = [
+        (f"{count} issues", lambda count=count: review_calls(count, seed)) for count in sizes
+    ]
+    batches += [(f"{w}x{h}", lambda w=w, h=h: frame_calls(w, h)) for w, h in frame_sizes]
+    results: Dict[str, Dict[str, dict]] = {}
+    for size, build in batches:
+        results[size] = {}
+        for call in build():
+            numbers = roundtrip(call, repeat)
+            if evaluate is not None:
+                numbers["vim_ms"] = vim_time(call, evaluate, repeat)
+            results[size][call.label] = numbers
+        sessions.reset()
+        vim4rabbit.vim_stop_game()
+        vim4rabbit.vim_forget_frames(FRAME_BUFNR)
+    return results
+
+
+def vim_time(call: Call, evaluate: Callable[[str], None], repeat: int) -> float:
+    """Best time of running a call's expression through py3eval(), in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        if call.before is not None:
+            call.before()
+        expression = call.expression()
+        started = time.perf_counter()
+        evaluate(expression)
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def run_in_vim(out_path: str, sizes: List[int], repeat: int) -> None:
+    """Measure inside Vim (called by measure_in_vim()) and write the results as JSON."""
+    import __main__
+    import vim
+
+    __main__.vim4rabbit = vim4rabbit
+
+    def evaluate(expression: str) -> None:
+        vim.command(f"let g:vim4rabbit_bench = py3eval({vim_string(expression)})")
+
+    results = measure(sizes, repeat=repeat, evaluate=evaluate)
+    Path(out_path).write_text(json.dumps(results))
+
+
+def measure_in_vim(vim: str, sizes: List[int], repeat: int) -> Dict[str, Dict[str, dict]]:
+    """Run measure() inside a headless Vim, with vim_ms for every call."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / "results.json"
+        script = (
+            f"import sys; sys.path.insert(0, {str(ROOT)!r}); "
+            "from benchmarks import bench_roundtrip; "
+            f"bench_roundtrip.run_in_vim({str(out_path)!r}, {sizes!r}, {repeat})"
+        )
+        subprocess.run(
+            [vim, "-u", "NONE", "-i", "NONE", "-N", "-es", "-c", f"py3 {script}", "-c", "qa!"],
+            capture_output=True, check=False, cwd=ROOT,
+        )
+        if not out_path.exists():
+            raise RuntimeError("benchmark did not run in Vim")
+        return json.loads(out_path.read_text())
+
+
+def check_constant_size(results: Dict[str, Dict[str, dict]]) -> List[str]:
+    """
+    Check that CONSTANT_SIZE calls do not grow with the review.
+
+    Returns:
+        Failure messages (empty if none)
+    """
+    reviews = [size for size in results if size.endswith(" issues")]
+    if len(reviews) < 2:
+        return []
+    smallest, largest = reviews[0], reviews[-1]
+    failures = []
+    for label in CONSTANT_SIZE:
+        for key in ("arg_bytes", "result_bytes"):
+            small, large = results[smallest][label][key], results[largest][label][key]
+            if large > small + CONSTANT_SLACK:
+                failures.append(f"{label}: {key} {small} at {smallest}, {large} at {largest}")
+    return failures
+
+
+def format_table(results: Dict[str, Dict[str, dict]]) -> List[str]:
+    """Results as aligned text rows, one block per size."""
+    in_vim = any("vim_ms" in numbers for calls in results.values() for numbers in calls.values())
+    header = (
+        f"{'call':<34}{'encode ms':>11}{'eval ms':>10}{'decode ms':>11}{'total ms':>10}"
+        f"{'arg B':>11}{'result B':>11}"
+    )
+    rows = []
+    for size, calls in results.items():
+        rows.append(size)
+        rows.append(header + (f"{'vim ms':>10}" if in_vim else ""))
+        for label, n in calls.items():
+            row = (
+                f"{label:<34}{n['encode_ms']:>11.3f}{n['eval_ms']:>10.3f}{n['decode_ms']:>11.3f}"
+                f"{n['total_ms']:>10.3f}{n['arg_bytes']:>11}{n['result_bytes']:>11}"
+            )
+            if in_vim:
+                row += f"{n['vim_ms']:>10.3f}"
+            rows.append(row)
+        rows.append("")
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vim", action="store_true", help="also measure in a headless Vim")
+    args = parser.parse_args(argv)
+
+    if args.vim:
+        vim = vim_with_python3()
+        if vim is None:
+            print("FAIL --vim needs a vim with +python3")
+            return 1
+        results = measure_in_vim(vim, args.sizes, args.repeat)
+    else:
+        results = measure(args.sizes, repeat=args.repeat, seed=args.seed)
+    print("\n".join(format_table(results)))
+    failures = check_constant_size(results)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
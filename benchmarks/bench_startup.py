@@ -0,0 +1,184 @@
+"""
+Startup cost benchmark.
+
+Measures what loading vim4rabbit costs, in fresh processes:
+
+    python  `python -X importtime -c "import vim4rabbit"`: cumulative import
+            time of the package, and of the game packages, which are now
+            imported when a game starts instead of with the package
+    vim     `vim --startuptime`: time spent sourcing plugin/vim4rabbit.vim
+            at startup, and the autoload script (which imports the Python
+            backend) on first use; needs a Vim with +python3, skipped
+            otherwise
+
+Every number is the best of several runs.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10
+
+Exits with status 1 if importing vim4rabbit imports a game package.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+from vim4rabbit.games import GAME_REGISTRY  # noqa: E402
+
+# Game packages, as imported by games.get_game_class()
+GAME_MODULES = sorted(
+    "vim4rabbit.games." + class_path.rsplit(".", 1)[0]
+    for _, class_path, _ in GAME_REGISTRY.values()
+)
+
+# "import time: self | cumulative | package" lines of -X importtime
+_IMPORT_TIME = re.compile(r"^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+# "clock self+sourced self: sourcing path" lines of --startuptime
+_SOURCING = re.compile(r"^\s*[\d.]+\s+([\d.]+)\s+[\d.]+: sourcing (.+?)\s*$")
+
+
+def parse_import_times(stderr: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of each module in -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def parse_sourcing_times(log: str) -> Dict[str, float]:
+    """Milliseconds spent sourcing each script (with what it sourced) in a --startuptime log."""
+    times = {}
+    for line in log.splitlines():
+        match = _SOURCING.match(line)
+        if match:
+            times[match.group(2)] = float(match.group(1))
+    return times
+
+
+def import_times(statement: str, runs: int) -> Dict[str, int]:
+    """Best cumulative import time of each module imported by statement."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "pythonx"))
+    best: Dict[str, int] = {}
+    for _ in range(runs):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            capture_output=True, text=True, env=env, check=True,
+        ).stderr
+        for module, us in parse_import_times(stderr).items():
+            best[module] = min(best.get(module, us), us)
+    return best
+
+
+def measure_python(runs: int = 5) -> dict:
+    """
+    Measure importing the package, and the game packages after it.
+
+    Args:
+        runs: Interpreters started per measurement
+
+    Returns:
+        Dict with keys:
+        - import_us: cumulative import time of vim4rabbit
+        - games_us: import time the game packages add (what the package
+          paid before they were imported lazily)
+        - games_imported: game packages imported by `import vim4rabbit`
+    """
+    lazy = import_times("import vim4rabbit", runs)
+    games = "; ".join(f"import {module}" for module in GAME_MODULES)
+    eager = import_times(f"import vim4rabbit; {games}", runs)
+    return {
+        "import_us": lazy["vim4rabbit"],
+        "games_us": sum(eager[module] for module in GAME_MODULES),
+        "games_imported": [module for module in GAME_MODULES if module in lazy],
+    }
+
+
+def vim_with_python3() -> Optional[str]:
+    """Path of a vim executable with +python3, or None."""
+    vim = shutil.which("vim")
+    if vim is None:
+        return None
+    version = subprocess.run([vim, "--version"], capture_output=True, text=True).stdout
+    return vim if "+python3" in version else None
+
+
+def measure_vim(vim: str, runs: int = 5) -> dict:
+    """
+    Measure sourcing the plugin at startup and the autoload script on first use.
+
+    Args:
+        vim: vim executable (with +python3)
+        runs: Vim processes started
+
+    Returns:
+        Dict with keys plugin_ms and autoload_ms
+    """
+    plugin = str(ROOT / "plugin" / "vim4rabbit.vim")
+    autoload = str(ROOT / "autoload" / "vim4rabbit.vim")
+    best = {"plugin_ms": float("inf"), "autoload_ms": float("inf")}
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "startuptime.log"
+        for _ in range(runs):
+            log.unlink(missing_ok=True)
+            subprocess.run(
+                [
+                    vim, "-u", "NONE", "-i", "NONE", "-N", "-es",
+                    "--startuptime", str(log),
+                    "--cmd", f"set runtimepath^={ROOT}",
+                    "--cmd", f"source {plugin}",
+                    "-c", "call vim4rabbit#CompleteRabbit('', '', 0)",
+                    "-c", "qa!",
+                ],
+                capture_output=True, check=False,
+            )
+            times = parse_sourcing_times(log.read_text())
+            best["plugin_ms"] = min(best["plugin_ms"], times.get(plugin, float("inf")))
+            best["autoload_ms"] = min(best["autoload_ms"], times.get(autoload, float("inf")))
+    return best
+
+
+def format_table(python: dict, vim: Optional[dict]) -> List[str]:
+    """Results as aligned text rows."""
+    rows = [
+        f"{'import vim4rabbit':<36}{python['import_us'] / 1000:>10.2f} ms",
+        f"{'game packages (on first game)':<36}{python['games_us'] / 1000:>10.2f} ms",
+    ]
+    if vim is None:
+        rows.append("vim: skipped (no vim with +python3)")
+    else:
+        rows.append(f"{'vim startup: plugin/vim4rabbit.vim':<36}{vim['plugin_ms']:>10.2f} ms")
+        rows.append(f"{'first use: autoload + Python':<36}{vim['autoload_ms']:>10.2f} ms")
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    python = measure_python(args.runs)
+    vim = vim_with_python3()
+    print("\n".join(format_table(python, measure_vim(vim, args.runs) if vim else None)))
+    if python["games_imported"]:
+        print(f"FAIL import vim4rabbit imports {', '.join(python['games_imported'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
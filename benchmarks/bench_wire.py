@@ -0,0 +1,109 @@
+"""
+Review payload benchmark.
+
+Counts the bytes a finished review sends between Python and Vim, for the
+legacy result shape and for the compact one (types.WIRE_VERSION), on
+synthetic CodeRabbit output at several issue counts.
+
+    legacy   the result with every issue's lines twice (issues and
+             issues_data), issues_data json_encode()d back into
+             vim_format_review(), then the formatted review lines
+    compact  the result with each issue once and without its lines,
+             plus the formatted review lines (which show them)
+
+Sizes are JSON-encoded UTF-8 bytes, a stand-in for what py3eval() and
+json_encode() convert.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_wire
+    python -m benchmarks.bench_wire --sizes 10 1000
+
+Exits with status 1 if the compact payload is not below MAX_RATIO of the
+legacy one at the largest size.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pythonx"))
+
+from vim4rabbit.content import format_review_output  # noqa: E402
+from vim4rabbit.parser import parse_review_issues  # noqa: E402
+from vim4rabbit.types import ReviewResult  # noqa: E402
+
+from .corpus import generate  # noqa: E402
+
+# Issue counts measured by default
+SIZES = [10, 100, 1000, 10000]
+
+# Largest accepted compact/legacy payload ratio
+MAX_RATIO = 0.5
+
+
+def payload_bytes(value: object) -> int:
+    """Size of a value as compact JSON, in UTF-8 bytes."""
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def measure(sizes: List[int] = SIZES, seed: int = 0) -> Dict[int, dict]:
+    """
+    Count the payload of each shape.
+
+    Args:
+        sizes: Issue counts to measure
+        seed: Corpus seed
+
+    Returns:
+        Dict of issue count to {legacy_bytes, compact_bytes, ratio}
+    """
+    results = {}
+    for count in sizes:
+        review = ReviewResult(success=True, issues=parse_review_issues(generate(count, seed=seed)))
+        legacy = review.to_dict(legacy=True)
+        lines = format_review_output(review)["lines"]
+        legacy_bytes = (
+            payload_bytes(legacy) + payload_bytes(legacy["issues_data"]) + payload_bytes(lines)
+        )
+        compact_bytes = payload_bytes(review.to_dict(bodies=False)) + payload_bytes(lines)
+        results[count] = {
+            "legacy_bytes": legacy_bytes,
+            "compact_bytes": compact_bytes,
+            "ratio": round(compact_bytes / legacy_bytes, 3),
+        }
+    return results
+
+
+def format_table(results: Dict[int, dict]) -> List[str]:
+    """Results as aligned text rows."""
+    rows = [f"{'issues':>8}{'legacy B':>14}{'compact B':>14}{'ratio':>8}"]
+    for count, numbers in results.items():
+        rows.append(
+            f"{count:>8}{numbers['legacy_bytes']:>14}{numbers['compact_bytes']:>14}"
+            f"{numbers['ratio']:>8.3f}"
+        )
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = measure(args.sizes, args.seed)
+    print("\n".join(format_table(results)))
+    largest = results[max(results)]
+    if largest["ratio"] >= MAX_RATIO:
+        print(f"FAIL compact payload is {largest['ratio']:.0%} of legacy (limit {MAX_RATIO:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Seeded synthetic CodeRabbit output for benchmarks.
+
+Generates --plain review output shaped like tests/data/sample_review_1.out:
+preamble status lines, then issues separated by a row of equal signs, each
+with File/Line/Type fields, a Comment with a summary and explanation, an
+optional proposed diff block and a prompt. The same arguments always give
+the same output.
+"""
+
+import random
+from typing import List, Tuple
+
+# Status lines printed before the first issue
+PREAMBLE = [
+    "Starting CodeRabbit review in plain text mode...",
+    "",
+    "Connecting to review service",
+    "Setting up",
+    "Analyzing",
+    "Reviewing",
+    "",
+]
+
+SEPARATOR = "=" * 76
+
+_ISSUE_TYPES = ["potential_issue", "refactor_suggestion", "nitpick"]
+_EXTENSIONS = [".py", ".vim", ".md", ".toml"]
+_WORDS = (
+    "the value is read before it is checked so a missing key raises instead of "
+    "falling back to the default and callers never see the error because the "
+    "exception is swallowed by the handler around the loop which also hides "
+    "timeouts from the job manager"
+).split()
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    """A random sentence of low..high words."""
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+
+def _issue(
+    rng: random.Random,
+    index: int,
+    prompt_lines: Tuple[int, int],
+    diff_lines: Tuple[int, int],
+) -> List[str]:
+    """Lines of one issue (without its separator)."""
+    path = f"src/pkg{index % 13}/module_{index % 101}{rng.choice(_EXTENSIONS)}"
+    start = rng.randint(1, 2000)
+    lines = [
+        f"File: {path}",
+        f"Line: {start} to {start + rng.randint(0, 40)}",
+        f"Type: {rng.choice(_ISSUE_TYPES)}",
+        "",
+        "Comment:",
+        _sentence(rng, 4, 12),
+        "",
+    ]
+    lines += [_sentence(rng, 8, 30) for _ in range(rng.randint(1, 4))]
+    diff_count = rng.randint(*diff_lines)
+    if diff_count:
+        lines += ["", "", "Proposed fix", ""]
+        for _ in range(diff_count):
+            marker = rng.choice(" -+")
+            lines.append(f"{marker}    {' '.join(rng.choice(_WORDS) for _ in range(5))}")
+    lines += ["", "Prompt for AI Agent:"]
+    lines += [
+        f"In @{path} around lines {start} - {start + 3}, " + _sentence(rng, 10, 40)
+        for _ in range(rng.randint(*prompt_lines))
+    ]
+    return lines + ["", "", ""]
+
+
+def generate(
+    issue_count: int,
+    seed: int = 0,
+    prompt_lines: Tuple[int, int] = (1, 4),
+    diff_lines: Tuple[int, int] = (0, 20),
+    preamble: bool = True,
+) -> str:
+    """
+    Generate CodeRabbit --plain output.
+
+    Args:
+        issue_count: Number of issues
+        seed: Random seed
+        prompt_lines: (min, max) prompt lines per issue
+        diff_lines: (min, max) lines of the proposed diff block (0 for none)
+        preamble: Start with CLI status lines
+
+    Returns:
+        Raw output text
+    """
+    rng = random.Random(seed)
+    lines: List[str] = list(PREAMBLE) if preamble else []
+    for index in range(issue_count):
+        lines.append(SEPARATOR)
+        lines += _issue(rng, index, prompt_lines, diff_lines)
+    lines.append("Review completed")
+    return "\n".join(lines) + "\n"
@@ -15,22 +15,18 @@ if !has('python3')
     finish
 endif
 
-" Initialize Python module
-" Add pythonx directory to Python path and import vim4rabbit
-let s:plugin_root = expand('<sfile>:p:h:h')
-python3 << EOF
-import sys
-import vim
-
-# Add plugin's pythonx directory to Python path
-plugin_root = vim.eval('s:plugin_root')
-pythonx_path = plugin_root + '/pythonx'
-if pythonx_path not in sys.path:
-    sys.path.insert(0, pythonx_path)
-
-# Import vim4rabbit module
-import vim4rabbit
-EOF
+" The Python backend is imported by autoload/vim4rabbit.vim, on the first
+" :Rabbit (or other vim4rabbit# call), not at startup
 
 " Define the :Rabbit command with optional subcommands
-command! -nargs=? -complete=customlist,vim4rabbit#CompleteRabbit Rabbit call vim4rabbit#Rabbit(<q-args>)
+" A bang (:Rabbit! review) bypasses the review result cache
+command! -bang -nargs=? -complete=customlist,vim4rabbit#CompleteRabbit Rabbit call vim4rabbit#Rabbit(<q-args>, <bang>0)
+
+" Speculative reviews: review uncommitted changes in the background on save
+if get(g:, 'vim4rabbit_speculative', 0)
+    augroup vim4rabbit_speculative
+        autocmd!
+        autocmd BufWritePost * call vim4rabbit#OnBufWritePost()
+        autocmd VimLeavePre * call vim4rabbit#StopSpeculativeReview()
+    augroup END
+endif
@@ -7,14 +7,23 @@ All vim_* functions are the public API called from VimScript via py3eval().
 
 __version__ = "0.1.0"
 
-from typing import List
+import os
+import threading
+import time
+from typing import List, Optional, Tuple, Union
 
 from .cli import run_review
 from .content import (
     format_cancelled_message,
+    format_delta_summary,
     format_elapsed_time,
+    format_issue_tracking,
     format_loading_message,
+    format_patch_results,
+    format_review_metrics,
     format_review_output,
+    format_shard_timings,
+    format_speculative_stats,
     get_animation_frame,
     get_no_work_animation_frame,
     get_no_work_frame_count,
@@ -31,8 +40,229 @@ from .games import (
     stop_game,
     tick_game,
 )
-from .parser import parse_review_issues
+from .parser import parse_proposed_patch, parse_review_issues
+from .types import PatchResult, ReviewIssue, ReviewResult, ReviewSession
+from . import buffers
+from . import cache
+from . import classifier
+from . import delta
+from . import fingerprints
+from . import git
+from . import jobs
+from . import metrics
+from . import patches
 from . import selection
+from . import sessions
+from . import speculative
+from . import tasks
+
+# Most recently finished review (stored into the cache on request)
+_last_review: Optional[ReviewResult] = None
+# Reviews finish on result worker threads (see vim_start_review_result())
+_last_review_lock = threading.Lock()
+
+
+def _streamed_issues() -> Optional[list]:
+    """Issues parsed so far by the running review, if any."""
+    job = jobs.latest()
+    return job.issues if job is not None else None
+
+
+def _review_status() -> str:
+    """Status line of the loading screen: job setup, parse progress or task phase."""
+    job = jobs.latest()
+    if job is not None and job.preparing:
+        return "Preparing shards..."
+    if job is not None and job.parsing:
+        return f"Parsing results... {job.parse_progress}%"
+    task = tasks.latest()
+    if task is not None and not task.done and task.phase:
+        return f"{task.phase}..."
+    return ""
+
+
+def _render(lines: List[str], bufnr: int) -> List[str]:
+    """
+    Write lines into a buffer directly when possible (see buffers.py).
+
+    Returns:
+        The lines VimScript still has to write ([] if they were written)
+    """
+    if bufnr and buffers.write_lines(bufnr, lines):
+        return []
+    return lines
+
+
+def _frame(lines: List[str], bufnr: int, direct: bool) -> Union[List[str], dict]:
+    """
+    Send an animation or game frame (see buffers.update()).
+
+    Returns:
+        The lines if bufnr is 0, else the changes against the buffer's
+        previous frame that VimScript still has to apply
+    """
+    if not bufnr:
+        return lines
+    return buffers.update(bufnr, lines, direct)
+
+
+def _finish_review(
+    task: tasks.Task, job_id: int, track_issues: bool, new_only: bool, elapsed_secs: int
+) -> dict:
+    """Task body of vim_start_review_result()."""
+    job = jobs.get(job_id)
+    if job is not None:
+        job.wait()
+    task.phase = "Tracking issues"
+    # The review lines carry the issue bodies: don't send them twice
+    result, shown = _review_result(job_id, track_issues, new_only, bodies=False)
+    if result["success"]:
+        task.phase = f"Formatting {len(shown)} issue(s)"
+        result["review"] = _format_review(
+            ReviewResult(success=True, issues=shown),
+            result["issues_data"],
+            elapsed_secs,
+            hidden=result["hidden_issues"],
+            review_id=result["review_id"],
+        )
+    return result
+
+
+def _review_result(
+    job_id: int,
+    track_issues: bool,
+    new_only: bool,
+    legacy: bool = False,
+    bodies: bool = True,
+) -> Tuple[dict, List[ReviewIssue]]:
+    """
+    Body of vim_get_review_result().
+
+    Args:
+        bodies: Include each issue's lines in issues_data
+
+    Returns:
+        (result dict, the issues it lists), so the issues can be formatted
+        without rebuilding them from the dicts
+    """
+    global _last_review
+
+    job = jobs.pop(job_id)
+    if job is None:
+        result = ReviewResult(success=False, error_message="Unknown review job").to_dict(legacy)
+        result.update({
+            "shards": [], "shard_summary": "", "delta_summary": "",
+            "issue_summary": "", "hidden_issues": 0, "review_id": 0,
+        })
+        return result, []
+
+    review = job.result()
+    tracking = None
+    if review.success:
+        with _last_review_lock:
+            _last_review = review
+        metrics.record(job.metrics)
+        root = git.get_repo_root()
+        if track_issues and root:
+            tracking = fingerprints.track(
+                root, git.get_branch_name(root), job.review_type, review.issues
+            )
+    result = review.to_dict(legacy, bodies)
+    result["shards"] = [shard.to_dict() for shard in job.shards]
+    result["shard_summary"] = format_shard_timings(job.shards) if job.sharded else ""
+    result["delta_summary"] = format_delta_summary(job.delta) if job.delta else ""
+    result["issue_summary"] = ""
+    result["hidden_issues"] = 0
+    if job.delta is not None and job.delta.carried:
+        carried = {id(issue) for issue in job.delta.carried}
+        for data, issue in zip(result["issues_data"], review.issues):
+            if id(issue) in carried:
+                data["carried"] = True
+    shown = list(review.issues)
+    if tracking is not None and tracking.known:
+        statuses = tracking.statuses
+        hidden = 0
+        if new_only:
+            keep = [i for i, status in enumerate(statuses) if status == "new"]
+            hidden = len(statuses) - len(keep)
+            if legacy:
+                result["issues"] = [result["issues"][i] for i in keep]
+            result["issues_data"] = [result["issues_data"][i] for i in keep]
+            shown = [shown[i] for i in keep]
+            statuses = ["new"] * len(keep)
+        for data, status in zip(result["issues_data"], statuses):
+            data["status"] = status
+        result["issue_summary"] = format_issue_tracking(tracking, hidden)
+        result["hidden_issues"] = hidden
+    result["review_id"] = sessions.create(shown).review_id if review.success else 0
+    return result, shown
+
+
+def _format_review(
+    result: ReviewResult,
+    issues_data: List[dict],
+    elapsed_secs: int,
+    cached: bool = False,
+    hidden: int = 0,
+    review_id: int = 0,
+) -> dict:
+    """
+    Body of vim_format_review(): format result's issues, with the status
+    and carried flags of the matching issues_data dicts.
+    """
+    statuses = [item.get("status", "") for item in issues_data]
+    carried = [bool(item.get("carried")) for item in issues_data]
+    format_started = time.perf_counter()
+    output = format_review_output(
+        result,
+        elapsed_secs=elapsed_secs,
+        cached=cached,
+        statuses=statuses if any(statuses) else None,
+        hidden=hidden,
+        carried=carried if any(carried) else None,
+    )
+    metrics.record_phase("format", time.perf_counter() - format_started)
+    spans = output.pop("spans")
+    session = sessions.get(review_id)
+    if session is not None:
+        session.lines = output["lines"]
+        session.spans = spans
+    return output
+
+
+def _selected_issues(
+    selected_indices: List[int], issues_data: Union[int, List[dict]]
+) -> List[Tuple[int, ReviewIssue]]:
+    """
+    Issues behind 1-based issue numbers (invalid numbers are skipped).
+
+    Args:
+        selected_indices: 1-based issue numbers
+        issues_data: Review id of a session, or a list of issue dicts; the
+                     lines of dicts without them are taken from the latest
+                     session
+
+    Returns:
+        List of (issue number, issue)
+    """
+    if isinstance(issues_data, int):
+        session = sessions.get(issues_data)
+        if session is None:
+            return []
+        issues = [(idx, session.issue(idx)) for idx in selected_indices]
+        return [(idx, issue) for idx, issue in issues if issue is not None]
+
+    latest = sessions.latest()
+    selected = []
+    for idx in selected_indices:
+        if not 1 <= idx <= len(issues_data) or not isinstance(issues_data[idx - 1], dict):
+            continue
+        data = issues_data[idx - 1]
+        if "lines" not in data and latest is not None and latest.issue(idx) is not None:
+            selected.append((idx, latest.issue(idx)))
+        else:
+            selected.append((idx, ReviewIssue.from_dict(data)))
+    return selected
 
 
 # =============================================================================
@@ -40,20 +270,207 @@ from . import selection
 # =============================================================================
 
 
-def vim_run_review() -> dict:
+def vim_run_review(legacy: bool = False) -> dict:
     """
     Run CodeRabbit review and return results.
 
     Called from VimScript: py3eval('vim4rabbit.vim_run_review()')
 
+    Args:
+        legacy: Return the legacy result shape (see vim_parse_review_output())
+
     Returns:
-        Dict with keys:
-        - success: bool
-        - issues: list of lists (each issue is a list of line strings)
-        - error_message: str (empty if success)
+        Dict shaped like vim_parse_review_output()
     """
     result = run_review()
-    return result.to_dict()
+    return result.to_dict(legacy)
+
+
+def vim_start_review(
+    review_type: str = "uncommitted",
+    timeout: int = 0,
+    shard_count: int = 1,
+    max_jobs: int = 0,
+    delta: bool = False,
+    output_format: str = "text",
+) -> int:
+    """
+    Start a CodeRabbit review in the background without blocking Vim.
+
+    Called from VimScript:
+    py3eval('vim4rabbit.vim_start_review(type, timeout, shards, max_jobs, delta, format)')
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        timeout: Timeout in seconds per process (0 for unlimited)
+        shard_count: Split uncommitted changes across this many processes
+        max_jobs: Maximum concurrent shard processes (0 for all at once)
+        delta: Re-review only files changed since the previous review
+        output_format: Parser backend: 'text', 'json', or 'auto' to detect
+
+    Returns:
+        Job id for vim_poll_review() and friends
+    """
+    return jobs.start(review_type, timeout, shard_count, max_jobs, delta, output_format)
+
+
+def vim_poll_review(job_id: int) -> dict:
+    """
+    Get the status of a background review (its output is parsed on a
+    worker thread).
+
+    Called from VimScript on a timer: py3eval('vim4rabbit.vim_poll_review(id)')
+
+    Returns:
+        Dict with keys: state ('running', 'done', 'timeout', 'cancelled',
+        'failed', or 'unknown' for an unknown id), bytes_read,
+        issues_ready, elapsed_secs, preparing, parsing, parse_progress
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return {
+            "state": "unknown", "bytes_read": 0, "issues_ready": 0, "elapsed_secs": 0,
+            "preparing": False, "parsing": False, "parse_progress": 100,
+        }
+    return job.poll()
+
+
+def vim_read_review(job_id: int) -> str:
+    """
+    Read output a background review produced since the previous read.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_read_review(id)')
+
+    Returns:
+        New output text (empty string if none or unknown id)
+    """
+    job = jobs.get(job_id)
+    return job.read() if job is not None else ""
+
+
+def vim_cancel_review(job_id: int) -> None:
+    """
+    Cancel a background review, remove any shard worktrees and forget it.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_cancel_review(id)')
+    """
+    jobs.cancel(job_id)
+
+
+def vim_get_review_result(
+    job_id: int, track_issues: bool = True, new_only: bool = False, legacy: bool = False
+) -> dict:
+    """
+    Get the parsed result of a finished background review and forget it.
+
+    Called from VimScript once vim_poll_review() reports a final state.
+    Blocks if the review is still running.
+
+    Args:
+        job_id: Job id from vim_start_review()
+        track_issues: Classify issues against the previous review of the
+                      branch (see fingerprints.py)
+        new_only: Leave out issues the previous review already reported
+        legacy: Return the legacy result shape (see vim_parse_review_output())
+
+    Returns:
+        Dict with the keys of vim_parse_review_output() plus:
+        - shards: list of per-shard timing dicts (empty if not sharded)
+        - shard_summary: one-line timing summary ('' if not sharded)
+        - delta_summary: files re-reviewed by a delta review ('' otherwise)
+        - issue_summary: new/persisting/resolved counts ('' if not tracked)
+        - hidden_issues: number of persisting issues left out (new_only)
+        - review_id: id of the review's session (see sessions.py), which
+          holds its issues for the vim_* functions taking a review id (0
+          if the review failed)
+        Each issues_data dict gets a status ('new' or 'persisting') when
+        the branch was reviewed before, and carried (True) when a delta
+        review kept it from the previous review without re-reviewing its
+        file.
+    """
+    return _review_result(job_id, track_issues, new_only, legacy)[0]
+
+
+def vim_start_review_result(
+    job_id: int, track_issues: bool = True, new_only: bool = False, elapsed_secs: int = 0
+) -> int:
+    """
+    Build, track and format the result of a finished review on a worker
+    thread, so huge reviews don't stall Vim.
+
+    Called from VimScript once vim_poll_review() reports a final state:
+    py3eval('vim4rabbit.vim_start_review_result(id, track, new_only, secs)')
+
+    Args:
+        job_id: Job id from vim_start_review()
+        track_issues: See vim_get_review_result()
+        new_only: See vim_get_review_result()
+        elapsed_secs: Elapsed seconds shown in the review header
+
+    Returns:
+        Task id for vim_poll_task() and vim_take_review_result()
+    """
+    return tasks.start(
+        _finish_review, job_id, track_issues, new_only, elapsed_secs,
+        phase="Parsing results",
+    )
+
+
+def vim_poll_task(task_id: int) -> dict:
+    """
+    Get the status of a background task.
+
+    Called from VimScript on a timer: py3eval('vim4rabbit.vim_poll_task(id)')
+
+    Returns:
+        Dict with keys: state ('running', 'done', 'failed', 'cancelled',
+        or 'unknown' for an unknown id) and phase
+    """
+    task = tasks.get(task_id)
+    if task is None:
+        return {"state": "unknown", "phase": ""}
+    return task.poll()
+
+
+def vim_take_review_result(task_id: int, bufnr: int = 0) -> dict:
+    """
+    Get the result of a vim_start_review_result() task and forget it.
+    Blocks if the task is still running.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_take_review_result(id, bufnr)')
+
+    Args:
+        task_id: Task id from vim_start_review_result()
+        bufnr: Review buffer to write the formatted review into directly
+               (0 to return its lines)
+
+    Returns:
+        Dict of vim_get_review_result(); a successful review also has a
+        review key holding the vim_format_review() dict (with no lines if
+        they were written into bufnr), and its issues_data dicts have no
+        lines (the review shows them)
+    """
+    task = tasks.pop(task_id)
+    result = task.result() if task is not None else None
+    if result is not None and "review" in result:
+        result["review"]["lines"] = _render(result["review"]["lines"], bufnr)
+    if result is None:
+        error = task.error if task is not None and task.error else "Unknown review task"
+        result = ReviewResult(success=False, error_message=error).to_dict()
+        result.update({
+            "shards": [], "shard_summary": "", "delta_summary": "",
+            "issue_summary": "", "hidden_issues": 0, "review_id": 0,
+        })
+    return result
+
+
+def vim_cancel_task(task_id: int) -> None:
+    """
+    Cancel a background task and forget it.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_cancel_task(id)')
+    """
+    tasks.cancel(task_id)
 
 
 def vim_render_help(width: int) -> List[str]:
@@ -76,6 +493,9 @@ def vim_format_review(
     issues_data: list,
     error_message: str,
     elapsed_secs: int = 0,
+    cached: bool = False,
+    hidden: int = 0,
+    review_id: int = 0,
 ) -> dict:
     """
     Format review results for display.
@@ -88,25 +508,21 @@ def vim_format_review(
                      or list of line-lists for backward compatibility
         error_message: Error message if failed
         elapsed_secs: Total elapsed seconds for the review command
+        cached: Whether the result was served from the review cache
+        hidden: Number of persisting issues left out (new_only)
+        review_id: Session of the review (see vim_get_review_result()),
+                   which keeps the lines and where each issue is in them
 
     Returns:
         Dict with keys:
         - lines: List of strings for the review buffer
         - issue_count: Number of issues found
+        - highlights: Dict of highlight group to buffer line numbers
     """
-    from .types import ReviewIssue, ReviewResult
-
     review_issues = []
     for item in issues_data:
         if isinstance(item, dict):
-            review_issues.append(ReviewIssue(
-                lines=item.get("lines", []),
-                file_path=item.get("file_path", ""),
-                line_range=item.get("line_range", ""),
-                issue_type=item.get("issue_type", ""),
-                summary=item.get("summary", ""),
-                prompt=item.get("prompt", ""),
-            ))
+            review_issues.append(ReviewIssue.from_dict(item))
         else:
             # Backward compatibility: plain list of lines
             review_issues.append(ReviewIssue(lines=item))
@@ -116,8 +532,14 @@ def vim_format_review(
         issues=review_issues,
         error_message=error_message,
     )
-
-    return format_review_output(result, elapsed_secs=elapsed_secs)
+    return _format_review(
+        result,
+        [item for item in issues_data if isinstance(item, dict)],
+        elapsed_secs,
+        cached=cached,
+        hidden=hidden,
+        review_id=review_id,
+    )
 
 
 def vim_get_loading_content() -> List[str]:
@@ -144,35 +566,52 @@ def vim_get_cancelled_content() -> List[str]:
     return format_cancelled_message()
 
 
-def vim_get_animation_frame(frame: int, elapsed_secs: int = 0) -> List[str]:
+def vim_get_animation_frame(
+    frame: int, elapsed_secs: int = 0, bufnr: int = 0, direct: bool = True
+) -> Union[List[str], dict]:
     """
     Get a specific animation frame for the loading spinner.
 
-    Called from VimScript: py3eval('vim4rabbit.vim_get_animation_frame(frame, secs)')
+    Called from VimScript:
+    py3eval('vim4rabbit.vim_get_animation_frame(frame, secs, bufnr, direct)')
 
     Args:
         frame: Frame number (0-23, wraps around)
         elapsed_secs: Elapsed seconds since review started
+        bufnr: Buffer the frame is for (0 to get the whole frame)
+        direct: Write the changed lines into bufnr directly
 
     Returns:
-        List of strings for the animation frame
+        List of strings for the animation frame, or with a bufnr a dict of
+        changes and delete_from still to apply (see buffers.update())
     """
-    return get_animation_frame(frame, elapsed_secs=elapsed_secs)
+    return _frame(get_animation_frame(
+        frame,
+        elapsed_secs=elapsed_secs,
+        found_issues=_streamed_issues(),
+        status=_review_status(),
+    ), bufnr, direct)
 
 
-def vim_get_no_work_animation_frame(frame: int) -> List[str]:
+def vim_get_no_work_animation_frame(
+    frame: int, bufnr: int = 0, direct: bool = True
+) -> Union[List[str], dict]:
     """
     Get a specific animation frame for the "no work" state.
 
-    Called from VimScript: py3eval('vim4rabbit.vim_get_no_work_animation_frame(' . frame . ')')
+    Called from VimScript:
+    py3eval('vim4rabbit.vim_get_no_work_animation_frame(frame, bufnr, direct)')
 
     Args:
         frame: Frame number (0-7, wraps around)
+        bufnr: Buffer the frame is for (0 to get the whole frame)
+        direct: Write the changed lines into bufnr directly
 
     Returns:
-        List of strings for the animation frame
+        List of strings for the animation frame, or with a bufnr a dict of
+        changes still to apply (see vim_get_animation_frame())
     """
-    return get_no_work_animation_frame(frame)
+    return _frame(get_no_work_animation_frame(frame), bufnr, direct)
 
 
 def vim_get_no_work_frame_count() -> int:
@@ -202,7 +641,7 @@ def vim_is_no_files_error(error_message: str) -> bool:
     return is_no_files_error(error_message)
 
 
-def vim_parse_review_output(output: str) -> dict:
+def vim_parse_review_output(output: str, legacy: bool = False) -> dict:
     """
     Parse raw review output from async job.
 
@@ -210,26 +649,243 @@ def vim_parse_review_output(output: str) -> dict:
 
     Args:
         output: Raw output from coderabbit CLI
+        legacy: Return the legacy shape, which also has issues (a list of
+                line lists repeating every issue's lines) and no version
 
     Returns:
         Dict with keys:
+        - version: wire format version (types.WIRE_VERSION)
         - success: bool
-        - issues: list of lists (each issue is a list of line strings)
         - issues_data: list of dicts with full issue metadata
         - error_message: str (empty if success)
     """
-    from .types import ReviewResult
-
     issues = parse_review_issues(output)
     result = ReviewResult(
         success=True,
         issues=issues,
         raw_output=output,
     )
-    return result.to_dict()
+    return result.to_dict(legacy)
+
+
+def vim_set_line_rules(rules: dict) -> str:
+    """
+    Extend the line classifier with rules from g:vim4rabbit_line_rules.
+
+    Called from VimScript before a review starts:
+    py3eval('vim4rabbit.vim_set_line_rules(' . json_encode(rules) . ')')
+
+    Args:
+        rules: Dict of kind ('separator', 'fence', 'diff' or 'preamble')
+               to a list of extra regexes
+
+    Returns:
+        Error message, or '' if the rules are in use
+    """
+    try:
+        classifier.set_rules(rules)
+    except ValueError as e:
+        return str(e)
+    return ""
+
+
+def vim_review_cache_lookup(
+    review_type: str, bypass: bool = False, legacy: bool = False, bufnr: int = 0
+) -> dict:
+    """
+    Fingerprint the tree and look up a cached result for it.
+
+    Called from VimScript before starting a review:
+    py3eval('vim4rabbit.vim_review_cache_lookup(type, bypass)')
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        bypass: Skip the lookup (:Rabbit review!) but still return the key
+                so the fresh result can be stored
+        legacy: Return the legacy result shape (see vim_parse_review_output())
+        bufnr: Review buffer to write a cached review into directly (0 to
+               return its lines)
+
+    Returns:
+        Dict with keys:
+        - key: str cache key to pass to vim_review_cache_store() ('' if the
+          tree could not be fingerprinted)
+        - hit: bool
+        - result: dict shaped like vim_parse_review_output() (on a hit),
+          without issue lines but with a review key holding the
+          vim_format_review() dict, so issue bodies are sent once and the
+          issues need not be sent back for formatting, and a review_id
+          (see vim_get_review_result())
+        - elapsed_secs: int elapsed time of the original run (on a hit)
+    """
+    key = cache.compute_cache_key(review_type)
+    cached = None if bypass else cache.load_review(key)
+    if cached is None:
+        return {"key": key, "hit": False, "result": {}, "elapsed_secs": 0}
+    speculative.note_cache_hit(key)
+    result, elapsed_secs = cached
+    # A cached uncommitted review is the baseline for the next delta review
+    if result.file_hashes:
+        delta.remember(git.get_repo_root(), result)
+    data = result.to_dict(legacy, bodies=False)
+    review = format_review_output(result, elapsed_secs=elapsed_secs, cached=True)
+    spans = review.pop("spans")
+    data["review"] = review
+    data["review_id"] = sessions.create(list(result.issues), review["lines"], spans).review_id
+    data["review"]["lines"] = _render(data["review"]["lines"], bufnr)
+    return {
+        "key": key,
+        "hit": True,
+        "result": data,
+        "elapsed_secs": elapsed_secs,
+    }
+
+
+def vim_review_cache_store(key: str, elapsed_secs: int = 0) -> bool:
+    """
+    Store the most recently finished review under the given key.
+
+    Called from VimScript after vim_get_review_result():
+    py3eval('vim4rabbit.vim_review_cache_store(key, secs)')
+
+    Args:
+        key: Key returned by vim_review_cache_lookup() at review start
+        elapsed_secs: Elapsed seconds of the review run
+
+    Returns:
+        True if the result was stored
+    """
+    with _last_review_lock:
+        review = _last_review
+    if review is None:
+        return False
+    return cache.store_review(key, review, elapsed_secs)
+
+
+def vim_speculative_start(
+    min_interval: int = 60,
+    timeout: int = 0,
+    shard_count: int = 1,
+    max_jobs: int = 0,
+    delta: bool = False,
+    output_format: str = "text",
+) -> bool:
+    """
+    Start a speculative uncommitted review if the tree changed.
+
+    Called from VimScript after a debounced BufWritePost:
+    py3eval('vim4rabbit.vim_speculative_start(interval, timeout, shards, max_jobs, delta, format)')
+
+    Args:
+        min_interval: Minimum seconds between speculative starts
+        timeout: Timeout in seconds per process (0 for unlimited)
+        shard_count: Number of shards (1 for an unsharded review)
+        max_jobs: Maximum concurrent shard processes (0 for all at once)
+        delta: Re-review only files changed since the previous review
+        output_format: Parser backend: 'text', 'json', or 'auto' to detect
+
+    Returns:
+        True if a review was started (it is skipped if the tree turns out
+        to be reviewed already) or deferred by the rate limit (poll it
+        with vim_speculative_poll())
+    """
+    started = speculative.maybe_start(
+        min_interval, timeout, shard_count, max_jobs, delta, output_format
+    )
+    return started or speculative.is_deferred()
+
+
+def vim_speculative_poll() -> bool:
+    """
+    Advance the speculative review; its result is cached when it finishes.
+    A start deferred by the rate limit is made once it is due.
+
+    Called from VimScript on a timer: py3eval('vim4rabbit.vim_speculative_poll()')
+
+    Returns:
+        True while a speculative review is running, starting or deferred
+    """
+    return speculative.poll()
+
+
+def vim_speculative_claim(key: str) -> int:
+    """
+    Adopt a running speculative review of the same tree as a review job.
+
+    Called from VimScript on a review cache miss for an uncommitted review.
+
+    Args:
+        key: Key returned by vim_review_cache_lookup()
+
+    Returns:
+        Job id for vim_poll_review() and friends (0 if nothing to adopt)
+    """
+    job = speculative.claim(key)
+    return jobs.add(job) if job is not None else 0
+
+
+def vim_speculative_cancel() -> None:
+    """
+    Cancel any running speculative review.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_speculative_cancel()')
+    """
+    speculative.cancel()
+
+
+def vim_speculative_stats() -> str:
+    """
+    Get the speculative review hit/miss counters.
+
+    Called from VimScript for :Rabbit speculative.
+
+    Returns:
+        One-line summary of the counters
+    """
+    return format_speculative_stats(speculative.get_stats())
+
+
+def vim_record_render(secs: float) -> None:
+    """
+    Report how long rendering the finished review into its buffer took.
+
+    Called from VimScript after the review buffer is updated:
+    py3eval('vim4rabbit.vim_record_render(secs)')
+
+    Args:
+        secs: Render duration in seconds (measured with reltime())
+    """
+    metrics.record_phase("render", secs)
+
+
+def vim_get_review_metrics() -> dict:
+    """
+    Get per-phase review latencies over the recent review history.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_get_review_metrics()')
+
+    Returns:
+        Dict with keys count, phases ({phase: {p50, p95, last}} in
+        seconds), bytes ({p50, p95, total}) and history (per-review dicts)
+    """
+    return metrics.summarize()
+
+
+def vim_get_review_stats() -> List[str]:
+    """
+    Get the :Rabbit stats report.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_get_review_stats()')
+
+    Returns:
+        List of lines with p50/p95 per phase and bytes transferred
+    """
+    return format_review_metrics(metrics.summarize())
 
 
-def vim_build_claude_prompt(selected_indices: List[int], issues_data: List[dict]) -> str:
+def vim_build_claude_prompt(
+    selected_indices: List[int], issues_data: Union[int, List[dict]]
+) -> str:
     """
     Build a combined prompt for Claude from selected issues.
 
@@ -237,35 +893,25 @@ def vim_build_claude_prompt(selected_indices: List[int], issues_data: List[dict]
 
     Args:
         selected_indices: List of 1-based issue numbers that are selected
-        issues_data: List of issue dicts with full metadata (from issues_data)
+        issues_data: Review id of the review on display (review_id of its
+                     result), or a list of issue dicts with full metadata
+                     (from issues_data)
 
     Returns:
         Combined prompt string for Claude CLI
     """
-    if not selected_indices or not issues_data:
-        return ""
-
     prompts: List[str] = []
 
-    for idx in selected_indices:
-        # Convert 1-based index to 0-based
-        issue_idx = idx - 1
-        if 0 <= issue_idx < len(issues_data):
-            issue = issues_data[issue_idx]
-            prompt = issue.get("prompt", "")
-            file_path = issue.get("file_path", "")
-            line_range = issue.get("line_range", "")
-            summary = issue.get("summary", "")
-
-            if prompt:
-                # Use the AI prompt from CodeRabbit
-                prompts.append(prompt)
-            elif file_path:
-                # Fallback: build a prompt from metadata
-                location = file_path
-                if line_range:
-                    location += f":{line_range}"
-                prompts.append(f"Fix the issue in {location}: {summary}")
+    for _, issue in _selected_issues(selected_indices, issues_data):
+        if issue.prompt:
+            # Use the AI prompt from CodeRabbit
+            prompts.append(issue.prompt)
+        elif issue.file_path:
+            # Fallback: build a prompt from metadata
+            location = issue.file_path
+            if issue.line_range:
+                location += f":{issue.line_range}"
+            prompts.append(f"Fix the issue in {location}: {issue.summary}")
 
     if not prompts:
         return ""
@@ -281,18 +927,77 @@ def vim_build_claude_prompt(selected_indices: List[int], issues_data: List[dict]
     return combined.strip()
 
 
+# =============================================================================
+# Proposed fixes API for VimScript (vim_* functions)
+# =============================================================================
+
+
+def vim_apply_proposed_fixes(
+    selected_indices: List[int],
+    issues_data: Union[int, List[dict]],
+    skip_files: Optional[List[str]] = None,
+) -> dict:
+    """
+    Apply the proposed diffs of selected issues to the working tree.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_apply_proposed_fixes(...)')
+
+    Args:
+        selected_indices: List of 1-based issue numbers to apply
+        issues_data: Review id of the review on display, or a list of issue
+                     dicts (from issues_data); the lines of dicts without
+                     them are taken from the latest review session
+        skip_files: Absolute paths of files with unsaved changes in Vim,
+                    which are left alone
+
+    Returns:
+        Dict with keys:
+        - messages: lines to echo, the summary first
+        - files: absolute paths of the files that were changed
+        - applied: number of hunks applied
+    """
+    root = git.get_repo_root() or os.getcwd()
+    skip = {os.path.realpath(path) for path in skip_files or []}
+    results: List[PatchResult] = []
+    files: List[str] = []
+    for idx, issue in _selected_issues(selected_indices, issues_data):
+        patch = parse_proposed_patch(issue)
+        if patch is None:
+            results.append(PatchResult(idx, issue.file_path, error="no proposed fix"))
+            continue
+        path = patches.resolve_path(root, patch.file_path)
+        if path in skip:
+            results.append(PatchResult(idx, issue.file_path, error="file has unsaved changes"))
+            continue
+        result = patches.apply_patch(patch, root)
+        result.issue = idx
+        results.append(result)
+        if result.applied_count and path not in files:
+            files.append(path)
+    return {
+        "messages": format_patch_results(results),
+        "files": files,
+        "applied": sum(result.applied_count for result in results),
+    }
+
+
 # =============================================================================
 # Selection API for VimScript (vim_* functions)
 # =============================================================================
 
 
-def vim_init_selections(issue_count: int) -> None:
+def vim_init_selections(issue_count: int, review_id: int = 0) -> None:
     """
     Initialize selection state for a new review.
 
-    Called from VimScript: py3eval('vim4rabbit.vim_init_selections(count)')
+    Called from VimScript: py3eval('vim4rabbit.vim_init_selections(count, review_id)')
+
+    Args:
+        issue_count: Number of issues on display
+        review_id: Review id whose session keeps the selections (0 for none)
     """
-    selection.init_selections(issue_count)
+    session = sessions.get(review_id)
+    selection.init_selections(issue_count, session.selections if session is not None else None)
 
 
 def vim_reset_selections() -> None:
@@ -304,6 +1009,84 @@ def vim_reset_selections() -> None:
     selection.reset_selections()
 
 
+def vim_close_review_session(review_id: int) -> None:
+    """
+    Forget a review session and clear the selection state (on cleanup).
+
+    Called from VimScript: py3eval('vim4rabbit.vim_close_review_session(id)')
+    """
+    sessions.close(review_id)
+    selection.reset_selections()
+
+
+def _checkboxes(session: ReviewSession, issue_nums: List[int], selected: bool) -> List[list]:
+    """
+    Set the checkboxes of issues in a session's review lines.
+
+    Returns:
+        [lnum, header line] of each issue whose header changed
+    """
+    changed = []
+    for issue_num in issue_nums:
+        if not 1 <= issue_num <= len(session.spans):
+            continue
+        lnum = session.spans[issue_num - 1][0]
+        header = selection.set_checkbox(session.lines[lnum - 1], selected)
+        if header != session.lines[lnum - 1]:
+            session.lines[lnum - 1] = header
+            changed.append([lnum, header])
+    return changed
+
+
+def vim_checkbox_lines(issue_nums: List[int], selected: bool, review_id: int) -> List[list]:
+    """
+    Header lines to set to show issues checked or unchecked.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_checkbox_lines([num], selected, review_id)')
+
+    Args:
+        issue_nums: 1-based issue numbers
+        selected: Whether the issues are selected
+        review_id: Review on display
+
+    Returns:
+        [lnum, line] pairs (1-based buffer line numbers) for the headers
+        that change; empty for an unknown review
+    """
+    session = sessions.get(review_id)
+    if session is None:
+        return []
+    return _checkboxes(session, issue_nums, selected)
+
+
+def vim_set_all_selected(selected: bool, review_id: int) -> dict:
+    """
+    Select or deselect every issue, with the header lines to update.
+
+    Called from VimScript: py3eval('vim4rabbit.vim_set_all_selected(selected, review_id)')
+
+    Args:
+        selected: True to select all issues, False to deselect them
+        review_id: Review on display
+
+    Returns:
+        Dict with keys:
+        - count: Number of issues selected or deselected
+        - checkboxes: [lnum, line] pairs for the headers that change, so
+          VimScript updates them in one pass instead of searching the
+          buffer for each issue
+    """
+    changed = sorted(selection.get_selected())
+    if selected:
+        count = selection.select_all()
+        changed = sorted(set(range(1, count + 1)).difference(changed))
+    else:
+        count = selection.deselect_all()
+    session = sessions.get(review_id)
+    checkboxes = _checkboxes(session, changed, selected) if session is not None else []
+    return {"count": count, "checkboxes": checkboxes}
+
+
 def vim_toggle_selection(issue_num: int) -> bool:
     """
     Toggle selection for an issue number.
@@ -364,19 +1147,25 @@ def vim_get_issue_count() -> int:
     return selection.get_issue_count()
 
 
-def vim_find_issue_at_line(lines: List[str], cursor_line_index: int) -> int:
+def vim_find_issue_at_line(lines: Union[int, List[str]], cursor_line_index: int) -> int:
     """
     Find issue number at the given cursor line.
 
-    Called from VimScript: py3eval('vim4rabbit.vim_find_issue_at_line(lines, idx)')
+    Called from VimScript: py3eval('vim4rabbit.vim_find_issue_at_line(review_id, idx)')
 
     Args:
-        lines: Buffer lines (0-indexed list)
+        lines: Review id of the review on display, whose session knows the
+               line spans of its issues, or the buffer lines (0-indexed list)
         cursor_line_index: 0-based line index of cursor
 
     Returns:
         Issue number (1-based) or 0 if not found
     """
+    if isinstance(lines, int):
+        session = sessions.get(lines)
+        if session is None:
+            return 0
+        return selection.issue_at_line(session.spans, cursor_line_index + 1)
     return selection.find_issue_at_line(lines, cursor_line_index)
 
 
@@ -433,22 +1222,34 @@ def vim_is_game_active() -> bool:
     return is_game_active()
 
 
-def vim_tick_game() -> List[str]:
+def vim_tick_game(bufnr: int = 0, direct: bool = True) -> Union[List[str], dict]:
+    """
+    Advance game one tick and return frame (with a bufnr, the changes
+    still to apply, see vim_get_animation_frame()).
+
+    Called from VimScript: py3eval('vim4rabbit.vim_tick_game(bufnr, direct)')
+    """
+    return _frame(tick_game(), bufnr, direct)
+
+
+def vim_input_game(key: str, bufnr: int = 0, direct: bool = True) -> Union[List[str], dict]:
     """
-    Advance game one tick and return frame.
+    Handle game input and return frame (with a bufnr, the changes still to
+    apply, see vim_get_animation_frame()).
 
-    Called from VimScript: py3eval('vim4rabbit.vim_tick_game()')
+    Called from VimScript: py3eval('vim4rabbit.vim_input_game(key, bufnr, direct)')
     """
-    return tick_game()
+    return _frame(input_game(key), bufnr, direct)
 
 
-def vim_input_game(key: str) -> List[str]:
+def vim_forget_frames(bufnr: int) -> None:
     """
-    Handle game input and return frame.
+    Forget the previous frame of a buffer whose lines VimScript replaced,
+    or that was wiped.
 
-    Called from VimScript: py3eval('vim4rabbit.vim_input_game(key)')
+    Called from VimScript: py3eval('vim4rabbit.vim_forget_frames(bufnr)')
     """
-    return input_game(key)
+    buffers.forget(bufnr)
 
 
 def vim_get_game_match_patterns() -> List[List[str]]:
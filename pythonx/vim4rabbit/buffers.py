@@ -0,0 +1,155 @@
+"""
+Direct buffer output for vim4rabbit.
+
+Inside Vim, rendered lines are written straight into a buffer through the
+vim module, instead of being returned to VimScript as a list that it
+converts and writes with setline(). Outside Vim (tests, benchmarks) there
+is no vim module, and the vim_* functions return the lines as before.
+
+Animation and game frames are sent as changes against the previous frame
+of the buffer, so a tick only rewrites the lines that changed (the
+elapsed-time line, a moving ball) whether Python writes them or VimScript.
+
+Module-level state + functions keep the previous frame per buffer (only
+for frames: lines written whole by write_lines() are not kept).
+Same pattern as selection.py.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import vim
+except ImportError:  # not running inside Vim
+    vim = None
+
+# Module-level state: last frame of each buffer, and the buffer's
+# b:changedtick right after Python wrote it (to notice other writes)
+_frames: Dict[int, List[str]] = {}
+_ticks: Dict[int, int] = {}
+
+
+def available() -> bool:
+    """Whether buffers can be written directly."""
+    return vim is not None
+
+
+def _buffer(bufnr: int):
+    """The vim.Buffer with this number, or None."""
+    if vim is None or bufnr <= 0:
+        return None
+    try:
+        return vim.buffers[bufnr]
+    except KeyError:
+        return None
+
+
+def _changedtick(buffer) -> Optional[int]:
+    """b:changedtick of a buffer (None if Vim does not expose it)."""
+    try:
+        return int(buffer.vars["changedtick"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def frame_changes(old: List[str], new: List[str]) -> Tuple[List[list], int]:
+    """
+    Line ranges that turn one frame into another.
+
+    Args:
+        old: Previous frame
+        new: Next frame
+
+    Returns:
+        (changes, delete_from): changes are [lnum, lines] pairs to set in
+        order (lnum 1-based; the last may extend the buffer), delete_from
+        the first line to delete through the end (0 for none)
+    """
+    changes: List[list] = []
+    start: Optional[int] = None
+    for i, line in enumerate(new):
+        if i < len(old) and old[i] == line:
+            if start is not None:
+                changes.append([start + 1, new[start:i]])
+                start = None
+        elif start is None:
+            start = i
+    if start is not None:
+        changes.append([start + 1, new[start:]])
+    delete_from = len(new) + 1 if len(old) > len(new) else 0
+    return changes, delete_from
+
+
+def _write(buffer, bufnr: int, changes: List[list], delete_from: int) -> None:
+    """Apply changes to a buffer, even if it is 'nomodifiable'."""
+    modifiable = buffer.options["modifiable"]
+    buffer.options["modifiable"] = True
+    try:
+        for lnum, lines in changes:
+            buffer[lnum - 1:lnum - 1 + len(lines)] = lines
+        if delete_from:
+            del buffer[delete_from - 1:]
+    finally:
+        buffer.options["modifiable"] = modifiable
+    tick = _changedtick(buffer)
+    if tick is not None:
+        _ticks[bufnr] = tick
+
+
+def write_lines(bufnr: int, lines: List[str]) -> bool:
+    """
+    Replace the lines of a buffer, even if it is 'nomodifiable'.
+
+    Args:
+        bufnr: Vim buffer number (0 for none)
+        lines: New buffer lines
+
+    Returns:
+        True if the buffer was written; False without the vim module or
+        for a buffer that does not exist (the caller returns the lines)
+    """
+    buffer = _buffer(bufnr)
+    if buffer is None:
+        return False
+    _write(buffer, bufnr, [[1, lines]], len(lines) + 1 if len(buffer) > len(lines) else 0)
+    # Not a frame: keep no copy of a (possibly huge) review, which its
+    # session already holds; the next frame rewrites every line
+    _frames.pop(bufnr, None)
+    return True
+
+
+def update(bufnr: int, lines: List[str], direct: bool = True) -> dict:
+    """
+    Send a frame to a buffer as changes against its previous frame.
+
+    Args:
+        bufnr: Vim buffer number
+        lines: The frame
+        direct: Write the changes into the buffer when possible
+
+    Returns:
+        Dict with keys changes and delete_from (see frame_changes()) that
+        VimScript still has to apply; both empty if Python wrote them
+    """
+    buffer = _buffer(bufnr) if direct else None
+    previous = _frames.get(bufnr)
+    if buffer is not None and _ticks.get(bufnr) != _changedtick(buffer):
+        previous = None  # written by someone else since
+    if previous is None:
+        # Unknown contents: rewrite every line, drop whatever follows
+        changes, delete_from = [[1, lines]], len(lines) + 1
+    else:
+        changes, delete_from = frame_changes(previous, lines)
+    _frames[bufnr] = list(lines)
+
+    if buffer is None:
+        return {"changes": changes, "delete_from": delete_from}
+    if delete_from > len(buffer):
+        delete_from = 0
+    _write(buffer, bufnr, changes, delete_from)
+    return {"changes": [], "delete_from": 0}
+
+
+def forget(bufnr: int) -> None:
+    """Forget the previous frame of a buffer (its contents were replaced)."""
+    _frames.pop(bufnr, None)
+    _ticks.pop(bufnr, None)
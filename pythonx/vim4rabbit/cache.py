@@ -0,0 +1,269 @@
+"""
+On-disk review result cache for vim4rabbit.
+
+Parsed review results are stored as JSON files keyed by a fingerprint of
+what was reviewed (review type, HEAD sha and the relevant diff), so
+re-running a review on an unchanged tree returns instantly.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .git import get_diff_fingerprint, get_head_sha
+from .types import ReviewIssue, ReviewResult
+
+CACHE_VERSION = 1
+
+# Eviction limits
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+DEFAULT_MAX_AGE_SECS = 7 * 24 * 60 * 60  # one week
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory holding cached review results.
+
+    Honors $VIM4RABBIT_CACHE_DIR, then $XDG_CACHE_HOME, then ~/.cache.
+
+    Returns:
+        Path to the review cache directory (may not exist yet)
+    """
+    override = os.environ.get("VIM4RABBIT_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "vim4rabbit" / "reviews"
+
+
+def make_cache_key(review_type: str, head_sha: str, diff_fingerprint: str) -> str:
+    """
+    Combine the review inputs into a single cache key.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        head_sha: Commit sha of HEAD
+        diff_fingerprint: Hash of the relevant diff
+
+    Returns:
+        Hex digest usable as a file name
+    """
+    material = "\0".join((str(CACHE_VERSION), review_type, head_sha, diff_fingerprint))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def compute_cache_key(review_type: str, cwd: Optional[str] = None) -> str:
+    """
+    Compute the cache key for reviewing the current tree.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        cwd: Repository directory (default: current directory)
+
+    Returns:
+        Cache key, or empty string if the tree could not be fingerprinted
+    """
+    head_sha = get_head_sha(cwd)
+    if not head_sha:
+        return ""
+    diff_fingerprint = get_diff_fingerprint(review_type, cwd)
+    if not diff_fingerprint:
+        return ""
+    return make_cache_key(review_type, head_sha, diff_fingerprint)
+
+
+def _entry_path(key: str, cache_dir: Optional[Path]) -> Path:
+    """Path of the cache file for a key."""
+    return (cache_dir or get_cache_dir()) / f"{key}.json"
+
+
+def load_review(
+    key: str,
+    cache_dir: Optional[Path] = None,
+    max_age_secs: int = DEFAULT_MAX_AGE_SECS,
+) -> Optional[Tuple[ReviewResult, int]]:
+    """
+    Look up a cached review result.
+
+    Args:
+        key: Cache key from compute_cache_key()
+        cache_dir: Cache directory (default: get_cache_dir())
+        max_age_secs: Entries older than this are treated as misses
+
+    Returns:
+        Tuple of (ReviewResult, elapsed seconds of the original run),
+        or None on a miss
+    """
+    if not key:
+        return None
+    path = _entry_path(key, cache_dir)
+    try:
+        if time.time() - path.stat().st_mtime > max_age_secs:
+            return None
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("version") != CACHE_VERSION or entry.get("key") != key:
+        return None
+
+    result = ReviewResult(
+        success=True,
+        issues=[ReviewIssue.from_dict(item) for item in entry.get("issues", [])],
+        file_hashes=dict(entry.get("file_hashes", {})),
+    )
+    return result, int(entry.get("elapsed_secs", 0))
+
+
+def has_review(
+    key: str,
+    cache_dir: Optional[Path] = None,
+    max_age_secs: int = DEFAULT_MAX_AGE_SECS,
+) -> bool:
+    """
+    Check for a cached review result without reading it.
+
+    Only stats the entry, so it is cheap enough to call on every save; an
+    entry that load_review() then rejects (other version, corrupt) counts
+    as cached.
+
+    Args:
+        key: Cache key from compute_cache_key()
+        cache_dir: Cache directory (default: get_cache_dir())
+        max_age_secs: Entries older than this are treated as misses
+
+    Returns:
+        True if an entry for the key exists and has not expired
+    """
+    if not key:
+        return False
+    try:
+        mtime = _entry_path(key, cache_dir).stat().st_mtime
+    except OSError:
+        return False
+    return time.time() - mtime <= max_age_secs
+
+
+def store_review(
+    key: str,
+    result: ReviewResult,
+    elapsed_secs: int = 0,
+    cache_dir: Optional[Path] = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_age_secs: int = DEFAULT_MAX_AGE_SECS,
+) -> bool:
+    """
+    Store a successful review result and evict old entries.
+
+    Args:
+        key: Cache key from compute_cache_key()
+        result: Parsed review result
+        elapsed_secs: Elapsed seconds of the review run
+        cache_dir: Cache directory (default: get_cache_dir())
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of the cache in bytes
+        max_age_secs: Entries older than this are removed
+
+    Returns:
+        True if the result was written
+    """
+    if not key or not result.success:
+        return False
+
+    directory = cache_dir or get_cache_dir()
+    entry = {
+        "version": CACHE_VERSION,
+        "key": key,
+        "elapsed_secs": elapsed_secs,
+        "issues": [issue.to_dict() for issue in result.issues],
+        "file_hashes": result.file_hashes,
+    }
+    path = _entry_path(key, directory)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        # Atomic replace so concurrent Vim instances never read partial files
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+
+    evict(directory, max_entries, max_bytes, max_age_secs)
+    return True
+
+
+def evict(
+    cache_dir: Optional[Path] = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_age_secs: int = DEFAULT_MAX_AGE_SECS,
+) -> int:
+    """
+    Remove expired entries, then the oldest ones until within limits.
+
+    Args:
+        cache_dir: Cache directory (default: get_cache_dir())
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of the cache in bytes
+        max_age_secs: Entries older than this are removed
+
+    Returns:
+        Number of entries removed
+    """
+    directory = cache_dir or get_cache_dir()
+    try:
+        paths = list(directory.glob("*.json"))
+    except OSError:
+        return 0
+
+    entries = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    # Newest first; everything past the limits gets removed
+    entries.sort(key=lambda e: e[0], reverse=True)
+
+    now = time.time()
+    kept = 0
+    kept_bytes = 0
+    removed = 0
+    for mtime, size, path in entries:
+        if (
+            now - mtime > max_age_secs
+            or kept >= max_entries
+            or kept_bytes + size > max_bytes
+        ):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+            continue
+        kept += 1
+        kept_bytes += size
+    return removed
+
+
+def clear(cache_dir: Optional[Path] = None) -> int:
+    """
+    Remove all cached review results.
+
+    Args:
+        cache_dir: Cache directory (default: get_cache_dir())
+
+    Returns:
+        Number of entries removed
+    """
+    return evict(cache_dir, max_entries=0)
@@ -0,0 +1,224 @@
+"""
+Line classification for vim4rabbit.
+
+Every line of CodeRabbit --plain output is tagged once as a separator,
+field header, code fence, diff line, blank line, preamble or body line:
+with prefix checks under the built-in rules, with one compiled regex once
+rules are extended per kind with g:vim4rabbit_line_rules. The parser, the
+review renderer and its highlighter share the active classifier, so a line
+is recognized the same way everywhere.
+
+Same pattern as selection.py: module-level state with functions.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Line kinds
+SEPARATOR = "separator"
+FIELD = "field"
+FENCE = "fence"
+DIFF = "diff"
+BLANK = "blank"
+PREAMBLE = "preamble"
+BODY = "body"
+
+# Field headers ("File: ...") the parser extracts metadata from
+FIELD_NAMES = ("File", "Line", "Type", "Comment", "Prompt")
+
+# Status messages printed by the CLI before the first issue (any case)
+PREAMBLE_PATTERNS = (
+    "running",
+    "analyzing",
+    "processing",
+    "loading",
+    "fetching",
+    "please wait",
+    "in progress",
+    "starting coderabbit",
+    "connecting",
+    "setting up",
+    "reviewing",
+    "review completed",
+)
+
+# Kinds user rules may extend. Separator, fence and diff rules are regexes
+# matched at the start of the line; preamble rules are regexes searched
+# anywhere in the lowercased line.
+EXTENSIBLE_KINDS = (SEPARATOR, FENCE, DIFF, PREAMBLE)
+
+# Heading of a proposed diff in an issue ("Proposed fix", ...): a short
+# line, not a sentence of prose that happens to start with the word
+PROPOSED_HEADING_RE = re.compile(r"(\s*)(?:Proposed|Suggested)\b[^.!?]*\Z")
+
+# Line prefixes of the built-in rules (see LineClassifier.classify())
+_FIELD_PREFIXES = tuple(f"{name}:" for name in FIELD_NAMES)
+_FENCE_PREFIXES = ("```", "~~~")
+_DIFF_PREFIXES = ("@@", "+", "-")
+# First characters of indentable prefixes (fields and fences)
+_INDENTED_STARTS = frozenset(prefix[0] for prefix in _FIELD_PREFIXES + _FENCE_PREFIXES)
+
+_BUILTIN_RULES: Dict[str, List[str]] = {
+    # 5+ equal signs, then only whitespace
+    SEPARATOR: [r"={5,}\s*\Z"],
+    FENCE: [r"\s*(?:```|~~~)"],
+    DIFF: [r"@@", r"[+-]"],
+    PREAMBLE: [re.escape(pattern) for pattern in PREAMBLE_PATTERNS],
+}
+
+
+def _alternation(patterns: List[str]) -> str:
+    """Patterns as one alternation, each in its own group."""
+    return "|".join(f"(?:{pattern})" for pattern in patterns)
+
+
+class LineClassifier:
+    """
+    Tags lines of review output.
+
+    The structural kinds are alternatives of a single regex, tried in the
+    order separator, field, fence, diff, blank; whatever matches none of
+    them is a body line. Under the built-in rules alone, classify() does
+    the same with a few prefix checks, which beat the regex on the mostly
+    body lines of a review. Preamble is only asked for before the first
+    issue (see classify()), so lines inside issues are matched once.
+    """
+
+    __slots__ = ("rules", "match", "_preamble", "_builtin")
+
+    def __init__(self, rules: Optional[Dict[str, List[str]]] = None) -> None:
+        """
+        Compile the built-in rules plus extra rules.
+
+        Args:
+            rules: Dict of kind (see EXTENSIBLE_KINDS) to extra regexes
+
+        Raises:
+            ValueError: On an unknown kind or an invalid regex
+        """
+        rules = rules or {}
+        unknown = sorted(set(rules) - set(EXTENSIBLE_KINDS))
+        if unknown:
+            raise ValueError(f"Unknown line kind: {unknown[0]}")
+        self.rules = {kind: [str(rule) for rule in rules.get(kind, [])] for kind in EXTENSIBLE_KINDS}
+        self._builtin = not any(self.rules[kind] for kind in (SEPARATOR, FENCE, DIFF))
+
+        def patterns(kind: str) -> str:
+            return _alternation(_BUILTIN_RULES[kind] + self.rules[kind])
+
+        structural = (
+            f"(?P<{SEPARATOR}>{patterns(SEPARATOR)})"
+            f"|(?P<{FIELD}>\\s*(?P<name>{'|'.join(FIELD_NAMES)}):)"
+            f"|(?P<{FENCE}>{patterns(FENCE)})"
+            f"|(?P<{DIFF}>{patterns(DIFF)})"
+            f"|(?P<{BLANK}>\\s*\\Z)"
+        )
+        try:
+            self.match = re.compile(structural).match
+            # Searching the lowercased line is much faster than re.IGNORECASE
+            self._preamble = re.compile(patterns(PREAMBLE)).search
+        except re.error as e:
+            raise ValueError(f"Invalid line rule: {e}") from e
+
+    def classify(self, line: str, preamble: bool = False) -> str:
+        """
+        Kind of one line.
+
+        Args:
+            line: A line of output, without its newline
+            preamble: Whether the line comes before the first issue, where
+                      status messages are tagged as preamble
+
+        Returns:
+            One of the kind constants
+        """
+        if self._builtin:
+            stripped = line.lstrip()
+            if not stripped:
+                kind = BLANK
+            elif stripped[0] not in _INDENTED_STARTS:
+                if line.startswith("====="):
+                    kind = SEPARATOR if not line.rstrip().strip("=") else BODY
+                elif line.startswith(_DIFF_PREFIXES):
+                    kind = DIFF
+                else:
+                    kind = BODY
+            elif stripped.startswith(_FIELD_PREFIXES):
+                kind = FIELD
+            elif stripped.startswith(_FENCE_PREFIXES):
+                kind = FENCE
+            else:
+                kind = BODY
+        else:
+            match = self.match(line)
+            kind = match.lastgroup if match is not None else BODY
+        if preamble and kind not in (SEPARATOR, FIELD, BLANK) and self._preamble(line.lower()):
+            return PREAMBLE
+        return kind
+
+    def classify_issue(self, lines: List[str]) -> List[str]:
+        """
+        Kinds of the lines of one issue.
+
+        Lines starting with '+' or '-' are diff lines only inside a code
+        fence or the unfenced block under a proposed fix heading (see
+        PROPOSED_HEADING_RE); elsewhere they are Markdown bullets, tagged
+        as body lines.
+
+        Args:
+            lines: Lines of an issue
+
+        Returns:
+            Kind of each line
+        """
+        kinds: List[str] = []
+        in_fence = False
+        in_fix = False
+        for line in lines:
+            kind = self.classify(line)
+            if kind == FENCE:
+                in_fence = not in_fence
+                in_fix = False
+            elif not in_fence:
+                if in_fix and kind not in (DIFF, BLANK) and line[:1] != " ":
+                    in_fix = False
+                if kind == DIFF and not in_fix:
+                    kind = BODY
+                elif kind == BODY and PROPOSED_HEADING_RE.match(line):
+                    in_fix = True
+            kinds.append(kind)
+        return kinds
+
+    def is_preamble(self, line: str) -> bool:
+        """Whether a line contains a CLI status message."""
+        return self._preamble(line.lower()) is not None
+
+
+_classifier = LineClassifier()
+
+
+def get_classifier() -> LineClassifier:
+    """The classifier in use."""
+    return _classifier
+
+
+def set_rules(rules: Optional[Dict[str, List[str]]] = None) -> LineClassifier:
+    """
+    Replace the classifier with one using extra rules.
+
+    Args:
+        rules: Dict of kind (see EXTENSIBLE_KINDS) to extra regexes
+
+    Returns:
+        The new classifier
+
+    Raises:
+        ValueError: On an unknown kind or an invalid regex (the classifier
+                    in use is kept)
+    """
+    global _classifier
+    classifier = LineClassifier(rules)
+    # Keep the compiled classifier when the rules did not change
+    if classifier.rules != _classifier.rules:
+        _classifier = classifier
+    return _classifier
@@ -4,42 +4,279 @@ CLI execution for vim4rabbit.
 This module handles subprocess execution of the CodeRabbit CLI.
 """
 
+import codecs
+import os
+import queue
+import re
 import subprocess
-from typing import Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
 
-from .parser import parse_review_issues
-from .types import ReviewResult
+from . import git
+from .parser import (
+    DEFAULT_BACKEND,
+    backend_names,
+    create_parser,
+    get_backend,
+    parse_review_issues,
+)
+from .types import ReviewIssue, ReviewOutput, ReviewResult, ReviewShard
 
 
-def run_command(cmd: list, timeout: int = 60) -> Tuple[str, int]:
+# CommandJob states
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_TIMEOUT = "timeout"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"  # the process could not be started
+
+# Bytes requested per read from the process pipe
+_READ_SIZE = 65536
+
+# Output format picked by detect_output_format() (None until detected)
+_detected_format: Optional[str] = None
+
+
+class CommandJob:
+    """
+    A command running in the background without blocking the caller.
+
+    A reader thread drains the process output (stdout and stderr,
+    interleaved) into a queue as it arrives, and a waiter thread enforces
+    the timeout. Callers poll(), read() new output, cancel(), or block in
+    wait(); Vim's UI thread never waits on the process itself.
+    """
+
+    def __init__(
+        self,
+        cmd: list,
+        timeout: Optional[float] = None,
+        cwd: Optional[str] = None,
+        keep_output: bool = True,
+    ) -> None:
+        """
+        Start the command.
+
+        Args:
+            cmd: Command and arguments as list
+            timeout: Timeout in seconds (None or 0 for unlimited)
+            cwd: Working directory (default: current directory)
+            keep_output: Keep all output for output/result(); turn off when
+                         the caller consumes read() and keeps its own copy
+        """
+        self.cmd = cmd
+        self.timeout = timeout or None
+        self.keep_output = keep_output
+        self.state = JOB_RUNNING
+        self.exit_code: Optional[int] = None
+        self.bytes_read = 0
+        self._chunks: List[str] = []
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+        # Latency marks (monotonic times) for review metrics
+        self.spawned_at: Optional[float] = None
+        self.first_byte_at: Optional[float] = None
+        self.last_byte_at: Optional[float] = None
+
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                cwd=cwd,
+            )
+        except FileNotFoundError:
+            self._fail(f"Command not found: {cmd[0]}")
+            return
+        except Exception as e:
+            self._fail(str(e))
+            return
+        self.spawned_at = time.monotonic()
+
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+        threading.Thread(target=self._wait_for_exit, daemon=True).start()
+
+    def _fail(self, message: str) -> None:
+        """Mark the job as failed to start."""
+        self._proc = None
+        self._append(message)
+        self.state = JOB_FAILED
+        self.exit_code = 1
+        self._finished = time.monotonic()
+        self._done.set()
+
+    def _append(self, text: str) -> None:
+        """Record a chunk of output."""
+        if not text:
+            return
+        if self.keep_output:
+            with self._lock:
+                self._chunks.append(text)
+        self._queue.put(text)
+
+    def _read_output(self) -> None:
+        """Reader thread: decode output incrementally until EOF."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        fd = self._proc.stdout.fileno()
+        while True:
+            data = os.read(fd, _READ_SIZE)
+            if not data:
+                break
+            self.last_byte_at = time.monotonic()
+            if self.first_byte_at is None:
+                self.first_byte_at = self.last_byte_at
+            self.bytes_read += len(data)
+            self._append(decoder.decode(data))
+        self._append(decoder.decode(b"", final=True))
+        self._proc.stdout.close()
+
+    def _wait_for_exit(self) -> None:
+        """Waiter thread: enforce the timeout and record the exit."""
+        try:
+            exit_code = self._proc.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            if self.state == JOB_RUNNING:
+                self.state = JOB_TIMEOUT
+            self._proc.kill()
+            exit_code = self._proc.wait()
+        # All output is read before the job counts as finished
+        self._reader.join()
+        if self.state == JOB_RUNNING:
+            self.state = JOB_DONE
+        self.exit_code = exit_code
+        self._finished = time.monotonic()
+        self._done.set()
+
+    @property
+    def done(self) -> bool:
+        """Whether the process has exited and all output has been read."""
+        return self._done.is_set()
+
+    @property
+    def elapsed_secs(self) -> float:
+        """Seconds since start (frozen once finished)."""
+        end = self._finished if self._finished is not None else time.monotonic()
+        return end - self._started
+
+    @property
+    def output(self) -> str:
+        """All output received so far (empty unless keep_output)."""
+        with self._lock:
+            return "".join(self._chunks)
+
+    def read(self) -> str:
+        """
+        Drain output received since the previous read().
+
+        Returns:
+            New output text (empty string if none)
+        """
+        parts: List[str] = []
+        while True:
+            try:
+                parts.append(self._queue.get_nowait())
+            except queue.Empty:
+                return "".join(parts)
+
+    def poll(self) -> dict:
+        """
+        Get a snapshot of the job status.
+
+        Returns:
+            Dict with keys: state, exit_code (-1 while running),
+            bytes_read, elapsed_secs
+        """
+        return {
+            "state": self.state,
+            "exit_code": -1 if self.exit_code is None else self.exit_code,
+            "bytes_read": self.bytes_read,
+            "elapsed_secs": round(self.elapsed_secs, 3),
+        }
+
+    def cancel(self) -> None:
+        """Kill the process if it is still running."""
+        if self._proc is None or self.done:
+            return
+        if self.state == JOB_RUNNING:
+            self.state = JOB_CANCELLED
+        try:
+            self._proc.kill()
+        except OSError:
+            pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the job finished
+        """
+        return self._done.wait(timeout)
+
+    def result(self) -> Tuple[str, int]:
+        """
+        Get the final output and exit code, blocking until finished.
+
+        Returns:
+            Tuple of (output, exit code); a timed-out job yields
+            ("Command timed out", 1) and a cancelled one ("Command cancelled", 1)
+        """
+        self.wait()
+        if self.state == JOB_TIMEOUT:
+            return "Command timed out", 1
+        if self.state == JOB_CANCELLED:
+            return "Command cancelled", 1
+        return self.output, self.exit_code
+
+
+def start_command(
+    cmd: list,
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    keep_output: bool = True,
+) -> CommandJob:
+    """
+    Start a command in the background.
+
+    Args:
+        cmd: Command and arguments as list
+        timeout: Timeout in seconds (None or 0 for unlimited)
+        cwd: Working directory (default: current directory)
+        keep_output: Keep all output for output/result()
+
+    Returns:
+        CommandJob handle for polling, reading, cancelling and waiting
+    """
+    return CommandJob(cmd, timeout, cwd, keep_output)
+
+
+def run_command(
+    cmd: list, timeout: Optional[float] = 60, cwd: Optional[str] = None
+) -> Tuple[str, int]:
     """
     Run a shell command and return output and exit code.
 
+    Blocking wrapper around start_command().
+
     Args:
         cmd: Command and arguments as list
-        timeout: Timeout in seconds (default 60)
+        timeout: Timeout in seconds (default 60, None or 0 for unlimited)
+        cwd: Working directory (default: current directory)
 
     Returns:
         Tuple of (stdout+stderr output, exit code)
     """
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        # Combine stdout and stderr
-        output = result.stdout
-        if result.stderr:
-            output = output + result.stderr if output else result.stderr
-        return output, result.returncode
-    except subprocess.TimeoutExpired:
-        return "Command timed out", 1
-    except FileNotFoundError:
-        return f"Command not found: {cmd[0]}", 1
-    except Exception as e:
-        return str(e), 1
+    return start_command(cmd, timeout, cwd).result()
 
 
 def run_coderabbit(args: list = None, timeout: int = 60) -> Tuple[str, int]:
@@ -69,7 +306,13 @@ def run_review() -> ReviewResult:
         ReviewResult with success status, parsed issues, and any error message
     """
     output, exit_code = run_coderabbit(["--plain"])
+    return _result_from_output(output, exit_code)
+
 
+def _result_from_output(
+    output: str, exit_code: int, output_format: str = DEFAULT_BACKEND
+) -> ReviewResult:
+    """Build a ReviewResult from a finished coderabbit run."""
     if exit_code != 0:
         return ReviewResult(
             success=False,
@@ -77,9 +320,335 @@ def run_review() -> ReviewResult:
             raw_output=output,
         )
 
-    issues = parse_review_issues(output)
+    issues = parse_review_issues(output, output_format)
     return ReviewResult(
         success=True,
         issues=issues,
         raw_output=output,
     )
+
+
+def build_review_command(
+    review_type: str, output_format: str = DEFAULT_BACKEND
+) -> List[str]:
+    """
+    Build the coderabbit command line for a review.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        output_format: Output format of the parser backend (default: text)
+
+    Returns:
+        Command and arguments as list
+    """
+    return ["coderabbit", "review", "--type", review_type] + list(
+        get_backend(output_format).cli_args
+    )
+
+
+def detect_output_format(timeout: float = 10) -> str:
+    """
+    Pick the first structured backend whose flags coderabbit supports.
+
+    Runs `coderabbit review --help` once per session; the answer is cached.
+
+    Args:
+        timeout: Timeout in seconds for the help command
+
+    Returns:
+        Output format ('text' if no structured format is supported)
+    """
+    global _detected_format
+    if _detected_format is None:
+        _detected_format = DEFAULT_BACKEND
+        output, exit_code = run_coderabbit(["review", "--help"], timeout)
+        if exit_code == 0:
+            words = set(re.split(r"[\s,=\[\]]+", output))
+            for name in backend_names():
+                if name != DEFAULT_BACKEND and words.issuperset(get_backend(name).cli_args):
+                    _detected_format = name
+                    break
+    return _detected_format
+
+
+def resolve_output_format(output_format: str) -> str:
+    """
+    Turn a configured output format into a registered backend name.
+
+    Args:
+        output_format: 'auto' (detect), or a backend name such as 'text'
+                       or 'json'
+
+    Returns:
+        Backend name; unknown formats fall back to 'text'
+    """
+    if output_format == "auto":
+        return detect_output_format()
+    if output_format in backend_names():
+        return output_format
+    return DEFAULT_BACKEND
+
+
+def start_review(
+    review_type: str = "uncommitted",
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    output_format: str = DEFAULT_BACKEND,
+) -> CommandJob:
+    """
+    Start a CodeRabbit review in the background.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        timeout: Timeout in seconds (None or 0 for unlimited)
+        cwd: Working directory (default: current directory)
+        output_format: Output format to request (default: text)
+
+    Returns:
+        CommandJob streaming the review output
+    """
+    return start_command(build_review_command(review_type, output_format), timeout, cwd)
+
+
+def partition_files(
+    files: List[Tuple[str, int]], shard_count: int
+) -> List[List[str]]:
+    """
+    Split weighted files into at most shard_count balanced groups.
+
+    Files are assigned heaviest first to the currently lightest group, so
+    the result only depends on the input, never on timing.
+
+    Args:
+        files: List of (path, weight) tuples
+        shard_count: Maximum number of groups
+
+    Returns:
+        Non-empty groups of paths, each sorted by path
+    """
+    shard_count = max(1, min(shard_count, len(files)))
+    groups: List[List[str]] = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for path, weight in sorted(files, key=lambda f: (-f[1], f[0])):
+        target = loads.index(min(loads))
+        groups[target].append(path)
+        loads[target] += weight
+    return [sorted(group) for group in groups if group]
+
+
+def _issue_sort_key(issue: ReviewIssue) -> Tuple[int, str, int]:
+    """Order issues by file then first line; issues without a file go last."""
+    match = re.match(r"\d+", issue.line_range)
+    first_line = int(match.group(0)) if match else 0
+    return (0 if issue.file_path else 1, issue.file_path, first_line)
+
+
+def merge_shard_issues(issue_lists: List[List[ReviewIssue]]) -> List[ReviewIssue]:
+    """
+    Merge per-shard issues into one de-duplicated, stably ordered list.
+
+    Args:
+        issue_lists: Issues of each shard, in shard order
+
+    Returns:
+        Issues sorted by file and line, keeping the first of any duplicates
+    """
+    merged: List[ReviewIssue] = []
+    seen: Set[Tuple] = set()
+    for issues in issue_lists:
+        for issue in issues:
+            key = (issue.file_path, issue.line_range, issue.issue_type,
+                   tuple(issue.lines))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(issue)
+    # sorted() is stable, so ties keep shard order
+    return sorted(merged, key=_issue_sort_key)
+
+
+class ShardedReview:
+    """
+    A review split across several coderabbit processes.
+
+    Each shard runs an uncommitted review inside its own detached worktree
+    holding only that shard's share of the changed files. Shards are driven
+    either by run_sharded_review() (thread pool) or by jobs.ReviewJob, which
+    report output and exits through feed() and finish_shard().
+    """
+
+    def __init__(
+        self,
+        review_type: str,
+        shards: List[ReviewShard],
+        root: str,
+        output_format: str = DEFAULT_BACKEND,
+    ) -> None:
+        """Initialize per-shard parsers (each keeps its shard's output)."""
+        self.review_type = review_type
+        self.shards = shards
+        self.root = root
+        self.output_format = output_format
+        self._parsers = [create_parser(output_format) for _ in shards]
+        self._started: List[float] = [0.0] * len(shards)
+
+    @classmethod
+    def prepare(
+        cls,
+        review_type: str,
+        shard_count: int,
+        cwd: Optional[str] = None,
+        files: Optional[List[str]] = None,
+        output_format: str = DEFAULT_BACKEND,
+    ) -> Optional["ShardedReview"]:
+        """
+        Partition the changed files and create one worktree per shard.
+
+        Only uncommitted reviews can be sharded: committed changes cannot be
+        split by file without rewriting history.
+
+        Args:
+            review_type: 'uncommitted', 'committed' or 'all'
+            shard_count: Requested number of shards
+            cwd: Directory inside the repository (default: current directory)
+            files: Review only these changed files (delta reviews); a single
+                   shard is then allowed
+            output_format: Output format of the parser backend
+
+        Returns:
+            ShardedReview, or None if sharding does not apply (unsupported
+            type, fewer than two changed files, or worktree setup failed)
+        """
+        if review_type != "uncommitted" or (shard_count < 2 and files is None):
+            return None
+        root = git.get_repo_root(cwd)
+        if not root:
+            return None
+        changed = git.get_changed_files(root)
+        if files is not None:
+            wanted = set(files)
+            changed = [(path, weight) for path, weight in changed if path in wanted]
+        groups = partition_files(changed, max(shard_count, 1))
+        if len(groups) < (1 if files is not None else 2):
+            return None
+
+        worktrees = git.create_worktrees(groups, root)
+        if worktrees is None:
+            return None
+        shards = [
+            ReviewShard(index=index, files=group, cwd=worktree)
+            for index, (group, worktree) in enumerate(zip(groups, worktrees))
+        ]
+        return cls(review_type, shards, root, output_format)
+
+    def command(self) -> List[str]:
+        """Command line each shard runs (inside its worktree)."""
+        return build_review_command(self.review_type, self.output_format)
+
+    def begin_shard(self, index: int) -> None:
+        """Record that a shard's process has started."""
+        self._started[index] = time.monotonic()
+
+    def feed(self, index: int, chunk: str) -> int:
+        """
+        Feed output of one shard to its streaming parser.
+
+        Returns:
+            Number of issues completed by this chunk
+        """
+        return len(self._parsers[index].feed(chunk))
+
+    def finish_shard(self, index: int, exit_code: int) -> None:
+        """Record a shard's exit code and elapsed time."""
+        shard = self.shards[index]
+        self._parsers[index].close()
+        shard.exit_code = exit_code
+        if self._started[index]:
+            shard.elapsed_secs = round(time.monotonic() - self._started[index], 3)
+        shard.issue_count = len(self._parsers[index].issues)
+
+    @property
+    def done(self) -> bool:
+        """Whether every shard has exited."""
+        return all(shard.exit_code != -1 for shard in self.shards)
+
+    @property
+    def outputs(self) -> List[ReviewOutput]:
+        """Raw output of each shard so far."""
+        return [parser.output for parser in self._parsers]
+
+    @property
+    def issues(self) -> List[ReviewIssue]:
+        """Issues completed so far across all shards (unmerged)."""
+        return [issue for parser in self._parsers for issue in parser.issues]
+
+    def result(self) -> ReviewResult:
+        """
+        Merge all shards into a single ReviewResult.
+
+        The review fails if any shard failed; the error message collects
+        the output of each failed shard.
+        """
+        failed = [s for s in self.shards if s.exit_code != 0]
+        if failed:
+            message = "\n".join(
+                f"Shard {s.index + 1}: " + self._parsers[s.index].output.text.strip()
+                for s in failed
+            )
+            return ReviewResult(success=False, error_message=message,
+                                raw_output=message)
+        return ReviewResult(
+            success=True,
+            issues=merge_shard_issues([p.issues for p in self._parsers]),
+        )
+
+    def cleanup(self) -> None:
+        """Remove every shard worktree."""
+        for shard in self.shards:
+            git.remove_worktree(shard.cwd, self.root)
+
+
+def run_sharded_review(
+    review_type: str = "uncommitted",
+    shard_count: int = 4,
+    max_workers: Optional[int] = None,
+    timeout: int = 600,
+) -> Tuple[ReviewResult, List[ReviewShard]]:
+    """
+    Run a review split across concurrent coderabbit processes.
+
+    Falls back to a single unsharded run when sharding does not apply.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        shard_count: Number of shards (groups of changed files)
+        max_workers: Maximum concurrent processes (default: shard_count)
+        timeout: Timeout in seconds for each process
+
+    Returns:
+        Tuple of (merged ReviewResult, per-shard timings)
+    """
+    review = ShardedReview.prepare(review_type, shard_count)
+    if review is None:
+        started = time.monotonic()
+        output, exit_code = run_command(build_review_command(review_type), timeout)
+        result = _result_from_output(output, exit_code)
+        shard = ReviewShard(
+            exit_code=exit_code,
+            elapsed_secs=round(time.monotonic() - started, 3),
+            issue_count=len(result.issues),
+        )
+        return result, [shard]
+
+    def run_shard(shard: ReviewShard) -> None:
+        review.begin_shard(shard.index)
+        output, exit_code = run_command(review.command(), timeout, cwd=shard.cwd)
+        review.feed(shard.index, output)
+        review.finish_shard(shard.index, exit_code)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(review.shards)) as pool:
+            list(pool.map(run_shard, review.shards))
+        return review.result(), review.shards
+    finally:
+        review.cleanup()
@@ -4,9 +4,17 @@ Buffer content formatting for vim4rabbit.
 This module handles generating content for Vim buffers.
 """
 
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from .types import ReviewResult
+from .classifier import DIFF, FENCE, FIELD, get_classifier
+from .types import (
+    DeltaPlan,
+    IssueTracking,
+    PatchResult,
+    ReviewIssue,
+    ReviewResult,
+    ReviewShard,
+)
 
 
 def format_elapsed_time(seconds: int) -> str:
@@ -174,13 +182,52 @@ ANIMATION_FRAMES: List[List[str]] = [
 ]
 
 
-def get_animation_frame(frame_number: int, elapsed_secs: int = 0) -> List[str]:
+def format_issue_title(issue: ReviewIssue) -> str:
+    """
+    Format the one-line title for an issue: type, summary and location.
+
+    Args:
+        issue: ReviewIssue to describe
+
+    Returns:
+        String like '[potential_issue] Fix this (src/main.py:10-20)'
+    """
+    summary = issue.summary or "Issue"
+    issue_type = issue.issue_type or "issue"
+    location = ""
+    if issue.file_path:
+        location = issue.file_path
+        if issue.line_range:
+            location += f":{issue.line_range}"
+        location = f" ({location})"
+    return f"[{issue_type}] {summary}{location}"
+
+
+# Issues listed in the loading frame while a review runs; earlier ones are
+# summarized as "... and K more"
+FOUND_ISSUES_SHOWN = 10
+
+
+def get_animation_frame(
+    frame_number: int,
+    elapsed_secs: int = 0,
+    found_issues: Optional[List[ReviewIssue]] = None,
+    status: str = "",
+) -> List[str]:
     """
     Get a complete animation frame for the loading state.
 
+    Issues already completed by the streaming parser are listed below the
+    footer so results show up progressively while the review runs. Only the
+    last FOUND_ISSUES_SHOWN are listed, so the frame stays the same size as
+    a large review streams in.
+
     Args:
         frame_number: The frame index (0-23, wraps around)
         elapsed_secs: Elapsed seconds since review started
+        found_issues: Issues parsed so far (optional)
+        status: Progress shown instead of 'Review in progress!' while a
+                large result is parsed or formatted (optional)
 
     Returns:
         List of strings for the complete frame including header and footer
@@ -193,7 +240,7 @@ def get_animation_frame(frame_number: int, elapsed_secs: int = 0) -> List[str]:
     content: List[str] = [
         "  \U0001F430 coderabbit",  # rabbit emoji header
         "",
-        f"  Review in progress!  \U0001F552 {elapsed_str}",
+        f"  {status or 'Review in progress!'}  \U0001F552 {elapsed_str}",
         "",
         "  This may take a few minutes",
         "  depending on the size of the review.",
@@ -204,6 +251,15 @@ def get_animation_frame(frame_number: int, elapsed_secs: int = 0) -> List[str]:
     content.append("")
     content.append("  [p] play a game?  |  [c] cancel")
 
+    if found_issues:
+        content.append("")
+        content.append(f"  {len(found_issues)} issue(s) found so far:")
+        hidden = max(0, len(found_issues) - FOUND_ISSUES_SHOWN)
+        for i, issue in enumerate(found_issues[hidden:], hidden + 1):
+            content.append(f"    {i}. {format_issue_title(issue)}")
+        if hidden:
+            content.append(f"    ... and {hidden} more")
+
     return content
 
 
@@ -246,7 +302,50 @@ def render_help(width: int) -> List[str]:
     return content
 
 
-def format_review_output(result: ReviewResult, elapsed_secs: int = 0) -> dict:
+# Prefix of the fold header of an issue the previous review did not report
+NEW_ISSUE_BADGE = "\u2728 new "  # sparkles
+
+# Prefix of the fold header of an issue a delta review carried over from the
+# previous review without re-reviewing its file: its lines may have moved
+CARRIED_ISSUE_BADGE = "\u21bb carried "  # clockwise open circle arrow
+
+# Highlight group of issue lines by kind (see classifier.py); diff lines are
+# split into added, removed and other lines
+HIGHLIGHT_GROUPS = {
+    FIELD: "vim4rabbitField",
+    FENCE: "vim4rabbitFence",
+}
+DIFF_HIGHLIGHT_GROUPS = {
+    "+": "vim4rabbitDiffAdd",
+    "-": "vim4rabbitDiffDelete",
+}
+DIFF_HIGHLIGHT_GROUP = "vim4rabbitDiffHunk"
+
+
+def highlight_group(line: str, kind: str) -> str:
+    """
+    Highlight group of one issue line in the review buffer.
+
+    Args:
+        line: Issue line
+        kind: Its kind from the line classifier
+
+    Returns:
+        Group name, or '' for lines without highlighting
+    """
+    if kind == DIFF:
+        return DIFF_HIGHLIGHT_GROUPS.get(line[:1], DIFF_HIGHLIGHT_GROUP)
+    return HIGHLIGHT_GROUPS.get(kind, "")
+
+
+def format_review_output(
+    result: ReviewResult,
+    elapsed_secs: int = 0,
+    cached: bool = False,
+    statuses: Optional[List[str]] = None,
+    hidden: int = 0,
+    carried: Optional[List[bool]] = None,
+) -> dict:
     """
     Format review output for display in buffer with vim folds and checkboxes.
 
@@ -256,17 +355,31 @@ def format_review_output(result: ReviewResult, elapsed_secs: int = 0) -> dict:
     - Checkbox prefixes [ ] for issue selection
     - Filtered preamble (content before first issue)
     - Elapsed time display
+    - Highlights of field, code fence and diff lines
 
     Args:
         result: ReviewResult from running CodeRabbit
         elapsed_secs: Total elapsed seconds for the review command
+        cached: Whether the result was served from the review cache
+        statuses: 'new' or 'persisting' per issue (see fingerprints.py);
+                  new issues get a badge
+        hidden: Number of persisting issues left out of the result
+        carried: Whether each issue was carried over by a delta review (see
+                 delta.py); carried issues get a badge, as their line
+                 numbers are from the previous review
 
     Returns:
         Dict with keys:
         - lines: List of strings for the review buffer
         - issue_count: Number of issues found
+        - highlights: Dict of highlight group to buffer line numbers
+        - spans: (header, end) buffer line numbers of each issue's fold, in
+          issue order, for finding the issue at a line (kept in Python by
+          the vim_* functions, see selection.issue_at_line())
     """
     content: List[str] = []
+    highlights: Dict[str, List[int]] = {}
+    spans: List[Tuple[int, int]] = []
     issue_count = 0
 
     # Header
@@ -280,50 +393,223 @@ def format_review_output(result: ReviewResult, elapsed_secs: int = 0) -> dict:
             content.append(f"    {line}")
     else:
         if not result.issues:
-            content.append("  \u2713 No issues found!")  # checkmark
+            if hidden:
+                content.append(f"  \u2713 No new issues ({hidden} persisting hidden)")
+            else:
+                content.append("  \u2713 No issues found!")  # checkmark
         else:
             issue_count = len(result.issues)
             elapsed_str = format_elapsed_time(elapsed_secs)
+            cached_str = "  (cached)" if cached else ""
+            hidden_str = f"  ({hidden} persisting hidden)" if hidden else ""
             content.append(
                 f"  Found {issue_count} issue(s):  [\U0001F552 {elapsed_str}]"
+                + cached_str
+                + hidden_str
             )
             content.append("")
             content.append("  Select an issue with [Space] then press @ to implement with Claude Code")
             content.append("")
 
+            classify_issue = get_classifier().classify_issue
             for i, issue in enumerate(result.issues, 1):
-                # Build fold header with checkbox, number, type, summary, and location
-                summary = issue.summary or "Issue"
-                issue_type = issue.issue_type or "issue"
-                location = ""
-                if issue.file_path:
-                    location = issue.file_path
-                    if issue.line_range:
-                        location += f":{issue.line_range}"
-                    location = f" ({location})"
-
-                # Fold header line with opening marker
+                badge = NEW_ISSUE_BADGE if statuses and statuses[i - 1] == "new" else ""
+                if carried and carried[i - 1]:
+                    badge += CARRIED_ISSUE_BADGE
+                # Fold header line with checkbox, number, title and opening marker
                 fold_header = (
-                    f"  [ ] {i}. [{issue_type}] {summary}{location} "
+                    f"  [ ] {i}. {badge}{format_issue_title(issue)} "
                     + "{{" + "{"
                 )
                 content.append(fold_header)
+                header_lnum = len(content)
 
                 # Issue content (indented)
-                for line in issue.lines:
+                lines = issue.lines
+                for line, kind in zip(lines, classify_issue(lines)):
                     content.append(f"    {line}")
+                    group = highlight_group(line, kind)
+                    if group:
+                        highlights.setdefault(group, []).append(len(content))
 
                 # Fold closing marker
                 content.append("  " + "}}" + "}")
+                spans.append((header_lnum, len(content)))
                 content.append("")
 
     # Footer with keybinding hints
     if issue_count > 0:
-        content.append("  [za] toggle fold | [Space] toggle select | [@] claude | [c] close")
+        content.append(
+            "  [za] toggle fold | [Space] toggle select | [a] apply fix | [@] claude | [c] close"
+        )
     else:
         content.append("  [c] close")
 
-    return {"lines": content, "issue_count": issue_count}
+    return {
+        "lines": content,
+        "issue_count": issue_count,
+        "highlights": highlights,
+        "spans": spans,
+    }
+
+
+def format_issue_tracking(tracking: IssueTracking, hidden: int = 0) -> str:
+    """
+    Summarize new/persisting/resolved issue counts on one line.
+
+    Args:
+        tracking: Classification of the review
+        hidden: Number of persisting issues left out of the panel
+
+    Returns:
+        String like 'Issues: 3 new, 12 persisting (hidden), 2 resolved',
+        or '' on the first review of a branch
+    """
+    if not tracking.known:
+        return ""
+    persisting = f"{tracking.persisting_count} persisting"
+    if hidden:
+        persisting += " (hidden)"
+    return (
+        f"Issues: {tracking.new_count} new, {persisting}, "
+        f"{len(tracking.resolved)} resolved"
+    )
+
+
+def format_patch_results(results: List[PatchResult]) -> List[str]:
+    """
+    Describe the outcome of applying proposed fixes.
+
+    Args:
+        results: One PatchResult per issue
+
+    Returns:
+        Lines to echo: a summary like 'Applied 3 of 4 hunks in 2 files',
+        then one line per failed or fuzzy hunk and per skipped issue
+    """
+    applied = sum(result.applied_count for result in results)
+    total = sum(len(result.hunks) for result in results)
+    files = len({result.file_path for result in results if result.applied_count})
+    lines = [f"Applied {applied} of {total} hunks in {files} files"]
+    for result in results:
+        prefix = f"Issue {result.issue} ({result.file_path or 'no file'})"
+        if result.error:
+            lines.append(f"{prefix}: {result.error}")
+            continue
+        for hunk in result.hunks:
+            if not hunk.applied:
+                lines.append(f"{prefix}: hunk {hunk.index} failed: {hunk.message}")
+            elif hunk.fuzz:
+                lines.append(
+                    f"{prefix}: hunk {hunk.index} applied at line {hunk.line} (fuzz {hunk.fuzz})"
+                )
+    return lines
+
+
+def format_shard_timings(shards: List[ReviewShard]) -> str:
+    """
+    Summarize per-shard timings of a sharded review on one line.
+
+    Args:
+        shards: Finished shards of the review
+
+    Returns:
+        String like 'Shards: #1 12.3s (4 files, 2 issues) | #2 ...'
+    """
+    parts = [
+        f"#{shard.index + 1} {shard.elapsed_secs:.1f}s "
+        f"({len(shard.files)} files, {shard.issue_count} issues)"
+        for shard in shards
+    ]
+    return "Shards: " + " | ".join(parts)
+
+
+def format_delta_summary(delta: DeltaPlan) -> str:
+    """
+    Summarize what a delta review re-reviewed on one line.
+
+    Args:
+        delta: Plan the delta review ran with
+
+    Returns:
+        String like 'Delta review: 2 of 40 changed files re-reviewed,
+        5 issues carried over'
+    """
+    total = len(delta.file_hashes)
+    if delta.full:
+        return f"Delta review: full review of {total} changed files"
+    return (
+        f"Delta review: {len(delta.changed)} of {total} changed files "
+        f"re-reviewed, {len(delta.carried)} issues carried over"
+    )
+
+
+def format_bytes(size: float) -> str:
+    """
+    Format a byte count for display.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        String like '512 B', '12.3 KB' or '4.0 MB'
+    """
+    if size < 1024:
+        return f"{int(size)} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_review_metrics(summary: dict) -> List[str]:
+    """
+    Format the review latency summary for :Rabbit stats.
+
+    Args:
+        summary: Dict from metrics.summarize()
+
+    Returns:
+        List of lines: one row per phase with p50, p95 and last values,
+        then bytes read per review
+    """
+    if not summary["count"]:
+        return ["Review metrics: no reviews recorded yet"]
+
+    lines = [
+        f"Review metrics (last {summary['count']} review(s))",
+        f"{'phase':<12} {'p50':>9} {'p95':>9} {'last':>9}",
+    ]
+    for phase, values in summary["phases"].items():
+        lines.append(
+            f"{phase:<12} {values['p50']:>8.3f}s {values['p95']:>8.3f}s "
+            f"{values['last']:>8.3f}s"
+        )
+    sizes = summary["bytes"]
+    lines.append(
+        f"{'bytes':<12} {format_bytes(sizes['p50']):>9} "
+        f"{format_bytes(sizes['p95']):>9}   total {format_bytes(sizes['total'])}"
+    )
+    return lines
+
+
+def format_speculative_stats(stats: Dict[str, int]) -> str:
+    """
+    Summarize speculative review counters on one line.
+
+    Args:
+        stats: Counters from speculative.get_stats()
+
+    Returns:
+        String like 'Speculative reviews: 3 hits, 1 miss | started 5, ...'
+    """
+    hits, misses = stats["hits"], stats["misses"]
+    return (
+        f"Speculative reviews: {hits} hit{'' if hits == 1 else 's'}, "
+        f"{misses} miss{'' if misses == 1 else 'es'} | "
+        f"started {stats['started']}, completed {stats['completed']}, "
+        f"failed {stats['failed']}, superseded {stats['superseded']}, "
+        f"skipped {stats['skipped']}"
+    )
 
 
 def format_loading_message() -> List[str]:
@@ -0,0 +1,120 @@
+"""
+Delta reviews for vim4rabbit.
+
+A delta review re-reviews only the changed files whose content differs from
+the previous review of the same repository (compared by content hash), and
+carries over the previous issues of every other changed file.
+
+Module-level state + functions. Same pattern as selection.py.
+"""
+
+from typing import Dict, Optional
+
+from . import git
+from .cli import merge_shard_issues
+from .types import DeltaPlan, ReviewIssue, ReviewResult
+
+# Module-level state: last successful uncommitted review per repository root
+_baselines: Dict[str, ReviewResult] = {}
+
+
+def snapshot(root: str) -> Dict[str, str]:
+    """
+    Hash every uncommitted changed file.
+
+    Args:
+        root: Repository root
+
+    Returns:
+        Dict of repository-relative path to content hash
+    """
+    files = [path for path, _ in git.get_changed_files(root)]
+    return git.get_file_hashes(files, root)
+
+
+def _issue_path(issue: ReviewIssue) -> str:
+    """Repository-relative path an issue refers to ('' if none)."""
+    path = issue.file_path
+    return path[2:] if path.startswith("./") else path
+
+
+def plan(root: str, previous: Optional[ReviewResult] = None) -> DeltaPlan:
+    """
+    Decide which changed files need a fresh review.
+
+    Args:
+        root: Repository root
+        previous: Previous review (default: the remembered baseline)
+
+    Returns:
+        DeltaPlan; full is True when there is no usable baseline or every
+        changed file differs from it
+    """
+    hashes = snapshot(root)
+    if previous is None:
+        previous = _baselines.get(root)
+    if previous is None or not previous.file_hashes:
+        return DeltaPlan(root=root, file_hashes=hashes, changed=sorted(hashes))
+
+    changed = sorted(
+        path for path, digest in hashes.items()
+        if previous.file_hashes.get(path) != digest
+    )
+    if hashes and len(changed) == len(hashes):
+        return DeltaPlan(root=root, file_hashes=hashes, changed=changed)
+
+    # Issues of reverted files (no longer changed) are dropped
+    untouched = set(hashes) - set(changed)
+    carried = [
+        issue for issue in previous.issues
+        if not _issue_path(issue) or _issue_path(issue) in untouched
+    ]
+    return DeltaPlan(
+        root=root, file_hashes=hashes, changed=changed, carried=carried, full=False
+    )
+
+
+def apply(delta: DeltaPlan, result: ReviewResult) -> ReviewResult:
+    """
+    Merge a review of the changed files with the carried-over issues.
+
+    Args:
+        delta: Plan the review was run for
+        result: Review of delta.changed (or of every file if delta.full)
+
+    Returns:
+        ReviewResult covering every changed file, with current file hashes
+    """
+    if not result.success:
+        return result
+    issues = result.issues if delta.full else merge_shard_issues(
+        [delta.carried, result.issues]
+    )
+    return ReviewResult(
+        success=True,
+        issues=issues,
+        raw_output=result.raw_output,
+        file_hashes=dict(delta.file_hashes),
+    )
+
+
+def remember(root: str, result: ReviewResult) -> None:
+    """
+    Keep a successful review as the baseline for the next delta review.
+
+    Args:
+        root: Repository root
+        result: Review with file_hashes set
+    """
+    if root and result.success and result.file_hashes:
+        _baselines[root] = result
+
+
+def get_baseline(root: str) -> Optional[ReviewResult]:
+    """Baseline review for a repository root, if any."""
+    return _baselines.get(root)
+
+
+def reset() -> None:
+    """Forget every baseline."""
+    _baselines.clear()
@@ -0,0 +1,236 @@
+"""
+Issue fingerprints for vim4rabbit.
+
+Every issue gets a stable fingerprint built from its file, a normalized
+line anchor, its type and its normalized comment text. The fingerprints of
+the last review of each branch and review type are kept in a small on-disk
+index, so the next such review is classified with one dict lookup per
+issue: new, persisting (already reported), or resolved (reported before,
+gone now).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .cache import get_cache_dir
+from .classifier import FIELD, get_classifier
+from .content import format_issue_title
+from .types import IssueTracking, ReviewIssue
+
+INDEX_VERSION = 2
+
+_DIGITS_RE = re.compile(r"\d+")
+
+# "Prompt for AI Agent:", which ends the comment of an issue
+_PROMPT_RE = re.compile(r"\s*Prompt\b[^:]*:")
+
+# Reviews are tracked on result worker threads: one index update at a time
+_lock = threading.Lock()
+
+
+def get_index_dir() -> Path:
+    """Directory holding the per-branch fingerprint indexes."""
+    return get_cache_dir() / "fingerprints"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize comment text for fingerprinting.
+
+    Case, whitespace and numbers (which often quote line numbers) are
+    ignored.
+    """
+    return " ".join(_DIGITS_RE.sub("#", text.lower()).split())
+
+
+def _first_line(issue: ReviewIssue) -> int:
+    """First line number of an issue (0 if none)."""
+    match = _DIGITS_RE.match(issue.line_range)
+    return int(match.group(0)) if match else 0
+
+
+def comment_text(issue: ReviewIssue) -> str:
+    """
+    Full comment of an issue: its lines from the Comment: field up to the
+    next field or the AI prompt (the summary if it has no Comment: field).
+    """
+    match = get_classifier().match
+    text: List[str] = []
+    in_comment = False
+    for line in issue.lines:
+        field = match(line)
+        if field is not None and field.lastgroup == FIELD:
+            in_comment = field.group("name") == "Comment"
+            if in_comment:
+                text.append(line[field.end():])
+        elif _PROMPT_RE.match(line):
+            in_comment = False
+        elif in_comment:
+            text.append(line)
+    return "\n".join(text) if text else issue.summary
+
+
+def fingerprint_issues(issues: List[ReviewIssue]) -> List[str]:
+    """
+    Fingerprint every issue of a review.
+
+    Line numbers drift whenever code above an issue is edited, so the line
+    anchor is normalized to the issue's rank among issues with the same
+    file, type and comment, ordered by line: the first such issue is #0,
+    the next #1, and so on.
+
+    Args:
+        issues: Issues of one review
+
+    Returns:
+        Hex fingerprint per issue, in the same order
+    """
+    keys = [
+        "\0".join((
+            issue.file_path[2:] if issue.file_path.startswith("./") else issue.file_path,
+            issue.issue_type,
+            normalize_text(comment_text(issue)),
+        ))
+        for issue in issues
+    ]
+    order = sorted(range(len(issues)), key=lambda i: _first_line(issues[i]))
+    ranks: Dict[str, int] = {}
+    fingerprints = [""] * len(issues)
+    for i in order:
+        rank = ranks.get(keys[i], 0)
+        ranks[keys[i]] = rank + 1
+        material = f"{keys[i]}\0{rank}"
+        fingerprints[i] = hashlib.sha1(material.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+def _index_path(
+    root: str, branch: str, review_type: str, index_dir: Optional[Path]
+) -> Path:
+    """Path of the index file for reviews of one type on a repository branch."""
+    key = f"{root}\0{branch}\0{review_type}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return (index_dir or get_index_dir()) / f"{name}.json"
+
+
+def load_index(
+    root: str, branch: str, review_type: str, index_dir: Optional[Path] = None
+) -> Optional[Dict[str, str]]:
+    """
+    Load the fingerprint index of a branch.
+
+    Args:
+        root: Repository root
+        branch: Branch name
+        review_type: 'uncommitted', 'committed' or 'all'
+        index_dir: Index directory (default: get_index_dir())
+
+    Returns:
+        Dict of fingerprint to issue title, or None if the branch has no
+        index for the review type yet
+    """
+    try:
+        with open(_index_path(root, branch, review_type, index_dir), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != INDEX_VERSION:
+        return None
+    return dict(entry.get("issues", {}))
+
+
+def save_index(
+    root: str,
+    branch: str,
+    review_type: str,
+    index: Dict[str, str],
+    index_dir: Optional[Path] = None,
+) -> bool:
+    """
+    Replace the fingerprint index of a branch.
+
+    Args:
+        root: Repository root
+        branch: Branch name
+        review_type: 'uncommitted', 'committed' or 'all'
+        index: Dict of fingerprint to issue title
+        index_dir: Index directory (default: get_index_dir())
+
+    Returns:
+        True if the index was written
+    """
+    path = _index_path(root, branch, review_type, index_dir)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    entry = {
+        "version": INDEX_VERSION, "root": root, "branch": branch,
+        "review_type": review_type, "issues": index,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        # Atomic replace so concurrent Vim instances never read partial files
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+
+def classify(
+    issues: List[ReviewIssue],
+    index: Optional[Dict[str, str]],
+    fingerprints: Optional[List[str]] = None,
+) -> IssueTracking:
+    """
+    Classify issues against the index of the previous review.
+
+    Args:
+        issues: Issues of the new review
+        index: Previous index (None if there was no previous review)
+        fingerprints: fingerprint_issues(issues), if already computed
+
+    Returns:
+        IssueTracking; without a previous index every issue is new and
+        known is False
+    """
+    if fingerprints is None:
+        fingerprints = fingerprint_issues(issues)
+    previous = index or {}
+    statuses = ["persisting" if fp in previous else "new" for fp in fingerprints]
+    current = set(fingerprints)
+    resolved = [title for fp, title in previous.items() if fp not in current]
+    return IssueTracking(statuses=statuses, resolved=resolved, known=index is not None)
+
+
+def track(
+    root: str,
+    branch: str,
+    review_type: str,
+    issues: List[ReviewIssue],
+    index_dir: Optional[Path] = None,
+) -> IssueTracking:
+    """
+    Classify a finished review of a branch and make it the index of the
+    branch's next review of the same type.
+
+    Args:
+        root: Repository root
+        branch: Branch name
+        review_type: 'uncommitted', 'committed' or 'all'
+        issues: Issues of the review
+        index_dir: Index directory (default: get_index_dir())
+
+    Returns:
+        IssueTracking of the review
+    """
+    fingerprints = fingerprint_issues(issues)
+    index = {fp: format_issue_title(issue) for fp, issue in zip(fingerprints, issues)}
+    with _lock:
+        previous = load_index(root, branch, review_type, index_dir)
+        save_index(root, branch, review_type, index, index_dir)
+    return classify(issues, previous, fingerprints)
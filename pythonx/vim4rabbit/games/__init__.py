@@ -3,31 +3,35 @@ Game manager for mini-games during loading animation.
 
 Module-level state + functions for managing game lifecycle.
 Games are played while waiting for CodeRabbit review to complete.
+
+Game packages are imported when a game is started, not with this module,
+so loading vim4rabbit does not pay for games nobody plays.
 """
 
+import importlib
 from typing import List, Optional
 
-from .zen_spiral import ZenSpiral
-from .coffee_cup import CoffeeCup
-from .rabbit import Snake
-from .pong import Pong
-from .wargames import WarGames
-from .matrix import Matrix
-
 # Module-level state
 _active_game = None  # type: Optional[object]
 
-# Game key -> (class, tick_ms)
+# Game key -> (name, "package.Class" relative to this package, tick_ms)
 GAME_REGISTRY = {
-    "b": ("Coffee Break!", CoffeeCup, 1040),
-    "z": ("Zen Spiral", ZenSpiral, 333),
-    "s": ("Snake vs Rabbit!", Snake, 200),
-    "p": ("Pong", Pong, 67),
-    "w": ("Global Thermonuclear War", WarGames, 200),
-    "m": ("Enter the Matrix", Matrix, 143),
+    "b": ("Coffee Break!", "coffee_cup.CoffeeCup", 1040),
+    "z": ("Zen Spiral", "zen_spiral.ZenSpiral", 333),
+    "s": ("Snake vs Rabbit!", "rabbit.Snake", 200),
+    "p": ("Pong", "pong.Pong", 67),
+    "w": ("Global Thermonuclear War", "wargames.WarGames", 200),
+    "m": ("Enter the Matrix", "matrix.Matrix", 143),
 }
 
 
+def get_game_class(key: str) -> type:
+    """Import the game package of a registered key and return its class."""
+    module_name, class_name = GAME_REGISTRY[key][1].rsplit(".", 1)
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, class_name)
+
+
 def get_game_menu(width: int = 80, height: int = 24) -> List[str]:
     """Render game selection menu, centered in the given dimensions."""
     box = [
@@ -66,8 +70,7 @@ def start_game(key: str, width: int, height: int) -> bool:
     global _active_game
     if key not in GAME_REGISTRY:
         return False
-    _, game_class, _ = GAME_REGISTRY[key]
-    _active_game = game_class(width, height)
+    _active_game = get_game_class(key)(width, height)
     return True
 
 
@@ -0,0 +1,307 @@
+"""
+Git helpers for vim4rabbit.
+
+This module inspects the working tree to identify what a review covers,
+and sets up the worktrees of sharded reviews. It runs git itself rather
+than through cli, which imports it.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+# Review types whose scope includes working-tree changes
+_WORKTREE_REVIEW_TYPES = ("uncommitted", "all")
+
+# Timeout in seconds of a single git command
+_GIT_TIMEOUT = 60
+
+
+def _run_git(args: List[str], cwd: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Run a git command and return output and exit code.
+
+    Args:
+        args: git arguments (without "git")
+        cwd: Working directory (default: current directory)
+
+    Returns:
+        Tuple of (stdout+stderr output, exit code); 1 with the error
+        message if git could not be run or timed out
+    """
+    try:
+        proc = subprocess.run(
+            ["git", *args], cwd=cwd, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, errors="surrogateescape",
+            timeout=_GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return str(e), 1
+    return proc.stdout, proc.returncode
+
+
+def get_head_sha(cwd: Optional[str] = None) -> str:
+    """
+    Get the commit sha of HEAD.
+
+    Args:
+        cwd: Repository directory (default: current directory)
+
+    Returns:
+        Full sha string, or empty string if not in a git repository
+    """
+    output, exit_code = _run_git(["rev-parse", "HEAD"], cwd=cwd)
+    if exit_code != 0:
+        return ""
+    return output.strip()
+
+
+def get_untracked_files(cwd: Optional[str] = None) -> List[str]:
+    """
+    List untracked files that are not ignored.
+
+    Args:
+        cwd: Repository directory (default: current directory)
+
+    Returns:
+        Sorted list of repository-relative paths
+    """
+    output, exit_code = _run_git(["ls-files", "--others", "--exclude-standard"], cwd=cwd)
+    if exit_code != 0:
+        return []
+    return sorted(line for line in output.split("\n") if line)
+
+
+def get_diff_fingerprint(review_type: str, cwd: Optional[str] = None) -> str:
+    """
+    Hash the working-tree changes that a review of the given type covers.
+
+    Committed reviews are fully identified by HEAD, so only uncommitted and
+    all reviews hash the diff against HEAD plus untracked file contents.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        cwd: Repository directory (default: current directory)
+
+    Returns:
+        Hex digest, or empty string if the diff could not be read
+    """
+    digest = hashlib.sha256()
+    if review_type not in _WORKTREE_REVIEW_TYPES:
+        return digest.hexdigest()
+
+    output, exit_code = _run_git(["diff", "HEAD", "--binary"], cwd=cwd)
+    if exit_code != 0:
+        return ""
+    digest.update(output.encode("utf-8", errors="surrogateescape"))
+
+    for path in get_untracked_files(cwd):
+        digest.update(b"\0" + path.encode("utf-8", errors="surrogateescape") + b"\0")
+        try:
+            with open(os.path.join(cwd or ".", path), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            continue
+
+    return digest.hexdigest()
+
+
+def get_repo_root(cwd: Optional[str] = None) -> str:
+    """
+    Get the top-level directory of the repository.
+
+    Args:
+        cwd: Directory inside the repository (default: current directory)
+
+    Returns:
+        Absolute path, or empty string if not in a git repository
+    """
+    output, exit_code = _run_git(["rev-parse", "--show-toplevel"], cwd=cwd)
+    if exit_code != 0:
+        return ""
+    return output.strip()
+
+
+def get_branch_name(cwd: Optional[str] = None) -> str:
+    """
+    Get the name of the checked out branch.
+
+    Args:
+        cwd: Directory inside the repository (default: current directory)
+
+    Returns:
+        Branch name, 'HEAD' when detached, or empty string if not in a
+        git repository
+    """
+    output, exit_code = _run_git(
+        ["rev-parse", "--abbrev-ref", "HEAD"], cwd=cwd
+    )
+    if exit_code != 0:
+        return ""
+    return output.strip()
+
+
+def get_changed_files(cwd: Optional[str] = None) -> List[Tuple[str, int]]:
+    """
+    List uncommitted changed files with a rough size of each change.
+
+    Tracked files are weighted by lines added plus removed (binary files
+    count as 1); untracked files by their line count.
+
+    Args:
+        cwd: Repository root (default: current directory)
+
+    Returns:
+        List of (repository-relative path, weight) tuples, sorted by path
+    """
+    output, exit_code = _run_git(["diff", "HEAD", "--numstat"], cwd=cwd)
+    if exit_code != 0:
+        return []
+
+    weights: Dict[str, int] = {}
+    for line in output.split("\n"):
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        added, removed, path = parts
+        if added.isdigit() and removed.isdigit():
+            weights[path] = max(int(added) + int(removed), 1)
+        else:
+            weights[path] = 1
+
+    for path in get_untracked_files(cwd):
+        try:
+            with open(os.path.join(cwd or ".", path), "rb") as f:
+                weights[path] = max(f.read().count(b"\n"), 1)
+        except OSError:
+            weights[path] = 1
+
+    return sorted(weights.items())
+
+
+def get_file_hashes(files: List[str], cwd: Optional[str] = None) -> Dict[str, str]:
+    """
+    Hash the working-tree content of some files.
+
+    Args:
+        files: Repository-relative paths
+        cwd: Repository root (default: current directory)
+
+    Returns:
+        Dict of path to sha256 hex digest ('' for a deleted file)
+    """
+    hashes: Dict[str, str] = {}
+    for path in files:
+        try:
+            with open(os.path.join(cwd or ".", path), "rb") as f:
+                hashes[path] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            hashes[path] = ""
+    return hashes
+
+
+def create_worktree(path: str, cwd: Optional[str] = None) -> bool:
+    """
+    Create a detached worktree of HEAD at the given path.
+
+    Args:
+        path: Directory for the worktree (must be missing or empty)
+        cwd: Repository directory (default: current directory)
+
+    Returns:
+        True if the worktree was created
+    """
+    _, exit_code = _run_git(["worktree", "add", "--detach", path, "HEAD"], cwd=cwd)
+    return exit_code == 0
+
+
+def remove_worktree(path: str, cwd: Optional[str] = None) -> None:
+    """
+    Remove a worktree created by create_worktree().
+
+    Args:
+        path: Worktree directory
+        cwd: Repository directory (default: current directory)
+    """
+    _run_git(["worktree", "remove", "--force", path], cwd=cwd)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def copy_changes_to_worktree(
+    files: List[str], worktree: str, cwd: Optional[str] = None
+) -> bool:
+    """
+    Reproduce the uncommitted changes of some files inside a worktree.
+
+    Tracked changes are applied as a binary patch; untracked files are
+    copied verbatim.
+
+    Args:
+        files: Repository-relative paths to carry over
+        worktree: Worktree directory created by create_worktree()
+        cwd: Repository root (default: current directory)
+
+    Returns:
+        True if every change was reproduced
+    """
+    untracked = set(get_untracked_files(cwd))
+    tracked = [f for f in files if f not in untracked]
+
+    if tracked:
+        # Write the patch outside the worktree so it is not itself reviewed
+        fd, patch_path = tempfile.mkstemp(prefix="vim4rabbit-", suffix=".patch")
+        os.close(fd)
+        try:
+            _, exit_code = _run_git(
+                ["diff", "HEAD", "--binary", f"--output={patch_path}",
+                 "--", *tracked],
+                cwd=cwd,
+            )
+            if exit_code != 0:
+                return False
+            if os.path.getsize(patch_path):
+                _, exit_code = _run_git(["apply", patch_path], cwd=worktree)
+                if exit_code != 0:
+                    return False
+        finally:
+            os.unlink(patch_path)
+
+    for path in files:
+        if path not in untracked:
+            continue
+        target = os.path.join(worktree, path)
+        try:
+            os.makedirs(os.path.dirname(target) or worktree, exist_ok=True)
+            shutil.copy2(os.path.join(cwd or ".", path), target)
+        except OSError:
+            return False
+
+    return True
+
+
+def create_worktrees(groups: List[List[str]], cwd: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Create one worktree per group of files, each holding the uncommitted
+    changes of its group only.
+
+    Args:
+        groups: Repository-relative paths of each worktree
+        cwd: Repository root (default: current directory)
+
+    Returns:
+        Worktree directories in group order, or None if any setup failed
+        (the worktrees created so far are then removed)
+    """
+    worktrees: List[str] = []
+    for index, group in enumerate(groups):
+        worktree = tempfile.mkdtemp(prefix=f"vim4rabbit-shard{index}-")
+        worktrees.append(worktree)
+        if not (create_worktree(worktree, cwd)
+                and copy_changes_to_worktree(group, worktree, cwd)):
+            for path in worktrees:
+                remove_worktree(path, cwd)
+            return None
+    return worktrees
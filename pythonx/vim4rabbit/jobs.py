@@ -0,0 +1,554 @@
+"""
+Review job manager for vim4rabbit.
+
+Python owns the coderabbit processes of a review: CommandJob reader threads
+queue their output, and a parse worker thread per review feeds it to the
+streaming parser(s) in slices of PARSE_CHUNK_SIZE characters. VimScript only
+polls a small status dict from a timer and fetches the parsed result once,
+when the review ends, so even a huge output never stalls Vim's UI thread.
+
+Module-level state + functions keep the running jobs by id.
+Same pattern as selection.py.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .cli import (
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_RUNNING,
+    CommandJob,
+    ShardedReview,
+    build_review_command,
+    resolve_output_format,
+    start_command,
+)
+from .parser import DEFAULT_BACKEND, create_parser
+from .types import (
+    DeltaPlan,
+    ReviewIssue,
+    ReviewMetrics,
+    ReviewOutput,
+    ReviewResult,
+    ReviewShard,
+)
+from . import cache
+from . import delta as delta_reviews
+from . import git
+
+# Output is parsed in slices of this many characters; the job lock is
+# released between slices, so polls from Vim never wait on a whole output
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# Seconds the parse worker sleeps when no output is waiting
+_IDLE_INTERVAL = 0.02
+
+# Module-level state
+_jobs: Dict[int, "ReviewJob"] = {}
+_next_id: int = 1
+
+
+class ReviewJob:
+    """
+    A review running in the background: one coderabbit process, or one per
+    shard when the review is sharded (at most max_jobs at a time).
+
+    All parsing happens on the job's parse worker thread, one slice at a
+    time under the job lock; every public method takes the same lock, so
+    callers see the parsers between slices only. The parsers' output
+    buffers hold the only copy of the output: the processes don't keep theirs.
+    """
+
+    def __init__(
+        self,
+        review_type: str = "uncommitted",
+        timeout: Optional[float] = None,
+        shard_count: int = 1,
+        max_jobs: int = 0,
+        cwd: Optional[str] = None,
+        delta: bool = False,
+        output_format: str = DEFAULT_BACKEND,
+        skip_cached: bool = False,
+        skip_keys: Tuple[str, ...] = (),
+    ) -> None:
+        """
+        Start the review.
+
+        Args:
+            review_type: 'uncommitted', 'committed' or 'all'
+            timeout: Timeout in seconds per process (None or 0 for unlimited)
+            shard_count: Number of shards (1 for an unsharded review)
+            max_jobs: Maximum concurrent shard processes (0 for all at once)
+            cwd: Working directory (default: current directory)
+            delta: Re-review only files changed since the previous review
+                   (uncommitted reviews only)
+            output_format: Parser backend ('text', 'json'), or 'auto' to
+                           use the structured one if coderabbit supports it
+            skip_cached: Compute the tree's cache key first (see cache_key),
+                         and end the review as skipped without starting
+                         coderabbit if there is none, it is in skip_keys,
+                         or the review cache holds it
+            skip_keys: Cache keys of trees not to review (with skip_cached)
+        """
+        self.review_type = review_type
+        self.timeout = timeout or None
+        self.output_format = resolve_output_format(output_format)
+        self.state = JOB_RUNNING
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+        self._result: Optional[ReviewResult] = None
+        self._parser = create_parser(self.output_format)
+        self._unread: Dict[int, int] = {}  # read() offset per output
+        self._commands: List[CommandJob] = []
+        self._running: Dict[int, CommandJob] = {}
+        self._exit: tuple = ("", 0)
+        self._pending: Dict[int, tuple] = {}  # (text, offset) not parsed yet
+        self._received = 0  # characters of output received
+        self._parsed = 0  # characters of output fed to the parser(s)
+        self._lock = threading.RLock()
+        self._worker: Optional[threading.Thread] = None
+        self.metrics = ReviewMetrics(review_type=review_type)
+        self.cache_key = ""  # set while preparing, with skip_cached
+        self.skipped = False
+
+        # Fingerprinting the tree, delta planning hashes files and sharding creates worktrees, so
+        # both run on the worker thread before it starts the processes
+        self.preparing = True
+        self._command = build_review_command(review_type, self.output_format)
+        self._delta: Optional[DeltaPlan] = None
+        self._queue: List[int] = []
+        self._max_jobs = 0
+        self._sharded: Optional[ShardedReview] = None
+        skip = tuple(skip_keys) if skip_cached else None
+        self._worker = threading.Thread(
+            target=self._work, args=(shard_count, max_jobs, cwd, delta, skip), daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def sharded(self) -> bool:
+        """Whether the review was split into shards."""
+        return self._sharded is not None
+
+    @property
+    def shards(self) -> List[ReviewShard]:
+        """Per-shard timings (empty for an unsharded review)."""
+        return self._sharded.shards if self._sharded is not None else []
+
+    @property
+    def delta(self) -> Optional[DeltaPlan]:
+        """Delta plan of a delta review (None otherwise)."""
+        return self._delta
+
+    @property
+    def done(self) -> bool:
+        """Whether the review has finished or been cancelled."""
+        return self.state != JOB_RUNNING
+
+    @property
+    def elapsed_secs(self) -> float:
+        """Seconds since start (frozen once finished)."""
+        end = self._finished if self._finished is not None else time.monotonic()
+        return end - self._started
+
+    @property
+    def bytes_read(self) -> int:
+        """Output bytes received from every process so far."""
+        return sum(command.bytes_read for command in self._commands)
+
+    @property
+    def issues(self) -> List[ReviewIssue]:
+        """Issues completed so far."""
+        with self._lock:
+            if self._sharded is not None:
+                return self._sharded.issues
+            return list(self._parser.issues)
+
+    @property
+    def parsing(self) -> bool:
+        """Whether received output is waiting to be parsed (a large burst)."""
+        return bool(self._pending)
+
+    @property
+    def parse_progress(self) -> int:
+        """Percentage of the output received so far that has been parsed."""
+        if self._received <= self._parsed:
+            return 100
+        return self._parsed * 100 // self._received
+
+    def poll(self) -> dict:
+        """
+        Report progress.
+
+        Returns:
+            Dict with keys: state ('running', 'done', 'timeout',
+            'cancelled' or 'failed'), bytes_read, issues_ready,
+            elapsed_secs, preparing (the tree's cache key, the delta plan
+            or shards are being set up), parsing (received output is waiting to be parsed) and
+            parse_progress (percent of received output parsed)
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "preparing": self.preparing,
+                "bytes_read": self.bytes_read,
+                "issues_ready": len(self.issues),
+                "elapsed_secs": round(self.elapsed_secs, 3),
+                "parsing": self.parsing,
+                "parse_progress": self.parse_progress,
+            }
+
+    @property
+    def outputs(self) -> List[ReviewOutput]:
+        """Raw output so far, one per shard (a single one if unsharded)."""
+        if self._sharded is not None:
+            return self._sharded.outputs
+        return [self._parser.output]
+
+    def read(self) -> str:
+        """
+        Get output received since the previous read().
+
+        Returns:
+            New output text, grouped by shard (empty string if none)
+        """
+        parts: List[str] = []
+        with self._lock:
+            for index, output in enumerate(self.outputs):
+                start = self._unread.get(index, 0)
+                if len(output) > start:
+                    parts.append(output.text[start:])
+                    self._unread[index] = len(output)
+        return "".join(parts)
+
+    def cancel(self) -> None:
+        """Kill every process and remove shard worktrees."""
+        with self._lock:
+            if self.done:
+                return
+            self._stop(JOB_CANCELLED, "Review cancelled")
+
+    def _stop(self, state: str, message: str) -> None:
+        """End the review early: kill every process and fail with message."""
+        for command in self._running.values():
+            command.cancel()
+        self._running = {}
+        self._queue = []
+        self._pending = {}
+        if self._sharded is not None:
+            self._sharded.cleanup()
+        self.state = state
+        self._finished = time.monotonic()
+        self._result = ReviewResult(success=False, error_message=message)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the review finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the review finished
+        """
+        if self._worker is not None:
+            self._worker.join(timeout)
+        return self.done
+
+    def result(self) -> ReviewResult:
+        """
+        Get the parsed review, blocking until it finishes.
+
+        Returns:
+            ReviewResult; a failed run carries its output (or a timeout
+            message) as error_message
+        """
+        self.wait()
+        return self._result
+
+    def _launch(self, index: int, cmd: List[str], cwd: Optional[str]) -> None:
+        """Start one process and track it under its shard index."""
+        command = start_command(cmd, self.timeout, cwd, keep_output=False)
+        self._commands.append(command)
+        self._running[index] = command
+
+    def _launch_shards(self) -> None:
+        """Start queued shards up to the concurrency limit."""
+        while self._queue and len(self._running) < self._max_jobs:
+            index = self._queue.pop(0)
+            self._sharded.begin_shard(index)
+            self._launch(index, self._sharded.command(), self._sharded.shards[index].cwd)
+
+    def _prepare(
+        self,
+        shard_count: int,
+        max_jobs: int,
+        cwd: Optional[str],
+        delta: bool,
+        skip_keys: Optional[Tuple[str, ...]],
+    ) -> None:
+        """
+        Check the cache (with skip_cached), plan a delta review and set up
+        shards, then start the process(es).
+        """
+        if skip_keys is not None:
+            key = cache.compute_cache_key(self.review_type, cwd)
+            skip = not key or key in skip_keys or cache.has_review(key)
+            with self._lock:
+                self.cache_key = key
+                if skip:
+                    self.preparing = False
+                    if not self.done:
+                        self.skipped = True
+                        self._stop(JOB_CANCELLED, "Review skipped: tree already reviewed")
+                    return
+
+        plan: Optional[DeltaPlan] = None
+        if delta and self.review_type == "uncommitted":
+            root = git.get_repo_root(cwd)
+            if root:
+                plan = delta_reviews.plan(root)
+
+        sharded = None
+        if plan is not None and not plan.full:
+            if plan.changed:
+                sharded = ShardedReview.prepare(
+                    self.review_type, shard_count, cwd, files=plan.changed,
+                    output_format=self.output_format,
+                )
+                if sharded is None:
+                    plan = DeltaPlan(root=plan.root, file_hashes=plan.file_hashes)
+        elif shard_count > 1:
+            sharded = ShardedReview.prepare(
+                self.review_type, shard_count, cwd, output_format=self.output_format
+            )
+
+        with self._lock:
+            self.preparing = False
+            if self.done:
+                # Cancelled while preparing
+                if sharded is not None:
+                    sharded.cleanup()
+                return
+            self._delta = plan
+            self._sharded = sharded
+            if plan is not None and not plan.full and not plan.changed:
+                # Nothing changed since the previous review
+                self._finish()
+            elif sharded is None:
+                self._launch(0, self._command, cwd)
+            else:
+                self._queue = [shard.index for shard in sharded.shards]
+                self._max_jobs = max_jobs or len(self._queue)
+                self._launch_shards()
+
+    def _work(
+        self,
+        shard_count: int,
+        max_jobs: int,
+        cwd: Optional[str],
+        delta: bool,
+        skip_keys: Optional[Tuple[str, ...]],
+    ) -> None:
+        """Worker thread: prepare the review, then pump output until it finishes."""
+        try:
+            self._prepare(shard_count, max_jobs, cwd, delta, skip_keys)
+        except Exception as e:
+            with self._lock:
+                self.preparing = False
+                if not self.done:
+                    self._stop(JOB_FAILED, f"Failed to start review: {e}")
+            return
+        while True:
+            with self._lock:
+                if self.done:
+                    return
+                try:
+                    busy = self._pump()
+                except Exception as e:
+                    self._stop(JOB_FAILED, f"Failed to parse review output: {e}")
+                    return
+            if not busy:
+                time.sleep(_IDLE_INTERVAL)
+
+    def _pump(self) -> bool:
+        """
+        Feed up to PARSE_CHUNK_SIZE characters of new output to the
+        parser(s) and reap finished processes.
+
+        Returns:
+            True if output is left to parse
+        """
+        if self.done:
+            return False
+        budget = PARSE_CHUNK_SIZE
+        for index, command in list(self._running.items()):
+            # Check done before reading: once done, all output is queued
+            finished = command.done
+            text, offset = self._pending.pop(index, ("", 0))
+            drained = offset >= len(text)
+            if drained:
+                text, offset = command.read(), 0
+                self._received += len(text)
+            if budget and offset < len(text):
+                chunk = text[offset:offset + budget]
+                parse_started = time.perf_counter()
+                if self._sharded is not None:
+                    self._sharded.feed(index, chunk)
+                else:
+                    self._parser.feed(chunk)
+                self.metrics.parse += time.perf_counter() - parse_started
+                offset += len(chunk)
+                budget -= len(chunk)
+                self._parsed += len(chunk)
+            if offset < len(text):
+                self._pending[index] = (text, offset)
+            elif finished and drained:
+                self._reap(index, command)
+        self._mark_issues()
+        if self._sharded is not None:
+            self._launch_shards()
+        if not self._running and not self._queue:
+            self._finish()
+        return bool(self._pending)
+
+    def _mark_issues(self) -> None:
+        """Record when each newly completed issue was first seen."""
+        now = time.monotonic() - self._started
+        for _ in range(len(self.issues) - len(self.metrics.issue_times)):
+            self.metrics.issue_times.append(round(now, 3))
+
+    def _reap(self, index: int, command: CommandJob) -> None:
+        """Record a finished process."""
+        del self._running[index]
+        output, exit_code = command.result()
+        if command.state != JOB_DONE:
+            self.state = command.state
+        parse_started = time.perf_counter()
+        if self._sharded is not None:
+            if command.state != JOB_DONE:
+                # The reason (timeout, command not found) replaces the output
+                self._sharded.feed(index, output)
+            self._sharded.finish_shard(index, exit_code)
+        else:
+            self._parser.close()
+            if command.state in (JOB_DONE, JOB_FAILED):
+                output = self._parser.output.text
+            self._exit = (output, exit_code)
+        self.metrics.parse += time.perf_counter() - parse_started
+
+    def _finish(self) -> None:
+        """Build the final result once every process has exited."""
+        if self._sharded is not None:
+            self._sharded.cleanup()
+            self._result = self._sharded.result()
+        else:
+            output, exit_code = self._exit
+            if exit_code != 0:
+                self._result = ReviewResult(
+                    success=False, error_message=output, raw_output=output
+                )
+            else:
+                self._result = ReviewResult(
+                    success=True, issues=self._parser.issues, raw_output=output
+                )
+        if self._delta is not None:
+            self._result = delta_reviews.apply(self._delta, self._result)
+            delta_reviews.remember(self._delta.root, self._result)
+        if self.state == JOB_RUNNING:
+            self.state = JOB_DONE
+        self._finished = time.monotonic()
+        self._finish_metrics()
+
+    def _finish_metrics(self) -> None:
+        """Fill in process latency marks once the review has finished."""
+        def since_start(marks: List[Optional[float]], latest: bool) -> Optional[float]:
+            marks = [mark for mark in marks if mark is not None]
+            if not marks:
+                return None
+            return round((max(marks) if latest else min(marks)) - self._started, 3)
+
+        metrics = self.metrics
+        metrics.spawn = since_start([c.spawned_at for c in self._commands], False)
+        metrics.first_byte = since_start([c.first_byte_at for c in self._commands], False)
+        metrics.last_byte = since_start([c.last_byte_at for c in self._commands], True)
+        metrics.first_issue = metrics.issue_times[0] if metrics.issue_times else None
+        metrics.total = round(self._finished - self._started, 3)
+        metrics.parse = round(metrics.parse, 6)
+        metrics.bytes_read = self.bytes_read
+        metrics.issue_count = len(self._result.issues)
+
+
+def start(
+    review_type: str = "uncommitted",
+    timeout: Optional[float] = None,
+    shard_count: int = 1,
+    max_jobs: int = 0,
+    delta: bool = False,
+    output_format: str = DEFAULT_BACKEND,
+) -> int:
+    """
+    Start a review job.
+
+    Args:
+        review_type: 'uncommitted', 'committed' or 'all'
+        timeout: Timeout in seconds per process (None or 0 for unlimited)
+        shard_count: Number of shards (1 for an unsharded review)
+        max_jobs: Maximum concurrent shard processes (0 for all at once)
+        delta: Re-review only files changed since the previous review
+        output_format: Parser backend ('text', 'json' or 'auto')
+
+    Returns:
+        Job id
+    """
+    return add(ReviewJob(
+        review_type, timeout, shard_count, max_jobs,
+        delta=delta, output_format=output_format,
+    ))
+
+
+def add(job: ReviewJob) -> int:
+    """
+    Track an already running job (e.g. an adopted speculative review).
+
+    Returns:
+        Job id
+    """
+    global _next_id
+    job_id = _next_id
+    _next_id += 1
+    _jobs[job_id] = job
+    return job_id
+
+
+def get(job_id: int) -> Optional[ReviewJob]:
+    """Get a job by id (None if unknown)."""
+    return _jobs.get(job_id)
+
+
+def pop(job_id: int) -> Optional[ReviewJob]:
+    """Forget a job and return it (None if unknown)."""
+    return _jobs.pop(job_id, None)
+
+
+def latest() -> Optional[ReviewJob]:
+    """The most recently started job still tracked, if any."""
+    if not _jobs:
+        return None
+    return _jobs[max(_jobs)]
+
+
+def cancel(job_id: int) -> None:
+    """Cancel a job and forget it."""
+    job = pop(job_id)
+    if job is not None:
+        job.cancel()
+
+
+def cancel_all() -> None:
+    """Cancel and forget every job."""
+    for job_id in list(_jobs):
+        cancel(job_id)
@@ -0,0 +1,137 @@
+"""
+Review latency metrics for vim4rabbit.
+
+Each finished review contributes a ReviewMetrics record (process spawn,
+first byte, first issue, last byte, parse, format and render times) to a
+rolling history, summarized as p50/p95 per phase by :Rabbit stats.
+
+Module-level state + functions. Same pattern as selection.py.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .types import ReviewMetrics
+
+# Number of reviews kept in the rolling history
+HISTORY_SIZE = 50
+
+# Phases summarized by summarize(), in display order
+PHASES = (
+    "spawn",
+    "first_byte",
+    "first_issue",
+    "last_byte",
+    "parse",
+    "format",
+    "render",
+    "total",
+)
+
+# Module-level state
+_history: Deque[ReviewMetrics] = deque(maxlen=HISTORY_SIZE)
+_pending: Optional[ReviewMetrics] = None  # waiting for format/render times
+# Reviews are recorded on result worker threads, summarized on Vim's thread
+_lock = threading.Lock()
+
+
+def record(metrics: ReviewMetrics) -> None:
+    """
+    Add a finished review to the history.
+
+    The record stays pending until its format and render phases are
+    reported through record_phase().
+
+    Args:
+        metrics: Metrics of the finished review
+    """
+    global _pending
+    with _lock:
+        _history.append(metrics)
+        _pending = metrics
+
+
+def record_phase(phase: str, secs: float) -> None:
+    """
+    Report the duration of a post-review phase ('format' or 'render').
+
+    Ignored when no review is pending (e.g. a result served from the cache).
+    Render is the last phase, so it ends the pending review.
+
+    Args:
+        phase: Phase name
+        secs: Duration in seconds
+    """
+    global _pending
+    with _lock:
+        if _pending is None:
+            return
+        setattr(_pending, phase, round(secs, 6))
+        if phase == "render":
+            _pending = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples (need not be sorted)
+        pct: Percentile in 0-100
+
+    Returns:
+        The percentile value (0.0 for no samples)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize() -> dict:
+    """
+    Summarize the history.
+
+    Returns:
+        Dict with keys:
+        - count: number of reviews in the history
+        - phases: {phase: {p50, p95, last}} in seconds (phases with no
+          samples are omitted)
+        - bytes: {p50, p95, total} bytes read per review
+        - history: list of per-review metrics dicts, oldest first
+    """
+    with _lock:
+        history = list(_history)
+    phases: Dict[str, dict] = {}
+    for phase in PHASES:
+        samples = [
+            getattr(m, phase) for m in history if getattr(m, phase) is not None
+        ]
+        if samples:
+            phases[phase] = {
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "last": samples[-1],
+            }
+    sizes = [m.bytes_read for m in history]
+    return {
+        "count": len(history),
+        "phases": phases,
+        "bytes": {
+            "p50": percentile(sizes, 50),
+            "p95": percentile(sizes, 95),
+            "total": sum(sizes),
+        },
+        "history": [m.to_dict() for m in history],
+    }
+
+
+def reset() -> None:
+    """Clear the history."""
+    global _pending
+    with _lock:
+        _history.clear()
+        _pending = None
@@ -1,13 +1,151 @@
 """
 Parsing functions for vim4rabbit.
 
-This module handles parsing of CodeRabbit CLI output.
+This module handles parsing of CodeRabbit CLI output. Parser backends are
+registered by output format: "text" scrapes the --plain output and is the
+fallback, "json" decodes machine-readable output (NDJSON or a JSON array).
 """
 
+import json
 import re
-from typing import Dict, List
+from typing import Dict, List, Match, Optional, Tuple
 
-from .types import ReviewIssue
+from .classifier import (
+    BLANK,
+    BODY,
+    FENCE,
+    FIELD,
+    FIELD_NAMES,
+    PREAMBLE,
+    PROPOSED_HEADING_RE,
+    SEPARATOR,
+    get_classifier,
+)
+from .types import PatchHunk, ProposedPatch, ReviewIssue, ReviewOutput, truncate_summary
+
+
+# Metadata field prefixes recognized inside an issue
+_FIELD_PREFIXES = tuple(f"{name}:" for name in FIELD_NAMES)
+
+# "Line: X to Y" is normalized to "X-Y"
+_LINE_RANGE_RE = re.compile(r"(\d+)\s+to\s+(\d+)")
+
+# "@@ -12,3 +12,4 @@" hunk header
+_HUNK_HEADER_RE = re.compile(r"@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+Span = Tuple[int, int]
+
+
+def _value_span(offset: int, line: str, start: int) -> Span:
+    """Offsets of line[start:] with surrounding whitespace removed."""
+    value = line[start:]
+    begin = offset + start + len(value) - len(value.lstrip())
+    return begin, begin + len(value.strip())
+
+
+class _IssueBuilder:
+    """
+    Offsets and metadata of one issue, extracted one line at a time.
+
+    Every field (File/Line/Type/Comment/Prompt and the summary fallback) is
+    picked up as the line is added, so an issue is never rescanned. Summary
+    and prompt are recorded as offsets into the output, not copied.
+    """
+
+    __slots__ = (
+        "start", "end", "file_path", "line_range", "issue_type",
+        "summary", "fallback", "prompt_spans", "in_comment", "in_prompt",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty issue."""
+        self.start: Optional[int] = None  # None until the first line
+        self.end = 0
+        self.file_path = ""
+        self.line_range = ""
+        self.issue_type = ""
+        self.summary: Optional[Span] = None
+        self.fallback: Optional[Span] = None  # first non-field line
+        self.prompt_spans: List[Span] = []
+        self.in_comment = False
+        self.in_prompt = False
+
+    @property
+    def empty(self) -> bool:
+        """Whether no line has been added."""
+        return self.start is None
+
+    def add(self, line: str, offset: int, match: Optional[Match[str]] = None) -> None:
+        """
+        Add one line and update metadata.
+
+        Args:
+            line: The line, without its newline
+            offset: Offset of the line in the output
+            match: The line's match of LineClassifier.match (None for a
+                   body line)
+        """
+        if self.start is None:
+            self.start = offset
+        self.end = offset + len(line)
+        kind = match.lastgroup if match is not None else None
+        if kind == BLANK:
+            return
+
+        if kind == FIELD:
+            name = match.group("name")
+            value_start = match.end()
+            value = line[value_start:].strip()
+            if name == "File":
+                self.file_path = value
+                self.in_prompt = False
+            elif name == "Line":
+                self.line_range = _LINE_RANGE_RE.sub(r"\1-\2", value)
+                self.in_prompt = False
+            elif name == "Type":
+                self.issue_type = value
+                self.in_prompt = False
+            elif name == "Comment":
+                # Summary is text on the same line, else the next non-empty line
+                self.in_prompt = False
+                self.in_comment = not value
+                if value:
+                    self.summary = _value_span(offset, line, value_start)
+            else:
+                # Prompt: may be multi-line, until the next field
+                self.in_prompt = True
+                self.in_comment = False
+                if value:
+                    self.prompt_spans.append(_value_span(offset, line, value_start))
+            return
+
+        if self.fallback is not None and not self.in_comment and not self.in_prompt:
+            # Nothing to record: the line only extends the issue
+            return
+        stripped = line.strip()
+        lead = len(line) - len(line.lstrip())
+        span = (offset + lead, offset + lead + len(stripped))
+        if self.fallback is None:
+            self.fallback = span
+        if self.in_comment:
+            self.summary = span
+            self.in_comment = False
+        elif self.in_prompt:
+            self.prompt_spans.append(span)
+
+    def build(self, output: ReviewOutput) -> ReviewIssue:
+        """Build the ReviewIssue over the output the offsets refer to."""
+        # Fallback: if no summary found, use first non-empty line
+        summary = self.summary or self.fallback or (0, 0)
+        return ReviewIssue.from_output(
+            output,
+            (self.start or 0, self.end),
+            file_path=self.file_path,
+            line_range=self.line_range,
+            issue_type=self.issue_type,
+            summary_span=summary,
+            prompt_spans=tuple(self.prompt_spans),
+        )
 
 
 def parse_issue_metadata(lines: List[str]) -> Dict[str, str]:
@@ -27,122 +165,428 @@ def parse_issue_metadata(lines: List[str]) -> Dict[str, str]:
     Returns:
         Dict with keys: file_path, line_range, issue_type, summary, prompt
     """
-    metadata: Dict[str, str] = {
-        "file_path": "",
-        "line_range": "",
-        "issue_type": "",
-        "summary": "",
-        "prompt": "",
+    return _metadata_of(lines)
+
+
+def _metadata_of(lines: List[str]) -> Dict[str, str]:
+    """Metadata of an issue's lines (see parse_issue_metadata())."""
+    text = "\n".join(lines)
+    builder = _IssueBuilder()
+    match = get_classifier().match
+    offset = 0
+    for line in lines:
+        builder.add(line, offset, match(line))
+        offset += len(line) + 1
+    issue = builder.build(ReviewOutput(text))
+    return {
+        "file_path": issue.file_path,
+        "line_range": issue.line_range,
+        "issue_type": issue.issue_type,
+        "summary": issue.summary,
+        "prompt": issue.prompt,
     }
 
-    in_comment = False
-    in_prompt = False
-    prompt_lines: List[str] = []
 
-    for i, line in enumerate(lines):
-        stripped = line.strip()
+def is_preamble_line(line: str) -> bool:
+    """
+    Check if a line is part of the CLI preamble (status messages to filter out).
 
-        # Extract File:
-        if stripped.startswith("File:"):
-            metadata["file_path"] = stripped[5:].strip()
-            in_prompt = False
-            continue
+    Args:
+        line: A line of text from CLI output
 
-        # Extract Line: (handles "Line: X" and "Line: X to Y")
-        if stripped.startswith("Line:"):
-            line_text = stripped[5:].strip()
-            # Normalize "X to Y" to "X-Y"
-            line_text = re.sub(r"(\d+)\s+to\s+(\d+)", r"\1-\2", line_text)
-            metadata["line_range"] = line_text
-            in_prompt = False
-            continue
+    Returns:
+        True if this line should be filtered out as preamble
+    """
+    return get_classifier().is_preamble(line)
 
-        # Extract Type:
-        if stripped.startswith("Type:"):
-            metadata["issue_type"] = stripped[5:].strip()
-            in_prompt = False
-            continue
 
-        # Extract summary from first non-empty line after "Comment:"
-        if stripped.startswith("Comment:"):
-            in_comment = True
-            in_prompt = False
-            # Check if there's text on the same line as "Comment:"
-            comment_text = stripped[8:].strip()
-            if comment_text:
-                metadata["summary"] = comment_text
-                in_comment = False
-            continue
+class StreamingReviewParser:
+    """
+    Push-style counterpart to parse_review_issues(); the "text" backend.
+
+    Accepts raw CLI output in arbitrary chunks as it arrives and emits each
+    ReviewIssue as soon as the separator that closes it has been seen, so
+    results can be rendered before the review process exits. Feeding the
+    whole output and calling close() yields the same issues as
+    parse_review_issues().
+
+    Parsing is a single pass and O(n) in the output length: every line is
+    split off once, classified once by the line classifier (see
+    classifier.py) and its metadata extracted as it is added, no issue is
+    rescanned, and a partial line is joined with its continuation only once
+    its newline arrives.
+
+    The raw output is kept once, in the `output` buffer; issues refer to it
+    by offsets instead of holding copies of their lines.
+    """
 
-        # Extract Prompt: (may be multi-line)
-        if stripped.startswith("Prompt:"):
-            in_prompt = True
-            in_comment = False
-            # Check if there's text on the same line as "Prompt:"
-            prompt_text = stripped[7:].strip()
-            if prompt_text:
-                prompt_lines.append(prompt_text)
-            continue
+    output_format = "text"
+    cli_args: Tuple[str, ...] = ("--plain",)
+
+    def __init__(self) -> None:
+        """Initialize empty parser state."""
+        self.issues: List[ReviewIssue] = []
+        self.output = ReviewOutput()
+        self._pending: List[str] = []  # partial line awaiting its newline
+        self._offset = 0  # offset of the pending line in the output
+        self._current: Optional[_IssueBuilder] = None  # None before the first issue
+        self._classifier = get_classifier()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called."""
+        return self._closed
+
+    def feed(self, chunk: str) -> List[ReviewIssue]:
+        """
+        Consume a chunk of raw output.
+
+        Args:
+            chunk: Raw output text (may split lines at any point)
+
+        Returns:
+            List of ReviewIssue objects completed by this chunk
+        """
+        if self._closed or not chunk:
+            return []
+
+        self.output.append(chunk)
+        self._pending.append(chunk)
+        if "\n" not in chunk:
+            return []
+        lines = "".join(self._pending).split("\n")
+        self._pending = [lines.pop()]
+
+        completed: List[ReviewIssue] = []
+        match_line = self._classifier.match
+        offset = self._offset
+        for line in lines:
+            match = match_line(line)
+            kind = match.lastgroup if match is not None else BODY
+            current = self._current
+            if current is not None and current.start is not None and (
+                kind == BLANK
+                or (kind != FIELD and kind != SEPARATOR and current.fallback is not None
+                    and not current.in_comment and not current.in_prompt)
+            ):
+                # Blank line, or body line with nothing to record: it only
+                # extends the issue
+                current.end = offset + len(line)
+            else:
+                issue = self._process_line(line, offset, match)
+                if issue is not None:
+                    completed.append(issue)
+            offset += len(line) + 1
+        self._offset = offset
+        return completed
+
+    def close(self) -> List[ReviewIssue]:
+        """
+        Signal end of output and flush the final issue.
+
+        Returns:
+            List of ReviewIssue objects completed by closing the stream
+        """
+        if self._closed:
+            return []
+        self._closed = True
+
+        completed: List[ReviewIssue] = []
+        # Trailing text after the last newline is a line of its own,
+        # exactly as str.split("\n") would produce it
+        line = "".join(self._pending)
+        issue = self._process_line(line, self._offset, self._classifier.match(line))
+        self._pending = []
+        if issue is not None:
+            completed.append(issue)
+
+        # Don't forget the last issue
+        if self._current is not None and not self._current.empty:
+            completed.append(self._emit())
+        return completed
+
+    def _process_line(
+        self, line: str, offset: int, match: Optional[Match[str]]
+    ) -> Optional[ReviewIssue]:
+        """Advance the parser by one classified line, returning an issue if one closed."""
+        kind = match.lastgroup if match is not None else None
+        if kind == SEPARATOR:
+            # If we were collecting an issue, save it
+            issue = None
+            if self._current is not None and not self._current.empty:
+                issue = self._emit()
+            # Start a new issue
+            self._current = _IssueBuilder()
+            return issue
 
-        if in_comment and stripped:
-            metadata["summary"] = stripped
-            in_comment = False
-            continue
+        if self._current is not None:
+            self._current.add(line, offset, match)
+        elif self._classifier.classify(line, preamble=True) not in (BLANK, PREAMBLE):
+            # Content before first separator - filter out preamble
+            # Only start collecting if it's not a preamble line
+            self._current = _IssueBuilder()
+            self._current.add(line, offset, match)
+        return None
 
-        # Continue collecting prompt lines until we hit another field
-        if in_prompt:
-            if stripped:
-                prompt_lines.append(stripped)
+    def _emit(self) -> ReviewIssue:
+        """Build the ReviewIssue being collected and record it."""
+        issue = self._current.build(self.output)
+        self._current = _IssueBuilder()
+        self.issues.append(issue)
+        return issue
 
-    # Join prompt lines
-    metadata["prompt"] = "\n".join(prompt_lines)
 
-    # Fallback: if no summary found, use first non-empty line
-    if not metadata["summary"]:
-        for line in lines:
-            stripped = line.strip()
-            if stripped and not stripped.startswith(
-                ("File:", "Line:", "Type:", "Comment:", "Prompt:")
-            ):
-                metadata["summary"] = stripped
+def _text(value: object) -> str:
+    """A JSON field as a string ('' for null)."""
+    return "" if value is None else str(value)
+
+
+def issue_from_json(data: dict) -> ReviewIssue:
+    """
+    Build a ReviewIssue from one structured issue object.
+
+    The issue's lines are the --plain layout of the same issue, and its
+    metadata is what the text backend extracts from those lines, so both
+    backends produce identical issues for the same review.
+
+    Expected keys (all optional): file, start_line, end_line (or line),
+    type, comment, prompt.
+
+    Args:
+        data: Decoded issue object
+
+    Returns:
+        ReviewIssue
+    """
+    file_path = _text(data.get("file")).strip()
+    start = _text(data.get("start_line", data.get("line"))).strip()
+    end = _text(data.get("end_line")).strip()
+    issue_type = _text(data.get("type")).strip()
+    comment = _text(data.get("comment"))
+    prompt = _text(data.get("prompt"))
+    line_range = f"{start} to {end}" if start and end else start
+
+    lines: List[str] = []
+    if file_path:
+        lines.append("File: " + file_path)
+    if line_range:
+        lines.append("Line: " + line_range)
+    if issue_type:
+        lines.append("Type: " + issue_type)
+    comment_lines = [line.rstrip() for line in comment.split("\n")] if comment.strip() else []
+    prompt_lines = [line.rstrip() for line in prompt.split("\n")] if prompt.strip() else []
+    if comment_lines:
+        lines += ["", "Comment:"] + comment_lines
+    if prompt_lines:
+        lines += ["", "Prompt:"] + prompt_lines
+
+    if any(prefix in comment or prefix in prompt for prefix in _FIELD_PREFIXES):
+        # Text that looks like a field: let the text rules decide
+        return ReviewIssue(lines=lines, **_metadata_of(lines))
+
+    summary = next((line.strip() for line in comment_lines if line.strip()), "")
+    prompt_text = "\n".join(line.strip() for line in prompt_lines if line.strip())
+    if not summary:
+        # Same fallback as the text backend: first non-field line
+        summary = prompt_text.split("\n", 1)[0]
+    return ReviewIssue(
+        lines=lines,
+        file_path=file_path,
+        line_range=_LINE_RANGE_RE.sub(r"\1-\2", line_range),
+        issue_type=issue_type,
+        summary=truncate_summary(summary),
+        prompt=prompt_text,
+    )
+
+
+class StructuredReviewParser:
+    """
+    The "json" backend: decodes machine-readable coderabbit output.
+
+    Accepts line-delimited JSON (one object per line), a JSON array of
+    issues, or a document with an "issues" array. Each value is decoded as
+    soon as it is complete, and the elements of a top-level array one by
+    one, so NDJSON and array output stream like the text backend does.
+    Objects that are not issues (status events) and lines that are not JSON
+    (CLI banners) are skipped; decoding resumes on the line after a
+    malformed value.
+
+    Same interface as StreamingReviewParser.
+    """
+
+    output_format = "json"
+    cli_args: Tuple[str, ...] = ("--json",)
+
+    def __init__(self) -> None:
+        """Initialize empty decoder state."""
+        self.issues: List[ReviewIssue] = []
+        self.output = ReviewOutput()
+        self._buffer = ""  # undecoded output
+        self._chunks: List[str] = []  # output not yet added to the buffer
+        self._size = 0  # size of buffer + chunks
+        self._retry_at = 0  # size at which to retry an incomplete value
+        self._in_array = False
+        self._decoder = json.JSONDecoder()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called."""
+        return self._closed
+
+    def feed(self, chunk: str) -> List[ReviewIssue]:
+        """
+        Consume a chunk of raw output.
+
+        Args:
+            chunk: Raw output text (may split values at any point)
+
+        Returns:
+            List of ReviewIssue objects completed by this chunk
+        """
+        if self._closed or not chunk:
+            return []
+        self.output.append(chunk)
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self._size < self._retry_at:
+            return []
+        return self._decode()
+
+    def close(self) -> List[ReviewIssue]:
+        """
+        Signal end of output and decode whatever is left.
+
+        Returns:
+            List of ReviewIssue objects completed by closing the stream
+        """
+        if self._closed:
+            return []
+        self._closed = True
+        return self._decode()
+
+    def _decode(self) -> List[ReviewIssue]:
+        """Decode every complete value in the buffer."""
+        buffer = "".join([self._buffer] + self._chunks)
+        self._chunks = []
+        pos = 0
+        retry_at = 0
+        completed: List[ReviewIssue] = []
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace()
+                                         or (self._in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos >= len(buffer):
                 break
+            char = buffer[pos]
+            if char == "[" and not self._in_array:
+                self._in_array = True
+                pos += 1
+                continue
+            if char == "]" and self._in_array:
+                self._in_array = False
+                pos += 1
+                continue
+            if char == "{":
+                try:
+                    value, pos = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # The error of a value cut short is in its last token,
+                    # which cannot span lines: with a newline after the
+                    # error, the value is malformed
+                    if not self._closed and buffer.find("\n", e.pos) == -1:
+                        # Incomplete: retry once the pending text has doubled,
+                        # so a large value is not re-decoded on every chunk
+                        retry_at = 2 * (len(buffer) - pos)
+                        break
+                    # Malformed: resume on the next line, where NDJSON output
+                    # starts its next record
+                    pos = self._skip_line(buffer, e.pos)
+                    continue
+                completed.extend(self._add(value))
+                continue
+            # Not JSON (banner or status text): skip the line once complete
+            end = buffer.find("\n", pos)
+            if end == -1 and not self._closed:
+                break
+            pos = self._skip_line(buffer, pos)
+
+        # Drop decoded text
+        self._buffer = buffer[pos:]
+        self._size = len(self._buffer)
+        self._retry_at = retry_at
+        return completed
+
+    @staticmethod
+    def _skip_line(buffer: str, pos: int) -> int:
+        """Position after the line containing pos."""
+        end = buffer.find("\n", pos)
+        return len(buffer) if end == -1 else end + 1
+
+    def _add(self, value: object) -> List[ReviewIssue]:
+        """Collect the issues in a decoded value."""
+        if isinstance(value, list):
+            return [issue for item in value for issue in self._add(item)]
+        if not isinstance(value, dict):
+            return []
+        if isinstance(value.get("issues"), list):
+            return self._add(value["issues"])
+        if "file" not in value and "comment" not in value:
+            return []  # status event
+        issue = issue_from_json(value)
+        self.issues.append(issue)
+        return [issue]
+
+
+# Parser backend per output format
+_BACKENDS: Dict[str, type] = {}
+
+# Backend used for unknown formats
+DEFAULT_BACKEND = "text"
+
+
+def register_backend(parser_class: type) -> None:
+    """
+    Register a parser backend under its output_format.
 
-    # Truncate summary if too long
-    if len(metadata["summary"]) > 60:
-        metadata["summary"] = metadata["summary"][:57] + "..."
+    A backend is a class with the StreamingReviewParser interface (feed,
+    close, issues, output, closed) and output_format/cli_args attributes.
 
-    return metadata
+    Args:
+        parser_class: Backend class
+    """
+    _BACKENDS[parser_class.output_format] = parser_class
 
 
-def is_preamble_line(line: str) -> bool:
+def get_backend(output_format: str) -> type:
     """
-    Check if a line is part of the CLI preamble (status messages to filter out).
+    Get the parser backend for an output format.
 
     Args:
-        line: A line of text from CLI output
+        output_format: 'text', 'json', ...
 
     Returns:
-        True if this line should be filtered out as preamble
+        Backend class (the text backend for unknown formats)
     """
-    preamble_patterns = [
-        "running",
-        "analyzing",
-        "processing",
-        "loading",
-        "fetching",
-        "please wait",
-        "in progress",
-        "starting coderabbit",
-        "connecting",
-        "setting up",
-        "reviewing",
-        "review completed",
-    ]
-    line_lower = line.lower().strip()
-    return any(pattern in line_lower for pattern in preamble_patterns)
-
-
-def parse_review_issues(output: str) -> List[ReviewIssue]:
+    return _BACKENDS.get(output_format, _BACKENDS[DEFAULT_BACKEND])
+
+
+def backend_names() -> List[str]:
+    """Registered output formats, the default first."""
+    return sorted(_BACKENDS, key=lambda name: name != DEFAULT_BACKEND)
+
+
+def create_parser(output_format: str = DEFAULT_BACKEND):
+    """Create a streaming parser for an output format."""
+    return get_backend(output_format)()
+
+
+register_backend(StreamingReviewParser)
+register_backend(StructuredReviewParser)
+
+
+def parse_review_issues(output: str, output_format: str = DEFAULT_BACKEND) -> List[ReviewIssue]:
     """
     Parse review output into separate issues.
 
@@ -152,44 +596,134 @@ def parse_review_issues(output: str) -> List[ReviewIssue]:
 
     Args:
         output: Raw output from CodeRabbit CLI
+        output_format: Parser backend to use (default: text)
 
     Returns:
         List of ReviewIssue objects
     """
-    issues: List[ReviewIssue] = []
-    current_lines: List[str] = []
-    in_issue = False
+    parser = create_parser(output_format)
+    parser.feed(output)
+    parser.close()
+    return parser.issues
 
-    for line in output.split("\n"):
-        # Check if this is a separator line (5+ equal signs)
-        if re.match(r"^={5,}\s*$", line):
-            # If we were collecting an issue, save it
-            if in_issue and current_lines:
-                issues.append(ReviewIssue(lines=current_lines))
-            # Start a new issue
-            current_lines = []
-            in_issue = True
-        elif in_issue:
-            # Add line to current issue (trim trailing whitespace)
-            current_lines.append(line.rstrip())
+
+def _indent(line: str) -> str:
+    """Leading whitespace of a line."""
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _fenced_block(lines: List[str], start: int) -> Tuple[List[str], int]:
+    """
+    Lines inside the code fence opened at lines[start], and the index after it.
+
+    The indent of the opening fence is stripped from the lines inside.
+    """
+    classify = get_classifier().classify
+    indent = _indent(lines[start])
+    end = start + 1
+    while end < len(lines) and classify(lines[end]) != FENCE:
+        end += 1
+    block = [line[len(indent):] if line.startswith(indent) else line.lstrip()
+             for line in lines[start + 1:end]]
+    # Blank lines inside a fence are context lines that lost their space
+    return [line or " " for line in block], end + 1
+
+
+def _is_diff_line(line: str, indent: str) -> bool:
+    """Whether line is a diff line (' ', '+', '-', '\\' or @@) at indent."""
+    return line.startswith(indent) and (
+        line[len(indent):len(indent) + 1] in (" ", "+", "-", "\\")
+        or line.startswith("@@", len(indent))
+    )
+
+
+def _diff_block(lines: List[str], start: int, indent: str = "") -> Tuple[List[str], int]:
+    """
+    Unfenced diff lines from lines[start], and the index after them.
+
+    The block ends at the first line that is not a diff line at indent
+    (the indent of its heading), which is stripped from the lines.
+    """
+    block: List[str] = []
+    end = start
+    while end < len(lines):
+        line = lines[end]
+        if _is_diff_line(line, indent):
+            block.append(line[len(indent):])
+        elif (not line.strip() and end + 1 < len(lines)
+                and _is_diff_line(lines[end + 1], indent)):
+            # Blank context line with its leading space stripped
+            block.append(" ")
         else:
-            # Content before first separator - filter out preamble
-            # Only start collecting if it's not a preamble line
-            if line.strip() and not is_preamble_line(line):
-                in_issue = True
-                current_lines.append(line.rstrip())
-
-    # Don't forget the last issue
-    if current_lines:
-        issues.append(ReviewIssue(lines=current_lines))
-
-    # Extract metadata for each issue
-    for issue in issues:
-        metadata = parse_issue_metadata(issue.lines)
-        issue.file_path = metadata["file_path"]
-        issue.line_range = metadata["line_range"]
-        issue.issue_type = metadata["issue_type"]
-        issue.summary = metadata["summary"]
-        issue.prompt = metadata["prompt"]
-
-    return issues
+            break
+        end += 1
+    return block, end
+
+
+def _split_hunks(block: List[str]) -> List[PatchHunk]:
+    """Split diff lines into hunks at @@ headers (one hunk without headers)."""
+    has_headers = any(_HUNK_HEADER_RE.match(line) for line in block)
+    hunks: List[PatchHunk] = []
+    current: Optional[PatchHunk] = None
+    for line in block:
+        header = _HUNK_HEADER_RE.match(line)
+        if header:
+            current = PatchHunk(start=int(header.group(1)))
+            hunks.append(current)
+        elif line.startswith("\\") or (has_headers and current is None):
+            # "\ No newline at end of file", or ---/+++ file headers
+            continue
+        else:
+            if current is None:
+                current = PatchHunk()
+                hunks.append(current)
+            current.lines.append(line)
+    # Hunks without a change are not worth applying
+    return [hunk for hunk in hunks if any(line[:1] in ("+", "-") for line in hunk.lines)]
+
+
+def parse_proposed_patch(issue: ReviewIssue) -> Optional[ProposedPatch]:
+    """
+    Extract the proposed diff of an issue.
+
+    CodeRabbit prints suggested changes after a heading such as "Proposed
+    fix", as unified diff lines (' ' context, '-' removed, '+' added),
+    optionally inside a code fence and with @@ hunk headers. Diff code
+    fences elsewhere in the issue are picked up too.
+
+    Args:
+        issue: A parsed issue
+
+    Returns:
+        ProposedPatch against the issue's file, or None if the issue has no
+        proposed diff
+    """
+    lines = issue.lines
+    classify = get_classifier().classify
+    hunks: List[PatchHunk] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        proposed = PROPOSED_HEADING_RE.match(line)
+        if classify(line) == FENCE and line.strip()[3:].strip() in ("diff", "patch"):
+            block, i = _fenced_block(lines, i)
+            hunks += _split_hunks(block)
+        elif proposed:
+            i += 1
+            while i < len(lines) and not lines[i].strip():
+                i += 1
+            if i < len(lines) and classify(lines[i]) == FENCE:
+                block, i = _fenced_block(lines, i)
+            else:
+                block, i = _diff_block(lines, i, proposed.group(1))
+            hunks += _split_hunks(block)
+        else:
+            i += 1
+    if not hunks or not issue.file_path:
+        return None
+    first_line = re.match(r"\d+", issue.line_range)
+    return ProposedPatch(
+        file_path=issue.file_path,
+        hunks=hunks,
+        start=int(first_line.group(0)) if first_line else 0,
+    )
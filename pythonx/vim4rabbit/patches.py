@@ -0,0 +1,210 @@
+"""
+Local application of CodeRabbit's proposed fixes.
+
+The proposed diff of an issue (see parser.parse_proposed_patch()) is
+applied to the working tree directly, without an LLM round trip. Hunks are
+located by their context and removed lines near the issue's line, first
+exactly, then ignoring whitespace, then with up to MAX_FUZZ context lines
+dropped at each end, the way patch(1) applies a stale diff. Each hunk
+succeeds or fails on its own.
+"""
+
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+from .types import HunkResult, PatchHunk, PatchResult, ProposedPatch
+
+# Context lines that may be ignored at each end of a hunk
+MAX_FUZZ = 2
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _exact(line: str) -> str:
+    """Line as compared on the first pass (review output drops trailing spaces)."""
+    return line.rstrip()
+
+
+def _loose(line: str) -> str:
+    """Line with all whitespace runs collapsed."""
+    return _WHITESPACE_RE.sub(" ", line).strip()
+
+
+def _trim(hunk_lines: List[str], fuzz: int) -> Optional[List[str]]:
+    """Hunk lines without `fuzz` context lines at each end (None if too few)."""
+    if not fuzz:
+        return hunk_lines
+    head = 0
+    while head < fuzz and head < len(hunk_lines) and hunk_lines[head][:1] == " ":
+        head += 1
+    tail = 0
+    while tail < fuzz and tail < len(hunk_lines) - head and hunk_lines[-1 - tail][:1] == " ":
+        tail += 1
+    if head + tail == 0:
+        return None
+    trimmed = hunk_lines[head:len(hunk_lines) - tail]
+    # Keep at least one line to anchor on
+    if not any(line[:1] != "+" for line in trimmed):
+        return None
+    return trimmed
+
+
+def _find(
+    lines: List[str], old: List[str], hint: int, normalize: Callable[[str], str]
+) -> Optional[int]:
+    """Index where `old` occurs in `lines` nearest to `hint`, or None."""
+    if not old:
+        return None
+    wanted = [normalize(line) for line in old]
+    normalized = [normalize(line) for line in lines]
+    best: Optional[int] = None
+    for i in range(len(lines) - len(old) + 1):
+        if normalized[i] == wanted[0] and normalized[i:i + len(old)] == wanted:
+            if best is None or abs(i - hint) < abs(best - hint):
+                best = i
+    return best
+
+
+def locate_hunk(
+    lines: List[str], hunk: PatchHunk, hint: int
+) -> Optional[Tuple[int, List[str], int]]:
+    """
+    Find where a hunk applies.
+
+    Args:
+        lines: File lines
+        hunk: Hunk to locate
+        hint: 0-based index the hunk is expected near
+
+    Returns:
+        (index, hunk lines used, fuzz) or None if the hunk does not apply
+    """
+    for fuzz in range(MAX_FUZZ + 1):
+        hunk_lines = _trim(hunk.lines, fuzz)
+        if hunk_lines is None:
+            continue
+        old = [line[1:] for line in hunk_lines if line[:1] != "+"]
+        for normalize in (_exact, _loose):
+            index = _find(lines, old, hint, normalize)
+            if index is not None:
+                return index, hunk_lines, fuzz
+    return None
+
+
+def apply_hunks(
+    lines: List[str], hunks: List[PatchHunk], start: int = 0
+) -> Tuple[List[str], List[HunkResult]]:
+    """
+    Apply hunks to file lines.
+
+    Args:
+        lines: File lines (not modified)
+        hunks: Hunks in file order
+        start: 1-based line the hunks are expected near when they have no
+               @@ hint (0 for the top of the file)
+
+    Returns:
+        (patched lines, result per hunk)
+    """
+    lines = list(lines)
+    results: List[HunkResult] = []
+    shift = 0  # lines added minus removed by the hunks applied so far
+    for number, hunk in enumerate(hunks, 1):
+        hint = max((hunk.start or start) - 1 + shift, 0)
+        found = locate_hunk(lines, hunk, hint)
+        if found is None:
+            results.append(HunkResult(index=number, message="context not found"))
+            continue
+        index, hunk_lines, fuzz = found
+        # Context lines keep the file's text (whitespace may differ)
+        replacement: List[str] = []
+        position = index
+        for line in hunk_lines:
+            if line[:1] == "+":
+                replacement.append(line[1:])
+            elif line[:1] == "-":
+                position += 1
+            else:
+                replacement.append(lines[position])
+                position += 1
+        lines[index:position] = replacement
+        shift += len(replacement) - (position - index)
+        results.append(HunkResult(index=number, applied=True, line=index + 1, fuzz=fuzz))
+    return lines, results
+
+
+def resolve_path(root: str, file_path: str) -> Optional[str]:
+    """
+    Absolute path of a reviewed file, if it lies inside the repository.
+
+    Args:
+        root: Repository root
+        file_path: Path from the review output
+
+    Returns:
+        Absolute path, or None for paths outside the root
+    """
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, file_path))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def apply_patch(patch: ProposedPatch, root: str) -> PatchResult:
+    """
+    Apply a proposed fix to the working tree.
+
+    The file is rewritten (atomically, keeping its mode and line endings)
+    only if at least one hunk applied.
+
+    Args:
+        patch: Proposed fix of one issue
+        root: Repository root the file path is relative to
+
+    Returns:
+        PatchResult with a HunkResult per hunk
+    """
+    result = PatchResult(file_path=patch.file_path)
+    path = resolve_path(root, patch.file_path)
+    if path is None:
+        result.error = "path outside the repository"
+        return result
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        result.error = f"cannot read file: {e}"
+        return result
+
+    newline = "\r\n" if "\r\n" in text else "\n"
+    final_newline = text.endswith(newline)
+    body = text[:-len(newline)] if final_newline else text
+    lines = body.split(newline) if body else []
+
+    patched, result.hunks = apply_hunks(lines, patch.hunks, patch.start)
+    if not result.applied_count:
+        return result
+
+    tmp_path = None
+    try:
+        # A unique name next to the file, so the replace stays on one file system
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path)
+        )
+        with open(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(newline.join(patched) + (newline if final_newline else ""))
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        result.error = f"cannot write file: {e}"
+        for hunk in result.hunks:
+            hunk.applied = False
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+    return result
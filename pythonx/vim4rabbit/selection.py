@@ -2,26 +2,34 @@
 Issue selection state management for vim4rabbit.
 
 Module-level state + functions for tracking which review issues are selected.
-Same pattern as games/__init__.py.
+Same pattern as games/__init__.py. The selections of a review with a session
+(see sessions.py) are kept in the session's set.
 """
 
+import bisect
 import re
-from typing import List, Set
+from typing import List, Optional, Sequence, Set, Tuple
+
+# Checkbox at the start of a fold header line
+_CHECKBOX = re.compile(r"^(\s*)\[.\]")
 
 # Module-level state
 _selections: Set[int] = set()
 _issue_count: int = 0
 
 
-def init_selections(issue_count: int) -> None:
+def init_selections(issue_count: int, selections: Optional[Set[int]] = None) -> None:
     """
     Reset state for a new review.
 
     Args:
         issue_count: Total number of issues in the review
+        selections: Set to keep the selections in (cleared), e.g. the
+                    review session's (default: a new set)
     """
     global _selections, _issue_count
-    _selections = set()
+    _selections = selections if selections is not None else set()
+    _selections.clear()
     _issue_count = issue_count
 
 
@@ -57,8 +65,7 @@ def select_all() -> int:
     Returns:
         Number of issues selected
     """
-    global _selections
-    _selections = set(range(1, _issue_count + 1))
+    _selections.update(range(1, _issue_count + 1))
     return _issue_count
 
 
@@ -69,12 +76,25 @@ def deselect_all() -> int:
     Returns:
         Number of issues deselected
     """
-    global _selections
     count = len(_selections)
-    _selections = set()
+    _selections.clear()
     return count
 
 
+def set_checkbox(header: str, selected: bool) -> str:
+    """
+    Check or uncheck the checkbox of an issue's fold header line.
+
+    Args:
+        header: Fold header line, like '  [ ] 1. ...'
+        selected: Whether the issue is selected
+
+    Returns:
+        The header line with '[x]' or '[ ]'
+    """
+    return _CHECKBOX.sub(r"\g<1>[x]" if selected else r"\g<1>[ ]", header, count=1)
+
+
 def get_selected() -> List[int]:
     """
     Get sorted list of selected issue numbers.
@@ -126,3 +146,24 @@ def find_issue_at_line(lines: List[str], cursor_line_index: int) -> int:
         search_line -= 1
 
     return 0
+
+
+def issue_at_line(spans: Sequence[Tuple[int, int]], lnum: int) -> int:
+    """
+    Find the issue whose fold contains a buffer line.
+
+    Binary search over the fold spans of the rendered review, so Vim does
+    not have to send the buffer lines (see find_issue_at_line()).
+
+    Args:
+        spans: (header, end) line numbers of each issue's fold, sorted
+               (from format_review_output())
+        lnum: 1-based buffer line number
+
+    Returns:
+        Issue number (1-based) or 0 if the line is outside every issue
+    """
+    i = bisect.bisect_right(spans, (lnum, float("inf")))
+    if i and spans[i - 1][1] >= lnum:
+        return i
+    return 0
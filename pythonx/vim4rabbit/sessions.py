@@ -0,0 +1,79 @@
+"""
+Review sessions for vim4rabbit.
+
+A session holds everything Python knows about a review on display: its
+issues, the rendered review lines and the selected issues. VimScript only
+keeps the review id and passes it back with issue numbers, so issue data
+never has to be copied into Vim variables and sent back again.
+
+Module-level state + functions keep the sessions by id.
+Same pattern as selection.py.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .types import ReviewIssue, ReviewSession
+
+# Sessions kept at most; older ones are forgotten (Vim closes its sessions,
+# this only bounds results that were never shown)
+MAX_SESSIONS = 4
+
+# Module-level state
+_sessions: Dict[int, ReviewSession] = {}
+_next_id: int = 1
+# Sessions are created on result worker threads too
+_lock = threading.Lock()
+
+
+def create(
+    issues: List[ReviewIssue],
+    lines: Optional[List[str]] = None,
+    spans: Optional[List[Tuple[int, int]]] = None,
+) -> ReviewSession:
+    """
+    Start a session for a review about to be shown.
+
+    Args:
+        issues: Issues in display order
+        lines: Rendered review lines, if already formatted
+        spans: Fold line numbers of each issue in those lines
+
+    Returns:
+        The new session
+    """
+    global _next_id
+    with _lock:
+        session = ReviewSession(
+            review_id=_next_id, issues=issues, lines=lines or [], spans=spans or []
+        )
+        _next_id += 1
+        _sessions[session.review_id] = session
+        while len(_sessions) > MAX_SESSIONS:
+            del _sessions[next(iter(_sessions))]
+    return session
+
+
+def get(review_id: int) -> Optional[ReviewSession]:
+    """Get a session by review id (None if unknown)."""
+    return _sessions.get(review_id)
+
+
+def latest() -> Optional[ReviewSession]:
+    """The most recently created session still tracked, if any."""
+    with _lock:
+        if not _sessions:
+            return None
+        return _sessions[max(_sessions)]
+
+
+def close(review_id: int) -> None:
+    """Forget a session."""
+    with _lock:
+        _sessions.pop(review_id, None)
+
+
+def reset() -> None:
+    """Forget all sessions."""
+    with _lock:
+        _sessions.clear()
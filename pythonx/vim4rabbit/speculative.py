@@ -0,0 +1,250 @@
+"""
+Speculative background reviews for vim4rabbit.
+
+With g:vim4rabbit_speculative enabled, saving a file (debounced by a Vim
+timer) starts an uncommitted review in the background; a save too soon
+after the previous start is deferred until the rate limit allows it, so
+the last save is always reviewed. The review's result is stored in the
+review cache under the tree's cache key, so :Rabbit review opens instantly
+if nothing changed since; the key is computed on the review's worker
+thread, so a save never waits on git. A review requested while the
+speculative run for the same tree is still going adopts that run.
+
+Module-level state + functions. Same pattern as selection.py.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from . import cache
+from .cli import JOB_DONE, JOB_RUNNING
+from .jobs import ReviewJob
+
+# Only uncommitted changes move while editing
+REVIEW_TYPE = "uncommitted"
+
+# Number of speculatively produced cache keys remembered for hit counting
+MAX_PRODUCED_KEYS = 32
+
+
+def _new_stats() -> Dict[str, int]:
+    """Zeroed counters."""
+    return {
+        "started": 0,
+        "superseded": 0,
+        "completed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "hits": 0,
+        "misses": 0,
+    }
+
+
+# Module-level state
+_job: Optional[ReviewJob] = None
+_job_key: str = ""
+_starting: Optional[ReviewJob] = None  # a start still fingerprinting its tree
+_previous_started: Optional[float] = None  # restored if _starting is skipped
+_last_key: str = ""
+_last_started: Optional[float] = None
+_deferred: Optional[tuple] = None  # maybe_start() arguments of a trailing start
+_deferred_at: float = 0.0  # when the trailing start is due
+_produced: List[str] = []
+_stats: Dict[str, int] = _new_stats()
+
+
+def maybe_start(
+    min_interval: float = 60,
+    timeout: Optional[float] = None,
+    shard_count: int = 1,
+    max_jobs: int = 0,
+    delta: bool = False,
+    output_format: str = "text",
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Start a speculative review if the tree changed since the last one.
+
+    Rate limited: less than min_interval seconds after the last start, the
+    start is deferred to the end of the interval, when poll() makes it (a
+    later save replaces it, and counts it as skipped). The review first
+    fingerprints the tree on its worker thread; poll() counts it as skipped
+    when the tree cannot be fingerprinted, when the running speculative
+    review or the last cached one is of the same tree, or when the cache
+    already holds its result. Otherwise the run for an older tree is
+    cancelled (superseded).
+
+    Args:
+        min_interval: Minimum seconds between speculative starts
+        timeout: Timeout in seconds per process (None or 0 for unlimited)
+        shard_count: Number of shards (1 for an unsharded review)
+        max_jobs: Maximum concurrent shard processes (0 for all at once)
+        delta: Re-review only files changed since the previous review
+        output_format: Parser backend ('text', 'json' or 'auto')
+        now: Current monotonic time (for testing)
+
+    Returns:
+        True if a review was started (it may still be skipped)
+    """
+    global _starting, _previous_started, _last_started, _deferred, _deferred_at
+    now = time.monotonic() if now is None else now
+
+    if _last_started is not None and now - _last_started < min_interval:
+        if _deferred is not None:
+            _stats["skipped"] += 1
+        _deferred = (min_interval, timeout, shard_count, max_jobs, delta, output_format)
+        _deferred_at = _last_started + min_interval
+        return False
+    _deferred = None
+
+    if _starting is not None:
+        # Replaced before it fingerprinted its tree
+        _starting.cancel()
+        _stats["skipped"] += 1
+    else:
+        _previous_started = _last_started
+    _starting = ReviewJob(
+        REVIEW_TYPE, timeout, shard_count, max_jobs,
+        delta=delta, output_format=output_format,
+        skip_cached=True, skip_keys=tuple(key for key in (_job_key, _last_key) if key),
+    )
+    _last_started = now
+    return True
+
+
+def _promote() -> None:
+    """Count a prepared start as skipped, or make it the running review."""
+    global _job, _job_key, _starting, _last_started, _deferred_at
+    if _starting is None or _starting.preparing:
+        return
+    job, _starting = _starting, None
+    if job.skipped:
+        # A skipped start does not count against the rate limit
+        _stats["skipped"] += 1
+        _last_started = _previous_started
+        if _deferred is not None:
+            interval = _deferred[0]
+            _deferred_at = 0.0 if _last_started is None else _last_started + interval
+        return
+    if _job is not None:
+        # The new process is already running, so both overlap until now
+        _job.cancel()
+        _stats["superseded"] += 1
+    _job = job
+    _job_key = job.cache_key
+    _stats["started"] += 1
+
+
+def poll(now: Optional[float] = None) -> bool:
+    """
+    Advance the speculative review; cache its result once it finishes.
+
+    Also makes a deferred start (see maybe_start()) once it is due, and
+    takes over a start once its tree is fingerprinted.
+
+    Args:
+        now: Current monotonic time (for testing)
+
+    Returns:
+        True while a speculative review is running, starting or deferred
+    """
+    global _job, _job_key, _last_key, _deferred
+    now = time.monotonic() if now is None else now
+    _promote()
+    if _deferred is not None and now >= _deferred_at:
+        args, _deferred = _deferred, None
+        maybe_start(*args, now=now)
+    if _job is None:
+        return _starting is not None or _deferred is not None
+    _job.poll()
+    if not _job.done:
+        return True
+
+    result = _job.result()
+    if result.success and cache.store_review(_job_key, result, int(_job.elapsed_secs)):
+        _produced.append(_job_key)
+        del _produced[:-MAX_PRODUCED_KEYS]
+        # Only a cached tree is skipped by later saves: a failed run is retried
+        _last_key = _job_key
+        _stats["completed"] += 1
+    else:
+        _stats["failed"] += 1
+    _job = None
+    _job_key = ""
+    return _starting is not None or _deferred is not None
+
+
+def claim(key: str) -> Optional[ReviewJob]:
+    """
+    Hand the running speculative review over to a requested review.
+
+    Called on a cache miss for an uncommitted review. Counts a hit if the
+    speculative run is reviewing the same tree, a miss otherwise.
+
+    Args:
+        key: Cache key of the requested review
+
+    Returns:
+        The running (or finished but not yet cached) ReviewJob for this
+        tree, or None
+    """
+    global _job, _job_key
+    _promote()
+    # The parse worker may finish the review before poll() caches it
+    if _job is not None and key and key == _job_key and _job.state in (JOB_RUNNING, JOB_DONE):
+        job = _job
+        _job = None
+        _job_key = ""
+        _stats["hits"] += 1
+        return job
+    _stats["misses"] += 1
+    return None
+
+
+def note_cache_hit(key: str) -> None:
+    """
+    Count a review served from the cache as a hit if we produced it.
+
+    Args:
+        key: Cache key that was hit
+    """
+    if key in _produced:
+        _stats["hits"] += 1
+
+
+def cancel() -> None:
+    """Cancel any running, starting or deferred speculative review."""
+    global _job, _job_key, _starting, _deferred
+    for job in (_job, _starting):
+        if job is not None:
+            job.cancel()
+    _job = None
+    _job_key = ""
+    _starting = None
+    _deferred = None
+
+
+def is_running() -> bool:
+    """Whether a speculative review is in progress (or starting)."""
+    return _job is not None or _starting is not None
+
+
+def is_deferred() -> bool:
+    """Whether a rate-limited start waits for poll()."""
+    return _deferred is not None
+
+
+def get_stats() -> Dict[str, int]:
+    """Copy of the speculative review counters."""
+    return dict(_stats)
+
+
+def reset() -> None:
+    """Cancel any run and clear all state and counters."""
+    global _last_key, _last_started, _previous_started, _produced, _stats
+    cancel()
+    _last_key = ""
+    _last_started = None
+    _previous_started = None
+    _produced = []
+    _stats = _new_stats()
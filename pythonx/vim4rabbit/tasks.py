@@ -0,0 +1,142 @@
+"""
+Background tasks for vim4rabbit.
+
+Work whose cost grows with the size of a review (building the result of a
+finished review, tracking its issues and formatting the review buffer) runs
+on a worker thread, so a huge review never stalls Vim. VimScript starts a
+task, polls it from a timer and fetches its result once it is done.
+
+Module-level state + functions keep the tasks by id.
+Same pattern as selection.py.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .cli import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_RUNNING
+
+# Module-level state
+_tasks: Dict[int, "Task"] = {}
+_next_id: int = 1
+
+
+class Task:
+    """
+    A function running on a worker thread.
+
+    The function gets the task as its first argument and may set
+    task.phase to tell VimScript what it is doing.
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any, phase: str = "") -> None:
+        """
+        Start the task.
+
+        Args:
+            func: Function to run as func(task, *args)
+            args: Further arguments of func
+            phase: Initial phase description
+        """
+        self.phase = phase
+        self.state = JOB_RUNNING
+        self.error = ""
+        self._result: Any = None
+        self._thread = threading.Thread(target=self._run, args=(func, args), daemon=True)
+        self._thread.start()
+
+    def _run(self, func: Callable[..., Any], args: tuple) -> None:
+        """Worker thread: run the function and record its outcome."""
+        try:
+            self._result = func(self, *args)
+        except Exception as e:
+            self.error = str(e)
+            self.state = JOB_FAILED
+        else:
+            if self.state == JOB_RUNNING:
+                self.state = JOB_DONE
+
+    @property
+    def done(self) -> bool:
+        """Whether the task has finished or been cancelled."""
+        return self.state != JOB_RUNNING
+
+    def poll(self) -> dict:
+        """
+        Report progress.
+
+        Returns:
+            Dict with keys: state ('running', 'done', 'failed' or
+            'cancelled') and phase
+        """
+        return {"state": self.state, "phase": self.phase}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the task finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the task finished
+        """
+        self._thread.join(timeout)
+        return self.done
+
+    def result(self) -> Any:
+        """
+        Get the function's return value, blocking until it finishes.
+
+        Returns:
+            The return value (None if the task failed or was cancelled)
+        """
+        self.wait()
+        return self._result if self.state == JOB_DONE else None
+
+    def cancel(self) -> None:
+        """Drop the result; the worker finishes in the background."""
+        if not self.done:
+            self.state = JOB_CANCELLED
+
+
+def start(func: Callable[..., Any], *args: Any, phase: str = "") -> int:
+    """
+    Start a task.
+
+    Args:
+        func: Function to run as func(task, *args)
+        args: Further arguments of func
+        phase: Initial phase description
+
+    Returns:
+        Task id
+    """
+    global _next_id
+    task_id = _next_id
+    _next_id += 1
+    _tasks[task_id] = Task(func, *args, phase=phase)
+    return task_id
+
+
+def get(task_id: int) -> Optional[Task]:
+    """Get a task by id (None if unknown)."""
+    return _tasks.get(task_id)
+
+
+def pop(task_id: int) -> Optional[Task]:
+    """Forget a task and return it (None if unknown)."""
+    return _tasks.pop(task_id, None)
+
+
+def latest() -> Optional[Task]:
+    """The most recently started task still tracked, if any."""
+    if not _tasks:
+        return None
+    return _tasks[max(_tasks)]
+
+
+def cancel(task_id: int) -> None:
+    """Cancel a task and forget it."""
+    task = pop(task_id)
+    if task is not None:
+        task.cancel()
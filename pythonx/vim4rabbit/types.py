@@ -4,34 +4,206 @@ Data types for vim4rabbit.
 This module contains dataclasses used throughout the plugin.
 """
 
+import sys
+import threading
+from array import array
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ReviewOutput:
+    """
+    Append-only raw CLI output, shared by the issues parsed from it.
+
+    Chunks are joined into one string only when the text is read, so a
+    streaming review keeps a single copy of its output however many
+    chunks it arrives in. Appending and reading are thread-safe: the parse
+    worker appends while Vim reads the issues parsed so far.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        """Initialize with optional initial text."""
+        self._text = text
+        self._chunks: List[str] = []
+        self._length = len(text)
+        self._lock = threading.Lock()
+
+    def append(self, chunk: str) -> None:
+        """Append a chunk of output."""
+        with self._lock:
+            if not self._length:
+                self._text = chunk  # no copy for a single chunk
+            else:
+                self._chunks.append(chunk)
+            self._length += len(chunk)
+
+    @property
+    def text(self) -> str:
+        """The whole output so far."""
+        with self._lock:
+            if self._chunks:
+                self._text = "".join([self._text] + self._chunks)
+                self._chunks = []
+            return self._text
+
+    def __len__(self) -> int:
+        """Number of characters so far."""
+        return self._length
+
+
+# Summaries longer than this are truncated with "..."
+SUMMARY_MAX_LEN = 60
+
+
+def truncate_summary(summary: str) -> str:
+    """Truncate a summary to SUMMARY_MAX_LEN characters."""
+    if len(summary) > SUMMARY_MAX_LEN:
+        return summary[:SUMMARY_MAX_LEN - 3] + "..."
+    return summary
 
 
-@dataclass
 class ReviewIssue:
-    """A single review issue from CodeRabbit output."""
-    lines: List[str] = field(default_factory=list)
-    file_path: str = ""
-    line_range: str = ""
-    issue_type: str = ""
-    summary: str = ""
-    prompt: str = ""  # AI prompt for implementing the fix
+    """
+    A single review issue from CodeRabbit output.
+
+    Issues built by the parser hold no text of their own: they keep the
+    shared ReviewOutput plus the offsets of the issue and of its summary and
+    prompt (packed in one array), and materialize lines, summary and prompt
+    on each access. Issues built from values (e.g. loaded from the cache)
+    store their lines as a tuple. File paths and issue types repeat across a
+    review, so they are interned: issues of one file share one string.
+    """
+
+    __slots__ = (
+        "file_path", "line_range", "issue_type",
+        "_lines", "_summary", "_prompt", "_output", "_spans",
+    )
+
+    def __init__(
+        self,
+        lines: Optional[List[str]] = None,
+        file_path: str = "",
+        line_range: str = "",
+        issue_type: str = "",
+        summary: str = "",
+        prompt: str = "",  # AI prompt for implementing the fix
+    ) -> None:
+        """Initialize an issue from values."""
+        self.file_path = sys.intern(file_path)
+        self.line_range = line_range
+        self.issue_type = sys.intern(issue_type)
+        self._lines: Optional[Tuple[str, ...]] = tuple(lines) if lines is not None else ()
+        self._summary = summary
+        self._prompt = prompt
+        self._output: Optional[ReviewOutput] = None
+        # Issue start/end, summary start/end, then start/end of each prompt line
+        self._spans: Optional[array] = None
+
+    @classmethod
+    def from_output(
+        cls,
+        output: ReviewOutput,
+        span: Tuple[int, int],
+        file_path: str = "",
+        line_range: str = "",
+        issue_type: str = "",
+        summary_span: Tuple[int, int] = (0, 0),
+        prompt_spans: Tuple[Tuple[int, int], ...] = (),
+    ) -> "ReviewIssue":
+        """
+        Build an issue backed by offsets into a shared output.
+
+        Args:
+            output: Raw output the offsets refer to
+            span: (start, end) of the issue's lines, without the final newline
+            file_path: File path field
+            line_range: Normalized line range field
+            issue_type: Type field
+            summary_span: (start, end) of the untruncated summary
+            prompt_spans: (start, end) of each prompt line
+        """
+        issue = cls(file_path=file_path, line_range=line_range, issue_type=issue_type)
+        issue._lines = None
+        issue._output = output
+        issue._spans = array("q", span + summary_span)
+        for prompt_span in prompt_spans:
+            issue._spans.extend(prompt_span)
+        return issue
+
+    @property
+    def lines(self) -> List[str]:
+        """Lines of the issue, trailing whitespace trimmed."""
+        if self._output is None:
+            return list(self._lines)
+        start, end = self._spans[0], self._spans[1]
+        return [line.rstrip() for line in self._output.text[start:end].split("\n")]
+
+    @property
+    def summary(self) -> str:
+        """One-line summary (truncated)."""
+        if self._output is None:
+            return self._summary
+        start, end = self._spans[2], self._spans[3]
+        return truncate_summary(self._output.text[start:end])
+
+    @property
+    def prompt(self) -> str:
+        """AI prompt for implementing the fix."""
+        if self._output is None:
+            return self._prompt
+        text = self._output.text
+        spans = self._spans
+        return "\n".join(text[spans[i]:spans[i + 1]] for i in range(4, len(spans), 2))
+
+    def __eq__(self, other: object) -> bool:
+        """Issues are equal when all their fields are."""
+        if not isinstance(other, ReviewIssue):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        """Readable representation with every field."""
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"ReviewIssue({fields})"
 
     def to_list(self) -> List[str]:
         """Convert to list for Vim serialization."""
         return self.lines
 
-    def to_dict(self) -> dict:
-        """Convert to dict for Vim serialization with full metadata."""
-        return {
-            "lines": self.lines,
+    def to_dict(self, bodies: bool = True) -> dict:
+        """
+        Convert to dict for Vim serialization with full metadata.
+
+        Args:
+            bodies: Include the issue's lines (left out for Vim when the
+                    lines are rendered anyway)
+        """
+        # Building the lines costs a list per issue: skip it without bodies
+        data = {"lines": self.lines} if bodies else {}
+        data.update({
             "file_path": self.file_path,
             "line_range": self.line_range,
             "issue_type": self.issue_type,
             "summary": self.summary,
             "prompt": self.prompt,
-        }
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReviewIssue":
+        """Build an issue from a dict produced by to_dict()."""
+        return cls(
+            lines=data.get("lines", []),
+            file_path=data.get("file_path", ""),
+            line_range=data.get("line_range", ""),
+            issue_type=data.get("issue_type", ""),
+            summary=data.get("summary", ""),
+            prompt=data.get("prompt", ""),
+        )
+
+
+# Version of the compact ReviewResult.to_dict() shape sent to Vim
+WIRE_VERSION = 2
 
 
 @dataclass
@@ -41,12 +213,200 @@ class ReviewResult:
     issues: List[ReviewIssue] = field(default_factory=list)
     error_message: str = ""
     raw_output: str = ""
+    # Content hash of each reviewed changed file (for delta reviews)
+    file_hashes: Dict[str, str] = field(default_factory=dict)
 
-    def to_dict(self) -> dict:
-        """Convert to dict for Vim serialization."""
+    def to_dict(self, legacy: bool = False, bodies: bool = True) -> dict:
+        """
+        Convert to dict for Vim serialization.
+
+        The compact shape (version WIRE_VERSION) sends every issue once, in
+        issues_data. The legacy shape has no version key and repeats every
+        issue's lines in issues, a list of line lists.
+
+        Args:
+            legacy: Use the legacy shape
+            bodies: Include each issue's lines in issues_data (compact shape)
+        """
+        if legacy:
+            return {
+                "success": self.success,
+                "issues": [issue.to_list() for issue in self.issues],
+                "issues_data": [issue.to_dict() for issue in self.issues],
+                "error_message": self.error_message,
+            }
         return {
+            "version": WIRE_VERSION,
             "success": self.success,
-            "issues": [issue.to_list() for issue in self.issues],
-            "issues_data": [issue.to_dict() for issue in self.issues],
+            "issues_data": [issue.to_dict(bodies) for issue in self.issues],
             "error_message": self.error_message,
         }
+
+
+@dataclass
+class ReviewSession:
+    """A review on display: its issues, rendered lines and selections."""
+    review_id: int = 0
+    issues: List[ReviewIssue] = field(default_factory=list)  # in display order
+    lines: List[str] = field(default_factory=list)  # review buffer lines
+    spans: List[Tuple[int, int]] = field(default_factory=list)  # issue fold line numbers
+    selections: Set[int] = field(default_factory=set)  # 1-based issue numbers
+
+    def issue(self, issue_num: int) -> Optional[ReviewIssue]:
+        """Issue by 1-based number (None if out of range)."""
+        if 1 <= issue_num <= len(self.issues):
+            return self.issues[issue_num - 1]
+        return None
+
+
+@dataclass
+class ReviewShard:
+    """One partition of a sharded review, with its per-shard timing."""
+    index: int = 0
+    files: List[str] = field(default_factory=list)
+    cwd: str = ""  # worktree the shard's coderabbit process runs in
+    exit_code: int = -1  # -1 until the shard's process has exited
+    elapsed_secs: float = 0.0
+    issue_count: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dict for Vim serialization."""
+        return {
+            "index": self.index,
+            "files": self.files,
+            "cwd": self.cwd,
+            "exit_code": self.exit_code,
+            "elapsed_secs": self.elapsed_secs,
+            "issue_count": self.issue_count,
+        }
+
+
+@dataclass
+class DeltaPlan:
+    """Which changed files a delta review re-reviews and which issues it keeps."""
+    root: str = ""
+    file_hashes: Dict[str, str] = field(default_factory=dict)  # current hashes
+    changed: List[str] = field(default_factory=list)  # files to re-review
+    carried: List[ReviewIssue] = field(default_factory=list)  # kept issues
+    full: bool = True  # no usable baseline: review every changed file
+
+
+@dataclass
+class ReviewMetrics:
+    """Per-phase latencies of one review, in seconds since it started."""
+    review_type: str = ""
+    spawn: Optional[float] = None  # coderabbit process started
+    first_byte: Optional[float] = None  # first output byte received
+    first_issue: Optional[float] = None  # first issue completed
+    last_byte: Optional[float] = None  # last output byte received
+    total: Optional[float] = None  # review finished
+    parse: float = 0.0  # time spent parsing output (duration)
+    format: Optional[float] = None  # format_review_output() (duration)
+    render: Optional[float] = None  # review buffer render in Vim (duration)
+    issue_times: List[float] = field(default_factory=list)
+    bytes_read: int = 0
+    issue_count: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dict for Vim serialization."""
+        return {
+            "review_type": self.review_type,
+            "spawn": self.spawn,
+            "first_byte": self.first_byte,
+            "first_issue": self.first_issue,
+            "last_byte": self.last_byte,
+            "total": self.total,
+            "parse": self.parse,
+            "format": self.format,
+            "render": self.render,
+            "issue_times": self.issue_times,
+            "bytes_read": self.bytes_read,
+            "issue_count": self.issue_count,
+        }
+
+
+@dataclass
+class IssueTracking:
+    """Issues of a review classified against the previous review of the branch."""
+    statuses: List[str] = field(default_factory=list)  # 'new'/'persisting' per issue
+    resolved: List[str] = field(default_factory=list)  # titles of resolved issues
+    known: bool = False  # False on the first review of the branch
+
+    @property
+    def new_count(self) -> int:
+        """Number of new issues."""
+        return self.statuses.count("new")
+
+    @property
+    def persisting_count(self) -> int:
+        """Number of issues already reported by the previous review."""
+        return self.statuses.count("persisting")
+
+    def to_dict(self) -> dict:
+        """Convert to dict for Vim serialization."""
+        return {
+            "statuses": self.statuses,
+            "resolved": self.resolved,
+            "known": self.known,
+            "new": self.new_count,
+            "persisting": self.persisting_count,
+        }
+
+
+@dataclass
+class PatchHunk:
+    """One hunk of a proposed diff: lines prefixed ' ' (context), '-' or '+'."""
+    lines: List[str] = field(default_factory=list)
+    start: int = 0  # 1-based line hint from an @@ header (0 if none)
+
+    @property
+    def old_lines(self) -> List[str]:
+        """Context and removed lines: what the hunk expects in the file."""
+        return [line[1:] for line in self.lines if line[:1] != "+"]
+
+    @property
+    def new_lines(self) -> List[str]:
+        """Context and added lines: what the hunk leaves in the file."""
+        return [line[1:] for line in self.lines if line[:1] != "-"]
+
+
+@dataclass
+class ProposedPatch:
+    """The proposed fix of an issue, as hunks against one file."""
+    file_path: str = ""
+    hunks: List[PatchHunk] = field(default_factory=list)
+    start: int = 0  # first line of the issue, used when hunks have no hint
+
+
+@dataclass
+class HunkResult:
+    """Outcome of applying one hunk."""
+    index: int = 0  # 1-based hunk number
+    applied: bool = False
+    line: int = 0  # 1-based line the hunk was applied at
+    fuzz: int = 0  # context lines ignored at each end to make it apply
+    message: str = ""  # why the hunk failed
+
+
+@dataclass
+class PatchResult:
+    """Outcome of applying the proposed fix of one issue."""
+    issue: int = 0  # 1-based issue number in the review
+    file_path: str = ""
+    hunks: List[HunkResult] = field(default_factory=list)
+    error: str = ""  # set when the file could not be patched at all
+
+    @property
+    def applied_count(self) -> int:
+        """Number of hunks applied."""
+        return sum(1 for hunk in self.hunks if hunk.applied)
+
+    def to_dict(self) -> dict:
+        """Convert to dict for Vim serialization."""
+        return {
+            "issue": self.issue,
+            "file_path": self.file_path,
+            "applied": self.applied_count,
+            "failed": len(self.hunks) - self.applied_count,
+            "error": self.error,
+        }
@@ -1 +1,83 @@
 """Pytest configuration and shared fixtures."""
+
+import os
+import stat
+import subprocess
+
+import pytest
+
+# Stand-in for the coderabbit CLI: one issue per changed file in its cwd
+FAKE_CODERABBIT = """#!/bin/sh
+git status --porcelain --untracked-files=all | while read -r status path; do
+    echo "============================================================"
+    echo "File: $path"
+    echo "Line: 1"
+    echo "Type: potential_issue"
+    echo "Comment: Check $path"
+done
+"""
+
+
+def run_git(cwd, *args):
+    """Run a git command in cwd, failing the test on error."""
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+class FakeBuffer(list):
+    """Stand-in for a vim.Buffer: a list of lines with options and vars."""
+
+    def __init__(self, lines, modifiable=False):
+        super().__init__(lines)
+        self.options = {"modifiable": modifiable}
+        self.vars = {"changedtick": 1}
+        self.writes = 0  # lines written
+
+    def _change(self):
+        if not self.options["modifiable"]:
+            raise RuntimeError("buffer is not modifiable")
+        self.vars["changedtick"] += 1
+
+    def __setitem__(self, index, value):
+        self._change()
+        self.writes += len(value) if isinstance(index, slice) else 1
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._change()
+        super().__delitem__(index)
+
+
+class FakeVim:
+    """Stand-in for the vim module with numbered buffers."""
+
+    def __init__(self, buffers):
+        self.buffers = buffers
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a git repository with one commit containing a.py."""
+    run_git(tmp_path, "init", "-q")
+    run_git(tmp_path, "config", "user.email", "test@example.com")
+    run_git(tmp_path, "config", "user.name", "Test")
+    (tmp_path / "a.py").write_text("print('a')\n")
+    run_git(tmp_path, "add", "a.py")
+    run_git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+@pytest.fixture
+def fake_coderabbit(tmp_path_factory, monkeypatch):
+    """Put a fake coderabbit executable first on PATH."""
+    bin_dir = tmp_path_factory.mktemp("bin")
+    script = bin_dir / "coderabbit"
+    script.write_text(FAKE_CODERABBIT)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep review caches and fingerprint indexes out of the user's cache."""
+    monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
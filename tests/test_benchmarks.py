@@ -0,0 +1,194 @@
+"""Tests for the parser benchmark corpus and checks."""
+
+from benchmarks import bench_classifier, bench_memory, bench_roundtrip, bench_startup, bench_wire
+from benchmarks.bench_parser import check_scaling, compare_to_baseline, measure
+from benchmarks.corpus import generate
+from vim4rabbit.parser import parse_review_issues
+from vim4rabbit.types import ReviewIssue
+
+
+def fake_results(secs_per_issue):
+    """measure()-shaped results with the given per-issue times by size."""
+    return {
+        size: {"parse_review_issues": {"secs": per_issue * size, "mb_per_sec": 10.0}}
+        for size, per_issue in secs_per_issue.items()
+    }
+
+
+class TestCorpus:
+    """Tests for the synthetic output generator."""
+
+    def test_seeded(self):
+        """Test that the same seed gives the same output."""
+        assert generate(20, seed=3) == generate(20, seed=3)
+        assert generate(20, seed=3) != generate(20, seed=4)
+
+    def test_parses_to_issue_count(self):
+        """Test that the parser finds every generated issue with its fields."""
+        issues = parse_review_issues(generate(200, seed=1))
+        assert len(issues) == 200
+        assert all(issue.file_path.startswith("src/") for issue in issues)
+        assert all(issue.line_range and issue.summary for issue in issues)
+
+    def test_preamble_optional(self):
+        """Test that the preamble can be left out."""
+        assert generate(1, preamble=False).startswith("=" * 76)
+        assert len(parse_review_issues(generate(5, diff_lines=(0, 0)))) == 5
+
+
+class TestBenchmarkChecks:
+    """Tests for the scaling and baseline checks."""
+
+    def test_measure(self):
+        """Test that measure() reports both benchmarks."""
+        results = measure(10, repeat=1)
+        assert set(results) == {"parse_review_issues", "parse_issue_metadata"}
+        assert results["parse_review_issues"]["issues_per_sec"] > 0
+
+    def test_linear_scaling_passes(self):
+        """Test that constant time per issue passes."""
+        assert check_scaling(fake_results({10: 1.0, 1000: 1e-5, 10000: 1.2e-5})) == []
+
+    def test_superlinear_scaling_fails(self):
+        """Test that time per issue growing past the limit fails."""
+        failures = check_scaling(fake_results({1000: 1e-5, 100000: 5e-5}))
+        assert len(failures) == 1
+        assert "5.00x" in failures[0]
+
+    def test_baseline_regression(self):
+        """Test that a throughput drop beyond the tolerance fails."""
+        results = fake_results({1000: 1e-5})
+        assert compare_to_baseline(results, {"1000": {
+            "parse_review_issues": {"mb_per_sec": 12.0}}}) == []
+        failures = compare_to_baseline(results, {"1000": {
+            "parse_review_issues": {"mb_per_sec": 20.0}}})
+        assert failures == [
+            "parse_review_issues @ 1000 issues: 10.0 MB/s, baseline 20.0 MB/s"
+        ]
+
+    def test_missing_baseline_entries_ignored(self):
+        """Test that sizes without a baseline are not compared."""
+        assert compare_to_baseline(fake_results({10: 1.0}), {}) == []
+
+
+class TestClassifierBenchmark:
+    """Tests for the line classifier benchmark."""
+
+    def test_measure(self):
+        """Test that both approaches are timed on agreeing classifications."""
+        results = bench_classifier.measure(20, repeat=1)
+        assert set(results) == {"classify", "preamble"}
+        assert results["classify"]["speedup"] > 0
+
+    def test_legacy_preamble(self):
+        """Test that the legacy preamble check matches the classifier."""
+        assert bench_classifier.legacy_is_preamble("Setting up")
+        assert not bench_classifier.legacy_is_preamble("File: a.py")
+
+
+class TestWireBenchmark:
+    """Tests for the review payload benchmark."""
+
+    def test_compact_below_half(self):
+        """Test that the compact shape sends less than half the bytes."""
+        results = bench_wire.measure([20])
+        assert results[20]["compact_bytes"] < results[20]["legacy_bytes"] * bench_wire.MAX_RATIO
+
+    def test_payload_bytes(self):
+        """Test that sizes are UTF-8 bytes of compact JSON."""
+        assert bench_wire.payload_bytes({"a": ["é"]}) == len('{"a":["é"]}'.encode("utf-8"))
+
+
+class TestMemoryBenchmark:
+    """Tests for the review issue memory benchmark."""
+
+    def test_values_smaller_than_dataclass(self):
+        """Test that value issues keep less memory alive than the dataclass."""
+        results = bench_memory.measure(200)
+        assert set(results) == {"dataclass", "values", "offsets"}
+        assert results["values"]["bytes_per_issue"] < results["dataclass"]["bytes_per_issue"]
+        assert results["offsets"]["bytes_per_issue"] < results["values"]["bytes_per_issue"]
+
+    def test_legacy_from_dict(self):
+        """Test that the legacy issue holds the same fields as ReviewIssue."""
+        data = ReviewIssue(lines=["a"], file_path="x.py", summary="s").to_dict()
+        assert bench_memory.legacy_from_dict(data).__dict__ == data
+
+
+class TestStartupBenchmark:
+    """Tests for the startup cost benchmark."""
+
+    def test_games_not_imported(self):
+        """Test that the package is measured without its game packages."""
+        results = bench_startup.measure_python(runs=1)
+        assert results["games_imported"] == []
+        assert results["import_us"] > 0
+        assert results["games_us"] > 0
+
+    def test_parse_import_times(self):
+        """Test that cumulative times are read from -X importtime output."""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   vim4rabbit.types\n"
+            "import time:       300 |       4500 | vim4rabbit\n"
+        )
+        assert bench_startup.parse_import_times(stderr) == {
+            "vim4rabbit.types": 120,
+            "vim4rabbit": 4500,
+        }
+
+    def test_parse_sourcing_times(self):
+        """Test that script times are read from a --startuptime log."""
+        log = (
+            "times in msec\n"
+            "000.008  000.008: --- VIM STARTING ---\n"
+            "012.500  000.310  000.290: sourcing /p/plugin/vim4rabbit.vim\n"
+            "090.100  061.200  004.000: sourcing /p/autoload/vim4rabbit.vim\n"
+        )
+        assert bench_startup.parse_sourcing_times(log) == {
+            "/p/plugin/vim4rabbit.vim": 0.31,
+            "/p/autoload/vim4rabbit.vim": 61.2,
+        }
+
+
+class TestRoundtripBenchmark:
+    """Tests for the py3eval() round-trip benchmark."""
+
+    def test_measure(self):
+        """Test that every call is measured and review ids keep payloads small."""
+        results = bench_roundtrip.measure([10], [(40, 12)], repeat=1)
+        assert set(results) == {"10 issues", "40x12"}
+        review = results["10 issues"]
+        for lines_form, id_form in [
+            ("find_issue_at_line(lines)", "find_issue_at_line(review_id)"),
+            ("build_claude_prompt(issues_data)", "build_claude_prompt(review_id)"),
+        ]:
+            assert review[id_form]["arg_bytes"] < review[lines_form]["arg_bytes"]
+            assert review[id_form]["result_bytes"] == review[lines_form]["result_bytes"]
+        assert review["take_review_result"]["result_bytes"] > 1000
+        frames = results["40x12"]
+        changes, lines = frames["tick_game(p, changes)"], frames["tick_game(p, lines)"]
+        assert changes["result_bytes"] < lines["result_bytes"]
+
+    def test_check_constant_size(self):
+        """Test that a constant-size call growing with the review fails."""
+        def results(find_bytes):
+            numbers = {"arg_bytes": 40, "result_bytes": 100}
+            return {
+                "find_issue_at_line(review_id)": dict(numbers, arg_bytes=find_bytes),
+                "checkbox_lines(review_id)": numbers,
+            }
+
+        assert bench_roundtrip.check_constant_size(
+            {"10 issues": results(40), "10000 issues": results(44)}
+        ) == []
+        failures = bench_roundtrip.check_constant_size(
+            {"10 issues": results(40), "10000 issues": results(400)}
+        )
+        assert failures == [
+            "find_issue_at_line(review_id): arg_bytes 40 at 10 issues, 400 at 10000 issues"
+        ]
+
+    def test_vim_string(self):
+        """Test that strings are quoted like Vim's string()."""
+        assert bench_roundtrip.vim_string(["a", "it's"]) == "['a', 'it''s']"
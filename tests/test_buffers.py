@@ -0,0 +1,101 @@
+"""Tests for vim4rabbit.buffers module."""
+
+import pytest
+from vim4rabbit import buffers
+
+from .conftest import FakeBuffer, FakeVim
+
+
+@pytest.fixture
+def fake_vim(monkeypatch):
+    """Run with a vim module holding buffer 3."""
+    vim = FakeVim({3: FakeBuffer(["old", "lines"])})
+    monkeypatch.setattr(buffers, "vim", vim)
+    yield vim
+    buffers.forget(3)
+
+
+class TestWriteLines:
+    """Tests for write_lines."""
+
+    def test_without_vim(self, monkeypatch):
+        """Test that nothing is written outside Vim."""
+        monkeypatch.setattr(buffers, "vim", None)
+        assert buffers.available() is False
+        assert buffers.write_lines(3, ["a"]) is False
+
+    def test_replaces_lines(self, fake_vim):
+        """Test that the lines are replaced and 'modifiable' restored."""
+        assert buffers.available() is True
+        assert buffers.write_lines(3, ["new"]) is True
+        assert fake_vim.buffers[3] == ["new"]
+        assert fake_vim.buffers[3].options["modifiable"] is False
+
+    def test_modifiable_kept(self, fake_vim):
+        """Test that a modifiable buffer stays modifiable."""
+        fake_vim.buffers[3].options["modifiable"] = True
+        buffers.write_lines(3, ["new"])
+        assert fake_vim.buffers[3].options["modifiable"] is True
+
+    def test_lines_not_kept(self, fake_vim):
+        """Test that written lines are not kept as the buffer's frame."""
+        buffers.update(3, ["frame", "one"])
+        buffers.write_lines(3, ["review"] * 100)
+        assert 3 not in buffers._frames
+        assert buffers.update(3, ["frame", "two"], direct=False) == {
+            "changes": [[1, ["frame", "two"]]], "delete_from": 3,
+        }
+
+    def test_unknown_buffer(self, fake_vim):
+        """Test that missing buffers and buffer 0 are not written."""
+        assert buffers.write_lines(4, ["new"]) is False
+        assert buffers.write_lines(0, ["new"]) is False
+        assert fake_vim.buffers[3].writes == 0
+
+
+class TestFrameChanges:
+    """Tests for frame_changes."""
+
+    def test_identical(self):
+        """Test that an unchanged frame needs no changes."""
+        assert buffers.frame_changes(["a", "b"], ["a", "b"]) == ([], 0)
+
+    def test_changed_ranges(self):
+        """Test that each run of changed lines is one change."""
+        old = ["a", "b", "c", "d", "e"]
+        new = ["a", "B", "C", "d", "E"]
+        assert buffers.frame_changes(old, new) == ([[2, ["B", "C"]], [5, ["E"]]], 0)
+
+    def test_longer_and_shorter(self):
+        """Test that added lines extend the last change and removed ones are deleted."""
+        assert buffers.frame_changes(["a"], ["a", "b", "c"]) == ([[2, ["b", "c"]]], 0)
+        assert buffers.frame_changes(["a", "b", "c"], ["x"]) == ([[1, ["x"]]], 2)
+        assert buffers.frame_changes([], ["a"]) == ([[1, ["a"]]], 0)
+
+
+class TestUpdate:
+    """Tests for update."""
+
+    def test_writes_only_changes(self, fake_vim):
+        """Test that a second frame writes only its changed lines."""
+        buffer = fake_vim.buffers[3]
+        assert buffers.update(3, ["a", "b", "c"]) == {"changes": [], "delete_from": 0}
+        assert buffer == ["a", "b", "c"]
+        written = buffer.writes
+        buffers.update(3, ["a", "B"])
+        assert buffer == ["a", "B"]
+        assert buffer.writes - written == 1
+        assert buffer.options["modifiable"] is False
+
+    def test_returns_changes_when_not_direct(self, fake_vim):
+        """Test that changes are returned and the buffer left alone."""
+        assert buffers.update(3, ["a"], direct=False) == {"changes": [[1, ["a"]]], "delete_from": 2}
+        assert buffers.update(3, ["b"], direct=False) == {"changes": [[1, ["b"]]], "delete_from": 0}
+        assert fake_vim.buffers[3] == ["old", "lines"]
+
+    def test_without_vim(self, monkeypatch):
+        """Test that changes are returned outside Vim."""
+        monkeypatch.setattr(buffers, "vim", None)
+        assert buffers.update(8, ["a"])["changes"] == [[1, ["a"]]]
+        assert buffers.update(8, ["a"])["changes"] == []
+        buffers.forget(8)
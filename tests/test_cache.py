@@ -0,0 +1,198 @@
+"""Tests for vim4rabbit.cache module."""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from vim4rabbit import cache
+from vim4rabbit.types import ReviewIssue, ReviewResult
+
+
+def _result(*summaries):
+    """Build a successful ReviewResult with one issue per summary."""
+    return ReviewResult(
+        success=True,
+        issues=[ReviewIssue(lines=[s], file_path="f.py", summary=s) for s in summaries],
+    )
+
+
+def _age(path, secs):
+    """Backdate a file's mtime by the given number of seconds."""
+    stamp = time.time() - secs
+    os.utime(path, (stamp, stamp))
+
+
+class TestGetCacheDir:
+    """Tests for get_cache_dir function."""
+
+    def test_override_env(self, monkeypatch, tmp_path):
+        """Test that VIM4RABBIT_CACHE_DIR takes precedence."""
+        monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path))
+        assert cache.get_cache_dir() == tmp_path
+
+    def test_xdg_cache_home(self, monkeypatch, tmp_path):
+        """Test that XDG_CACHE_HOME is honored."""
+        monkeypatch.delenv("VIM4RABBIT_CACHE_DIR", raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache.get_cache_dir() == tmp_path / "vim4rabbit" / "reviews"
+
+
+class TestCacheKey:
+    """Tests for make_cache_key and compute_cache_key."""
+
+    def test_key_depends_on_every_input(self):
+        """Test that each input changes the key."""
+        base = cache.make_cache_key("uncommitted", "abc", "d1")
+        assert base == cache.make_cache_key("uncommitted", "abc", "d1")
+        assert base != cache.make_cache_key("committed", "abc", "d1")
+        assert base != cache.make_cache_key("uncommitted", "abd", "d1")
+        assert base != cache.make_cache_key("uncommitted", "abc", "d2")
+
+    @patch("vim4rabbit.cache.get_head_sha", return_value="")
+    def test_no_key_outside_repo(self, mock_head):
+        """Test that an unknown HEAD produces no key."""
+        assert cache.compute_cache_key("uncommitted") == ""
+
+    @patch("vim4rabbit.cache.get_diff_fingerprint", return_value="")
+    @patch("vim4rabbit.cache.get_head_sha", return_value="abc")
+    def test_no_key_without_diff(self, mock_head, mock_diff):
+        """Test that an unreadable diff produces no key."""
+        assert cache.compute_cache_key("uncommitted") == ""
+
+    @patch("vim4rabbit.cache.get_diff_fingerprint", return_value="d1")
+    @patch("vim4rabbit.cache.get_head_sha", return_value="abc")
+    def test_key_from_git_state(self, mock_head, mock_diff):
+        """Test that the key combines HEAD and diff fingerprint."""
+        key = cache.compute_cache_key("all")
+        assert key == cache.make_cache_key("all", "abc", "d1")
+        mock_diff.assert_called_once_with("all", None)
+
+
+class TestStoreAndLoad:
+    """Tests for store_review and load_review."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a stored result is returned intact."""
+        result = _result("One", "Two")
+        assert cache.store_review("k1", result, 42, cache_dir=tmp_path)
+        loaded, elapsed = cache.load_review("k1", cache_dir=tmp_path)
+        assert loaded.success is True
+        assert loaded.issues == result.issues
+        assert elapsed == 42
+
+    def test_file_hashes_round_trip(self, tmp_path):
+        """Test that file hashes for delta reviews are kept."""
+        result = _result("One")
+        result.file_hashes = {"a.py": "abc"}
+        cache.store_review("k1", result, cache_dir=tmp_path)
+        loaded, _ = cache.load_review("k1", cache_dir=tmp_path)
+        assert loaded.file_hashes == {"a.py": "abc"}
+
+    def test_miss_for_unknown_key(self, tmp_path):
+        """Test that an unknown key is a miss."""
+        assert cache.load_review("missing", cache_dir=tmp_path) is None
+
+    def test_empty_key_never_cached(self, tmp_path):
+        """Test that an empty key is neither stored nor loaded."""
+        assert cache.store_review("", _result("One"), cache_dir=tmp_path) is False
+        assert cache.load_review("", cache_dir=tmp_path) is None
+
+    def test_failed_result_not_stored(self, tmp_path):
+        """Test that failed reviews are not cached."""
+        failed = ReviewResult(success=False, error_message="boom")
+        assert cache.store_review("k1", failed, cache_dir=tmp_path) is False
+        assert list(tmp_path.iterdir()) == []
+
+    def test_expired_entry_is_miss(self, tmp_path):
+        """Test that entries older than max_age_secs are misses."""
+        cache.store_review("k1", _result("One"), cache_dir=tmp_path)
+        _age(tmp_path / "k1.json", 120)
+        assert cache.load_review("k1", cache_dir=tmp_path, max_age_secs=60) is None
+        assert cache.load_review("k1", cache_dir=tmp_path, max_age_secs=600)
+
+    def test_corrupt_entry_is_miss(self, tmp_path):
+        """Test that unreadable JSON is treated as a miss."""
+        (tmp_path / "k1.json").write_text("{not json")
+        assert cache.load_review("k1", cache_dir=tmp_path) is None
+
+    def test_version_mismatch_is_miss(self, tmp_path):
+        """Test that entries from another cache version are ignored."""
+        cache.store_review("k1", _result("One"), cache_dir=tmp_path)
+        with patch.object(cache, "CACHE_VERSION", cache.CACHE_VERSION + 1):
+            assert cache.load_review("k1", cache_dir=tmp_path) is None
+
+
+class TestHasReview:
+    """Tests for has_review."""
+
+    def test_stored_entry(self, tmp_path):
+        """Test that a stored result is found."""
+        cache.store_review("k1", _result("One"), cache_dir=tmp_path)
+        assert cache.has_review("k1", cache_dir=tmp_path) is True
+
+    def test_unknown_and_empty_key(self, tmp_path):
+        """Test that unknown and empty keys are not found."""
+        assert cache.has_review("missing", cache_dir=tmp_path) is False
+        assert cache.has_review("", cache_dir=tmp_path) is False
+
+    def test_expired_entry(self, tmp_path):
+        """Test that entries older than max_age_secs are not found."""
+        cache.store_review("k1", _result("One"), cache_dir=tmp_path)
+        _age(tmp_path / "k1.json", 120)
+        assert cache.has_review("k1", cache_dir=tmp_path, max_age_secs=60) is False
+        assert cache.has_review("k1", cache_dir=tmp_path, max_age_secs=600) is True
+
+    def test_entry_not_read(self, tmp_path):
+        """Test that only the entry's existence is checked."""
+        (tmp_path / "k1.json").write_text("{not json")
+        assert cache.has_review("k1", cache_dir=tmp_path) is True
+
+class TestEvict:
+    """Tests for evict and clear."""
+
+    def test_evicts_oldest_beyond_max_entries(self, tmp_path):
+        """Test that only the newest max_entries entries are kept."""
+        for i in range(4):
+            cache.store_review(f"k{i}", _result("x"), cache_dir=tmp_path,
+                               max_entries=10)
+            _age(tmp_path / f"k{i}.json", 100 - i)
+        removed = cache.evict(tmp_path, max_entries=2)
+        assert removed == 2
+        assert sorted(p.name for p in tmp_path.glob("*.json")) == ["k2.json", "k3.json"]
+
+    def test_evicts_expired(self, tmp_path):
+        """Test that expired entries are removed."""
+        cache.store_review("old", _result("x"), cache_dir=tmp_path)
+        cache.store_review("new", _result("x"), cache_dir=tmp_path)
+        _age(tmp_path / "old.json", 1000)
+        assert cache.evict(tmp_path, max_age_secs=500) == 1
+        assert [p.name for p in tmp_path.glob("*.json")] == ["new.json"]
+
+    def test_evicts_beyond_max_bytes(self, tmp_path):
+        """Test that total size is bounded by max_bytes."""
+        cache.store_review("a", _result("x" * 1000), cache_dir=tmp_path)
+        _age(tmp_path / "a.json", 10)
+        cache.store_review("b", _result("y" * 1000), cache_dir=tmp_path)
+        size = (tmp_path / "b.json").stat().st_size
+        assert cache.evict(tmp_path, max_bytes=size + 10) == 1
+        assert [p.name for p in tmp_path.glob("*.json")] == ["b.json"]
+
+    def test_store_applies_eviction(self, tmp_path):
+        """Test that storing enforces the entry limit."""
+        for i in range(3):
+            cache.store_review(f"k{i}", _result("x"), cache_dir=tmp_path,
+                               max_entries=2)
+            _age(tmp_path / f"k{i}.json", 100 - i)
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+    def test_clear(self, tmp_path):
+        """Test that clear removes every entry."""
+        cache.store_review("a", _result("x"), cache_dir=tmp_path)
+        cache.store_review("b", _result("y"), cache_dir=tmp_path)
+        assert cache.clear(tmp_path) == 2
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_missing_dir(self, tmp_path):
+        """Test that evicting a missing directory is a no-op."""
+        assert cache.evict(tmp_path / "nope") == 0
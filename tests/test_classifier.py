@@ -0,0 +1,142 @@
+"""Tests for vim4rabbit.classifier module."""
+
+import pytest
+from vim4rabbit import classifier
+from vim4rabbit.classifier import (
+    BLANK,
+    BODY,
+    DIFF,
+    FENCE,
+    FIELD,
+    PREAMBLE,
+    SEPARATOR,
+    LineClassifier,
+)
+from vim4rabbit.parser import parse_review_issues
+
+
+@pytest.fixture(autouse=True)
+def default_rules():
+    """Restore the built-in rules after each test."""
+    yield
+    classifier.set_rules({})
+
+
+class TestLineClassifier:
+    """Tests for LineClassifier.classify."""
+
+    @pytest.mark.parametrize("line,kind", [
+        ("=" * 76, SEPARATOR),
+        ("=====  ", SEPARATOR),
+        ("===== x", BODY),
+        ("====", BODY),
+        ("File: a.py", FIELD),
+        ("  Comment:", FIELD),
+        ("Prompt for AI Agent:", BODY),
+        ("```diff", FENCE),
+        ("  ~~~", FENCE),
+        ("+    added", DIFF),
+        ("-    removed", DIFF),
+        ("@@ -1,2 +1,3 @@", DIFF),
+        ("", BLANK),
+        (" \t", BLANK),
+        ("The value is read twice.", BODY),
+    ])
+    def test_kinds(self, line, kind):
+        """Test the kind of each sort of line."""
+        assert LineClassifier().classify(line) == kind
+
+    def test_prefix_checks_match_rules(self):
+        """Test that the built-in prefix checks agree with the compiled regex."""
+        lines = ["=====", "======  ", "====== =", "  =====", "File: a", " Type:x", "Files:",
+                 "```", " ~~~py", "+", "-x", "@@ -1 +1 @@", " -x", "", "\t", "Prose"]
+        builtin = LineClassifier()
+        # An extra rule that matches nothing switches to the regex
+        compiled = LineClassifier({DIFF: [r"(?!)"]})
+        assert [builtin.classify(line) for line in lines] == [
+            compiled.classify(line) for line in lines
+        ]
+
+    def test_field_name_and_value(self):
+        """Test that a field match gives its name and where its value starts."""
+        line = "  Line: 3 to 4"
+        match = LineClassifier().match(line)
+        assert match.group("name") == "Line"
+        assert line[match.end():].strip() == "3 to 4"
+
+    def test_preamble_only_when_asked(self):
+        """Test that status messages are preamble only before the first issue."""
+        c = LineClassifier()
+        assert c.classify("Analyzing changes...", preamble=True) == PREAMBLE
+        assert c.classify("Analyzing changes...") == BODY
+        # Field headers and separators are never preamble
+        assert c.classify("File: src/loading.py", preamble=True) == FIELD
+        assert c.classify("=====", preamble=True) == SEPARATOR
+
+    def test_is_preamble_ignores_case(self):
+        """Test that preamble patterns match in any case."""
+        assert LineClassifier().is_preamble("REVIEW COMPLETED")
+        assert not LineClassifier().is_preamble("Possible None dereference")
+
+
+class TestClassifyIssue:
+    """Tests for LineClassifier.classify_issue."""
+
+    def test_bullets_outside_fences_are_body(self):
+        """Test that Markdown bullets are not diff lines."""
+        kinds = LineClassifier().classify_issue(["Notes:", "- first", "+ second"])
+        assert kinds == [BODY, BODY, BODY]
+
+    def test_diff_inside_fence(self):
+        """Test that +/- lines inside a code fence are diff lines."""
+        kinds = LineClassifier().classify_issue(["```diff", "-a", "+b", "```", "- note"])
+        assert kinds == [FENCE, DIFF, DIFF, FENCE, BODY]
+
+    def test_proposed_fix_block(self):
+        """Test that a proposed fix block runs until a line that is not a diff line."""
+        kinds = LineClassifier().classify_issue([
+            "Proposed fix", "", " keep", "-a", "+b", "Afterwards:", "- note",
+        ])
+        assert kinds == [BODY, BLANK, BODY, DIFF, DIFF, BODY, BODY]
+
+
+class TestLineRules:
+    """Tests for user rules and set_rules."""
+
+    def test_extra_rules(self):
+        """Test that extra rules extend their kind."""
+        c = LineClassifier({SEPARATOR: [r"-{10,}\s*\Z"], PREAMBLE: ["queued"]})
+        assert c.classify("-" * 20) == SEPARATOR
+        assert c.classify("Queued for review", preamble=True) == PREAMBLE
+
+    def test_unknown_kind(self):
+        """Test that only extensible kinds take rules."""
+        with pytest.raises(ValueError, match="Unknown line kind"):
+            LineClassifier({FIELD: ["Severity:"]})
+
+    def test_invalid_regex(self):
+        """Test that a bad regex is reported as ValueError."""
+        with pytest.raises(ValueError, match="Invalid line rule"):
+            LineClassifier({DIFF: ["("]})
+
+    def test_set_rules(self):
+        """Test that set_rules swaps the classifier only when rules change."""
+        default = classifier.get_classifier()
+        assert classifier.set_rules({}) is default
+        custom = classifier.set_rules({SEPARATOR: [r"-{10,}"]})
+        assert classifier.get_classifier() is custom
+        assert classifier.set_rules({SEPARATOR: [r"-{10,}"]}) is custom
+
+    def test_bad_rules_keep_classifier(self):
+        """Test that invalid rules leave the classifier in use alone."""
+        default = classifier.get_classifier()
+        with pytest.raises(ValueError):
+            classifier.set_rules({DIFF: ["("]})
+        assert classifier.get_classifier() is default
+
+    def test_parser_uses_rules(self):
+        """Test that the parser splits issues on a custom separator."""
+        output = "File: a.py\nComment: One\n----------\nFile: b.py\nComment: Two\n"
+        assert len(parse_review_issues(output)) == 1
+        classifier.set_rules({SEPARATOR: [r"-{10,}\s*\Z"]})
+        assert [i.file_path for i in parse_review_issues(output)] == ["a.py", "b.py"]
@@ -1,14 +1,30 @@
 """Tests for vim4rabbit.cli module."""
 
+import os
 import subprocess
 from unittest.mock import patch, MagicMock
 
 import pytest
 from vim4rabbit.cli import (
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_RUNNING,
+    JOB_TIMEOUT,
+    ShardedReview,
+    build_review_command,
+    detect_output_format,
+    merge_shard_issues,
+    partition_files,
+    resolve_output_format,
     run_command,
     run_coderabbit,
     run_review,
+    run_sharded_review,
+    start_command,
+    start_review,
 )
+from vim4rabbit.types import ReviewIssue
 
 
 class TestRunCommand:
@@ -38,17 +54,13 @@ class TestRunCommand:
         assert exit_code == 1
         assert "timed out" in output.lower()
 
-    @patch("subprocess.run")
-    def test_stderr_only_output(self, mock_run):
+    def test_stderr_only_output(self):
         """Test command that produces stderr but no stdout."""
-        mock_run.return_value = MagicMock(
-            stdout="", stderr="error message", returncode=1
-        )
-        output, exit_code = run_command(["some_cmd"])
+        output, exit_code = run_command(["sh", "-c", "printf 'error message' >&2; exit 1"])
         assert output == "error message"
         assert exit_code == 1
 
-    @patch("subprocess.run", side_effect=Exception("unexpected failure"))
+    @patch("subprocess.Popen", side_effect=Exception("unexpected failure"))
     def test_generic_exception(self, mock_run):
         """Test catch-all exception handling."""
         output, exit_code = run_command(["some_cmd"])
@@ -56,6 +68,86 @@ class TestRunCommand:
         assert exit_code == 1
 
 
+class TestCommandJob:
+    """Tests for the non-blocking CommandJob engine."""
+
+    def test_poll_while_running_then_done(self):
+        """Test that poll reports running, then the final state."""
+        job = start_command(["sh", "-c", "sleep 0.3; echo hi"])
+        assert job.poll()["state"] == JOB_RUNNING
+        assert job.poll()["exit_code"] == -1
+        assert job.wait(10) is True
+        status = job.poll()
+        assert status["state"] == JOB_DONE
+        assert status["exit_code"] == 0
+        assert status["bytes_read"] == 3
+        assert job.result() == ("hi\n", 0)
+
+    def test_latency_marks(self):
+        """Test that spawn, first byte and last byte times are recorded."""
+        job = start_command(["sh", "-c", "echo one; sleep 0.2; echo two"])
+        job.wait(10)
+        assert job.spawned_at <= job.first_byte_at < job.last_byte_at
+
+    def test_no_output_no_byte_marks(self):
+        """Test that a silent command has no byte marks."""
+        job = start_command(["true"])
+        job.wait(10)
+        assert job.spawned_at is not None
+        assert job.first_byte_at is None
+
+    def test_read_returns_incremental_output(self):
+        """Test that read only returns output produced since the last read."""
+        job = start_command(["sh", "-c", "echo one; sleep 0.3; echo two"])
+        job.wait(10)
+        assert job.read() == "one\ntwo\n"
+        assert job.read() == ""
+        assert job.output == "one\ntwo\n"
+
+    def test_output_not_kept(self):
+        """Test that keep_output=False only hands output out through read()."""
+        job = start_command(["echo", "hi"], keep_output=False)
+        job.wait(10)
+        assert job.read() == "hi\n"
+        assert job.output == ""
+        assert job.result() == ("", 0)
+
+    def test_cancel(self):
+        """Test that a cancelled job stops and reports cancellation."""
+        job = start_command(["sleep", "10"])
+        job.cancel()
+        assert job.wait(5) is True
+        assert job.poll()["state"] == JOB_CANCELLED
+        assert job.result() == ("Command cancelled", 1)
+
+    def test_timeout_state(self):
+        """Test that an expired timeout kills the job."""
+        job = start_command(["sleep", "10"], timeout=0.2)
+        assert job.wait(5) is True
+        assert job.poll()["state"] == JOB_TIMEOUT
+
+    def test_unlimited_timeout(self):
+        """Test that a zero timeout means no limit."""
+        job = start_command(["sh", "-c", "sleep 0.2; echo ok"], timeout=0)
+        assert job.result() == ("ok\n", 0)
+
+    def test_command_not_found_state(self):
+        """Test that a missing executable fails immediately."""
+        job = start_command(["nonexistent_command_12345"])
+        assert job.done is True
+        assert job.poll()["state"] == JOB_FAILED
+        assert job.result()[1] == 1
+
+    def test_start_review_runs_coderabbit(self, tmp_path, fake_coderabbit):
+        """Test that start_review runs the review command in cwd."""
+        (tmp_path / "x.py").write_text("x\n")
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        job = start_review("uncommitted", cwd=str(tmp_path))
+        output, exit_code = job.result()
+        assert exit_code == 0
+        assert "File: x.py" in output
+
+
 class TestRunCoderabbit:
     """Tests for run_coderabbit function."""
 
@@ -101,3 +193,225 @@ class TestRunReview:
         result = run_review()
         assert result.success is True
         assert len(result.issues) == 0
+
+
+class TestRunCommandCwd:
+    """Tests for the cwd argument of run_command."""
+
+    def test_runs_in_cwd(self, tmp_path):
+        """Test that the command runs in the given directory."""
+        output, exit_code = run_command(["pwd"], cwd=str(tmp_path))
+        assert exit_code == 0
+        assert os.path.samefile(output.strip(), tmp_path)
+
+
+class TestBuildReviewCommand:
+    """Tests for build_review_command function."""
+
+    def test_command_line(self):
+        """Test the coderabbit command line for a review type."""
+        assert build_review_command("committed") == [
+            "coderabbit", "review", "--type", "committed", "--plain",
+        ]
+
+    def test_structured_command_line(self):
+        """Test that the json backend requests machine-readable output."""
+        assert build_review_command("all", "json") == [
+            "coderabbit", "review", "--type", "all", "--json",
+        ]
+
+
+class TestOutputFormat:
+    """Tests for output format detection and resolution."""
+
+    @pytest.fixture(autouse=True)
+    def reset_detection(self, monkeypatch):
+        """Forget any detected format."""
+        monkeypatch.setattr("vim4rabbit.cli._detected_format", None)
+
+    def test_detects_json_support(self):
+        """Test that a --json flag in the help selects the json backend."""
+        help_text = "Options:\n  --plain   Plain text\n  --json    JSON output\n"
+        with patch("vim4rabbit.cli.run_coderabbit", return_value=(help_text, 0)) as run:
+            assert detect_output_format() == "json"
+            assert detect_output_format() == "json"
+        run.assert_called_once()
+
+    def test_falls_back_to_text(self):
+        """Test that text is used without --json or without coderabbit."""
+        with patch("vim4rabbit.cli.run_coderabbit", return_value=("--plain", 0)):
+            assert detect_output_format() == "text"
+        with patch("vim4rabbit.cli._detected_format", None), \
+                patch("vim4rabbit.cli.run_coderabbit",
+                      return_value=("Command not found: coderabbit", 1)):
+            assert detect_output_format() == "text"
+
+    def test_resolve(self):
+        """Test resolving configured formats."""
+        assert resolve_output_format("text") == "text"
+        assert resolve_output_format("json") == "json"
+        assert resolve_output_format("bogus") == "text"
+        with patch("vim4rabbit.cli.run_coderabbit", return_value=("--json", 0)):
+            assert resolve_output_format("auto") == "json"
+
+
+class TestPartitionFiles:
+    """Tests for partition_files function."""
+
+    def test_balances_by_weight(self):
+        """Test that heavy files are spread across shards."""
+        files = [("a", 10), ("b", 10), ("c", 5), ("d", 5)]
+        groups = partition_files(files, 2)
+        assert groups == [["a", "c"], ["b", "d"]]
+
+    def test_never_more_groups_than_files(self):
+        """Test that shard count is capped by the number of files."""
+        assert partition_files([("a", 1), ("b", 1)], 8) == [["a"], ["b"]]
+
+    def test_deterministic_regardless_of_input_order(self):
+        """Test that input order does not change the partition."""
+        files = [("x", 3), ("y", 1), ("z", 2), ("w", 2)]
+        assert partition_files(files, 2) == partition_files(files[::-1], 2)
+
+    def test_single_shard(self):
+        """Test that one shard holds every file, sorted."""
+        assert partition_files([("b", 1), ("a", 9)], 1) == [["a", "b"]]
+
+    def test_no_files(self):
+        """Test that no files yields no groups."""
+        assert partition_files([], 4) == []
+
+
+class TestMergeShardIssues:
+    """Tests for merge_shard_issues function."""
+
+    def test_sorted_by_file_then_line(self):
+        """Test that merged issues are ordered by file and first line."""
+        shard1 = [ReviewIssue(lines=["b"], file_path="b.py", line_range="20-30")]
+        shard2 = [
+            ReviewIssue(lines=["a2"], file_path="a.py", line_range="100"),
+            ReviewIssue(lines=["a1"], file_path="a.py", line_range="9-12"),
+            ReviewIssue(lines=["general"]),
+        ]
+        merged = merge_shard_issues([shard1, shard2])
+        assert [i.lines[0] for i in merged] == ["a1", "a2", "b", "general"]
+
+    def test_duplicates_removed(self):
+        """Test that identical issues reported by two shards appear once."""
+        issue = ReviewIssue(lines=["same"], file_path="a.py", line_range="1")
+        copy = ReviewIssue(lines=["same"], file_path="a.py", line_range="1")
+        assert merge_shard_issues([[issue], [copy]]) == [issue]
+
+    def test_ties_keep_shard_order(self):
+        """Test that issues at the same location keep shard order."""
+        first = ReviewIssue(lines=["first"], file_path="a.py", line_range="1")
+        second = ReviewIssue(lines=["second"], file_path="a.py", line_range="1")
+        assert merge_shard_issues([[first], [second]]) == [first, second]
+
+
+class TestShardedReview:
+    """Tests for ShardedReview and run_sharded_review."""
+
+    def _make_changes(self, repo):
+        """Modify a.py and add three untracked files."""
+        (repo / "a.py").write_text("changed\n")
+        for name in ("b.py", "c.py", "d.py"):
+            (repo / name).write_text(f"{name}\n")
+
+    def test_prepare_not_sharded_for_committed(self, repo, monkeypatch):
+        """Test that committed reviews are never sharded."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        assert ShardedReview.prepare("committed", 2) is None
+
+    def test_prepare_not_sharded_for_single_file(self, repo, monkeypatch):
+        """Test that one changed file does not warrant sharding."""
+        monkeypatch.chdir(repo)
+        (repo / "a.py").write_text("changed\n")
+        assert ShardedReview.prepare("uncommitted", 4) is None
+
+    def test_prepare_creates_worktrees(self, repo, monkeypatch):
+        """Test that each shard gets a worktree holding its files."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        review = ShardedReview.prepare("uncommitted", 2)
+        try:
+            assert len(review.shards) == 2
+            all_files = sorted(f for s in review.shards for f in s.files)
+            assert all_files == ["a.py", "b.py", "c.py", "d.py"]
+            for shard in review.shards:
+                for name in shard.files:
+                    assert os.path.exists(os.path.join(shard.cwd, name))
+        finally:
+            review.cleanup()
+        assert not any(os.path.exists(s.cwd) for s in review.shards)
+
+    def test_prepare_restricted_to_files(self, repo, monkeypatch):
+        """Test that a file subset may form a single shard."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        review = ShardedReview.prepare("uncommitted", 1, files=["c.py"])
+        try:
+            assert [s.files for s in review.shards] == [["c.py"]]
+            assert not os.path.exists(os.path.join(review.shards[0].cwd, "b.py"))
+        finally:
+            review.cleanup()
+
+    def test_feed_and_finish_track_timings(self, repo, monkeypatch):
+        """Test per-shard parsing, exit tracking and merging."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        review = ShardedReview.prepare("uncommitted", 2)
+        try:
+            review.begin_shard(0)
+            review.begin_shard(1)
+            assert review.feed(0, "File: b.py\nComment: B\n=====\nFile: c.py\n") == 1
+            review.feed(1, "File: a.py\nComment: A\n")
+            review.finish_shard(0, 0)
+            assert review.done is False
+            review.finish_shard(1, 0)
+            assert review.done is True
+            assert [s.issue_count for s in review.shards] == [2, 1]
+            assert all(s.elapsed_secs >= 0 for s in review.shards)
+            result = review.result()
+            assert result.success is True
+            assert [i.file_path for i in result.issues] == ["a.py", "b.py", "c.py"]
+        finally:
+            review.cleanup()
+
+    def test_failed_shard_fails_review(self, repo, monkeypatch):
+        """Test that a failing shard reports its output as the error."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        review = ShardedReview.prepare("uncommitted", 2)
+        try:
+            review.feed(1, "Error: rate limited")
+            review.finish_shard(0, 0)
+            review.finish_shard(1, 1)
+            result = review.result()
+            assert result.success is False
+            assert "Shard 2: Error: rate limited" in result.error_message
+        finally:
+            review.cleanup()
+
+    def test_run_sharded_review_end_to_end(self, repo, monkeypatch, fake_coderabbit):
+        """Test a full sharded run against a fake coderabbit."""
+        monkeypatch.chdir(repo)
+        self._make_changes(repo)
+        result, shards = run_sharded_review("uncommitted", shard_count=3, max_workers=2)
+        assert result.success is True
+        assert [i.file_path for i in result.issues] == ["a.py", "b.py", "c.py", "d.py"]
+        assert len(shards) == 3
+        assert sum(s.issue_count for s in shards) == 4
+        assert all(s.exit_code == 0 for s in shards)
+        assert not any(os.path.exists(s.cwd) for s in shards)
+
+    def test_run_sharded_review_falls_back_unsharded(self, repo, monkeypatch, fake_coderabbit):
+        """Test that an unshardable review runs as a single process."""
+        monkeypatch.chdir(repo)
+        (repo / "a.py").write_text("changed\n")
+        result, shards = run_sharded_review("uncommitted", shard_count=3)
+        assert result.success is True
+        assert [i.file_path for i in result.issues] == ["a.py"]
+        assert len(shards) == 1
+        assert shards[0].issue_count == 1
@@ -5,15 +5,34 @@ from vim4rabbit.content import (
     format_review_output,
     format_loading_message,
     format_cancelled_message,
+    format_bytes,
+    format_delta_summary,
     format_elapsed_time,
+    format_issue_tracking,
+    format_patch_results,
+    format_review_metrics,
+    format_shard_timings,
+    format_speculative_stats,
     get_animation_frame,
     get_no_work_animation_frame,
     get_no_work_frame_count,
+    highlight_group,
     is_no_files_error,
     render_help,
+    CARRIED_ISSUE_BADGE,
+    FOUND_ISSUES_SHOWN,
+    NEW_ISSUE_BADGE,
     NO_WORK_ANIMATION_FRAMES,
 )
-from vim4rabbit.types import ReviewResult, ReviewIssue
+from vim4rabbit.types import (
+    DeltaPlan,
+    HunkResult,
+    IssueTracking,
+    PatchResult,
+    ReviewIssue,
+    ReviewResult,
+    ReviewShard,
+)
 
 
 class TestRenderHelp:
@@ -80,6 +99,24 @@ class TestFormatReviewOutput:
         assert "Problem 2" in full_text
         assert output["issue_count"] == 2
 
+    def test_issue_spans(self):
+        """Test that each issue's fold is given as header and end line numbers."""
+        issues = [
+            ReviewIssue(lines=["Problem 1", "Details"]),
+            ReviewIssue(lines=["Problem 2"]),
+        ]
+        output = format_review_output(ReviewResult(success=True, issues=issues))
+        lines = output["lines"]
+        assert len(output["spans"]) == 2
+        for i, (header, end) in enumerate(output["spans"], 1):
+            assert lines[header - 1].startswith(f"  [ ] {i}.")
+            assert lines[end - 1] == "  }}" + "}"
+        assert output["spans"][1][0] - output["spans"][0][0] == 5
+
+    def test_no_spans_without_issues(self):
+        """Test that a review without issues has no spans."""
+        assert format_review_output(ReviewResult(success=True, issues=[]))["spans"] == []
+
     def test_fold_header_includes_issue_type(self):
         """Test that fold header includes issue type in brackets."""
         issues = [
@@ -133,6 +170,7 @@ class TestFormatReviewOutput:
         assert "[c] close" in full_text
         assert "[za] toggle fold" not in full_text
         assert "[Space] toggle select" not in full_text
+        assert "[a] apply fix" not in full_text
         assert "[@] claude" not in full_text
 
     def test_error_only_shows_close(self):
@@ -143,6 +181,7 @@ class TestFormatReviewOutput:
         assert "[c] close" in full_text
         assert "[za] toggle fold" not in full_text
         assert "[Space] toggle select" not in full_text
+        assert "[a] apply fix" not in full_text
         assert "[@] claude" not in full_text
 
     def test_issues_show_full_keybindings(self):
@@ -153,6 +192,7 @@ class TestFormatReviewOutput:
         full_text = "\n".join(output["lines"])
         assert "[za] toggle fold" in full_text
         assert "[Space] toggle select" in full_text
+        assert "[a] apply fix" in full_text
         assert "[@] claude" in full_text
         assert "[c] close" in full_text
 
@@ -331,6 +371,67 @@ class TestAnimationFrameElapsedTime:
         full_text = "\n".join(content)
         assert "00min 00sec" in full_text
 
+    def test_status_replaces_progress_line(self):
+        """Test that a status is shown in place of 'Review in progress!'."""
+        content = get_animation_frame(0, elapsed_secs=3, status="Parsing results... 40%")
+        assert content[2] == "  Parsing results... 40%  \U0001F552 00min 03sec"
+
+
+class TestAnimationFrameFoundIssues:
+    """Tests for progressive issue listing in animation frames."""
+
+    def test_no_issue_list_without_found_issues(self):
+        """Test that no issue list is shown before any issue completes."""
+        content = get_animation_frame(0, found_issues=[])
+        assert not any("found so far" in line for line in content)
+
+    def test_found_issues_listed_after_footer(self):
+        """Test that completed issues are listed below the footer."""
+        issues = [
+            ReviewIssue(file_path="src/a.py", line_range="1-3",
+                        issue_type="bug", summary="First"),
+            ReviewIssue(summary="Second"),
+        ]
+        content = get_animation_frame(0, found_issues=issues)
+        footer_idx = content.index("  [p] play a game?  |  [c] cancel")
+        assert content[footer_idx + 2] == "  2 issue(s) found so far:"
+        assert content[footer_idx + 3] == "    1. [bug] First (src/a.py:1-3)"
+        assert content[footer_idx + 4] == "    2. [issue] Second"
+
+    def test_found_issues_capped(self):
+        """Test that only the last issues are listed, with a count of the rest."""
+        issues = [ReviewIssue(summary=f"Issue {n}") for n in range(1, 26)]
+        content = get_animation_frame(0, found_issues=issues)
+        footer_idx = content.index("  [p] play a game?  |  [c] cancel")
+        listed = content[footer_idx + 2:]
+        assert listed[0] == "  25 issue(s) found so far:"
+        assert len(listed) == FOUND_ISSUES_SHOWN + 2
+        assert listed[1] == "    16. [issue] Issue 16"
+        assert listed[FOUND_ISSUES_SHOWN] == "    25. [issue] Issue 25"
+        assert listed[-1] == "    ... and 15 more"
+
+    def test_found_issues_at_cap_not_summarized(self):
+        """Test that no summary line is added when every issue fits."""
+        issues = [ReviewIssue(summary="x")] * FOUND_ISSUES_SHOWN
+        content = get_animation_frame(0, found_issues=issues)
+        assert not any("more" in line for line in content)
+
+
+class TestFormatReviewOutputCached:
+    """Tests for the cached marker in review output."""
+
+    def test_cached_marker_shown(self):
+        """Test that cached results are labelled in the header."""
+        result = ReviewResult(success=True, issues=[ReviewIssue(lines=["P"])])
+        output = format_review_output(result, elapsed_secs=5, cached=True)
+        assert any("(cached)" in line for line in output["lines"])
+
+    def test_no_marker_by_default(self):
+        """Test that fresh results carry no cached marker."""
+        result = ReviewResult(success=True, issues=[ReviewIssue(lines=["P"])])
+        output = format_review_output(result, elapsed_secs=5)
+        assert not any("(cached)" in line for line in output["lines"])
+
 
 class TestFormatReviewOutputElapsedTime:
     """Tests for elapsed time display in review output."""
@@ -368,3 +469,198 @@ class TestFormatReviewOutputElapsedTime:
         full_text = "\n".join(output["lines"])
         assert "No issues found" in full_text
         assert "01min 40sec" not in full_text
+
+
+class TestFormatShardTimings:
+    """Tests for format_shard_timings function."""
+
+    def test_one_entry_per_shard(self):
+        """Test that each shard's timing, files and issues are listed."""
+        shards = [
+            ReviewShard(index=0, files=["a.py", "b.py"], elapsed_secs=12.34, issue_count=3),
+            ReviewShard(index=1, files=["c.py"], elapsed_secs=4.0, issue_count=0),
+        ]
+        assert format_shard_timings(shards) == (
+            "Shards: #1 12.3s (2 files, 3 issues) | #2 4.0s (1 files, 0 issues)"
+        )
+
+
+class TestFormatSpeculativeStats:
+    """Tests for format_speculative_stats function."""
+
+    def test_counters(self):
+        """Test that hits, misses and run counters are summarized."""
+        stats = {
+            "started": 5, "superseded": 1, "completed": 3, "failed": 1,
+            "skipped": 7, "hits": 1, "misses": 2,
+        }
+        assert format_speculative_stats(stats) == (
+            "Speculative reviews: 1 hit, 2 misses | started 5, completed 3, "
+            "failed 1, superseded 1, skipped 7"
+        )
+
+
+class TestFormatDeltaSummary:
+    """Tests for format_delta_summary function."""
+
+    def test_partial(self):
+        """Test the summary of a delta review."""
+        plan = DeltaPlan(
+            file_hashes={"a.py": "1", "b.py": "2", "c.py": "3"},
+            changed=["b.py"], carried=[ReviewIssue(lines=["x"])], full=False,
+        )
+        assert format_delta_summary(plan) == (
+            "Delta review: 1 of 3 changed files re-reviewed, 1 issues carried over"
+        )
+
+    def test_full(self):
+        """Test the summary when every file was reviewed."""
+        plan = DeltaPlan(file_hashes={"a.py": "1"}, changed=["a.py"])
+        assert format_delta_summary(plan) == "Delta review: full review of 1 changed files"
+
+
+class TestFormatIssueTracking:
+    """Tests for format_issue_tracking and the new-issue badge."""
+
+    def test_summary(self):
+        """Test the new/persisting/resolved summary."""
+        tracking = IssueTracking(statuses=["new", "persisting"], resolved=["a", "b"], known=True)
+        assert format_issue_tracking(tracking) == "Issues: 1 new, 1 persisting, 2 resolved"
+        assert format_issue_tracking(tracking, hidden=1) == (
+            "Issues: 1 new, 1 persisting (hidden), 2 resolved"
+        )
+
+    def test_first_review(self):
+        """Test that the first review of a branch has no summary."""
+        assert format_issue_tracking(IssueTracking(statuses=["new"])) == ""
+
+    def test_new_badge(self):
+        """Test that only new issues get the badge."""
+        result = ReviewResult(success=True, issues=[
+            ReviewIssue(lines=["x"], summary="First"),
+            ReviewIssue(lines=["y"], summary="Second"),
+        ])
+        lines = format_review_output(result, statuses=["new", "persisting"])["lines"]
+        headers = [line for line in lines if line.startswith("  [ ]")]
+        assert NEW_ISSUE_BADGE in headers[0]
+        assert NEW_ISSUE_BADGE not in headers[1]
+
+    def test_carried_badge(self):
+        """Test that issues carried over by a delta review are marked."""
+        result = ReviewResult(success=True, issues=[
+            ReviewIssue(lines=["x"], summary="First"),
+            ReviewIssue(lines=["y"], summary="Second"),
+        ])
+        lines = format_review_output(
+            result, statuses=["new", "persisting"], carried=[False, True]
+        )["lines"]
+        headers = [line for line in lines if line.startswith("  [ ]")]
+        assert CARRIED_ISSUE_BADGE not in headers[0]
+        assert f"2. {CARRIED_ISSUE_BADGE}" in headers[1]
+
+    def test_hidden_issues(self):
+        """Test the header when persisting issues are hidden."""
+        empty = format_review_output(ReviewResult(success=True), hidden=3)["lines"]
+        assert any("No new issues (3 persisting hidden)" in line for line in empty)
+        result = ReviewResult(success=True, issues=[ReviewIssue(lines=["x"])])
+        lines = format_review_output(result, hidden=2)["lines"]
+        assert any("(2 persisting hidden)" in line for line in lines)
+
+
+class TestReviewHighlights:
+    """Tests for highlights in format_review_output."""
+
+    def test_highlighted_lines(self):
+        """Test that fields, fences and diff lines get highlight groups."""
+        issue = ReviewIssue(lines=[
+            "File: a.py", "", "Comment:", "Fix it", "```diff", "-old", "+new", "```",
+        ])
+        output = format_review_output(ReviewResult(success=True, issues=[issue]))
+        lines = output["lines"]
+        highlights = output["highlights"]
+        assert [lines[n - 1].strip() for n in highlights["vim4rabbitField"]] == [
+            "File: a.py", "Comment:",
+        ]
+        assert len(highlights["vim4rabbitFence"]) == 2
+        assert lines[highlights["vim4rabbitDiffDelete"][0] - 1].strip() == "-old"
+        assert lines[highlights["vim4rabbitDiffAdd"][0] - 1].strip() == "+new"
+
+    def test_bullets_are_not_diff_lines(self):
+        """Test that Markdown bullets outside a fence or proposed fix stay plain."""
+        issue = ReviewIssue(lines=[
+            "Comment:", "Two problems:", "- the cache key", "+ the lock",
+            "Proposed fix", "-old", "+new", "Then:", "- rerun the tests",
+        ])
+        output = format_review_output(ReviewResult(success=True, issues=[issue]))
+        lines = output["lines"]
+        highlights = output["highlights"]
+        assert [lines[n - 1].strip() for n in highlights["vim4rabbitDiffDelete"]] == ["-old"]
+        assert [lines[n - 1].strip() for n in highlights["vim4rabbitDiffAdd"]] == ["+new"]
+
+    def test_no_issues(self):
+        """Test that there is nothing to highlight without issues."""
+        assert format_review_output(ReviewResult(success=True))["highlights"] == {}
+
+    def test_highlight_group(self):
+        """Test the group of each line kind."""
+        assert highlight_group("@@ -1 +1 @@", "diff") == "vim4rabbitDiffHunk"
+        assert highlight_group("Some text", "body") == ""
+
+
+class TestFormatBytes:
+    """Tests for format_bytes function."""
+
+    def test_units(self):
+        """Test bytes, kilobytes and megabytes."""
+        assert format_bytes(512) == "512 B"
+        assert format_bytes(12.3 * 1024) == "12.3 KB"
+        assert format_bytes(4 * 1024 * 1024) == "4.0 MB"
+
+
+class TestFormatReviewMetrics:
+    """Tests for format_review_metrics function."""
+
+    def test_no_reviews(self):
+        """Test the report before any review finished."""
+        summary = {"count": 0, "phases": {}, "bytes": {}, "history": []}
+        assert format_review_metrics(summary) == [
+            "Review metrics: no reviews recorded yet"
+        ]
+
+    def test_table(self):
+        """Test one row per phase plus bytes."""
+        summary = {
+            "count": 2,
+            "phases": {"spawn": {"p50": 0.01, "p95": 0.02, "last": 0.02}},
+            "bytes": {"p50": 2048, "p95": 4096, "total": 6144},
+            "history": [],
+        }
+        lines = format_review_metrics(summary)
+        assert lines[0] == "Review metrics (last 2 review(s))"
+        assert lines[2].split() == ["spawn", "0.010s", "0.020s", "0.020s"]
+        assert lines[3].split() == ["bytes", "2.0", "KB", "4.0", "KB", "total", "6.0", "KB"]
+
+
+class TestFormatPatchResults:
+    """Tests for format_patch_results function."""
+
+    def test_all_applied(self):
+        """Test that clean hunks only show the summary."""
+        results = [PatchResult(1, "a.py", [HunkResult(index=1, applied=True, line=4)])]
+        assert format_patch_results(results) == ["Applied 1 of 1 hunks in 1 files"]
+
+    def test_failures_and_fuzz(self):
+        """Test one line per failed or fuzzy hunk and per error."""
+        results = [
+            PatchResult(1, "a.py", [
+                HunkResult(index=1, applied=True, line=4, fuzz=2),
+                HunkResult(index=2, message="context not found"),
+            ]),
+            PatchResult(3, "b.py", error="no proposed fix"),
+        ]
+        assert format_patch_results(results) == [
+            "Applied 1 of 2 hunks in 1 files",
+            "Issue 1 (a.py): hunk 1 applied at line 4 (fuzz 2)",
+            "Issue 1 (a.py): hunk 2 failed: context not found",
+            "Issue 3 (b.py): no proposed fix",
+        ]
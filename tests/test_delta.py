@@ -0,0 +1,122 @@
+"""Tests for vim4rabbit.delta module."""
+
+import pytest
+from vim4rabbit import delta
+from vim4rabbit.types import DeltaPlan, ReviewIssue, ReviewResult
+
+
+@pytest.fixture(autouse=True)
+def reset_baselines():
+    """Forget baselines around each test."""
+    delta.reset()
+    yield
+    delta.reset()
+
+
+def issue(path, text="Issue"):
+    """Build an issue for a file."""
+    return ReviewIssue(lines=[text], file_path=path, line_range="1")
+
+
+def write_changes(repo):
+    """Modify a.py and add b.py and c.py."""
+    (repo / "a.py").write_text("changed\n")
+    (repo / "b.py").write_text("b\n")
+    (repo / "c.py").write_text("c\n")
+
+
+class TestPlan:
+    """Tests for plan."""
+
+    def test_full_without_baseline(self, repo):
+        """Test that the first review covers every changed file."""
+        write_changes(repo)
+        result = delta.plan(str(repo))
+        assert result.full is True
+        assert result.changed == ["a.py", "b.py", "c.py"]
+        assert set(result.file_hashes) == {"a.py", "b.py", "c.py"}
+
+    def test_only_changed_files(self, repo):
+        """Test that only files whose content changed are re-reviewed."""
+        write_changes(repo)
+        previous = ReviewResult(
+            success=True,
+            issues=[issue("a.py"), issue("b.py"), issue("./c.py"), issue("")],
+            file_hashes=delta.snapshot(str(repo)),
+        )
+        (repo / "b.py").write_text("b fixed\n")
+        result = delta.plan(str(repo), previous)
+        assert result.full is False
+        assert result.changed == ["b.py"]
+        assert [i.file_path for i in result.carried] == ["a.py", "./c.py", ""]
+
+    def test_reverted_file_issues_dropped(self, repo):
+        """Test that issues of files no longer changed are not carried."""
+        write_changes(repo)
+        previous = ReviewResult(
+            success=True,
+            issues=[issue("a.py"), issue("c.py")],
+            file_hashes=delta.snapshot(str(repo)),
+        )
+        (repo / "a.py").write_text("print('a')\n")
+        (repo / "b.py").write_text("b fixed\n")
+        result = delta.plan(str(repo), previous)
+        assert result.changed == ["b.py"]
+        assert [i.file_path for i in result.carried] == ["c.py"]
+
+    def test_full_when_every_file_changed(self, repo):
+        """Test that a delta covering every file becomes a full review."""
+        write_changes(repo)
+        previous = ReviewResult(success=True, file_hashes={"a.py": "x", "b.py": "y"})
+        assert delta.plan(str(repo), previous).full is True
+
+    def test_uses_remembered_baseline(self, repo):
+        """Test that the remembered baseline is used by default."""
+        write_changes(repo)
+        hashes = delta.snapshot(str(repo))
+        delta.remember(str(repo), ReviewResult(success=True, file_hashes=hashes))
+        result = delta.plan(str(repo))
+        assert result.full is False
+        assert result.changed == []
+
+
+class TestApply:
+    """Tests for apply."""
+
+    def test_merges_carried_and_new(self):
+        """Test that new issues replace those of changed files."""
+        plan = DeltaPlan(
+            root="/r", file_hashes={"a.py": "1", "b.py": "2"},
+            changed=["b.py"], carried=[issue("a.py")], full=False,
+        )
+        result = delta.apply(plan, ReviewResult(success=True, issues=[issue("b.py")]))
+        assert [i.file_path for i in result.issues] == ["a.py", "b.py"]
+        assert result.file_hashes == {"a.py": "1", "b.py": "2"}
+
+    def test_full_keeps_review_issues(self):
+        """Test that a full review keeps only its own issues."""
+        plan = DeltaPlan(root="/r", file_hashes={"b.py": "2"}, changed=["b.py"])
+        review = ReviewResult(success=True, issues=[issue("b.py"), issue("", "General")])
+        assert delta.apply(plan, review).issues == review.issues
+
+    def test_failure_passes_through(self):
+        """Test that a failed review is returned unchanged."""
+        failed = ReviewResult(success=False, error_message="boom")
+        assert delta.apply(DeltaPlan(full=False), failed) is failed
+
+
+class TestBaselines:
+    """Tests for remember, get_baseline and reset."""
+
+    def test_remember_requires_hashes(self):
+        """Test that results without file hashes are not remembered."""
+        delta.remember("/r", ReviewResult(success=True))
+        assert delta.get_baseline("/r") is None
+
+    def test_remember_and_reset(self):
+        """Test remembering and forgetting a baseline."""
+        result = ReviewResult(success=True, file_hashes={"a.py": "1"})
+        delta.remember("/r", result)
+        assert delta.get_baseline("/r") is result
+        delta.reset()
+        assert delta.get_baseline("/r") is None
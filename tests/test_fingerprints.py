@@ -0,0 +1,152 @@
+"""Tests for vim4rabbit.fingerprints module."""
+
+from vim4rabbit import fingerprints
+from vim4rabbit.types import ReviewIssue
+
+
+def issue(file_path="a.py", line_range="10", summary="Possible None dereference",
+          issue_type="potential_issue"):
+    """Build an issue with the fields that go into a fingerprint."""
+    return ReviewIssue(
+        lines=[summary], file_path=file_path, line_range=line_range,
+        issue_type=issue_type, summary=summary,
+    )
+
+
+class TestNormalizeText:
+    """Tests for normalize_text function."""
+
+    def test_case_whitespace_and_numbers(self):
+        """Test that case, spacing and numbers are ignored."""
+        assert fingerprints.normalize_text("Unused  import on line 12\n") == (
+            "unused import on line #"
+        )
+        assert fingerprints.normalize_text("Line 3") == fingerprints.normalize_text("line 40")
+
+
+def commented(comment_lines, summary="Possible None dereference"):
+    """Build an issue with a multi-line comment and an AI prompt."""
+    return ReviewIssue(
+        lines=["File: a.py", "Line: 10", "Type: potential_issue", "", "Comment:",
+               *comment_lines, "", "Prompt for AI Agent:", "Fix it."],
+        file_path="a.py", line_range="10", issue_type="potential_issue", summary=summary,
+    )
+
+
+class TestCommentText:
+    """Tests for comment_text function."""
+
+    def test_comment_lines_without_prompt(self):
+        """Test that the comment runs from Comment: to the AI prompt."""
+        issue = commented(["First line.", "Second line."])
+        assert fingerprints.comment_text(issue) == "\nFirst line.\nSecond line.\n"
+
+    def test_summary_without_comment_field(self):
+        """Test that an issue without a Comment: field falls back to its summary."""
+        assert fingerprints.comment_text(issue(summary="Only this")) == "Only this"
+
+
+class TestFingerprintIssues:
+    """Tests for fingerprint_issues function."""
+
+    def test_stable_under_line_drift(self):
+        """Test that moving an issue to another line keeps its fingerprint."""
+        before = fingerprints.fingerprint_issues([issue(line_range="10 to 12")])
+        after = fingerprints.fingerprint_issues([issue(line_range="25 to 27")])
+        assert before == after
+
+    def test_leading_dot_slash_ignored(self):
+        """Test that './a.py' and 'a.py' are the same file."""
+        assert fingerprints.fingerprint_issues([issue(file_path="./a.py")]) == (
+            fingerprints.fingerprint_issues([issue(file_path="a.py")])
+        )
+
+    def test_fields_change_fingerprint(self):
+        """Test that file, type and comment all matter."""
+        base = fingerprints.fingerprint_issues([issue()])[0]
+        assert base != fingerprints.fingerprint_issues([issue(file_path="b.py")])[0]
+        assert base != fingerprints.fingerprint_issues([issue(issue_type="nitpick")])[0]
+        assert base != fingerprints.fingerprint_issues([issue(summary="Other")])[0]
+
+    def test_full_comment_text(self):
+        """Test that comments sharing a truncated summary differ by their full text."""
+        first = commented(["Same opening sentence.", "Check the cache key."])
+        second = commented(["Same opening sentence.", "Check the lock."])
+        fps = fingerprints.fingerprint_issues([first, second])
+        assert fps[0] != fps[1]
+        rewrapped = commented(["Same opening", "sentence.  Check the CACHE key."])
+        assert fingerprints.fingerprint_issues([rewrapped]) == fps[:1]
+
+    def test_identical_issues_ranked_by_line(self):
+        """Test that repeated issues get distinct fingerprints by line order."""
+        fps = fingerprints.fingerprint_issues([issue(line_range="30"), issue(line_range="5")])
+        assert fps[0] != fps[1]
+        # Same two issues reported in the other order, both shifted
+        swapped = fingerprints.fingerprint_issues([issue(line_range="8"), issue(line_range="40")])
+        assert swapped == [fps[1], fps[0]]
+
+
+class TestClassify:
+    """Tests for classify function."""
+
+    def test_first_review(self):
+        """Test that without an index every issue is new and unknown."""
+        tracking = fingerprints.classify([issue()], None)
+        assert tracking.statuses == ["new"]
+        assert tracking.resolved == []
+        assert tracking.known is False
+
+    def test_new_persisting_resolved(self):
+        """Test classification against a previous index."""
+        old = issue(summary="Old bug")
+        kept = issue(summary="Kept bug")
+        index = dict(zip(fingerprints.fingerprint_issues([old, kept]), ["old", "kept"]))
+        tracking = fingerprints.classify([kept, issue(summary="New bug")], index)
+        assert tracking.statuses == ["persisting", "new"]
+        assert tracking.resolved == ["old"]
+        assert tracking.known is True
+
+
+class TestTrack:
+    """Tests for track, load_index and save_index."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a review becomes the index of the next one."""
+        first = fingerprints.track("/repo", "main", "uncommitted", [issue(summary="A")], tmp_path)
+        assert first.known is False
+        second = fingerprints.track(
+            "/repo", "main", "uncommitted", [issue(summary="A"), issue(summary="B")], tmp_path
+        )
+        assert second.statuses == ["persisting", "new"]
+        third = fingerprints.track("/repo", "main", "uncommitted", [issue(summary="B")], tmp_path)
+        assert third.statuses == ["persisting"]
+        assert len(third.resolved) == 1
+        assert "A" in third.resolved[0]
+
+    def test_indexes_per_branch(self, tmp_path):
+        """Test that branches are tracked separately."""
+        fingerprints.track("/repo", "main", "uncommitted", [issue()], tmp_path)
+        assert fingerprints.load_index("/repo", "main", "uncommitted", tmp_path)
+        assert fingerprints.load_index("/repo", "feature", "uncommitted", tmp_path) is None
+        assert fingerprints.load_index("/other", "main", "uncommitted", tmp_path) is None
+
+    def test_indexes_per_review_type(self, tmp_path):
+        """Test that each review type of a branch is tracked separately."""
+        fingerprints.track("/repo", "main", "uncommitted", [issue(summary="A")], tmp_path)
+        tracking = fingerprints.track("/repo", "main", "committed", [issue(summary="B")], tmp_path)
+        assert tracking.known is False
+        assert fingerprints.load_index("/repo", "main", "all", tmp_path) is None
+        again = fingerprints.track("/repo", "main", "uncommitted", [issue(summary="A")], tmp_path)
+        assert again.statuses == ["persisting"]
+
+    def test_corrupt_index_ignored(self, tmp_path):
+        """Test that an unreadable index counts as no index."""
+        fingerprints.save_index("/repo", "main", "uncommitted", {}, tmp_path)
+        for path in tmp_path.iterdir():
+            path.write_text("{not json")
+        assert fingerprints.load_index("/repo", "main", "uncommitted", tmp_path) is None
+
+    def test_default_dir_under_cache(self, monkeypatch, tmp_path):
+        """Test that indexes live under the cache directory."""
+        monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path))
+        assert fingerprints.get_index_dir() == tmp_path / "fingerprints"
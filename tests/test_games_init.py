@@ -1,5 +1,10 @@
 """Tests for vim4rabbit.games module (game manager)."""
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from vim4rabbit.games import (
     get_game_menu,
@@ -10,9 +15,12 @@ from vim4rabbit.games import (
     tick_game,
     input_game,
     get_game_match_patterns,
+    get_game_class,
     GAME_REGISTRY,
 )
 
+PYTHONX = Path(__file__).resolve().parent.parent / "pythonx"
+
 
 class TestGetGameMenu:
     """Tests for get_game_menu function."""
@@ -244,13 +252,26 @@ class TestGameRegistry:
         assert "m" in GAME_REGISTRY
 
     def test_registry_structure(self):
-        """Test that each registry entry has name, class, and tick rate."""
-        for key, (name, cls, tick_ms) in GAME_REGISTRY.items():
+        """Test that each registry entry has name, class path, and tick rate."""
+        for key, (name, class_path, tick_ms) in GAME_REGISTRY.items():
             assert isinstance(name, str)
-            assert callable(cls)
+            assert callable(get_game_class(key))
+            assert get_game_class(key).__name__ == class_path.rsplit(".", 1)[1]
             assert isinstance(tick_ms, int)
             assert tick_ms > 0
 
+    def test_games_imported_on_start(self):
+        """Test that importing vim4rabbit does not import the game packages."""
+        code = (
+            "import sys, vim4rabbit; "
+            "print(sorted(m for m in sys.modules if m.startswith('vim4rabbit.games.')))"
+        )
+        env = dict(os.environ, PYTHONPATH=str(PYTHONX))
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+        ).stdout
+        assert output.strip() == "[]"
+
 
 class TestUniformCancelUX:
     """Tests for uniform [c] cancel status bar across all games."""
@@ -0,0 +1,162 @@
+"""Tests for vim4rabbit.git module."""
+
+import os
+
+from vim4rabbit.git import (
+    copy_changes_to_worktree,
+    create_worktree,
+    get_branch_name,
+    get_changed_files,
+    get_diff_fingerprint,
+    get_file_hashes,
+    get_head_sha,
+    get_repo_root,
+    get_untracked_files,
+    remove_worktree,
+)
+
+from .conftest import run_git
+
+
+class TestGetHeadSha:
+    """Tests for get_head_sha function."""
+
+    def test_returns_sha_in_repo(self, repo):
+        """Test that HEAD sha is a 40-char hex string."""
+        sha = get_head_sha(str(repo))
+        assert len(sha) == 40
+        int(sha, 16)
+
+    def test_empty_outside_repo(self, tmp_path):
+        """Test that a non-repository yields an empty sha."""
+        assert get_head_sha(str(tmp_path)) == ""
+
+
+class TestGetUntrackedFiles:
+    """Tests for get_untracked_files function."""
+
+    def test_lists_untracked_files_sorted(self, repo):
+        """Test that untracked files are listed and sorted."""
+        (repo / "z.py").write_text("z")
+        (repo / "b.py").write_text("b")
+        assert get_untracked_files(str(repo)) == ["b.py", "z.py"]
+
+
+class TestGetDiffFingerprint:
+    """Tests for get_diff_fingerprint function."""
+
+    def test_stable_for_unchanged_tree(self, repo):
+        """Test that the fingerprint is stable without changes."""
+        first = get_diff_fingerprint("uncommitted", str(repo))
+        assert first
+        assert get_diff_fingerprint("uncommitted", str(repo)) == first
+
+    def test_changes_with_tracked_edit(self, repo):
+        """Test that editing a tracked file changes the fingerprint."""
+        before = get_diff_fingerprint("uncommitted", str(repo))
+        (repo / "a.py").write_text("print('changed')\n")
+        assert get_diff_fingerprint("uncommitted", str(repo)) != before
+
+    def test_changes_with_untracked_content(self, repo):
+        """Test that untracked file contents are part of the fingerprint."""
+        (repo / "new.py").write_text("one")
+        before = get_diff_fingerprint("all", str(repo))
+        (repo / "new.py").write_text("two")
+        assert get_diff_fingerprint("all", str(repo)) != before
+
+    def test_committed_ignores_worktree(self, repo):
+        """Test that committed reviews do not depend on worktree edits."""
+        before = get_diff_fingerprint("committed", str(repo))
+        (repo / "a.py").write_text("print('changed')\n")
+        assert get_diff_fingerprint("committed", str(repo)) == before
+
+    def test_empty_outside_repo(self, tmp_path):
+        """Test that a non-repository yields an empty fingerprint."""
+        assert get_diff_fingerprint("uncommitted", str(tmp_path)) == ""
+
+
+class TestGetRepoRoot:
+    """Tests for get_repo_root function."""
+
+    def test_root_from_subdirectory(self, repo):
+        """Test that the top-level directory is found from a subdirectory."""
+        sub = repo / "sub"
+        sub.mkdir()
+        assert os.path.samefile(get_repo_root(str(sub)), repo)
+
+    def test_empty_outside_repo(self, tmp_path):
+        """Test that a non-repository yields an empty root."""
+        assert get_repo_root(str(tmp_path)) == ""
+
+
+class TestGetBranchName:
+    """Tests for get_branch_name function."""
+
+    def test_checked_out_branch(self, repo):
+        """Test that the checked out branch is returned."""
+        run_git(repo, "checkout", "-q", "-b", "feature")
+        assert get_branch_name(str(repo)) == "feature"
+
+    def test_empty_outside_repo(self, tmp_path):
+        """Test that a non-repository yields an empty name."""
+        assert get_branch_name(str(tmp_path)) == ""
+
+
+class TestGetChangedFiles:
+    """Tests for get_changed_files function."""
+
+    def test_tracked_and_untracked_weights(self, repo):
+        """Test that weights count changed lines and untracked file lines."""
+        (repo / "a.py").write_text("one\ntwo\n")
+        (repo / "new.py").write_text("x\ny\nz\n")
+        files = dict(get_changed_files(str(repo)))
+        # a.py: 2 added + 1 removed
+        assert files == {"a.py": 3, "new.py": 3}
+
+    def test_no_changes(self, repo):
+        """Test that a clean tree has no changed files."""
+        assert get_changed_files(str(repo)) == []
+
+
+class TestGetFileHashes:
+    """Tests for get_file_hashes."""
+
+    def test_hashes_content(self, repo):
+        """Test that hashes follow file content."""
+        before = get_file_hashes(["a.py"], str(repo))
+        (repo / "a.py").write_text("other\n")
+        after = get_file_hashes(["a.py"], str(repo))
+        assert len(before["a.py"]) == 64
+        assert before != after
+
+    def test_deleted_file(self, repo):
+        """Test that a missing file hashes to an empty string."""
+        assert get_file_hashes(["gone.py"], str(repo)) == {"gone.py": ""}
+
+
+class TestWorktree:
+    """Tests for worktree creation and change copying."""
+
+    def test_copy_changes_into_worktree(self, repo, tmp_path_factory):
+        """Test that only the selected files' changes reach the worktree."""
+        (repo / "b.py").write_text("b\n")
+        run_git(repo, "add", "b.py")
+        run_git(repo, "commit", "-q", "-m", "b")
+        (repo / "a.py").write_text("changed a\n")
+        (repo / "b.py").write_text("changed b\n")
+        (repo / "pkg").mkdir()
+        (repo / "pkg" / "new.py").write_text("new\n")
+
+        worktree = str(tmp_path_factory.mktemp("wt"))
+        assert create_worktree(worktree, str(repo))
+        try:
+            assert copy_changes_to_worktree(["a.py", "pkg/new.py"], worktree, str(repo))
+            with open(os.path.join(worktree, "a.py")) as f:
+                assert f.read() == "changed a\n"
+            with open(os.path.join(worktree, "b.py")) as f:
+                assert f.read() == "b\n"
+            with open(os.path.join(worktree, "pkg", "new.py")) as f:
+                assert f.read() == "new\n"
+        finally:
+            remove_worktree(worktree, str(repo))
+        assert not os.path.exists(worktree)
@@ -1,8 +1,27 @@
 """Tests for vim4rabbit.__init__ module functions."""
 
+import os
+import time
+from unittest.mock import patch
+
 import pytest
 from vim4rabbit import (
+    vim_apply_proposed_fixes,
     vim_build_claude_prompt,
+    vim_cancel_task,
+    vim_close_review_session,
+    vim_speculative_cancel,
+    vim_speculative_claim,
+    vim_speculative_poll,
+    vim_speculative_start,
+    vim_speculative_stats,
+    vim_cancel_review,
+    vim_get_review_result,
+    vim_poll_review,
+    vim_poll_task,
+    vim_read_review,
+    vim_start_review,
+    vim_start_review_result,
     vim_format_review,
     vim_init_selections,
     vim_reset_selections,
@@ -10,10 +29,40 @@ from vim4rabbit import (
     vim_select_all,
     vim_deselect_all,
     vim_get_selected,
+    vim_checkbox_lines,
+    vim_set_all_selected,
     vim_get_issue_count,
     vim_find_issue_at_line,
+    vim_get_animation_frame,
+    vim_get_no_work_animation_frame,
+    vim_forget_frames,
+    vim_get_review_metrics,
+    vim_get_review_stats,
+    vim_record_render,
+    vim_review_cache_lookup,
+    vim_review_cache_store,
+    vim_set_line_rules,
+    vim_take_review_result,
+)
+import vim4rabbit
+from vim4rabbit import (
+    buffers, classifier, delta, jobs, metrics, selection, sessions, speculative, tasks,
 )
-from vim4rabbit import selection
+from vim4rabbit.content import CARRIED_ISSUE_BADGE
+
+from .conftest import FakeBuffer, FakeVim
+
+
+def fake_review(cmd):
+    """Patch the review command so jobs run cmd instead of coderabbit."""
+    return patch("vim4rabbit.jobs.build_review_command", return_value=cmd)
+
+
+def finish_review(output):
+    """Run a review job that prints output and fetch its result."""
+    with fake_review(["printf", "%s", output]):
+        job_id = vim_start_review("uncommitted")
+    return vim_get_review_result(job_id)
 
 
 class TestVimBuildClaudePrompt:
@@ -189,3 +238,661 @@ class TestVimSelectionApi:
         """Test vim_find_issue_at_line returns 0 when not found."""
         lines = ["  header", "  footer"]
         assert vim_find_issue_at_line(lines, 0) == 0
+
+
+class TestVimReviewCacheApi:
+    """Tests for vim_review_cache_lookup and vim_review_cache_store."""
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, monkeypatch, tmp_path):
+        """Point the review cache at a temporary directory."""
+        monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path))
+        return tmp_path
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_miss_then_hit_after_store(self, mock_key):
+        """Test that a stored review is returned by the next lookup."""
+        miss = vim_review_cache_lookup("uncommitted")
+        assert miss["hit"] is False
+        assert miss["key"] == "k1"
+
+        finish_review("File: a.py\nComment: Cached issue\n")
+        assert vim_review_cache_store("k1", 17) is True
+
+        hit = vim_review_cache_lookup("uncommitted")
+        assert hit["hit"] is True
+        assert hit["elapsed_secs"] == 17
+        assert hit["result"]["issues_data"][0]["summary"] == "Cached issue"
+        review = hit["result"]["review"]
+        assert review["issue_count"] == 1
+        assert "lines" not in hit["result"]["issues_data"][0]
+        assert any("(cached)" in line for line in review["lines"])
+        session = sessions.get(hit["result"]["review_id"])
+        assert session.lines == review["lines"]
+        assert session.issues[0].summary == "Cached issue"
+        assert len(session.spans) == 1
+        assert "spans" not in review
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_bypass_skips_lookup_but_returns_key(self, mock_key):
+        """Test that bypass forces a miss while still providing the key."""
+        finish_review("File: a.py\n")
+        vim_review_cache_store("k1")
+
+        result = vim_review_cache_lookup("uncommitted", True)
+        assert result["hit"] is False
+        assert result["key"] == "k1"
+
+    def test_format_review_cached_flag(self):
+        """Test that vim_format_review passes the cached flag through."""
+        issues = [{"lines": ["Problem"], "summary": "A bug"}]
+        result = vim_format_review(True, issues, "", 3, True)
+        assert any("(cached)" in line for line in result["lines"])
+
+
+class TestVimReviewJobApi:
+    """Tests for the vim_*_review background job handles."""
+
+    def teardown_method(self):
+        """Cancel any job left running by a test."""
+        jobs.cancel_all()
+
+    def test_start_poll_result(self):
+        """Test a background review from start to parsed result."""
+        with fake_review(["printf", "File: a.py\nComment: Bad\n"]):
+            job_id = vim_start_review("uncommitted", 0)
+        jobs.get(job_id).wait(10)
+        status = vim_poll_review(job_id)
+        assert status["state"] == "done"
+        assert status["issues_ready"] == 1
+        assert status["bytes_read"] == len("File: a.py\nComment: Bad\n")
+        result = vim_get_review_result(job_id)
+        assert result["success"] is True
+        assert result["issues_data"][0]["file_path"] == "a.py"
+        assert result["shard_summary"] == ""
+        assert result["delta_summary"] == ""
+        assert vim_poll_review(job_id)["state"] == "unknown"
+
+    def test_status_dict_is_small(self):
+        """Test that polling never ships output or issues to Vim."""
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted", 0)
+        status = vim_poll_review(job_id)
+        assert status["state"] == "running"
+        assert set(status) == {
+            "state", "bytes_read", "issues_ready", "elapsed_secs", "preparing", "parsing",
+            "parse_progress",
+        }
+
+    def test_read_returns_new_output(self):
+        """Test reading output incrementally."""
+        with fake_review(["echo", "hello"]):
+            job_id = vim_start_review("uncommitted", 0)
+        jobs.get(job_id).wait(10)
+        assert vim_read_review(job_id) == "hello\n"
+        assert vim_read_review(job_id) == ""
+
+    def test_failed_review(self):
+        """Test that a failing command yields its output as the error."""
+        with fake_review(["sh", "-c", "echo 'Error: not authenticated'; exit 1"]):
+            job_id = vim_start_review("uncommitted", 0)
+        result = vim_get_review_result(job_id)
+        assert result["success"] is False
+        assert "not authenticated" in result["error_message"]
+
+    def test_timeout(self):
+        """Test that the timeout stops the review."""
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted", 1)
+        jobs.get(job_id).wait(10)
+        assert vim_poll_review(job_id)["state"] == "timeout"
+        assert "timed out" in vim_get_review_result(job_id)["error_message"]
+
+    def test_cancel(self):
+        """Test that cancelling forgets the job."""
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted", 0)
+        vim_cancel_review(job_id)
+        assert vim_poll_review(job_id)["state"] == "unknown"
+        assert vim_read_review(job_id) == ""
+
+    def test_unknown_job_result(self):
+        """Test that an unknown job id yields a failed result."""
+        result = vim_get_review_result(-1)
+        assert result["success"] is False
+        assert result["shards"] == []
+
+    def test_animation_frame_lists_issues_so_far(self):
+        """Test that the spinner frame shows issues parsed by the last poll."""
+        cmd = ["sh", "-c", "printf 'File: a.py\\nComment: Early bird\\n=====\\n'; sleep 10"]
+        with fake_review(cmd):
+            job_id = vim_start_review("uncommitted", 0)
+        job = jobs.get(job_id)
+        while vim_poll_review(job_id)["issues_ready"] == 0 and job.elapsed_secs < 5:
+            job.wait(0.05)
+        content = vim_get_animation_frame(0, 5)
+        assert "  1 issue(s) found so far:" in content
+        assert any("Early bird" in line for line in content)
+
+    def test_sharded_review(self, repo, monkeypatch, fake_coderabbit):
+        """Test a sharded review reports merged issues and shard timings."""
+        monkeypatch.chdir(repo)
+        (repo / "a.py").write_text("changed\n")
+        for name in ("b.py", "c.py", "d.py"):
+            (repo / name).write_text(f"{name}\n")
+        job_id = vim_start_review("uncommitted", 0, 2, 1)
+        job = jobs.get(job_id)
+        result = vim_get_review_result(job_id)
+        shards = job.shards
+        assert result["success"] is True
+        assert [i["file_path"] for i in result["issues_data"]] == [
+            "a.py", "b.py", "c.py", "d.py",
+        ]
+        assert len(result["shards"]) == 2
+        assert result["shard_summary"].startswith("Shards: #1 ")
+        assert not any(os.path.exists(s.cwd) for s in shards)
+
+
+    def test_delta_review_marks_carried_issues(self, repo, monkeypatch, fake_coderabbit):
+        """Test that issues kept from the previous review are marked carried."""
+        monkeypatch.chdir(repo)
+        delta.reset()
+        (repo / "a.py").write_text("changed\n")
+        (repo / "b.py").write_text("b.py\n")
+        vim_get_review_result(vim_start_review("uncommitted", 0, delta=True), False)
+        (repo / "b.py").write_text("b.py fixed\n")
+        result = vim_get_review_result(vim_start_review("uncommitted", 0, delta=True), False)
+        delta.reset()
+        assert [(i["file_path"], i.get("carried", False)) for i in result["issues_data"]] == [
+            ("a.py", True), ("b.py", False),
+        ]
+        review = vim_format_review(True, result["issues_data"], "")
+        headers = [line for line in review["lines"] if line.startswith("  [ ]")]
+        assert CARRIED_ISSUE_BADGE in headers[0]
+        assert CARRIED_ISSUE_BADGE not in headers[1]
+
+
+class TestVimReviewResultTaskApi:
+    """Tests for building review results on a worker thread."""
+
+    def test_formatted_result(self):
+        """Test that the task result carries the formatted review."""
+        with fake_review(["printf", "File: a.py\nComment: Bug\n"]):
+            job_id = vim_start_review("uncommitted")
+        task_id = vim_start_review_result(job_id, False, False, 7)
+        tasks.get(task_id).wait(10)
+        assert vim_poll_task(task_id)["state"] == "done"
+        result = vim_take_review_result(task_id)
+        assert result["success"] is True
+        assert result["issues_data"][0]["file_path"] == "a.py"
+        assert result["review"]["issue_count"] == 1
+        assert any("7s" in line for line in result["review"]["lines"])
+        assert "lines" not in result["issues_data"][0]
+        assert vim_poll_task(task_id) == {"state": "unknown", "phase": ""}
+
+    def test_issues_formatted_without_round_trip(self):
+        """Test that the parsed issues are formatted, not rebuilt from dicts."""
+        with fake_review(["printf", "File: a.py\nComment: Bug\n"]):
+            job_id = vim_start_review("uncommitted")
+        with patch("vim4rabbit.ReviewIssue.from_dict", side_effect=AssertionError):
+            result = vim_take_review_result(vim_start_review_result(job_id, False))
+        assert result["review"]["issue_count"] == 1
+        assert sessions.get(result["review_id"]).issue(1).file_path == "a.py"
+
+    def test_failed_review_not_formatted(self):
+        """Test that failures are left for VimScript to format."""
+        with fake_review(["sh", "-c", "echo 'No files found'; exit 1"]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_take_review_result(vim_start_review_result(job_id))
+        assert result["success"] is False
+        assert "review" not in result
+
+    def test_unknown_and_cancelled(self):
+        """Test that unknown or cancelled tasks yield a failed result."""
+        assert vim_take_review_result(-1)["error_message"] == "Unknown review task"
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted")
+        task_id = vim_start_review_result(job_id)
+        vim_cancel_task(task_id)
+        assert vim_poll_task(task_id)["state"] == "unknown"
+        jobs.cancel(job_id)
+
+    def test_animation_frame_shows_preparation(self):
+        """Test that the spinner frame reports shards being set up."""
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted", 0)
+        job = jobs.get(job_id)
+        with job._lock:
+            job.preparing = True
+            content = vim_get_animation_frame(0, 5)
+        assert content[2].startswith("  Preparing shards...")
+        jobs.cancel(job_id)
+
+    def test_animation_frame_shows_parse_progress(self, monkeypatch):
+        """Test that the spinner frame reports a parse that is behind."""
+        monkeypatch.setattr(jobs, "PARSE_CHUNK_SIZE", 500)
+        with fake_review(["sleep", "10"]):
+            job_id = vim_start_review("uncommitted", 0)
+        job = jobs.get(job_id)
+        while job.preparing:
+            time.sleep(0.01)
+        output = "x" * 2000
+        with job._lock:
+            job._pending[0] = (output, 0)
+            job._received = len(output)
+            job._pump()
+            content = vim_get_animation_frame(0, 5)
+        assert content[2].startswith("  Parsing results... 25%")
+        jobs.cancel(job_id)
+
+
+class TestVimSpeculativeApi:
+    """Tests for the vim_speculative_* wrappers."""
+
+    @pytest.fixture(autouse=True)
+    def clean_state(self, monkeypatch, tmp_path):
+        """Use a temporary cache and reset speculative state."""
+        monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path))
+        speculative.reset()
+        yield
+        speculative.reset()
+        jobs.cancel_all()
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_speculative_result_served_from_cache(self, mock_key):
+        """Test that a finished speculative review is a cache hit."""
+        with fake_review(["printf", "File: a.py\n"]):
+            assert vim_speculative_start(0) is True
+        while vim_speculative_poll():
+            (speculative._job or speculative._starting).wait(0.05)
+        lookup = vim_review_cache_lookup("uncommitted")
+        assert lookup["hit"] is True
+        assert "1 hit," in vim_speculative_stats()
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_rate_limited_start_keeps_polling(self, mock_key):
+        """Test that a start deferred by the rate limit asks Vim to keep polling."""
+        with fake_review(["sleep", "10"]):
+            assert vim_speculative_start(60) is True
+            assert vim_speculative_start(60) is True
+        assert speculative.is_deferred() is True
+        vim_speculative_cancel()
+        assert vim_speculative_poll() is False
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_claim_adopts_running_review(self, mock_key):
+        """Test that a claimed speculative review becomes a review job."""
+        with fake_review(["printf", "File: a.py\n"]):
+            vim_speculative_start(0)
+        speculative._starting.wait(10)
+        job_id = vim_speculative_claim("k1")
+        assert job_id > 0
+        assert vim_speculative_poll() is False
+        assert vim_get_review_result(job_id)["issues_data"][0]["file_path"] == "a.py"
+
+    def test_claim_nothing_running(self):
+        """Test that claiming with no speculative review returns 0."""
+        assert vim_speculative_claim("k1") == 0
+        assert "1 miss |" in vim_speculative_stats()
+
+    @patch("vim4rabbit.cache.compute_cache_key", return_value="k1")
+    def test_cancel(self, mock_key):
+        """Test that cancel stops the speculative review."""
+        with fake_review(["sleep", "10"]):
+            vim_speculative_start(0)
+        vim_speculative_cancel()
+        assert vim_speculative_poll() is False
+
+
+class TestVimReviewMetricsApi:
+    """Tests for review metrics recording and reporting."""
+
+    def setup_method(self):
+        """Start with an empty metrics history."""
+        metrics.reset()
+
+    def teardown_method(self):
+        """Clear the metrics history."""
+        metrics.reset()
+
+    def test_review_records_all_phases(self):
+        """Test that a finished review, its formatting and render are recorded."""
+        result = finish_review("File: a.py\nComment: Bad\n")
+        vim_format_review(True, result["issues_data"], "", 1)
+        vim_record_render(0.004)
+        summary = vim_get_review_metrics()
+        assert summary["count"] == 1
+        for phase in ("spawn", "first_byte", "first_issue", "last_byte",
+                      "parse", "format", "render", "total"):
+            assert phase in summary["phases"]
+        assert summary["phases"]["render"]["last"] == 0.004
+        assert summary["bytes"]["total"] == len("File: a.py\nComment: Bad\n")
+
+    def test_failed_review_not_recorded(self):
+        """Test that failed reviews do not skew the metrics."""
+        with fake_review(["false"]):
+            vim_get_review_result(vim_start_review("uncommitted"))
+        assert vim_get_review_metrics()["count"] == 0
+
+    def test_stats_lines(self):
+        """Test the :Rabbit stats report."""
+        assert vim_get_review_stats() == ["Review metrics: no reviews recorded yet"]
+        finish_review("File: a.py\n")
+        assert vim_get_review_stats()[0] == "Review metrics (last 1 review(s))"
+
+
+class TestVimIssueTrackingApi:
+    """Tests for new/persisting/resolved tracking in vim_get_review_result."""
+
+    FIRST = "File: a.py\nComment: Old bug\n=====\nFile: a.py\nComment: Kept bug\n"
+    SECOND = "File: a.py\nComment: Kept bug\n=====\nFile: a.py\nComment: New bug\n"
+
+    @pytest.fixture(autouse=True)
+    def in_repo(self, repo, monkeypatch):
+        """Run reviews inside a fresh repository."""
+        monkeypatch.chdir(repo)
+
+    def test_first_review_untracked(self):
+        """Test that the first review of a branch has no statuses."""
+        result = finish_review(self.FIRST)
+        assert result["issue_summary"] == ""
+        assert "status" not in result["issues_data"][0]
+
+    def test_statuses_and_summary(self):
+        """Test that the second review is classified against the first."""
+        finish_review(self.FIRST)
+        result = finish_review(self.SECOND)
+        assert [d["status"] for d in result["issues_data"]] == ["persisting", "new"]
+        assert result["issue_summary"] == "Issues: 1 new, 1 persisting, 1 resolved"
+        review = vim_format_review(True, result["issues_data"], "")
+        assert sum("✨ new" in line for line in review["lines"]) == 1
+
+    def test_new_only(self):
+        """Test that persisting issues can be left out."""
+        finish_review(self.FIRST)
+        with fake_review(["printf", "%s", self.SECOND]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_get_review_result(job_id, True, True)
+        assert [d["summary"] for d in result["issues_data"]] == ["New bug"]
+        assert result["hidden_issues"] == 1
+        assert "(hidden)" in result["issue_summary"]
+
+    def test_new_only_legacy_shape(self):
+        """Test that the legacy issues list is filtered too."""
+        finish_review(self.FIRST)
+        with fake_review(["printf", "%s", self.SECOND]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_get_review_result(job_id, True, True, True)
+        assert result["issues"] == [result["issues_data"][0]["lines"]]
+        assert len(result["issues"]) == 1
+
+    def test_tracking_disabled(self):
+        """Test that tracking can be turned off."""
+        finish_review(self.FIRST)
+        with fake_review(["printf", "%s", self.SECOND]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_get_review_result(job_id, False)
+        assert result["issue_summary"] == ""
+        assert "status" not in result["issues_data"][0]
+
+
+class TestVimSetLineRules:
+    """Tests for vim_set_line_rules."""
+
+    def teardown_method(self):
+        """Restore the built-in rules."""
+        classifier.set_rules({})
+
+    def test_rules_applied(self):
+        """Test that valid rules are used by the parser."""
+        assert vim_set_line_rules({"separator": ["-{10,}"]}) == ""
+        result = finish_review("File: a.py\n----------\nFile: b.py\n")
+        assert len(result["issues_data"]) == 2
+
+    def test_error_message(self):
+        """Test that invalid rules are reported, not raised."""
+        assert "Unknown line kind" in vim_set_line_rules({"field": ["X:"]})
+
+
+class TestVimApplyProposedFixes:
+    """Tests for vim_apply_proposed_fixes."""
+
+    FIX = {
+        "file_path": "a.py",
+        "line_range": "1",
+        "lines": ["Comment:", "Say b.", "Proposed fix", "-print('a')", "+print('b')"],
+    }
+
+    @pytest.fixture(autouse=True)
+    def in_repo(self, repo, monkeypatch):
+        """Apply fixes inside a fresh repository."""
+        monkeypatch.chdir(repo)
+
+    def test_applied(self, repo):
+        """Test that the diff is written and the file reported."""
+        result = vim_apply_proposed_fixes([1], [self.FIX])
+        assert (repo / "a.py").read_text() == "print('b')\n"
+        assert result["applied"] == 1
+        assert result["files"] == [os.path.realpath(repo / "a.py")]
+        assert result["messages"] == ["Applied 1 of 1 hunks in 1 files"]
+
+    def test_unsaved_file_skipped(self, repo):
+        """Test that files modified in Vim are left alone."""
+        result = vim_apply_proposed_fixes([1], [self.FIX], [str(repo / "a.py")])
+        assert (repo / "a.py").read_text() == "print('a')\n"
+        assert result["files"] == []
+        assert result["messages"][1] == "Issue 1 (a.py): file has unsaved changes"
+
+    def test_lines_from_review_on_display(self, repo):
+        """Test that issue dicts sent without lines are resolved in Python."""
+        output = "File: a.py\nLine: 1\nComment:\nSay b.\nProposed fix\n-print('a')\n+print('b')\n"
+        with fake_review(["printf", "%s", output]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_take_review_result(vim_start_review_result(job_id, False))
+        assert "lines" not in result["issues_data"][0]
+        assert vim_apply_proposed_fixes([1], result["issues_data"])["applied"] == 1
+        assert (repo / "a.py").read_text() == "print('b')\n"
+
+    def test_applied_by_review_id(self, repo):
+        """Test that fixes are applied from the review's session."""
+        result = finish_review(
+            "File: a.py\nLine: 1\nComment:\nSay b.\nProposed fix\n-print('a')\n+print('b')\n"
+        )
+        assert vim_apply_proposed_fixes([1, 2], result["review_id"])["applied"] == 1
+        assert (repo / "a.py").read_text() == "print('b')\n"
+        assert vim_apply_proposed_fixes([1], 0)["applied"] == 0
+
+    def test_no_proposed_fix(self):
+        """Test issues without a diff and invalid numbers."""
+        issue = {"file_path": "a.py", "lines": ["Comment:", "Rename it."]}
+        result = vim_apply_proposed_fixes([1, 5], [issue])
+        assert result["applied"] == 0
+        assert result["messages"] == [
+            "Applied 0 of 0 hunks in 0 files",
+            "Issue 1 (a.py): no proposed fix",
+        ]
+
+
+class TestVimReviewSessionApi:
+    """Tests for the vim_* functions taking a review id."""
+
+    OUTPUT = "File: a.py\nComment: First\n=====\nFile: b.py\nLine: 3\nComment: Second\n"
+
+    def teardown_method(self):
+        """Forget the sessions and selections of a test."""
+        sessions.reset()
+        selection.reset_selections()
+
+    def formatted_review(self):
+        """Run a review through the result task and return its result."""
+        with fake_review(["printf", "%s", self.OUTPUT]):
+            job_id = vim_start_review("uncommitted")
+        return vim_take_review_result(vim_start_review_result(job_id, False))
+
+    def test_result_has_session(self):
+        """Test that a finished review's issues and lines stay in Python."""
+        result = self.formatted_review()
+        session = sessions.get(result["review_id"])
+        assert [issue.summary for issue in session.issues] == ["First", "Second"]
+        assert session.lines == result["review"]["lines"]
+
+    def test_failed_and_unknown_results_have_no_session(self):
+        """Test that results without issues to show get review id 0."""
+        with fake_review(["sh", "-c", "exit 1"]):
+            job_id = vim_start_review("uncommitted")
+        assert vim_get_review_result(job_id)["review_id"] == 0
+        assert vim_get_review_result(job_id)["review_id"] == 0
+
+    def test_build_claude_prompt(self):
+        """Test that prompts are built from the session by issue number."""
+        review_id = self.formatted_review()["review_id"]
+        assert vim_build_claude_prompt([2], review_id) == "Fix the issue in b.py:3: Second"
+        assert "## Issue 2" in vim_build_claude_prompt([1, 2, 9], review_id)
+        assert vim_build_claude_prompt([1], review_id + 100) == ""
+
+    def test_find_issue_at_line(self):
+        """Test that the cursor is resolved against the rendered lines."""
+        result = self.formatted_review()
+        lines = result["review"]["lines"]
+        second = next(i for i, line in enumerate(lines) if "2." in line and "[ ]" in line)
+        assert vim_find_issue_at_line(result["review_id"], second + 1) == 2
+        assert vim_find_issue_at_line(result["review_id"], second) == 2
+        assert vim_find_issue_at_line(0, second) == 0
+        assert vim_find_issue_at_line(result["review_id"], second - 1) == 0
+        assert "spans" not in result["review"]
+
+    def test_format_review_keeps_spans(self):
+        """Test that formatting a review for its session gives the session spans."""
+        with fake_review(["printf", "File: a.py\nComment: Bug\n"]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_get_review_result(job_id)
+        review = vim_format_review(True, result["issues_data"], "", review_id=result["review_id"])
+        lines = review["lines"]
+        header = next(i for i, line in enumerate(lines) if line.startswith("  [ ] 1."))
+        assert vim_find_issue_at_line(result["review_id"], header) == 1
+        assert sessions.get(result["review_id"]).lines == lines
+
+    def test_selections_kept_in_session(self):
+        """Test that selections of a review live in its session."""
+        review_id = self.formatted_review()["review_id"]
+        vim_init_selections(2, review_id)
+        vim_toggle_selection(2)
+        assert sessions.get(review_id).selections == {2}
+
+    def test_close(self):
+        """Test that closing a session forgets it and its selections."""
+        review_id = self.formatted_review()["review_id"]
+        vim_init_selections(2, review_id)
+        vim_select_all()
+        vim_close_review_session(review_id)
+        assert sessions.get(review_id) is None
+        assert vim_get_selected() == []
+        assert vim_build_claude_prompt([1], review_id) == ""
+
+    def test_set_all_selected(self):
+        """Test that select-all returns every header line to update at once."""
+        result = self.formatted_review()
+        review_id = result["review_id"]
+        lines = list(result["review"]["lines"])
+        vim_init_selections(2, review_id)
+        vim_toggle_selection(1)
+        vim_checkbox_lines([1], True, review_id)
+
+        update = vim_set_all_selected(True, review_id)
+        assert update["count"] == 2
+        [[lnum, header]] = update["checkboxes"]
+        assert lines[lnum - 1].startswith("  [ ] 2.")
+        assert header == lines[lnum - 1].replace("[ ]", "[x]", 1)
+        assert vim_get_selected() == [1, 2]
+
+        update = vim_set_all_selected(False, review_id)
+        assert [header for _, header in update["checkboxes"]] == [
+            line for line in lines if line.startswith(("  [ ] 1.", "  [ ] 2."))
+        ]
+        assert vim_get_selected() == []
+
+    def test_checkbox_lines(self):
+        """Test that one issue's header line is looked up by number."""
+        review_id = self.formatted_review()["review_id"]
+        [[lnum, header]] = vim_checkbox_lines([2], True, review_id)
+        assert header.startswith("  [x] 2.")
+        assert sessions.get(review_id).lines[lnum - 1] == header
+        assert vim_checkbox_lines([2], True, review_id) == []
+        assert vim_checkbox_lines([3], True, review_id) == []
+        assert vim_checkbox_lines([1], True, review_id + 100) == []
+
+    def test_set_all_selected_without_session(self):
+        """Test that selections change even without a review to update."""
+        vim_init_selections(3)
+        assert vim_set_all_selected(True, 0) == {"count": 3, "checkboxes": []}
+        assert vim_get_selected() == [1, 2, 3]
+
+
+class TestVimDirectWrites:
+    """Tests for vim_* functions writing frames into a buffer directly."""
+
+    @pytest.fixture(autouse=True)
+    def fake_vim(self, monkeypatch):
+        """Run with a vim module holding buffer 5."""
+        vim = FakeVim({5: FakeBuffer(["loading", "", ""])})
+        monkeypatch.setattr(buffers, "vim", vim)
+        yield vim
+        for bufnr in (5, 6, 9):
+            vim_forget_frames(bufnr)
+
+    def test_whole_frame_without_buffer(self, fake_vim):
+        """Test that frames are returned as lines for bufnr 0."""
+        assert vim_get_animation_frame(0, 3) == vim_get_animation_frame(0, 3, 0)
+        assert fake_vim.buffers[5].writes == 0
+
+    def test_animation_frame_written(self, fake_vim):
+        """Test that only the lines of a frame that changed are written."""
+        assert vim_get_animation_frame(0, 3, 5) == {"changes": [], "delete_from": 0}
+        assert fake_vim.buffers[5] == vim_get_animation_frame(0, 3)
+        written = fake_vim.buffers[5].writes
+        vim_get_animation_frame(0, 4, 5)
+        assert fake_vim.buffers[5] == vim_get_animation_frame(0, 4)
+        assert fake_vim.buffers[5].writes - written == 1  # the elapsed time line
+
+    def test_changes_returned(self, fake_vim):
+        """Test that VimScript gets the changed lines when not writing directly."""
+        frame = vim_get_animation_frame(0, 3)
+        first = vim_get_animation_frame(0, 3, 5, False)
+        assert first == {"changes": [[1, frame]], "delete_from": len(frame) + 1}
+        update = vim_get_animation_frame(0, 4, 5, False)
+        assert len(update["changes"]) == 1
+        lnum, lines = update["changes"][0]
+        frame[lnum - 1:lnum - 1 + len(lines)] = lines
+        assert frame == vim_get_animation_frame(0, 4)
+        assert update["delete_from"] == 0
+        assert fake_vim.buffers[5] == ["loading", "", ""]
+
+    def test_unknown_buffer_gets_changes(self):
+        """Test that frames for buffers Vim does not have are sent back."""
+        update = vim_get_no_work_animation_frame(0, 9)
+        assert update["changes"] == [[1, vim_get_no_work_animation_frame(0)]]
+
+    def test_other_writes_noticed(self, fake_vim):
+        """Test that a buffer changed by someone else is fully rewritten."""
+        vim_get_animation_frame(0, 3, 5)
+        buffer = fake_vim.buffers[5]
+        buffer.options["modifiable"] = True
+        buffer[1:] = []
+        buffer.options["modifiable"] = False
+        vim_get_animation_frame(0, 3, 5)
+        assert buffer == vim_get_animation_frame(0, 3)
+
+    def test_forget_frames(self, fake_vim):
+        """Test that a forgotten frame is sent whole."""
+        vim_get_animation_frame(0, 3, 6, False)
+        vim_forget_frames(6)
+        assert len(vim_get_animation_frame(0, 3, 6, False)["changes"][0][1]) > 1
+
+    def test_review_lines_written(self, fake_vim):
+        """Test that a finished review is written instead of sent back."""
+        with fake_review(["printf", "File: a.py\nComment: Bug\n"]):
+            job_id = vim_start_review("uncommitted")
+        result = vim_take_review_result(vim_start_review_result(job_id, False), 5)
+        assert result["review"]["lines"] == []
+        assert result["review"]["issue_count"] == 1
+        assert fake_vim.buffers[5] == sessions.get(result["review_id"]).lines
@@ -0,0 +1,345 @@
+"""Tests for vim4rabbit.jobs module."""
+
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from vim4rabbit import delta, jobs
+from vim4rabbit.jobs import ReviewJob
+
+
+def fake_review(cmd):
+    """Patch the review command so jobs run cmd instead of coderabbit."""
+    return patch("vim4rabbit.jobs.build_review_command", return_value=cmd)
+
+
+def prepared(job, timeout=10):
+    """Wait until the job's worker has set up its processes; returns the job."""
+    deadline = time.monotonic() + timeout
+    while job.preparing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture(autouse=True)
+def reset_jobs():
+    """Cancel and forget every job after each test."""
+    yield
+    jobs.cancel_all()
+
+
+class TestReviewJob:
+    """Tests for ReviewJob."""
+
+    def test_parses_output_on_poll(self):
+        """Test that issues become ready as polls consume output."""
+        with fake_review(["printf", "File: a.py\\n=====\\nFile: b.py\\n"]):
+            job = ReviewJob("uncommitted")
+        assert job.wait(10) is True
+        status = job.poll()
+        assert status["state"] == "done"
+        assert status["issues_ready"] == 2
+        result = job.result()
+        assert result.success is True
+        assert [i.file_path for i in result.issues] == ["a.py", "b.py"]
+
+    def test_json_output_format(self):
+        """Test a review parsed by the structured backend."""
+        line = '{"file": "a.py", "start_line": 1, "end_line": 2, "comment": "Bad"}'
+        with fake_review(["echo", line]) as build:
+            job = ReviewJob("uncommitted", output_format="json")
+        build.assert_called_once_with("uncommitted", "json")
+        result = job.result()
+        assert [(i.file_path, i.line_range, i.summary) for i in result.issues] == [
+            ("a.py", "1-2", "Bad")
+        ]
+
+    def test_output_kept_once(self):
+        """Test that the raw output is the parser's buffer, not a copy."""
+        with fake_review(["printf", "File: a.py\\n=====\\nFile: b.py\\n"]):
+            job = ReviewJob("uncommitted")
+        result = job.result()
+        assert result.raw_output == "File: a.py\n=====\nFile: b.py\n"
+        assert result.raw_output is job.outputs[0].text
+        assert all(command.output == "" for command in job._commands)
+
+    def test_read_returns_new_output(self):
+        """Test that read() returns output received since the last read()."""
+        with fake_review(["printf", "hello\\n"]):
+            job = ReviewJob("uncommitted")
+        job.wait(10)
+        assert job.read() == "hello\n"
+        assert job.read() == ""
+
+    def test_metrics_recorded(self):
+        """Test that latency marks are filled in when the job finishes."""
+        cmd = ["sh", "-c", "printf 'File: a.py\\n=====\\n'; sleep 0.2; printf 'File: b.py\\n'"]
+        with fake_review(cmd):
+            job = ReviewJob("uncommitted")
+        job.result()
+        m = job.metrics
+        assert m.review_type == "uncommitted"
+        assert 0 <= m.spawn <= m.first_byte <= m.last_byte <= m.total
+        assert m.first_issue == m.issue_times[0]
+        assert len(m.issue_times) == 2
+        assert m.issue_count == 2
+        assert m.bytes_read == len("File: a.py\n=====\nFile: b.py\n")
+        assert m.parse > 0
+
+    def test_running_until_process_exits(self):
+        """Test that the job stays running while its process runs."""
+        with fake_review(["sleep", "10"]):
+            job = ReviewJob("uncommitted")
+        assert job.poll()["state"] == "running"
+        assert job.done is False
+
+    def test_failure_keeps_output_as_error(self):
+        """Test that a non-zero exit fails the review with its output."""
+        with fake_review(["sh", "-c", "echo 'No files found'; exit 1"]):
+            job = ReviewJob("uncommitted")
+        result = job.result()
+        assert result.success is False
+        assert "No files found" in result.error_message
+
+    def test_command_not_found(self):
+        """Test that a missing coderabbit fails the job."""
+        with fake_review(["nonexistent_command_12345"]):
+            job = ReviewJob("uncommitted")
+        job.wait(10)
+        assert job.state == "failed"
+        assert job.result().success is False
+        assert "Command not found" in job.result().error_message
+
+    def test_cancel(self):
+        """Test that cancelling stops the job and reports cancellation."""
+        with fake_review(["sleep", "10"]):
+            job = ReviewJob("uncommitted")
+        job.cancel()
+        assert job.state == "cancelled"
+        assert job.result().error_message == "Review cancelled"
+
+    def test_unsharded_when_not_shardable(self, repo, monkeypatch, fake_coderabbit):
+        """Test that a committed review runs as a single process."""
+        monkeypatch.chdir(repo)
+        job = ReviewJob("committed", shard_count=4)
+        assert job.sharded is False
+        assert job.shards == []
+        job.wait(10)
+
+    def test_sharded_respects_max_jobs(self, repo, monkeypatch, fake_coderabbit):
+        """Test that at most max_jobs shard processes run at once."""
+        monkeypatch.chdir(repo)
+        (repo / "a.py").write_text("changed\n")
+        for name in ("b.py", "c.py", "d.py"):
+            (repo / name).write_text(f"{name}\n")
+        running = []
+        launch = ReviewJob._launch
+
+        def counting_launch(job, *args):
+            launch(job, *args)
+            running.append(len(job._running))
+
+        with patch.object(ReviewJob, "_launch", counting_launch):
+            job = ReviewJob("uncommitted", shard_count=3, max_jobs=1)
+            result = job.result()
+        assert job.sharded is True
+        assert running == [1, 1, 1]
+        assert result.success is True
+        assert len(result.issues) == 4
+        assert all(s.exit_code == 0 for s in job.shards)
+        assert not any(os.path.exists(s.cwd) for s in job.shards)
+
+
+class TestPreparation:
+    """Tests for the setup ReviewJob's worker does before starting processes."""
+
+    def test_planning_runs_on_worker(self, repo, monkeypatch, fake_coderabbit):
+        """Test that the constructor returns while the delta plan is computed."""
+        monkeypatch.chdir(repo)
+        release = threading.Event()
+        plan = delta.plan
+
+        def slow_plan(root):
+            release.wait(10)
+            return plan(root)
+
+        with patch("vim4rabbit.delta.plan", side_effect=slow_plan):
+            job = ReviewJob("uncommitted", delta=True)
+            status = job.poll()
+            assert status["state"] == "running"
+            assert status["preparing"] is True
+            assert job._commands == []
+            release.set()
+            assert job.wait(10) is True
+        assert job.poll()["preparing"] is False
+        assert job.result().success is True
+
+    def test_cancel_while_preparing(self, repo, monkeypatch, fake_coderabbit):
+        """Test that a review cancelled during setup starts no process."""
+        monkeypatch.chdir(repo)
+        (repo / "a.py").write_text("changed\n")
+        (repo / "b.py").write_text("b.py\n")
+        release = threading.Event()
+        prepare = jobs.ShardedReview.prepare
+
+        def slow_prepare(*args, **kwargs):
+            release.wait(10)
+            return prepare(*args, **kwargs)
+
+        with patch("vim4rabbit.jobs.ShardedReview.prepare", side_effect=slow_prepare):
+            job = ReviewJob("uncommitted", shard_count=2)
+            job.cancel()
+            release.set()
+            job._worker.join(10)
+        assert job.state == "cancelled"
+        assert job._commands == []
+        assert job.sharded is False
+        assert job.poll()["preparing"] is False
+
+
+    def test_skip_cached_computes_key_on_worker(self):
+        """Test that a job for a new tree records its key and runs."""
+        with patch("vim4rabbit.cache.compute_cache_key", return_value="k1"), \
+                patch("vim4rabbit.cache.has_review", return_value=False), \
+                fake_review(["printf", "File: a.py\\n"]):
+            job = ReviewJob("uncommitted", skip_cached=True, skip_keys=("k0",))
+            result = job.result()
+        assert job.cache_key == "k1"
+        assert job.skipped is False
+        assert [i.file_path for i in result.issues] == ["a.py"]
+
+    @pytest.mark.parametrize("key,cached", [("", False), ("k0", False), ("k1", True)])
+    def test_skip_cached_skips_reviewed_tree(self, key, cached):
+        """Test that an unfingerprinted, skipped or cached tree starts no process."""
+        with patch("vim4rabbit.cache.compute_cache_key", return_value=key), \
+                patch("vim4rabbit.cache.has_review", return_value=cached), \
+                fake_review(["true"]):
+            job = ReviewJob("uncommitted", skip_cached=True, skip_keys=("k0",))
+            job.wait(10)
+        assert job.skipped is True
+        assert job.state == "cancelled"
+        assert job._commands == []
+        assert job.poll()["preparing"] is False
+
+class TestParseWorker:
+    """Tests for the chunked parsing of ReviewJob's worker thread."""
+
+    OUTPUT = "=====\n".join(f"File: f{i}.py\nComment: Issue {i}\n" for i in range(50))
+
+    def test_small_slices_parse_the_same(self, monkeypatch):
+        """Test that slicing the output does not change the issues."""
+        monkeypatch.setattr(jobs, "PARSE_CHUNK_SIZE", 7)
+        with fake_review(["printf", "%s", self.OUTPUT]):
+            job = ReviewJob("uncommitted")
+        result = job.result()
+        assert [i.file_path for i in result.issues] == [f"f{i}.py" for i in range(50)]
+        assert result.raw_output == self.OUTPUT
+        status = job.poll()
+        assert status["parsing"] is False
+        assert status["parse_progress"] == 100
+
+    def test_progress_while_behind(self, monkeypatch):
+        """Test that a burst larger than a slice is reported as parsing."""
+        monkeypatch.setattr(jobs, "PARSE_CHUNK_SIZE", 500)
+        with fake_review(["sleep", "10"]):
+            job = prepared(ReviewJob("uncommitted"))
+        with job._lock:
+            job._pending[0] = (self.OUTPUT, 0)
+            job._received = len(self.OUTPUT)
+            job._pump()
+            status = job.poll()
+        assert status["state"] == "running"
+        assert status["parsing"] is True
+        assert 0 < status["parse_progress"] < 100
+
+    def test_parse_error_fails_job(self):
+        """Test that an exception in the worker fails the review."""
+        with fake_review(["printf", "File: a.py\n"]):
+            with patch("vim4rabbit.jobs.create_parser") as create:
+                create.return_value.feed.side_effect = RuntimeError("boom")
+                job = ReviewJob("uncommitted")
+        assert job.wait(10) is True
+        assert job.state == "failed"
+        assert job.result().error_message == "Failed to parse review output: boom"
+
+
+class TestDeltaReviewJob:
+    """Tests for ReviewJob in delta mode."""
+
+    @pytest.fixture(autouse=True)
+    def reset_baselines(self):
+        """Forget delta baselines around each test."""
+        delta.reset()
+        yield
+        delta.reset()
+
+    def _changes(self, repo):
+        """Modify a.py and add three untracked files."""
+        (repo / "a.py").write_text("changed\n")
+        for name in ("b.py", "c.py", "d.py"):
+            (repo / name).write_text(f"{name}\n")
+
+    def test_rereviews_only_changed_files(self, repo, monkeypatch, fake_coderabbit):
+        """Test that a repeat review runs coderabbit on touched files only."""
+        monkeypatch.chdir(repo)
+        self._changes(repo)
+        first = prepared(ReviewJob("uncommitted", delta=True))
+        assert first.delta.full is True
+        assert len(first.result().issues) == 4
+
+        (repo / "b.py").write_text("b.py fixed\n")
+        second = prepared(ReviewJob("uncommitted", delta=True))
+        assert second.delta.changed == ["b.py"]
+        assert [s.files for s in second.shards] == [["b.py"]]
+        result = second.result()
+        assert [i.file_path for i in result.issues] == ["a.py", "b.py", "c.py", "d.py"]
+        assert not any(os.path.exists(s.cwd) for s in second.shards)
+
+    def test_unchanged_tree_needs_no_process(self, repo, monkeypatch, fake_coderabbit):
+        """Test that nothing is run when no file changed since last time."""
+        monkeypatch.chdir(repo)
+        self._changes(repo)
+        ReviewJob("uncommitted", delta=True).result()
+        job = prepared(ReviewJob("uncommitted", delta=True))
+        assert job.done is True
+        assert job._commands == []
+        assert len(job.result().issues) == 4
+
+    def test_committed_review_ignores_delta(self, repo, monkeypatch, fake_coderabbit):
+        """Test that delta mode applies to uncommitted reviews only."""
+        monkeypatch.chdir(repo)
+        job = prepared(ReviewJob("committed", delta=True))
+        assert job.delta is None
+        job.wait(10)
+
+
+class TestJobRegistry:
+    """Tests for the module-level job registry."""
+
+    def test_start_get_pop(self):
+        """Test that started jobs are tracked until popped."""
+        with fake_review(["true"]):
+            job_id = jobs.start("uncommitted")
+        assert jobs.get(job_id) is jobs.latest()
+        assert jobs.pop(job_id) is not None
+        assert jobs.get(job_id) is None
+        assert jobs.latest() is None
+
+    def test_ids_are_unique(self):
+        """Test that each start returns a new id."""
+        with fake_review(["true"]):
+            first = jobs.start("uncommitted")
+            second = jobs.start("uncommitted")
+        assert first != second
+        assert jobs.latest() is jobs.get(second)
+
+    def test_cancel_all(self):
+        """Test that cancel_all stops and forgets every job."""
+        with fake_review(["sleep", "10"]):
+            job_id = jobs.start("uncommitted")
+        job = jobs.get(job_id)
+        jobs.cancel_all()
+        assert job.state == "cancelled"
+        assert jobs.get(job_id) is None
@@ -0,0 +1,111 @@
+"""Tests for vim4rabbit.metrics module."""
+
+import sys
+import threading
+
+import pytest
+from vim4rabbit import metrics
+from vim4rabbit.types import ReviewMetrics
+
+
+@pytest.fixture(autouse=True)
+def reset_history():
+    """Clear the metrics history around each test."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestPercentile:
+    """Tests for percentile."""
+
+    def test_nearest_rank(self):
+        """Test nearest-rank percentiles."""
+        values = [5, 1, 4, 2, 3]
+        assert metrics.percentile(values, 50) == 3
+        assert metrics.percentile(values, 95) == 5
+        assert metrics.percentile(values, 0) == 1
+
+    def test_empty(self):
+        """Test that no samples yields zero."""
+        assert metrics.percentile([], 50) == 0.0
+
+
+class TestRecord:
+    """Tests for record and record_phase."""
+
+    def test_phases_fill_pending_review(self):
+        """Test that format and render attach to the pending review."""
+        review = ReviewMetrics(total=3.0)
+        metrics.record(review)
+        metrics.record_phase("format", 0.002)
+        metrics.record_phase("render", 0.01)
+        assert review.format == 0.002
+        assert review.render == 0.01
+
+    def test_render_ends_pending_review(self):
+        """Test that phases after render are ignored."""
+        review = ReviewMetrics()
+        metrics.record(review)
+        metrics.record_phase("render", 0.01)
+        metrics.record_phase("format", 5.0)
+        assert review.format is None
+
+    def test_phase_without_review_ignored(self):
+        """Test that a cached review (nothing pending) records nothing."""
+        metrics.record_phase("format", 1.0)
+        assert metrics.summarize()["count"] == 0
+
+    def test_history_is_bounded(self):
+        """Test that only the most recent reviews are kept."""
+        for i in range(metrics.HISTORY_SIZE + 5):
+            metrics.record(ReviewMetrics(total=float(i)))
+        summary = metrics.summarize()
+        assert summary["count"] == metrics.HISTORY_SIZE
+        assert summary["history"][0]["total"] == 5.0
+
+
+class TestSummarize:
+    """Tests for summarize."""
+
+    def test_phases_and_bytes(self):
+        """Test p50/p95/last per phase and bytes totals."""
+        for total, size in ((1.0, 100), (3.0, 300), (2.0, 200)):
+            metrics.record(ReviewMetrics(total=total, spawn=0.01, bytes_read=size))
+        summary = metrics.summarize()
+        assert summary["count"] == 3
+        assert summary["phases"]["total"] == {"p50": 2.0, "p95": 3.0, "last": 2.0}
+        assert summary["bytes"] == {"p50": 200, "p95": 300, "total": 600}
+
+    def test_phases_without_samples_omitted(self):
+        """Test that phases never measured are left out."""
+        metrics.record(ReviewMetrics(total=1.0))
+        phases = metrics.summarize()["phases"]
+        assert "total" in phases
+        assert "first_issue" not in phases
+        assert "parse" in phases  # parse always has a (zero) duration
+
+    def test_empty(self):
+        """Test the summary with no reviews."""
+        summary = metrics.summarize()
+        assert summary["count"] == 0
+        assert summary["phases"] == {}
+
+    def test_records_from_another_thread(self):
+        """Test summarizing while a worker thread records reviews."""
+        def worker():
+            for i in range(2000):
+                metrics.record(ReviewMetrics(total=float(i)))
+
+        # Switch threads as often as possible, so they interleave mid-summary
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            while thread.is_alive():
+                assert metrics.summarize()["count"] <= metrics.HISTORY_SIZE
+            thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert metrics.summarize()["history"][-1]["total"] == 1999.0
@@ -1,7 +1,24 @@
 """Tests for vim4rabbit.parser module."""
 
+import json
+from pathlib import Path
+
 import pytest
-from vim4rabbit.parser import parse_review_issues, parse_issue_metadata, is_preamble_line
+from vim4rabbit import classifier
+from vim4rabbit.classifier import SEPARATOR
+from vim4rabbit.parser import (
+    StreamingReviewParser,
+    StructuredReviewParser,
+    backend_names,
+    create_parser,
+    get_backend,
+    is_preamble_line,
+    issue_from_json,
+    parse_issue_metadata,
+    parse_proposed_patch,
+    parse_review_issues,
+)
+from vim4rabbit.types import ReviewIssue
 
 
 class TestParseReviewIssues:
@@ -121,6 +138,13 @@ class TestParseReviewIssuesPreambleFiltering:
         issues = parse_review_issues(output)
         assert issues == []
 
+    def test_field_header_is_never_preamble(self):
+        """Test that a File: line naming a 'loading' file starts an issue."""
+        output = "Analyzing\nFile: src/loading.py\nComment: Leak\n"
+        issues = parse_review_issues(output)
+        assert len(issues) == 1
+        assert issues[0].file_path == "src/loading.py"
+
 
 class TestParseIssueMetadata:
     """Tests for parse_issue_metadata function."""
@@ -210,3 +234,525 @@ Prompt: Another prompt here"""
         assert len(issues) == 2
         assert issues[0].prompt == "Update the code to handle edge case"
         assert issues[1].prompt == "Another prompt here"
+
+
+class TestStreamingReviewParser:
+    """Tests for StreamingReviewParser (push-style parsing)."""
+
+    SAMPLE = (
+        "Starting CodeRabbit review in plain text mode...\n"
+        "Reviewing\n"
+        "=====\n"
+        "File: src/a.py\n"
+        "Line: 1 to 3\n"
+        "Type: potential_issue\n"
+        "Comment: First problem\n"
+        "=====\n"
+        "File: src/b.py\n"
+        "Type: nitpick\n"
+        "Comment:\n"
+        "Second problem\n"
+        "Prompt: Fix b\n"
+    )
+
+    def test_matches_batch_parser_for_any_chunk_size(self):
+        """Test that chunked feeding yields the same issues as parse_review_issues."""
+        expected = parse_review_issues(self.SAMPLE)
+        for size in (1, 2, 7, 64, len(self.SAMPLE)):
+            parser = StreamingReviewParser()
+            for start in range(0, len(self.SAMPLE), size):
+                parser.feed(self.SAMPLE[start:start + size])
+            parser.close()
+            assert parser.issues == expected
+
+    def test_matches_batch_parser_on_sample_file(self):
+        """Test equivalence on the recorded sample review output."""
+        path = Path(__file__).parent / "data" / "sample_review_1.out"
+        output = path.read_text(encoding="utf-8", errors="replace")
+        parser = StreamingReviewParser()
+        for start in range(0, len(output), 100):
+            parser.feed(output[start:start + 100])
+        parser.close()
+        assert parser.issues == parse_review_issues(output)
+
+    def test_issue_emitted_when_separator_arrives(self):
+        """Test that an issue is emitted as soon as its closing separator is seen."""
+        parser = StreamingReviewParser()
+        assert parser.feed("=====\nFile: src/a.py\nComment: Bad\n") == []
+        completed = parser.feed("=====\n")
+        assert len(completed) == 1
+        assert completed[0].file_path == "src/a.py"
+        assert completed[0].summary == "Bad"
+
+    def test_partial_separator_line_is_buffered(self):
+        """Test that a separator split across chunks is still recognized."""
+        parser = StreamingReviewParser()
+        parser.feed("=====\nIssue one\n===")
+        assert parser.issues == []
+        completed = parser.feed("==\n")
+        assert [issue.lines for issue in completed] == [["Issue one"]]
+
+    def test_close_flushes_last_issue(self):
+        """Test that close() emits the final unterminated issue."""
+        parser = StreamingReviewParser()
+        parser.feed("=====\nLast issue")
+        completed = parser.close()
+        assert [issue.lines for issue in completed] == [["Last issue"]]
+        assert parser.closed is True
+
+    def test_feed_after_close_ignored(self):
+        """Test that feeding a closed parser does nothing."""
+        parser = StreamingReviewParser()
+        parser.close()
+        assert parser.feed("=====\nIssue\n=====\n") == []
+        assert parser.close() == []
+        assert parser.issues == []
+
+
+def _synthetic_output(count):
+    """Build CLI-like output with `count` issues, and the expected fields."""
+    parts = ["Starting CodeRabbit review in plain text mode...", ""]
+    expected = []
+    for i in range(count):
+        variant = i % 4
+        parts.append("=" * 76)
+        parts.append(f"File: src/module_{i % 97}.py")
+        parts.append(f"Line: {i + 1} to {i + 5}")
+        parts.append("Type: potential_issue")
+        if variant == 0:
+            summary = f"Issue number {i}"
+            parts.append(f"Comment: {summary}")
+        elif variant == 1:
+            summary = f"Issue on the next line {i}"
+            parts += ["Comment:", "", summary, "More detail."]
+        elif variant == 2:
+            summary = ("Long issue description " * 4)[:57] + "..."
+            parts.append("Comment: " + "Long issue description " * 4)
+        else:
+            # No Comment field: falls back to the first non-field line
+            summary = f"Plain description {i}"
+            parts.append(summary)
+        prompt = f"Fix issue {i}\nin two lines"
+        parts += ["Prompt: " + prompt.split("\n")[0], "  in two lines  ", ""]
+        expected.append((f"src/module_{i % 97}.py", f"{i + 1}-{i + 5}", summary, prompt))
+    return "\n".join(parts) + "\n", expected
+
+
+class TestSinglePassParser:
+    """Tests for the single-pass parser on large outputs."""
+
+    def test_synthetic_10k_issues(self):
+        """Test that every field of 10k issues is extracted in one pass."""
+        output, expected = _synthetic_output(10000)
+        issues = parse_review_issues(output)
+        assert len(issues) == 10000
+        for issue, (file_path, line_range, summary, prompt) in zip(issues, expected):
+            assert issue.file_path == file_path
+            assert issue.line_range == line_range
+            assert issue.issue_type == "potential_issue"
+            assert issue.summary == summary
+            assert issue.prompt == prompt
+
+    def test_synthetic_10k_issues_chunked(self):
+        """Test that chunked feeding of 10k issues matches the batch parse."""
+        output, _ = _synthetic_output(10000)
+        parser = StreamingReviewParser()
+        for start in range(0, len(output), 4093):
+            parser.feed(output[start:start + 4093])
+        parser.close()
+        assert parser.issues == parse_review_issues(output)
+
+    def test_metadata_matches_per_issue_extraction(self):
+        """Test that streamed metadata equals parse_issue_metadata() of the lines."""
+        path = Path(__file__).parent / "data" / "sample_review_1.out"
+        output = path.read_text(encoding="utf-8", errors="replace")
+        synthetic, _ = _synthetic_output(200)
+        for text in (output, synthetic):
+            for issue in parse_review_issues(text):
+                metadata = parse_issue_metadata(issue.lines)
+                assert metadata == {
+                    "file_path": issue.file_path,
+                    "line_range": issue.line_range,
+                    "issue_type": issue.issue_type,
+                    "summary": issue.summary,
+                    "prompt": issue.prompt,
+                }
+
+    def test_many_chunks_without_newline(self):
+        """Test that a long line fed a character at a time is joined once."""
+        parser = StreamingReviewParser()
+        parser.feed("=====\n")
+        for char in "Comment: " + "x" * 5000:
+            assert parser.feed(char) == []
+        completed = parser.close()
+        assert len(completed) == 1
+        assert completed[0].summary == "x" * 57 + "..."
+
+
+def _fields(issues):
+    """(file, line range, type, summary, prompt) of each issue."""
+    return [
+        (issue.file_path, issue.line_range, issue.issue_type, issue.summary, issue.prompt)
+        for issue in issues
+    ]
+
+
+def _streamed(output, size=100):
+    """Issues of output fed to a StreamingReviewParser in chunks of size."""
+    parser = StreamingReviewParser()
+    for start in range(0, len(output), size):
+        parser.feed(output[start:start + size])
+    parser.close()
+    return parser.issues
+
+
+class TestGoldenOutput:
+    """Golden fields, as extracted by the original rescanning parser."""
+
+    SAMPLE = Path(__file__).parent / "data" / "sample_review_1.out"
+
+    # The sample is the rendered review buffer, with the CLI output indented
+    # by four spaces, so its separators are not recognized
+    SAMPLE_FIELDS = [
+        ("autoload/vim4rabbit.vim", "256-265", "potential_issue",
+         "Both branches are identical, and success case passes Fals...", ""),
+    ]
+
+    # The same output with the indent removed
+    DEDENTED_FIELDS = [
+        ("", "", "", "\ufffd coderabbit", ""),
+        ("autoload/vim4rabbit.vim", "219-228", "potential_issue",
+         "Remove or conditionally enable debug logging before merging.", ""),
+        ("autoload/vim4rabbit.vim", "234-243", "potential_issue",
+         "Same debug logging issue as above\ufffdremove or make conditio...", ""),
+        ("autoload/vim4rabbit.vim", "256-265", "potential_issue",
+         "Both branches are identical, and success case passes Fals...", ""),
+    ]
+
+    EDGE_CASES = {
+        "single line fields": (
+            "=====\nFile: src/a.py\nLine: 7\nType: nitpick\n"
+            "Comment: Short\nPrompt: Fix it\n",
+            [("src/a.py", "7", "nitpick", "Short", "Fix it")],
+        ),
+        "comment and prompt on following lines": (
+            "=====\nFile: b.py\nLine: 1 to 2\nType: refactor_suggestion\n"
+            "Comment:\n\nFirst real line\nsecond\nPrompt:\nDo this\n  and that  \n\n",
+            [("b.py", "1-2", "refactor_suggestion", "First real line", "Do this\nand that")],
+        ),
+        "summary without comment field": (
+            "=====\nFile: c.py\nPlain description here\nmore\n",
+            [("c.py", "", "", "Plain description here", "")],
+        ),
+        "long comment truncated": (
+            "=====\nComment: " + "word " * 30 + "\n",
+            [("", "", "", "word " * 11 + "wo...", "")],
+        ),
+        "empty issues": (
+            "=====\n=====\nFile: d.py\n=====\n",
+            [("d.py", "", "", "", ""), ("", "", "", "", "")],
+        ),
+        "preamble only": (
+            "Starting CodeRabbit review in plain text mode...\nReviewing\n",
+            [],
+        ),
+        "crlf line endings": (
+            "=====\r\nFile: e.py\r\nLine: 3 to 4\r\nComment: CR\r\n",
+            [("e.py", "3-4", "", "CR", "")],
+        ),
+        "later field lines win": (
+            "=====\nFile: f.py\nComment: Top\nFile: g.py\nLine: 9\n",
+            [("g.py", "9", "", "Top", "")],
+        ),
+    }
+
+    def _sample(self):
+        return self.SAMPLE.read_text(encoding="utf-8", errors="replace")
+
+    def test_sample_file(self):
+        """Test the fields of the recorded sample, batch and streamed."""
+        output = self._sample()
+        assert _fields(parse_review_issues(output)) == self.SAMPLE_FIELDS
+        assert _fields(_streamed(output)) == self.SAMPLE_FIELDS
+
+    def test_dedented_sample_file(self):
+        """Test the fields of the sample's CLI output, batch and streamed."""
+        output = "\n".join(
+            line[4:] if line.startswith("    ") else line
+            for line in self._sample().splitlines()
+        ) + "\n"
+        assert _fields(parse_review_issues(output)) == self.DEDENTED_FIELDS
+        assert _fields(_streamed(output, 7)) == self.DEDENTED_FIELDS
+
+    @pytest.mark.parametrize("name", sorted(EDGE_CASES))
+    def test_edge_cases(self, name):
+        """Test the fields of hand-written outputs, batch and streamed."""
+        output, expected = self.EDGE_CASES[name]
+        assert _fields(parse_review_issues(output)) == expected
+        assert _fields(_streamed(output, 3)) == expected
+
+    @pytest.mark.parametrize("line,is_issue_break", [
+        ("=====", True),
+        ("==========  ", True),
+        ("=====\t", True),
+        ("====", False),
+        ("===== x", False),
+        (" =====", False),
+        ("=====a=====", False),
+    ])
+    def test_separator_detection(self, line, is_issue_break):
+        """Test separator recognition (5+ '=' then only whitespace)."""
+        issues = parse_review_issues(f"First\n{line}\nSecond\n")
+        assert (len(issues) == 2) == is_issue_break
+
+
+class TestIssueStorage:
+    """Tests for issues stored as offsets into the shared output."""
+
+    def test_issues_share_the_parsed_output(self):
+        """Test that parsed issues keep no copy of the output."""
+        output = "=====\nFile: a.py\nComment: First\n=====\nFile: b.py\nPrompt: Fix\n"
+        parser = StreamingReviewParser()
+        parser.feed(output)
+        parser.close()
+        assert parser.output.text is output
+        assert [issue.file_path for issue in parser.issues] == ["a.py", "b.py"]
+        assert parser.issues[1].lines == ["File: b.py", "Prompt: Fix", ""]
+
+    def test_chunked_output_joined_once(self):
+        """Test that a chunked stream is kept as one joined output."""
+        parser = StreamingReviewParser()
+        for chunk in ("=====\nFile: a", ".py\nComment: ", "First\n"):
+            parser.feed(chunk)
+        parser.close()
+        assert parser.output.text == "=====\nFile: a.py\nComment: First\n"
+        assert parser.issues[0].summary == "First"
+        assert parser.issues[0].lines == ["File: a.py", "Comment: First", ""]
+
+
+STRUCTURED_ISSUES = [
+    {
+        "file": "src/a.py",
+        "start_line": 10,
+        "end_line": 14,
+        "type": "potential_issue",
+        "comment": "Guard against None.\n\nThe value may be missing.",
+        "prompt": "In src/a.py around lines 10 - 14,\n  check for None first.",
+    },
+    {"file": "src/b.py", "line": 3, "type": "nitpick", "comment": "Comment: " + "x" * 80},
+    {"file": "src/c.py", "prompt": "Rename the helper."},
+    {"comment": "General remark with no file."},
+]
+
+
+def _plain_output(issues):
+    """The --plain layout of structured issues, as the text backend sees it."""
+    parts = ["Starting CodeRabbit review in plain text mode...", ""]
+    for data in issues:
+        parts.append("=" * 76)
+        parts.extend(issue_from_json(data).lines)
+    return "\n".join(parts)
+
+
+class TestStructuredReviewParser:
+    """Tests for the structured (json) parser backend."""
+
+    def test_ndjson_matches_text_backend(self):
+        """Test that NDJSON output yields the same issues as the text output."""
+        output = "\n".join(json.dumps(data) for data in STRUCTURED_ISSUES) + "\n"
+        issues = parse_review_issues(output, "json")
+        assert issues == parse_review_issues(_plain_output(STRUCTURED_ISSUES))
+        assert [i.file_path for i in issues] == ["src/a.py", "src/b.py", "src/c.py", ""]
+        assert issues[0].line_range == "10-14"
+        assert issues[0].summary == "Guard against None."
+        assert issues[0].prompt == "In src/a.py around lines 10 - 14,\ncheck for None first."
+        assert issues[2].summary == "Rename the helper."
+
+    @pytest.mark.parametrize("document", [
+        STRUCTURED_ISSUES,
+        {"issues": STRUCTURED_ISSUES},
+    ])
+    def test_json_documents(self, document):
+        """Test a JSON array and a document with an issues array."""
+        output = json.dumps(document, indent=2)
+        ndjson = "\n".join(json.dumps(data) for data in STRUCTURED_ISSUES)
+        assert parse_review_issues(output, "json") == parse_review_issues(ndjson, "json")
+
+    @pytest.mark.parametrize("size", [1, 7, 64])
+    def test_chunked_feed(self, size):
+        """Test that values split across chunks are decoded once complete."""
+        output = json.dumps(STRUCTURED_ISSUES, indent=2)
+        parser = StructuredReviewParser()
+        for start in range(0, len(output), size):
+            parser.feed(output[start:start + size])
+        parser.close()
+        assert parser.issues == parse_review_issues(output, "json")
+
+    def test_array_elements_stream(self):
+        """Test that array elements are emitted before the array closes."""
+        parser = StructuredReviewParser()
+        completed = parser.feed("[" + json.dumps(STRUCTURED_ISSUES[0]) + ",\n")
+        assert [issue.file_path for issue in completed] == ["src/a.py"]
+
+    def test_banners_and_status_events_skipped(self):
+        """Test that non-JSON lines and non-issue objects are ignored."""
+        output = (
+            "Starting CodeRabbit review...\n"
+            '{"event": "status", "message": "Reviewing"}\n'
+            + json.dumps(STRUCTURED_ISSUES[0]) + "\n"
+            "Review completed\n"
+        )
+        issues = parse_review_issues(output, "json")
+        assert [issue.file_path for issue in issues] == ["src/a.py"]
+
+    def test_malformed_record_skipped(self):
+        """Test that records after a malformed one stream without waiting for close."""
+        parser = StructuredReviewParser()
+        completed = parser.feed(
+            '{"file": "bad.py", "comment": oops}\n'
+            + json.dumps(STRUCTURED_ISSUES[0]) + "\n"
+        )
+        assert [issue.file_path for issue in completed] == ["src/a.py"]
+        completed = parser.feed(json.dumps(STRUCTURED_ISSUES[1]) + "\n")
+        assert [issue.file_path for issue in completed] == ["src/b.py"]
+        parser.close()
+        assert [issue.file_path for issue in parser.issues] == ["src/a.py", "src/b.py"]
+
+    def test_truncated_output_does_not_raise(self):
+        """Test that an unterminated value is dropped on close."""
+        output = json.dumps(STRUCTURED_ISSUES[0]) + "\n" + '{"file": "x.py", "comm'
+        assert len(parse_review_issues(output, "json")) == 1
+
+    def test_keeps_raw_output(self):
+        """Test that the backend keeps the output for error messages."""
+        parser = StructuredReviewParser()
+        parser.feed("Error: not logged in\n")
+        parser.close()
+        assert parser.output.text == "Error: not logged in\n"
+        assert parser.issues == []
+
+    def test_many_issues_match_text_backend(self):
+        """Test equivalence on a large review."""
+        issues = [
+            dict(STRUCTURED_ISSUES[i % len(STRUCTURED_ISSUES)], file=f"src/m{i}.py")
+            for i in range(2000)
+        ]
+        output = "\n".join(json.dumps(data) for data in issues)
+        assert parse_review_issues(output, "json") == parse_review_issues(_plain_output(issues))
+
+
+class TestParserBackends:
+    """Tests for the parser backend registry."""
+
+    def test_registered_backends(self):
+        """Test that text (the default) and json are registered."""
+        assert backend_names() == ["text", "json"]
+        assert get_backend("text") is StreamingReviewParser
+        assert get_backend("json") is StructuredReviewParser
+
+    def test_unknown_format_falls_back_to_text(self):
+        """Test that an unknown format uses the text backend."""
+        assert get_backend("yaml") is StreamingReviewParser
+        assert isinstance(create_parser("yaml"), StreamingReviewParser)
+
+    def test_cli_args(self):
+        """Test the coderabbit flags each backend requests."""
+        assert StreamingReviewParser.cli_args == ("--plain",)
+        assert StructuredReviewParser.cli_args == ("--json",)
+
+
+class TestParseProposedPatch:
+    """Tests for parse_proposed_patch function."""
+
+    def test_sample_review(self):
+        """Test the proposed fixes of real CodeRabbit output."""
+        path = Path(__file__).parent / "data" / "sample_review_1.out"
+        output = path.read_text(encoding="utf-8", errors="replace")
+        # The sample is the rendered review buffer: its separators are indented
+        classifier.set_rules({SEPARATOR: [r"\s+={5,}\s*\Z"]})
+        try:
+            issues = parse_review_issues(output)[1:]
+        finally:
+            classifier.set_rules({})
+        patches = [parse_proposed_patch(issue) for issue in issues]
+        found = [patch for patch in patches if patch is not None]
+        assert [patch.start for patch in found] == [219, 234, 256]
+        for patch in found:
+            assert len(patch.hunks) == 1
+            assert patch.hunks[0].old_lines != patch.hunks[0].new_lines
+        assert found[0].hunks[0].lines[0] == " function! s:OnReviewOutput(channel, msg)"
+        assert found[0].hunks[0].lines[-1] == " endfunction"
+
+    def test_indented_block_ends_at_prose(self):
+        """Test that an indented diff stops at the first line that is not a diff line."""
+        issue = ReviewIssue(
+            file_path="a.py",
+            line_range="3",
+            lines=[
+                "    Proposed fix",
+                "",
+                "     x = 1",
+                "    -y = 2",
+                "    +y = 3",
+                "    ",
+                "     z = 4",
+                "    Then rerun the tests.",
+                "      indented prose",
+            ],
+        )
+        patch = parse_proposed_patch(issue)
+        assert patch.hunks[0].lines == [" x = 1", "-y = 2", "+y = 3", " ", " z = 4"]
+
+    def test_indented_fence(self):
+        """Test that the indent of a fence is stripped from its lines."""
+        issue = ReviewIssue(
+            file_path="a.py",
+            lines=["  Suggested change", "  ```diff", "  -a", "  +b", "", "  ```"],
+        )
+        assert parse_proposed_patch(issue).hunks[0].lines == ["-a", "+b", " "]
+
+    def test_prose_does_not_open_a_block(self):
+        """Test that a sentence starting with "Suggested" is not a heading."""
+        issue = ReviewIssue(
+            file_path="a.py",
+            lines=["Suggested by the linter: rename it.", "- first point", "+ second"],
+        )
+        assert parse_proposed_patch(issue) is None
+
+    def test_fenced_diff_with_hunk_headers(self):
+        """Test a diff fence with file headers and two hunks."""
+        issue = ReviewIssue(
+            file_path="src/a.py",
+            line_range="10 to 12",
+            lines=[
+                "Comment:",
+                "Rename it.",
+                "```diff",
+                "--- a/src/a.py",
+                "+++ b/src/a.py",
+                "@@ -10,2 +10,2 @@",
+                " x = 1",
+                "-y = 2",
+                "+z = 2",
+                "@@ -40 +40 @@",
+                "-old()",
+                "+new()",
+                "```",
+            ],
+        )
+        patch = parse_proposed_patch(issue)
+        assert patch.file_path == "src/a.py"
+        assert patch.start == 10
+        assert [hunk.start for hunk in patch.hunks] == [10, 40]
+        assert patch.hunks[0].lines == [" x = 1", "-y = 2", "+z = 2"]
+        assert patch.hunks[1].old_lines == ["old()"]
+
+    def test_no_diff(self):
+        """Test that issues without a diff have no patch."""
+        issue = ReviewIssue(file_path="a.py", lines=["Comment:", "Consider renaming."])
+        assert parse_proposed_patch(issue) is None
+
+    def test_no_file(self):
+        """Test that a diff without a file cannot be applied."""
+        issue = ReviewIssue(lines=["```diff", "-a", "+b", "```"])
+        assert parse_proposed_patch(issue) is None
@@ -0,0 +1,158 @@
+"""Tests for vim4rabbit.patches module."""
+
+import os
+from unittest.mock import patch
+
+from vim4rabbit.patches import apply_hunks, apply_patch, locate_hunk, resolve_path
+from vim4rabbit.types import PatchHunk, ProposedPatch
+
+FILE = [
+    "def load(path):",
+    "    data = read(path)",
+    "    print('debug', data)",
+    "    return data",
+    "",
+    "def save(path, data):",
+    "    print('debug', data)",
+    "    write(path, data)",
+]
+
+# Removes the debug print from save()
+SAVE_HUNK = PatchHunk(lines=[
+    " def save(path, data):",
+    "-    print('debug', data)",
+    "     write(path, data)",
+])
+
+
+class TestApplyHunks:
+    """Tests for apply_hunks and locate_hunk."""
+
+    def test_exact(self):
+        """Test a hunk whose context matches exactly."""
+        lines, results = apply_hunks(FILE, [SAVE_HUNK])
+        assert lines == FILE[:6] + FILE[7:]
+        assert results[0].applied is True
+        assert results[0].line == 6
+        assert results[0].fuzz == 0
+
+    def test_input_not_modified(self):
+        """Test that the given lines are left alone."""
+        before = list(FILE)
+        apply_hunks(FILE, [SAVE_HUNK])
+        assert FILE == before
+
+    def test_nearest_occurrence(self):
+        """Test that the match nearest to the hint wins."""
+        hunk = PatchHunk(lines=["-    print('debug', data)"])
+        lines, results = apply_hunks(FILE, [hunk], start=7)
+        assert results[0].line == 7
+        assert lines == FILE[:6] + FILE[7:]
+        _, results = apply_hunks(FILE, [hunk], start=1)
+        assert results[0].line == 3
+
+    def test_whitespace_insensitive(self):
+        """Test that reindented context still matches and keeps the file's text."""
+        hunk = PatchHunk(lines=[
+            " def save(path,  data):",
+            "-  print('debug', data)",
+            "+    log(data)",
+            " write(path, data)",
+        ])
+        lines, results = apply_hunks(FILE, [hunk])
+        assert results[0].applied is True
+        assert lines[5:] == ["def save(path, data):", "    log(data)", "    write(path, data)"]
+
+    def test_fuzz(self):
+        """Test that stale context at the ends is ignored."""
+        hunk = PatchHunk(lines=[
+            " def save(path, data, mode):",
+            "-    print('debug', data)",
+            "     write(path, data)",
+        ], start=6)
+        lines, results = apply_hunks(FILE, [hunk])
+        assert results[0].fuzz == 1
+        assert lines == FILE[:6] + FILE[7:]
+
+    def test_failed_hunk_reported(self):
+        """Test that a hunk that does not apply fails alone."""
+        missing = PatchHunk(lines=["-    cleanup()"])
+        lines, results = apply_hunks(FILE, [missing, SAVE_HUNK])
+        assert [r.applied for r in results] == [False, True]
+        assert results[0].message == "context not found"
+        assert results[0].index == 1
+        assert len(lines) == len(FILE) - 1
+
+    def test_hunks_shift_later_hints(self):
+        """Test that earlier hunks move the hints of later ones."""
+        first = PatchHunk(lines=[" def load(path):", "+    check(path)"], start=1)
+        second = PatchHunk(lines=["-    print('debug', data)", "     write(path, data)"], start=7)
+        lines, results = apply_hunks(FILE, [first, second])
+        assert [r.line for r in results] == [1, 8]
+        assert lines[1] == "    check(path)"
+        assert "    print('debug', data)" in lines[:5]
+
+    def test_pure_insertion_needs_context(self):
+        """Test that a hunk with nothing to anchor on fails."""
+        assert locate_hunk(FILE, PatchHunk(lines=["+new"]), 0) is None
+
+
+class TestApplyPatch:
+    """Tests for apply_patch and resolve_path."""
+
+    def test_file_rewritten(self, tmp_path):
+        """Test that applied hunks are written to the file."""
+        (tmp_path / "a.py").write_text("\n".join(FILE) + "\n")
+        result = apply_patch(ProposedPatch("a.py", [SAVE_HUNK]), str(tmp_path))
+        assert result.applied_count == 1
+        assert (tmp_path / "a.py").read_text() == "\n".join(FILE[:6] + FILE[7:]) + "\n"
+
+    def test_line_endings_kept(self, tmp_path):
+        """Test that CRLF endings and a missing final newline are kept."""
+        path = tmp_path / "a.py"
+        path.write_bytes("\r\n".join(FILE).encode())
+        apply_patch(ProposedPatch("a.py", [SAVE_HUNK]), str(tmp_path))
+        assert path.read_bytes() == "\r\n".join(FILE[:6] + FILE[7:]).encode()
+
+    def test_mode_kept(self, tmp_path):
+        """Test that the file mode survives the rewrite."""
+        path = tmp_path / "a.py"
+        path.write_text("\n".join(FILE) + "\n")
+        path.chmod(0o755)
+        apply_patch(ProposedPatch("a.py", [SAVE_HUNK]), str(tmp_path))
+        assert os.stat(path).st_mode & 0o777 == 0o755
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        """Test that a failed replace reports an error and cleans up."""
+        path = tmp_path / "a.py"
+        path.write_text("\n".join(FILE) + "\n")
+        with patch("vim4rabbit.patches.os.replace", side_effect=OSError("disk full")):
+            result = apply_patch(ProposedPatch("a.py", [SAVE_HUNK]), str(tmp_path))
+        assert result.error == "cannot write file: disk full"
+        assert result.applied_count == 0
+        assert [p.name for p in tmp_path.iterdir()] == ["a.py"]
+        assert path.read_text() == "\n".join(FILE) + "\n"
+
+    def test_nothing_applied_leaves_file(self, tmp_path):
+        """Test that the file is not rewritten when no hunk applies."""
+        path = tmp_path / "a.py"
+        path.write_text("x\n")
+        os.utime(path, (1, 1))
+        result = apply_patch(ProposedPatch("a.py", [SAVE_HUNK]), str(tmp_path))
+        assert result.applied_count == 0
+        assert os.stat(path).st_mtime == 1
+
+    def test_missing_file(self, tmp_path):
+        """Test that an unreadable file is an error, not an exception."""
+        result = apply_patch(ProposedPatch("gone.py", [SAVE_HUNK]), str(tmp_path))
+        assert result.error.startswith("cannot read file")
+
+    def test_path_outside_root(self, tmp_path):
+        """Test that review paths cannot escape the repository."""
+        assert resolve_path(str(tmp_path), "../etc/passwd") is None
+        assert resolve_path(str(tmp_path), "/etc/passwd") is None
+        result = apply_patch(ProposedPatch("../x.py", [SAVE_HUNK]), str(tmp_path))
+        assert result.error == "path outside the repository"
+        assert resolve_path(str(tmp_path), "src/a.py") == os.path.join(
+            os.path.realpath(tmp_path), "src", "a.py"
+        )
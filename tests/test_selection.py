@@ -2,6 +2,8 @@
 
 import pytest
 from vim4rabbit import selection
+from vim4rabbit.content import format_review_output
+from vim4rabbit.types import ReviewIssue, ReviewResult
 
 
 @pytest.fixture(autouse=True)
@@ -30,6 +32,19 @@ class TestInitSelections:
         assert selection.get_issue_count() == 5
 
 
+    def test_keeps_selections_in_given_set(self):
+        """Test that selections are kept in a set owned by the caller."""
+        owned = {7}
+        selection.init_selections(3, owned)
+        assert owned == set()
+        selection.toggle_selection(2)
+        assert owned == {2}
+        selection.select_all()
+        assert owned == {1, 2, 3}
+        selection.deselect_all()
+        assert owned == set()
+
+
 class TestResetSelections:
     """Tests for reset_selections function."""
 
@@ -221,3 +236,40 @@ class TestFindIssueAtLine:
         ]
         assert selection.find_issue_at_line(lines, 0) == 3
         assert selection.find_issue_at_line(lines, 1) == 3
+
+
+class TestSetCheckbox:
+    """Tests for set_checkbox function."""
+
+    def test_checks_and_unchecks(self):
+        """Test that only the leading checkbox changes."""
+        assert selection.set_checkbox("  [ ] 1. [ ] x {{{", True) == "  [x] 1. [ ] x {{{"
+        assert selection.set_checkbox("  [x] 1. [x] x {{{", False) == "  [ ] 1. [x] x {{{"
+
+    def test_line_without_checkbox(self):
+        """Test that other lines are left alone."""
+        assert selection.set_checkbox("    details", True) == "    details"
+
+
+class TestIssueAtLine:
+    """Tests for issue_at_line function."""
+
+    def test_lines_of_a_fold(self):
+        """Test that header, body and end lines belong to the issue."""
+        spans = [(6, 9), (11, 13)]
+        assert [selection.issue_at_line(spans, lnum) for lnum in range(5, 15)] == [
+            0, 1, 1, 1, 1, 0, 2, 2, 2, 0,
+        ]
+
+    def test_no_spans(self):
+        """Test that nothing is found without issues."""
+        assert selection.issue_at_line([], 1) == 0
+
+    def test_matches_find_issue_at_line(self):
+        """Test that spans and scanning the lines agree on every line."""
+        issues = [ReviewIssue(lines=[f"Problem {i}"] * i) for i in range(1, 6)]
+        output = format_review_output(ReviewResult(success=True, issues=issues))
+        lines = output["lines"]
+        for index in range(len(lines)):
+            expected = selection.find_issue_at_line(lines, index)
+            assert selection.issue_at_line(output["spans"], index + 1) == expected
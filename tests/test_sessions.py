@@ -0,0 +1,48 @@
+"""Tests for vim4rabbit.sessions module."""
+
+import pytest
+from vim4rabbit import sessions
+from vim4rabbit.types import ReviewIssue
+
+
+@pytest.fixture(autouse=True)
+def reset_sessions():
+    """Forget every session after each test."""
+    yield
+    sessions.reset()
+
+
+class TestSessions:
+    """Tests for the session registry."""
+
+    def test_create_and_get(self):
+        """Test that a session is found by its review id."""
+        issues = [ReviewIssue(file_path="a.py")]
+        session = sessions.create(issues, ["line"])
+        assert sessions.get(session.review_id) is session
+        assert session.issues is issues
+        assert session.lines == ["line"]
+        assert session.selections == set()
+
+    def test_ids_increase(self):
+        """Test that every session gets a new id and the latest is tracked."""
+        first = sessions.create([])
+        second = sessions.create([])
+        assert second.review_id > first.review_id
+        assert sessions.latest() is second
+        assert first.lines == []
+
+    def test_close(self):
+        """Test that closed and unknown sessions are not found."""
+        session = sessions.create([])
+        sessions.close(session.review_id)
+        sessions.close(session.review_id)
+        assert sessions.get(session.review_id) is None
+        assert sessions.get(0) is None
+        assert sessions.latest() is None
+
+    def test_oldest_forgotten(self):
+        """Test that at most MAX_SESSIONS sessions are kept."""
+        created = [sessions.create([]) for _ in range(sessions.MAX_SESSIONS + 1)]
+        assert sessions.get(created[0].review_id) is None
+        assert all(sessions.get(s.review_id) is s for s in created[1:])
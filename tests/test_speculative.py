@@ -0,0 +1,305 @@
+"""Tests for vim4rabbit.speculative module."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from vim4rabbit import cache, speculative
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch, tmp_path):
+    """Use a temporary cache and reset speculative state around each test."""
+    monkeypatch.setenv("VIM4RABBIT_CACHE_DIR", str(tmp_path))
+    speculative.reset()
+    yield
+    speculative.reset()
+
+
+def fake_review(cmd):
+    """Patch the review command so jobs run cmd instead of coderabbit."""
+    return patch("vim4rabbit.jobs.build_review_command", return_value=cmd)
+
+
+def with_key(key):
+    """Patch the tree's cache key."""
+    return patch("vim4rabbit.cache.compute_cache_key", return_value=key)
+
+
+def wait_prepared(timeout=10):
+    """Wait until a start has fingerprinted its tree."""
+    job = speculative._starting
+    deadline = time.monotonic() + timeout
+    while job is not None and job.preparing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def prepared(now=None):
+    """Wait until a start has fingerprinted its tree, then poll it in."""
+    wait_prepared()
+    return speculative.poll(now)
+
+
+def run_to_completion():
+    """Poll the speculative review until it finishes."""
+    while speculative.poll():
+        (speculative._job or speculative._starting).wait(0.05)
+
+
+class TestMaybeStart:
+    """Tests for maybe_start."""
+
+    def test_starts_and_caches_result(self):
+        """Test that a finished run is stored in the review cache."""
+        with with_key("k1"), fake_review(["printf", "File: a.py\\n"]):
+            assert speculative.maybe_start(now=100) is True
+            run_to_completion()
+        result, _ = cache.load_review("k1")
+        assert result.issues[0].file_path == "a.py"
+        assert speculative.get_stats()["completed"] == 1
+
+    def test_key_computed_on_worker(self):
+        """Test that maybe_start returns before the tree is fingerprinted."""
+        release = threading.Event()
+
+        def slow_key(review_type, cwd=None):
+            release.wait(10)
+            return "k1"
+
+        slow = patch("vim4rabbit.cache.compute_cache_key", side_effect=slow_key)
+        with slow, fake_review(["sleep", "10"]):
+            assert speculative.maybe_start(now=100) is True
+            assert speculative.is_running() is True
+            assert speculative.poll(now=100) is True
+            assert speculative._job is None
+            release.set()
+            prepared(now=100)
+        assert speculative._job_key == "k1"
+        assert speculative.get_stats()["started"] == 1
+
+    def test_rate_limited_start_deferred(self):
+        """Test that a start closer than min_interval runs when the interval ends."""
+        with fake_review(["sleep", "10"]):
+            with with_key("k1"):
+                assert speculative.maybe_start(60, now=100) is True
+                prepared(now=100)
+            with with_key("k2"):
+                assert speculative.maybe_start(60, now=130) is False
+                assert speculative.is_deferred() is True
+                assert speculative.poll(now=159) is True
+                assert speculative._job_key == "k1"
+                assert speculative.poll(now=160) is True
+                prepared(now=160)
+        assert speculative._job_key == "k2"
+        assert speculative.is_deferred() is False
+        stats = speculative.get_stats()
+        assert (stats["started"], stats["superseded"], stats["skipped"]) == (2, 1, 0)
+
+    def test_later_save_replaces_deferred_start(self):
+        """Test that only the last save of an interval is started."""
+        with fake_review(["sleep", "10"]):
+            with with_key("k1"):
+                speculative.maybe_start(60, now=100)
+                prepared(now=100)
+            with with_key("k2"):
+                speculative.maybe_start(60, now=110)
+            with with_key("k3"):
+                speculative.maybe_start(60, now=130)
+                speculative.poll(now=160)
+                prepared(now=160)
+        assert speculative._job_key == "k3"
+        stats = speculative.get_stats()
+        assert (stats["started"], stats["skipped"]) == (2, 1)
+
+    def test_start_after_interval_drops_deferred(self):
+        """Test that a start once the interval is over replaces the deferred one."""
+        with fake_review(["sleep", "10"]):
+            with with_key("k1"):
+                speculative.maybe_start(60, now=100)
+                prepared(now=100)
+            with with_key("k2"):
+                speculative.maybe_start(60, now=130)
+                assert speculative.maybe_start(60, now=161) is True
+                prepared(now=161)
+        assert speculative.is_deferred() is False
+        assert speculative.get_stats()["started"] == 2
+
+    def test_cancel_drops_deferred_start(self):
+        """Test that cancelling also forgets a deferred start."""
+        with with_key("k1"), fake_review(["true"]):
+            speculative.maybe_start(60, now=100)
+            speculative.maybe_start(60, now=130)
+        speculative.cancel()
+        assert speculative.is_deferred() is False
+        assert speculative.poll(now=200) is False
+
+    def test_unchanged_fingerprint_skipped(self):
+        """Test that the same tree is not speculated twice."""
+        with with_key("k1"), fake_review(["sleep", "10"]):
+            assert speculative.maybe_start(0, now=100) is True
+            prepared(now=100)
+            first = speculative._job
+            speculative.maybe_start(0, now=200)
+            prepared(now=200)
+        assert speculative._job is first
+        stats = speculative.get_stats()
+        assert (stats["started"], stats["skipped"], stats["superseded"]) == (1, 1, 0)
+
+    def test_skipped_start_not_rate_limited(self):
+        """Test that a skipped start does not delay the next one."""
+        with fake_review(["sleep", "10"]):
+            with with_key("k1"):
+                speculative.maybe_start(60, now=100)
+                prepared(now=100)
+                speculative.maybe_start(60, now=200)
+                prepared(now=200)
+            with with_key("k2"):
+                assert speculative.maybe_start(60, now=210) is True
+                prepared(now=210)
+        assert speculative._job_key == "k2"
+
+    def test_reviewed_tree_skipped(self):
+        """Test that a tree already speculated and cached is not started again."""
+        with with_key("k1"), fake_review(["true"]):
+            speculative.maybe_start(0, now=100)
+            run_to_completion()
+            with patch("vim4rabbit.cache.has_review", return_value=False):
+                speculative.maybe_start(0, now=200)
+                assert prepared(now=200) is False
+        assert speculative.get_stats()["skipped"] == 1
+
+    def test_failed_tree_retried(self):
+        """Test that the same tree is reviewed again after a failed run."""
+        with with_key("k1"), fake_review(["false"]):
+            speculative.maybe_start(0, now=100)
+            run_to_completion()
+            speculative.maybe_start(0, now=200)
+            prepared(now=200)
+        assert speculative.get_stats()["started"] == 2
+
+    def test_cancelled_tree_retried(self):
+        """Test that the same tree is reviewed again after a cancelled run."""
+        with with_key("k1"), fake_review(["sleep", "10"]):
+            speculative.maybe_start(0, now=100)
+            prepared(now=100)
+            speculative.cancel()
+            speculative.maybe_start(0, now=200)
+            prepared(now=200)
+        assert speculative.is_running() is True
+        assert speculative.get_stats()["started"] == 2
+
+    def test_cached_tree_skipped(self):
+        """Test that a tree whose review is cached is not re-reviewed."""
+        from vim4rabbit.types import ReviewResult
+
+        cache.store_review("k1", ReviewResult(success=True))
+        with with_key("k1"), fake_review(["true"]):
+            speculative.maybe_start(now=100)
+            assert prepared(now=100) is False
+        assert speculative.is_running() is False
+        assert speculative.get_stats()["skipped"] == 1
+
+    def test_no_fingerprint_skipped(self):
+        """Test that a tree that cannot be fingerprinted is skipped."""
+        with with_key(""), fake_review(["true"]):
+            speculative.maybe_start(now=100)
+            assert prepared(now=100) is False
+        assert speculative.get_stats()["skipped"] == 1
+
+    def test_supersedes_older_run(self):
+        """Test that a new tree cancels the run for the old one."""
+        with fake_review(["sleep", "10"]):
+            with with_key("k1"):
+                speculative.maybe_start(0, now=100)
+                prepared(now=100)
+            old = speculative._job
+            with with_key("k2"):
+                assert speculative.maybe_start(0, now=200) is True
+                assert old.state == "running"
+                prepared(now=200)
+        assert old.state == "cancelled"
+        assert speculative.get_stats()["superseded"] == 1
+
+
+class TestPoll:
+    """Tests for poll."""
+
+    def test_idle(self):
+        """Test that polling with nothing running reports idle."""
+        assert speculative.poll() is False
+
+    def test_failed_run_not_cached(self):
+        """Test that a failing run is counted and not cached."""
+        with with_key("k1"), fake_review(["false"]):
+            speculative.maybe_start(now=100)
+            run_to_completion()
+        assert cache.load_review("k1") is None
+        assert speculative.get_stats()["failed"] == 1
+
+
+class TestHitsAndMisses:
+    """Tests for claim and note_cache_hit."""
+
+    def test_claim_running_run_is_hit(self):
+        """Test that a review of the speculated tree adopts its run."""
+        with with_key("k1"), fake_review(["sleep", "10"]):
+            speculative.maybe_start(now=100)
+            wait_prepared()
+        job = speculative.claim("k1")
+        assert job is not None
+        assert speculative.is_running() is False
+        assert speculative.get_stats()["hits"] == 1
+        job.cancel()
+
+    def test_claim_while_starting_is_miss(self):
+        """Test that a start still fingerprinting its tree is not adopted."""
+        release = threading.Event()
+
+        def slow_key(review_type, cwd=None):
+            release.wait(10)
+            return "k1"
+
+        slow = patch("vim4rabbit.cache.compute_cache_key", side_effect=slow_key)
+        with slow, fake_review(["sleep", "10"]):
+            speculative.maybe_start(now=100)
+            assert speculative.claim("k1") is None
+            release.set()
+            wait_prepared()
+        assert speculative.get_stats()["misses"] == 1
+
+    def test_claim_finished_uncached_run_is_hit(self):
+        """Test that a run finished before its result was cached is adopted."""
+        with with_key("k1"), fake_review(["printf", "File: a.py\\n"]):
+            speculative.maybe_start(now=100)
+            speculative._starting.wait(10)
+        job = speculative.claim("k1")
+        assert job is not None
+        assert [i.file_path for i in job.result().issues] == ["a.py"]
+        assert speculative.get_stats()["hits"] == 1
+
+    def test_claim_cancelled_run_is_miss(self):
+        """Test that a cancelled run is not adopted."""
+        with with_key("k1"), fake_review(["sleep", "10"]):
+            speculative.maybe_start(now=100)
+            prepared()
+        speculative._job.cancel()
+        assert speculative.claim("k1") is None
+
+    def test_claim_other_tree_is_miss(self):
+        """Test that a review of a different tree counts a miss."""
+        with with_key("k1"), fake_review(["sleep", "10"]):
+            speculative.maybe_start(now=100)
+            wait_prepared()
+        assert speculative.claim("k2") is None
+        assert speculative.is_running() is True
+        assert speculative.get_stats()["misses"] == 1
+
+    def test_cache_hit_on_produced_key(self):
+        """Test that only speculatively produced cache hits are counted."""
+        with with_key("k1"), fake_review(["true"]):
+            speculative.maybe_start(now=100)
+            run_to_completion()
+        speculative.note_cache_hit("k1")
+        speculative.note_cache_hit("other")
+        assert speculative.get_stats()["hits"] == 1
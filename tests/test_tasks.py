@@ -0,0 +1,76 @@
+"""Tests for vim4rabbit.tasks module."""
+
+import threading
+
+import pytest
+from vim4rabbit import tasks
+from vim4rabbit.tasks import Task
+
+
+@pytest.fixture(autouse=True)
+def reset_tasks():
+    """Forget every task after each test."""
+    yield
+    for task_id in list(tasks._tasks):
+        tasks.cancel(task_id)
+
+
+class TestTask:
+    """Tests for Task."""
+
+    def test_result(self):
+        """Test that the function runs with the task and its arguments."""
+        task = Task(lambda task, a, b: (task.phase, a + b), 1, 2, phase="Adding")
+        assert task.result() == ("Adding", 3)
+        assert task.poll() == {"state": "done", "phase": "Adding"}
+
+    def test_running_and_phase(self):
+        """Test that the task reports its phase while it runs."""
+        release = threading.Event()
+
+        def work(task):
+            task.phase = "Waiting"
+            release.wait(5)
+            return "ok"
+
+        task = Task(work)
+        assert task.wait(0.05) is False
+        assert task.poll() == {"state": "running", "phase": "Waiting"}
+        release.set()
+        assert task.wait(5) is True
+        assert task.result() == "ok"
+
+    def test_failure(self):
+        """Test that an exception fails the task with its message."""
+        def work(task):
+            raise ValueError("bad output")
+
+        task = Task(work)
+        assert task.result() is None
+        assert task.state == "failed"
+        assert task.error == "bad output"
+
+    def test_cancel_drops_result(self):
+        """Test that a cancelled task has no result."""
+        release = threading.Event()
+        task = Task(lambda task: release.wait(5))
+        task.cancel()
+        release.set()
+        assert task.result() is None
+        assert task.state == "cancelled"
+
+
+class TestTaskRegistry:
+    """Tests for the module-level task registry."""
+
+    def test_start_get_pop(self):
+        """Test that started tasks are tracked until popped."""
+        task_id = tasks.start(lambda task: 42)
+        assert tasks.get(task_id) is tasks.latest()
+        assert tasks.pop(task_id).result() == 42
+        assert tasks.get(task_id) is None
+        assert tasks.latest() is None
+
+    def test_ids_are_unique(self):
+        """Test that each start returns a new id."""
+        assert tasks.start(lambda task: 1) != tasks.start(lambda task: 2)
@@ -1,7 +1,20 @@
 """Tests for vim4rabbit.types module."""
 
 import pytest
-from vim4rabbit.types import ReviewIssue, ReviewResult
+from vim4rabbit.types import (
+    DeltaPlan,
+    HunkResult,
+    IssueTracking,
+    PatchHunk,
+    PatchResult,
+    ReviewIssue,
+    ReviewMetrics,
+    ReviewOutput,
+    ReviewResult,
+    ReviewSession,
+    ReviewShard,
+    WIRE_VERSION,
+)
 
 
 class TestReviewIssue:
@@ -47,6 +60,112 @@ class TestReviewIssue:
         issue = ReviewIssue(prompt="Fix this bug")
         assert issue.prompt == "Fix this bug"
 
+    def test_from_dict_round_trip(self):
+        """Test that from_dict restores an issue produced by to_dict."""
+        issue = ReviewIssue(
+            lines=["Line 1"],
+            file_path="src/main.py",
+            line_range="10-20",
+            issue_type="potential_issue",
+            summary="Test summary",
+            prompt="Fix it",
+        )
+        assert ReviewIssue.from_dict(issue.to_dict()) == issue
+
+    def test_value_lines_are_copies(self):
+        """Test that value-backed lines are stored apart from the caller's list."""
+        lines = ["Line 1"]
+        issue = ReviewIssue(lines=lines)
+        lines.append("Line 2")
+        issue.lines.append("Line 3")
+        assert issue.lines == ["Line 1"]
+        assert isinstance(issue.to_list(), list)
+        assert isinstance(issue.to_dict()["lines"], list)
+
+    def test_file_path_and_type_interned(self):
+        """Test that issues of one file share their path and type strings."""
+        # Built at runtime, so each dict holds its own string objects
+        first, second = (
+            ReviewIssue.from_dict({"file_path": "src/" + name, "issue_type": "nit" + kind})
+            for name, kind in [("a.py", "pick"), ("a.py", "pick")]
+        )
+        assert first.file_path is second.file_path
+        assert first.issue_type is second.issue_type
+
+    def test_no_instance_dict(self):
+        """Test that issues are slotted."""
+        assert not hasattr(ReviewIssue(), "__dict__")
+
+    def test_from_dict_missing_keys(self):
+        """Test that from_dict defaults missing keys."""
+        issue = ReviewIssue.from_dict({"summary": "Only summary"})
+        assert issue.summary == "Only summary"
+        assert issue.lines == []
+        assert issue.file_path == ""
+
+
+class TestReviewIssueFromOutput:
+    """Tests for ReviewIssue backed by offsets into a ReviewOutput."""
+
+    TEXT = "File: a.py  \nComment: Summary here\nPrompt: one\n  two\n"
+
+    def make_issue(self, output):
+        """Issue over the whole TEXT."""
+        return ReviewIssue.from_output(
+            output,
+            (0, len(self.TEXT) - 1),
+            file_path="a.py",
+            summary_span=(22, 34),
+            prompt_spans=((43, 46), (49, 52)),
+        )
+
+    def test_fields_materialized_from_output(self):
+        """Test that lines, summary and prompt are sliced from the output."""
+        issue = self.make_issue(ReviewOutput(self.TEXT))
+        assert issue.lines == ["File: a.py", "Comment: Summary here", "Prompt: one", "  two"]
+        assert issue.summary == "Summary here"
+        assert issue.prompt == "one\ntwo"
+        assert issue.file_path == "a.py"
+
+    def test_equals_issue_built_from_values(self):
+        """Test that equality compares field values, not storage."""
+        issue = self.make_issue(ReviewOutput(self.TEXT))
+        assert issue == ReviewIssue.from_dict(issue.to_dict())
+        assert issue != ReviewIssue(lines=issue.lines)
+
+    def test_long_summary_truncated_on_access(self):
+        """Test that a summary span over 60 characters is truncated."""
+        output = ReviewOutput("x" * 100)
+        issue = ReviewIssue.from_output(output, (0, 100), summary_span=(0, 100))
+        assert issue.summary == "x" * 57 + "..."
+
+    def test_sees_output_appended_later(self):
+        """Test that an issue reads the output as it is when accessed."""
+        output = ReviewOutput("Issue one")
+        issue = ReviewIssue.from_output(output, (0, 9))
+        output.append("\nmore")
+        assert issue.lines == ["Issue one"]
+
+
+class TestReviewOutput:
+    """Tests for ReviewOutput."""
+
+    def test_append_and_text(self):
+        """Test that chunks are joined into one text."""
+        output = ReviewOutput()
+        for chunk in ("ab", "c", "", "de"):
+            output.append(chunk)
+        assert output.text == "abcde"
+        assert len(output) == 5
+
+    def test_single_chunk_not_copied(self):
+        """Test that a single chunk is kept as the same string."""
+        text = "".join(["some ", "output"])
+        output = ReviewOutput()
+        output.append(text)
+        assert output.text is text
+        assert ReviewOutput(text).text is text
+
 
 class TestReviewResult:
     """Tests for ReviewResult dataclass."""
@@ -67,21 +186,142 @@ class TestReviewResult:
         assert len(result.issues) == 2
 
     def test_to_dict(self):
-        """Test conversion to dict."""
+        """Test conversion to the compact dict: every issue sent once."""
         issues = [ReviewIssue(lines=["Line 1", "Line 2"])]
         result = ReviewResult(success=True, issues=issues, error_message="")
         d = result.to_dict()
+        assert d["version"] == WIRE_VERSION
         assert d["success"] is True
-        assert d["issues"] == [["Line 1", "Line 2"]]
         assert d["error_message"] == ""
-        assert "issues_data" in d
+        assert "issues" not in d
         assert len(d["issues_data"]) == 1
         assert d["issues_data"][0]["lines"] == ["Line 1", "Line 2"]
 
+    def test_to_dict_without_bodies(self):
+        """Test that issue lines can be left out."""
+        issues = [ReviewIssue(lines=["Line 1"], file_path="a.py")]
+        d = ReviewResult(success=True, issues=issues).to_dict(bodies=False)
+        assert d["issues_data"] == [{
+            "file_path": "a.py", "line_range": "", "issue_type": "",
+            "summary": "", "prompt": "",
+        }]
+
+    def test_to_dict_legacy(self):
+        """Test the legacy shape with lines repeated in issues."""
+        issues = [ReviewIssue(lines=["Line 1", "Line 2"])]
+        d = ReviewResult(success=True, issues=issues).to_dict(legacy=True)
+        assert set(d) == {"success", "issues", "issues_data", "error_message"}
+        assert d["issues"] == [["Line 1", "Line 2"]]
+        assert d["issues_data"][0]["lines"] == ["Line 1", "Line 2"]
+
     def test_error_result(self):
         """Test error result."""
         result = ReviewResult(success=False, error_message="Command not found")
         d = result.to_dict()
         assert d["success"] is False
         assert d["error_message"] == "Command not found"
-        assert d["issues"] == []
+        assert d["issues_data"] == []
+
+
+class TestReviewShard:
+    """Tests for ReviewShard dataclass."""
+
+    def test_defaults(self):
+        """Test that a new shard has not exited yet."""
+        shard = ReviewShard()
+        assert shard.exit_code == -1
+        assert shard.files == []
+
+    def test_to_dict(self):
+        """Test conversion to dict."""
+        shard = ReviewShard(index=2, files=["a.py"], cwd="/tmp/x",
+                            exit_code=0, elapsed_secs=1.5, issue_count=4)
+        assert shard.to_dict() == {
+            "index": 2, "files": ["a.py"], "cwd": "/tmp/x",
+            "exit_code": 0, "elapsed_secs": 1.5, "issue_count": 4,
+        }
+
+
+class TestDeltaPlan:
+    """Tests for DeltaPlan dataclass."""
+
+    def test_defaults(self):
+        """Test that a new plan is a full review."""
+        plan = DeltaPlan()
+        assert plan.full is True
+        assert plan.changed == []
+        assert plan.carried == []
+
+    def test_file_hashes_not_sent_to_vim(self):
+        """Test that ReviewResult.to_dict omits file hashes."""
+        result = ReviewResult(success=True, file_hashes={"a.py": "1"})
+        assert "file_hashes" not in result.to_dict()
+
+
+class TestReviewMetrics:
+    """Tests for ReviewMetrics dataclass."""
+
+    def test_defaults(self):
+        """Test that unmeasured phases are None."""
+        review = ReviewMetrics()
+        assert review.spawn is None
+        assert review.parse == 0.0
+        assert review.issue_times == []
+
+    def test_to_dict(self):
+        """Test that every phase is serialized."""
+        d = ReviewMetrics(review_type="uncommitted", total=2.5, bytes_read=10).to_dict()
+        assert d["review_type"] == "uncommitted"
+        assert d["total"] == 2.5
+        assert d["bytes_read"] == 10
+        assert d["render"] is None
+
+
+class TestIssueTracking:
+    """Tests for IssueTracking dataclass."""
+
+    def test_counts(self):
+        """Test the new and persisting counts."""
+        tracking = IssueTracking(statuses=["new", "persisting", "new"], resolved=["x"], known=True)
+        assert tracking.new_count == 2
+        assert tracking.persisting_count == 1
+        d = tracking.to_dict()
+        assert d["new"] == 2
+        assert d["persisting"] == 1
+        assert d["resolved"] == ["x"]
+
+
+class TestPatchTypes:
+    """Tests for PatchHunk and PatchResult dataclasses."""
+
+    def test_hunk_sides(self):
+        """Test the old and new text of a hunk."""
+        hunk = PatchHunk(lines=[" a", "-b", "+c"])
+        assert hunk.old_lines == ["a", "b"]
+        assert hunk.new_lines == ["a", "c"]
+
+    def test_result_to_dict(self):
+        """Test the applied count and serialization."""
+        result = PatchResult(
+            issue=2,
+            file_path="a.py",
+            hunks=[HunkResult(index=1, applied=True, line=3), HunkResult(index=2)],
+        )
+        assert result.applied_count == 1
+        d = result.to_dict()
+        assert d["issue"] == 2
+        assert d["applied"] == 1
+        assert d["failed"] == 1
+        assert d["error"] == ""
+
+
+class TestReviewSession:
+    """Tests for ReviewSession."""
+
+    def test_issue_by_number(self):
+        """Test that issues are looked up by 1-based number."""
+        issue = ReviewIssue(file_path="a.py")
+        session = ReviewSession(review_id=1, issues=[issue])
+        assert session.issue(1) is issue
+        assert session.issue(0) is None
+        assert session.issue(2) is None